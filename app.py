@@ -1,9 +1,12 @@
 #!/usr/bin/env python3
 from __future__ import annotations
 
+import atexit
 import logging
 import os
 import base64
+import hashlib
+import threading
 import time
 import traceback
 
@@ -12,13 +15,25 @@ import joblib
 import numpy as np
 import openai
 import requests
-from flask import Flask, render_template, request, jsonify, send_file
+from flask import Flask, Response, render_template, request, jsonify, send_file, make_response
 from flask_cors import CORS
 
 from datetime import datetime
+from functools import wraps
 from pathlib import Path
 
-from src.database.db import DatabaseConnection
+from src.database.counters import TOTALS_RECONCILE_INTERVAL_SECONDS_DEFAULT, TotalsReconciler
+from src.database.db import EXPORT_COLUMNS, DatabaseConnection
+from src.database.group_commit import GroupCommitWriter
+from src.database.pool import PoolConfig
+from src.database.repository import TotemRepository, open_idempotency_store, open_repository, sqlite_path_from_url
+from src.database.idempotency import ClaimStatus, IdempotencyStore
+from src.database.snapshots import (
+    SNAPSHOT_INTERVAL_SECONDS_DEFAULT,
+    SNAPSHOT_KEEP_DEFAULT,
+    SNAPSHOT_PAGES_PER_STEP_DEFAULT,
+    SnapshotManager,
+)
 
 from dotenv import load_dotenv
 
@@ -26,10 +41,42 @@ from dotenv import load_dotenv
 # Importar agents e prompts
 # from prompts.agents_config import get_agent
 
+from src.modules.admission import (
+    AdmissionController,
+    AdmissionDecision,
+    InferenceAdmission,
+    InferenceSaturated,
+    RoutePolicy,
+    ShedReason,
+    parse_route_policy,
+)
 from src.modules.image import ImageClassifier
-from src.modules.sprint3_analytics import build_analytics_report, build_daily_trend, is_admin_authenticated
+from src.modules.inference_pool import InferenceResult, ProcessPoolInferenceExecutor, read_cv_metrics
+from src.modules.export_stream import EXPORT_FORMATS, csv_chunks, decode_cursor, encode_cursor, ndjson_chunks
+from src.modules.json_provider import COMPACT_MEDIA_TYPE, FastJSONProvider, compact_payload
+from src.modules.period_stats import PeriodStatsCache
+from src.modules.sprint3_analytics import (
+    ANALYTICS_MAX_BUCKETS_DEFAULT,
+    build_analytics_report,
+    build_analytics_report_from_rollup,
+    build_daily_trend_from_counts,
+    bucket_labels,
+    is_admin_authenticated,
+    parse_analytics_range,
+)
 
 from src.hardware.esp32 import ESP32_API_URL, get_esp32_sensors, calculate_environmental_impact, check_esp32_mechanical, confirm_esp32_detection
+from src.hardware.esp32 import (
+    esp32_breakers,
+    get_esp32_sensors_with_mechanical,
+    get_esp32_telemetry_token,
+    http_session as esp32_http,
+    ingest_esp32_telemetry,
+    start_esp32_call,
+    telemetry_store as esp32_telemetry,
+    token_snapshot as esp32_token_snapshot,
+)
+from src.hardware.telemetry import is_device_authenticated
 
 # Carregar variáveis de ambiente
 load_dotenv()
@@ -38,6 +85,7 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s | %(levelname)s | %(
 logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
+app.json = FastJSONProvider(app)  # orjson + NumPy: rotas não precisam converter com float(...)
 CORS(app)
 
 # 🐛 Configurar pasta de imagens como estática
@@ -76,8 +124,75 @@ ESP32_LOCAL_TIMEOUT_SECONDS = 20.0
 TOTEM_ACCESS_USERNAME = 'aluno'
 TOTEM_ACCESS_PASSWORD = 'fiap2026'
 
+# Idempotência: retries do totem com o mesmo `Idempotency-Key` recebem a resposta original
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+IDEMPOTENCY_TTL_SECONDS = float(os.getenv('IDEMPOTENCY_TTL_SECONDS', '600'))
+IDEMPOTENCY_MAX_ENTRIES = int(os.getenv('IDEMPOTENCY_MAX_ENTRIES', '1024'))
+
+# Admissão nas rotas de inferência: limite por totem ("<N>/<s|min|hour>[:burst]", env RATE_LIMIT_<ROTA>)
+# e semáforo global de classificações em andamento com fila curta (429 + Retry-After quando saturado)
+ADMISSION_DEFAULT_POLICIES = {
+    'classify': '120/min:20',
+    'validate_complete': '30/min:10',
+    'validate_mechanical': '30/min:10',
+    'save_deposit': '30/min:10',
+}
+KIOSK_ID_HEADER = 'X-Kiosk-Id'
+INFERENCE_MAX_IN_FLIGHT = int(os.getenv('INFERENCE_MAX_IN_FLIGHT', '4'))
+INFERENCE_MAX_QUEUE = int(os.getenv('INFERENCE_MAX_QUEUE', '8'))
+INFERENCE_QUEUE_TIMEOUT_SECONDS = float(os.getenv('INFERENCE_QUEUE_TIMEOUT_SECONDS', '2.0'))
+
+# Pool de processos para classificação (0 = classifica na thread da requisição)
+INFERENCE_PROCESS_WORKERS = int(os.getenv('INFERENCE_PROCESS_WORKERS', '0'))
+
+# Backend de persistência: sem DATABASE_URL (ou sqlite:///arquivo) usa o SQLite local com pool WAL;
+# outra URL (ex.: postgresql+psycopg://...) usa o backend SQLAlchemy compartilhado entre instâncias
+DATABASE_URL = os.getenv('DATABASE_URL', '')
+# Pool SQLite (WAL): conexões de longa duração emprestadas por bloco `with db_connection as db:`
+DB_POOL_CONFIG = PoolConfig(
+    size=int(os.getenv('DB_POOL_SIZE', '4')),
+    busy_timeout_ms=int(os.getenv('DB_BUSY_TIMEOUT_MS', '5000')),
+    cache_size_kib=int(os.getenv('DB_CACHE_SIZE_KIB', '8192')),
+)
+# Group commit (opcional): interações/depósitos enfileirados e gravados em lote por uma thread única
+DB_GROUP_COMMIT = os.getenv('DB_GROUP_COMMIT', 'False').lower() == 'true'
+DB_GROUP_COMMIT_INTERVAL_MS = int(os.getenv('DB_GROUP_COMMIT_INTERVAL_MS', '20'))
+DB_GROUP_COMMIT_MAX_ROWS = int(os.getenv('DB_GROUP_COMMIT_MAX_ROWS', '64'))
+
+# Dashboard admin: janela da série diária e quantidade de depósitos recentes exibidos
+DASHBOARD_TREND_DAYS = 7
+DASHBOARD_LATEST_DEPOSITS = 10
+DASHBOARD_PERIOD_CACHE_TTL_SECONDS = float(os.getenv('DASHBOARD_PERIOD_CACHE_TTL_SECONDS', '3600'))
+# Contadores de totais (tabela mantida por trigger): recontagem periódica contra as tabelas
+DB_TOTALS_RECONCILE_INTERVAL_SECONDS = float(os.getenv('DB_TOTALS_RECONCILE_INTERVAL_SECONDS',
+                                                       str(TOTALS_RECONCILE_INTERVAL_SECONDS_DEFAULT)))
+# Limite de buckets por resposta do relatório analítico com from/to/granularity
+ANALYTICS_MAX_BUCKETS = int(os.getenv('ANALYTICS_MAX_BUCKETS', str(ANALYTICS_MAX_BUCKETS_DEFAULT)))
+# Exportação em stream: linhas por consulta (página de chave) ao banco
+EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', '1000'))
+# Snapshots de leitura (opcional): relatório analítico lê uma cópia periódica do banco vivo
+ANALYTICS_SNAPSHOTS = os.getenv('ANALYTICS_SNAPSHOTS', 'False').lower() == 'true'
+ANALYTICS_SNAPSHOT_DIR = os.getenv('ANALYTICS_SNAPSHOT_DIR', 'snapshots')
+ANALYTICS_SNAPSHOT_INTERVAL_SECONDS = float(os.getenv('ANALYTICS_SNAPSHOT_INTERVAL_SECONDS',
+                                                      str(SNAPSHOT_INTERVAL_SECONDS_DEFAULT)))
+ANALYTICS_SNAPSHOT_KEEP = int(os.getenv('ANALYTICS_SNAPSHOT_KEEP', str(SNAPSHOT_KEEP_DEFAULT)))
+ANALYTICS_SNAPSHOT_PAGES_PER_STEP = int(os.getenv('ANALYTICS_SNAPSHOT_PAGES_PER_STEP',
+                                                  str(SNAPSHOT_PAGES_PER_STEP_DEFAULT)))
+
+# Resposta compacta para o totem: `?compact=1` ou `Accept: application/vnd.totem.compact+json`
+COMPACT_QUERY_PARAM = 'compact'
+
 image_classifier: ImageClassifier | None = None
-db_connection: DatabaseConnection | None = None
+inference_executor: ProcessPoolInferenceExecutor | None = None
+_inference_executor_lock = threading.Lock()
+_inference_executor_failed = False  # pool não subiu: classificação na thread até o fim do processo
+db_connection: TotemRepository | None = None
+idempotency_store: IdempotencyStore | None = None
+admission_controller: AdmissionController | None = None
+period_stats: PeriodStatsCache | None = None
+snapshot_manager: SnapshotManager | None = None
+totals_reconciler: TotalsReconciler | None = None
 
 # Status ESP32 para comunicação com front-end
 esp32_status = {
@@ -139,6 +254,231 @@ def enforce_totem_basic_auth():
     response.headers['WWW-Authenticate'] = 'Basic realm="Totem IA"'
     return response
 
+# ============================================================================
+# 🔁 IDEMPOTÊNCIA - RETRIES DO TOTEM SEM TRABALHO DUPLICADO
+# ============================================================================
+def _ensure_idempotency_store() -> IdempotencyStore:
+    """Garante o armazenamento de chaves de idempotência (LRU + tabela no banco de DATABASE_URL)."""
+    global idempotency_store
+    if idempotency_store is None:
+        shared = sqlite_path_from_url(DATABASE_URL) is None
+        idempotency_store = open_idempotency_store(
+            DATABASE_URL,
+            repository=_ensure_db_connection() if shared else None,
+            ttl_seconds=IDEMPOTENCY_TTL_SECONDS,
+            max_entries=IDEMPOTENCY_MAX_ENTRIES
+        )
+        if shared:
+            logger.info("✅ Idempotência: chaves no banco compartilhado (retries valem entre instâncias)")
+        else:
+            logger.info(f"✅ Idempotência: chaves em {idempotency_store.db_path} (só workers desta instância; "
+                        "várias instâncias exigem DATABASE_URL compartilhado)")
+    return idempotency_store
+
+
+def _request_fingerprint() -> str:
+    """Hash do payload da requisição (JSON ou multipart) para detectar reuso indevido da chave."""
+    digest = hashlib.sha256(f"{request.method} {request.path}".encode('utf-8'))
+    if request.is_json:
+        digest.update(request.get_data(cache=True))
+        return digest.hexdigest()
+
+    for name in sorted(request.files):
+        upload = request.files[name]
+        digest.update(f"{name}:{upload.filename}".encode('utf-8'))
+        digest.update(upload.stream.read())
+        upload.stream.seek(0)
+    for name in sorted(request.form):
+        digest.update(f"{name}={request.form[name]}".encode('utf-8'))
+    return digest.hexdigest()
+
+
+def idempotent(view):
+    """Aplica semântica de `Idempotency-Key` a uma rota de depósito.
+
+    - Sem o header, a rota executa normalmente.
+    - Retry dentro do TTL recebe a resposta original (header `Idempotent-Replayed: true`).
+    - Duplicata concorrente espera o resultado da requisição em andamento.
+    - Respostas 5xx e 429 (admissão) não são armazenadas, para que o retry possa reexecutar.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER, '').strip()
+        if not key:
+            return view(*args, **kwargs)
+
+        if len(key) > IDEMPOTENCY_KEY_MAX_LENGTH:
+            return jsonify({
+                'status': 'erro',
+                'error': f'{IDEMPOTENCY_HEADER} muito longo (máximo {IDEMPOTENCY_KEY_MAX_LENGTH} caracteres)',
+                'timestamp': datetime.now().isoformat()
+            }), 400
+
+        store = _ensure_idempotency_store()
+        scoped_key = f"{request.path}:{key}"
+        fingerprint = _request_fingerprint()
+        claim = store.begin(scoped_key, fingerprint)
+
+        if claim.status == ClaimStatus.REPLAY:
+            logger.info(f"🔁 Idempotência: reenviando resposta original para {request.path}")
+            replay = make_response(claim.response.body, claim.response.status_code)
+            replay.mimetype = 'application/json'
+            replay.headers['Idempotent-Replayed'] = 'true'
+            return replay
+
+        if claim.status == ClaimStatus.CONFLICT:
+            logger.warning(f"⚠️ Idempotência: chave reutilizada com payload diferente em {request.path}")
+            return jsonify({
+                'status': 'erro',
+                'error': f'{IDEMPOTENCY_HEADER} já utilizado com outro conteúdo',
+                'timestamp': datetime.now().isoformat()
+            }), 422
+
+        if claim.status == ClaimStatus.IN_PROGRESS:
+            logger.warning(f"⚠️ Idempotência: requisição duplicada ainda em andamento em {request.path}")
+            response = jsonify({
+                'status': 'erro',
+                'error': 'Requisição com a mesma chave ainda em processamento',
+                'timestamp': datetime.now().isoformat()
+            })
+            response.status_code = 409
+            response.headers['Retry-After'] = '1'
+            return response
+
+        try:
+            response = make_response(view(*args, **kwargs))
+        except Exception:
+            store.abort(scoped_key)
+            raise
+
+        if response.status_code < 500 and response.status_code != 429 and response.is_json:
+            store.complete(scoped_key, fingerprint, response.status_code, response.get_data())
+        else:
+            store.abort(scoped_key)
+        return response
+
+    return wrapper
+
+
+# ============================================================================
+# 🚦 ADMISSÃO - RATE LIMIT POR TOTEM + SEMÁFORO DE INFERÊNCIA
+# ============================================================================
+def _build_admission_policies() -> dict[str, RoutePolicy]:
+    """Lê limites por rota do ambiente (`RATE_LIMIT_<ROTA>`), com fallback para o padrão."""
+    policies = {}
+    for route, default_spec in ADMISSION_DEFAULT_POLICIES.items():
+        spec = os.getenv(f'RATE_LIMIT_{route.upper()}', default_spec)
+        try:
+            policies[route] = parse_route_policy(spec)
+        except ValueError as e:
+            logger.warning(f"⚠️ RATE_LIMIT_{route.upper()} inválido ({e}), usando {default_spec}")
+            policies[route] = parse_route_policy(default_spec)
+    return policies
+
+
+def _ensure_admission_controller() -> AdmissionController:
+    """Garante controlador de admissão inicializado para as rotas de inferência."""
+    global admission_controller
+    if admission_controller is None:
+        admission_controller = AdmissionController(
+            _build_admission_policies(),
+            InferenceAdmission(
+                max_in_flight=INFERENCE_MAX_IN_FLIGHT,
+                max_queue=INFERENCE_MAX_QUEUE,
+                queue_timeout_seconds=INFERENCE_QUEUE_TIMEOUT_SECONDS
+            )
+        )
+    return admission_controller
+
+
+def _client_key() -> str:
+    """Identifica o totem: header `X-Kiosk-Id`, senão IP de origem (primeiro hop do proxy)."""
+    kiosk_id = request.headers.get(KIOSK_ID_HEADER, '').strip()
+    if kiosk_id:
+        return f"kiosk:{kiosk_id}"
+    forwarded_for = request.headers.get('X-Forwarded-For', '')
+    if forwarded_for:
+        return f"ip:{forwarded_for.split(',')[0].strip()}"
+    return f"ip:{request.remote_addr or 'desconhecido'}"
+
+
+def _shed_response(decision: AdmissionDecision):
+    """429 + Retry-After para uma requisição descartada pela admissão."""
+    if decision.reason == ShedReason.RATE_LIMITED:
+        message = 'Muitas requisições deste totem. Aguarde e tente novamente.'
+    else:
+        message = 'Servidor ocupado processando outras imagens. Tente novamente.'
+    logger.warning(f"🚦 Admissão: {request.path} descartada ({decision.reason.value})")
+    response = jsonify({
+        'status': 'erro',
+        'error': message,
+        'reason': decision.reason.value,
+        'timestamp': datetime.now().isoformat()
+    })
+    response.status_code = 429
+    response.headers['Retry-After'] = str(decision.retry_after_seconds)
+    return response
+
+
+def admission_controlled(route_name: str):
+    """Aplica rate limit por totem à rota; a vaga de inferência é pedida em `_classify_admitted`."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            decision = _ensure_admission_controller().check_rate(route_name, _client_key())
+            if not decision.admitted:
+                return _shed_response(decision)
+            try:
+                return view(*args, **kwargs)
+            except InferenceSaturated as e:
+                return _shed_response(e.decision)
+        return wrapper
+    return decorator
+
+
+# ============================================================================
+# 📦 RESPOSTA COMPACTA PARA O TOTEM
+# ============================================================================
+def _wants_compact() -> bool:
+    """Cliente pediu o esquema compacto (`?compact=1` ou `Accept` com o media type compacto)."""
+    if request.args.get(COMPACT_QUERY_PARAM, '').strip().lower() in {'1', 'true', 'yes'}:
+        return True
+    return any(mimetype == COMPACT_MEDIA_TYPE for mimetype, _ in request.accept_mimetypes)
+
+
+def _kiosk_json(payload: dict, status_code: int):
+    """jsonify das rotas do totem, aplicando o esquema compacto quando negociado."""
+    if not _wants_compact():
+        return jsonify(payload), status_code
+    response = jsonify(compact_payload(payload))
+    response.status_code = status_code
+    response.headers['Vary'] = 'Accept'
+    return response
+
+
+def _round_cv_metric(v, default=0, decimals=3):
+    if isinstance(v, (int, float)):
+        return round(float(v), decimals) if decimals else int(v)
+    try:
+        return round(float(v), decimals) if v is not None else default
+    except (TypeError, ValueError):
+        return default
+
+
+def _build_cv_debug(cv_metrics: dict) -> dict:
+    """Métricas CV da classificação no formato do `cv_debug` (arredondadas para leitura)."""
+    if not cv_metrics:
+        return {}
+    return {
+        'hough': _round_cv_metric(cv_metrics.get('hough', 0), 0, 0),
+        'hough_consistent': cv_metrics.get('hough_consistent', False) is True,
+        'circularity': _round_cv_metric(cv_metrics.get('circularity', 0), 0),
+        'aspect_ratio': _round_cv_metric(cv_metrics.get('aspect_ratio', 0), 0),
+        'ellipse_aspect': _round_cv_metric(cv_metrics.get('ellipse_aspect', 0), 0),
+        'contour_area': _round_cv_metric(cv_metrics.get('contour_area', 0), 0, 1),
+    }
+
+
 # Rota para servir imagem de teste (para simulador ESP32)
 @app.route('/test_tampinha.jpg')
 def serve_test_image():
@@ -232,9 +572,10 @@ def serve_debug_image(filename):
 
 
 @app.route('/api/classify', methods=['POST'])
+@admission_controlled('classify')
 def api_classify():
     try:
-        classifier = _ensure_image_classifier()
+        classifier = _local_classifier()
         image = None
 
         if request.is_json:
@@ -274,7 +615,7 @@ def api_classify():
         if image is None:
             return jsonify({'error': 'Erro ao processar imagem'}), 400
 
-        pred, conf, sat, method = classifier.classify_image(image, is_debug_mode=MODO_DEBUG) if classifier else (None, None, None, None)
+        pred, conf, sat, method = _classify_admitted('classify', classifier, image, is_debug_mode=MODO_DEBUG).as_tuple()
 
         if pred is None:
             return jsonify({
@@ -289,8 +630,8 @@ def api_classify():
             'status': 'sucesso' if is_tampinha else 'rejeitado',
             'is_tampinha': is_tampinha,
             'classification': 'TAMPINHA ACEITA!' if is_tampinha else 'NAO E TAMPINHA',
-            'confidence': float(conf) if conf is not None else None,
-            'saturation': float(sat) if sat is not None else None,
+            'confidence': conf,
+            'saturation': sat,
             'method': method,
             'timestamp': datetime.now().isoformat()
         }
@@ -306,8 +647,10 @@ def api_classify():
 
         logger.info(f"Classificação: {response['classification']} (conf: {conf:.2f}, sat: {sat:.1f})")
 
-        return jsonify(response), 200
+        return _kiosk_json(response, 200)
 
+    except InferenceSaturated:
+        raise
     except Exception as e:
         logger.error(f"Erro no endpoint /classify: {e}", exc_info=True)
         return jsonify({
@@ -377,6 +720,8 @@ def api_validate_mechanical():
 # ROTA ANTIGA: Validação Completa (Software + Mecânica com ESP32) 
 # =============================================================================
 @app.route('/api/validate-complete', methods=['POST'])
+@idempotent
+@admission_controlled('validate_complete')
 def api_validate_complete():
     """
     Validação completa de tampinha (com resposta rápida):
@@ -384,7 +729,7 @@ def api_validate_complete():
     2. Validação mecânica via ESP32 → em background (não bloqueia)
     """
     try:
-        classifier = _ensure_image_classifier()
+        classifier = _local_classifier()
         image = None
 
         # Processar imagem igual ao /api/classify
@@ -416,7 +761,8 @@ def api_validate_complete():
             return jsonify({'error': 'Erro ao processar imagem'}), 400
 
         # ========== ETAPA 1: Classificação Software (RÁPIDA) ==========
-        pred, conf, sat, method = classifier.classify_image(image) if classifier else (None, None, None, None)
+        classification = _classify_admitted('validate_complete', classifier, image)
+        pred, conf, sat, method = classification.as_tuple()
         
         if pred is None:
             if db_connection:
@@ -433,25 +779,8 @@ def api_validate_complete():
 
         is_tampinha = pred == 1
 
-        # Métricas CV para debug (visíveis no console do browser) — valores JSON-serializáveis
-        def _safe_cv(v, default=0, decimals=3):
-            if isinstance(v, (int, float)):
-                return round(float(v), decimals) if decimals else int(v)
-            try:
-                return round(float(v), decimals) if v is not None else default
-            except (TypeError, ValueError):
-                return default
-
-        cv_debug = {}
-        if classifier:
-            cv_debug = {
-                'hough': _safe_cv(getattr(classifier, '_last_hough_count', 0), 0, 0),
-                'hough_consistent': getattr(classifier, '_last_hough_consistent', False) is True,
-                'circularity': _safe_cv(getattr(classifier, '_last_circularity', 0), 0),
-                'aspect_ratio': _safe_cv(getattr(classifier, '_last_aspect_ratio', 0), 0),
-                'ellipse_aspect': _safe_cv(getattr(classifier, '_last_ellipse_aspect', 0), 0),
-                'contour_area': _safe_cv(getattr(classifier, '_last_contour_area', 0), 0, 1),
-            }
+        # Métricas CV para debug (visíveis no console do browser); omitidas na resposta compacta
+        cv_debug = {} if _wants_compact() else _build_cv_debug(classification.cv_metrics)
         logger.info(f"🔬 CV Debug: {cv_debug}")
 
         # Rejeitar sempre que pred=0 (CV ou SVM rejeitou). Não há bypass por saturação.
@@ -464,17 +793,17 @@ def api_validate_complete():
 
             # Se não é tampinha, rejeita imediatamente
             logger.warning(f"❌ Item rejeitado: não é tampinha (conf: {conf:.2f})")
-            return jsonify({
+            return _kiosk_json({
                 'status': 'rejeitado',
                 'stage': 'classificacao',
                 'message': 'Item rejeitado - Não é tampinha',
                 'classification': 'NAO E TAMPINHA',
-                'confidence': float(conf) if conf is not None else None,
-                'saturation': float(sat) if sat is not None else None,
+                'confidence': conf,
+                'saturation': sat,
                 'method': method,
                 'cv_debug': cv_debug,
                 'timestamp': datetime.now().isoformat()
-            }), 200
+            }, 200)
 
         logger.info(f"✅ Classificação OK: TAMPINHA (conf: {conf:.2f})")
 
@@ -486,8 +815,8 @@ def api_validate_complete():
                 'classificacao': {
                     'status': 'sucesso',
                     'is_tampinha': True,
-                    'confidence': float(conf) if conf is not None else None,
-                    'saturation': float(sat) if sat is not None else None,
+                    'confidence': conf,
+                    'saturation': sat,
                     'method': method,
                     'cv_debug': cv_debug,
                 }
@@ -496,7 +825,6 @@ def api_validate_complete():
         }
 
         # ========== ENVIAR PARA ESP32 EM BACKGROUND (NÃO BLOQUEIA) ==========
-        import threading
         def validate_esp32_background():
             try:
                 esp32_status['status'] = 'validating'
@@ -504,8 +832,19 @@ def api_validate_complete():
                 
                 logger.info("🔄 [Background] Iniciando validação ESP32...")
                 
-                sensors = get_esp32_sensors()
-                logger.info(f"🔌 [Background] Sensores ESP32: {sensors}")
+                # Confirmação de detecção não depende de sensores/validação mecânica: vai em paralelo
+                detection_confirm_wait = start_esp32_call(
+                    confirm_esp32_detection, 'tampinha', float(conf) if conf is not None else 0.0
+                )
+                
+                # Firmware com `sensors_mechanical`: sensores + validação mecânica numa requisição
+                combined = get_esp32_sensors_with_mechanical()
+                if combined is not None:
+                    sensors, esp32_check = combined
+                    logger.info(f"🔌 [Background] Sensores + validação mecânica (combinado): {sensors} | {esp32_check}")
+                else:
+                    sensors = get_esp32_sensors()
+                    logger.info(f"🔌 [Background] Sensores ESP32: {sensors}")
                 esp32_status['message'] = f"📊 Sensores recebidos: {sensors}"
                 
                 presenca = sensors.get('presenca', True) if sensors else True
@@ -516,8 +855,9 @@ def api_validate_complete():
                 logger.info(f"📊 [Background] Valores extraídos: presença={presenca}, peso={peso}g, weight_ok={weight_ok}")
                 esp32_status['message'] = f"✓ Presença={presenca}, Peso={peso}g"
                 
-                # Chamar validação mecânica
-                esp32_check = check_esp32_mechanical(presenca, peso)
+                # Chamar validação mecânica (caminho sequencial: firmware sem a requisição combinada)
+                if combined is None:
+                    esp32_check = check_esp32_mechanical(presenca, peso)
                 logger.info(f"⚙️  [Background] Resposta validação mecânica: {esp32_check}")
                 esp32_status['message'] = f"✓ Validação mecânica: {esp32_check.get('status', 'OK') if esp32_check else 'OK'}"
                 
@@ -527,8 +867,8 @@ def api_validate_complete():
                     esp32_status['message'] = "⚠️ ESP32 offline - usando fallback"
                     logger.info(f"✅ [Background] Fallback ativado: {esp32_check}")
                 
-                # Confirmar detecção
-                detection_confirm = confirm_esp32_detection('tampinha', float(conf) if conf is not None else 0.0)
+                # Confirmar detecção (iniciada em paralelo acima)
+                detection_confirm = detection_confirm_wait()
                 logger.info(f"✔️  [Background] Confirmação de detecção: {detection_confirm}")
                 esp32_status['message'] += " | ✓ Detecção confirmada"
                 
@@ -539,12 +879,9 @@ def api_validate_complete():
                 # Salvar no banco de dados
                 if db_connection:
                     with db_connection as db:
-                        deposit_id = db.save_deposit_data(conf, bool(presenca), weight_ok, peso, plastico_reciclado_g)
-                        logger.info(f"💾 [Background] Depósito salvo no BD com ID: {deposit_id}")
+                        deposit_id = db.record_deposit_outcome(conf, bool(presenca), weight_ok, peso, plastico_reciclado_g)
+                        logger.info(f"💾 [Background] Depósito salvo no BD com ID: {deposit_id} (interação SUCESSO)")
                         esp32_status['message'] += f" | 💾 Depósito #{deposit_id}"
-                        
-                        db.save_interaction(DatabaseConnection.ResultadoInteracao.SUCESSO, deposit_id)
-                        logger.info(f"📝 [Background] Interação registrada como SUCESSO")
                 else:
                     logger.warning("⚠️ [Background] Banco de dados não disponível")
                     esp32_status['message'] += " | ⚠️ BD indisponível"
@@ -565,8 +902,10 @@ def api_validate_complete():
         thread.start()
         logger.info("🚀 [Background] Thread ESP32 iniciada")
 
-        return jsonify(response), 200
+        return _kiosk_json(response, 200)
 
+    except InferenceSaturated:
+        raise
     except Exception as e:
         logger.error(f"Erro em /validate-complete: {e}", exc_info=True)
         return jsonify({
@@ -589,21 +928,23 @@ def get_esp32_status():
 def esp32_health():
 
     try:
-        response = requests.get(
+        response = esp32_http.get(
             f"{ESP32_API_URL}/api/health",
-            timeout=ESP32_HEALTH_TIMEOUT_SECONDS
+            timeout=esp32_http.timeout(ESP32_HEALTH_TIMEOUT_SECONDS)
         )
         
         if response.status_code == 200:
             return jsonify({
                 'status': 'online',
                 'esp32': response.json(),
+                'circuit_breakers': esp32_breakers.snapshot(),
                 'timestamp': datetime.now().isoformat()
             }), 200
         else:
             return jsonify({
                 'status': 'offline',
                 'message': f'ESP32 retornou {response.status_code}',
+                'circuit_breakers': esp32_breakers.snapshot(),
                 'timestamp': datetime.now().isoformat()
             }), 503
     except Exception as e:
@@ -611,18 +952,63 @@ def esp32_health():
         return jsonify({
             'status': 'offline',
             'error': str(e),
+            'circuit_breakers': esp32_breakers.snapshot(),
             'timestamp': datetime.now().isoformat()
         }), 503
 
 
+@app.route('/api/esp32/telemetry', methods=['POST'])
+def esp32_telemetry_ingest():
+    """Recebe leituras de presença/peso/temperatura empurradas pelo ESP32 (ou relay)."""
+    try:
+        auth_header = request.headers.get('Authorization', '').strip()
+        if not is_device_authenticated(auth_header, get_esp32_telemetry_token()):
+            return jsonify({
+                'status': 'erro',
+                'error': 'Acesso não autorizado',
+                'timestamp': datetime.now().isoformat()
+            }), 401
+
+        if not request.is_json:
+            return jsonify({
+                'status': 'erro',
+                'error': 'Payload JSON obrigatório',
+                'timestamp': datetime.now().isoformat()
+            }), 400
+
+        try:
+            accepted = ingest_esp32_telemetry(request.get_json(silent=True))
+        except ValueError as e:
+            return jsonify({
+                'status': 'erro',
+                'error': str(e),
+                'timestamp': datetime.now().isoformat()
+            }), 400
+
+        return jsonify({
+            'success': True,
+            'accepted': accepted,
+            'timestamp': datetime.now().isoformat()
+        }), 200
+    except Exception as e:
+        logger.error(f"❌ Erro ao receber telemetria ESP32: {e}", exc_info=True)
+        return jsonify({
+            'status': 'erro',
+            'error': 'Erro interno ao receber telemetria',
+            'timestamp': datetime.now().isoformat()
+        }), 500
+
+
 # =============================================================================
 # NOVA ROTA: Validação Mecânica (apenas presença e peso - ESP32)
 # =============================================================================
 @app.route('/api/validate_mechanical', methods=['POST'])
+@idempotent
+@admission_controlled('validate_mechanical')
 def validate_mechanical():
     """Validação completa: Software (ML) + Mecânica (ESP32)"""
     try:
-        classifier = _ensure_image_classifier()
+        classifier = _local_classifier()
         # 1. Receber imagem
         if 'image' not in request.files:
             return jsonify({
@@ -649,7 +1035,9 @@ def validate_mechanical():
             }), 400
         
         # 3. Classificar com SVM
-        pred, conf, sat, method = classifier.classify_image(image, is_debug_mode=MODO_DEBUG) if classifier else (None, None, None, None)
+        pred, conf, sat, method = _classify_admitted(
+            'validate_mechanical', classifier, image, is_debug_mode=MODO_DEBUG
+        ).as_tuple()
         
         if pred is None:
             if db_connection:
@@ -673,12 +1061,12 @@ def validate_mechanical():
             else:
                 logger.warning("⚠️ Conexão com o banco de dados não estabelecida")
 
-            return jsonify({
+            return _kiosk_json({
                 'status': 'Objeto não é tampinha',
                 'validation': 'FAIL',
-                'confidence': float(conf) if conf is not None else None,
+                'confidence': conf,
                 'message': 'Por favor, deposite apenas tampinhas!'
-            }), 400
+            }, 400)
         
         # 4. Se ML OK, obter dados de verificação mecânica
         # Tenta conectar ao ESP32 real, se falhar, simula resposta
@@ -712,7 +1100,7 @@ def validate_mechanical():
                 'error': f'Erro ao comunicar com ESP32: {str(e)}',
                 'validation': 'OK',
                 'mechanical': 'UNKNOWN',
-                'confidence': float(conf) if conf is not None else None,
+                'confidence': conf,
                 'message': 'Erro na verificação mecânica. Tente novamente.'
             }), 500
         
@@ -733,23 +1121,21 @@ def validate_mechanical():
 
             if db_connection:
                 with db_connection as db:
-                    deposit_id = db.save_deposit_data(conf, presence, weight_ok, esp32_data.get('weight_value', 0), plastico_reciclado_g)
-
-                    db.save_interaction(DatabaseConnection.ResultadoInteracao.SUCESSO, deposit_id)
+                    db.record_deposit_outcome(conf, presence, weight_ok, esp32_data.get('weight_value', 0), plastico_reciclado_g)
             else:
                 logger.warning("⚠️ Conexão com o banco de dados não estabelecida")
 
-            return jsonify({
+            return _kiosk_json({
                 'status': 'Depósito autorizado!',
                 'validation': 'OK',
                 'mechanical': 'OK',
-                'confidence': float(conf) if conf is not None else None,
+                'confidence': conf,
                 'impacto': impact,
                 'message': '✅ Tampinha depositada com sucesso!',
                 'presence': presence,
                 'weight_ok': weight_ok,
                 'color': 'green'
-            }), 200
+            }, 200)
         else:
             logger.warning(f"❌ Verificação mecânica falhou: presença={presence}, peso={weight_ok}")
 
@@ -759,17 +1145,19 @@ def validate_mechanical():
             else:
                 logger.warning("⚠️ Conexão com o banco de dados não estabelecida")
             
-            return jsonify({
+            return _kiosk_json({
                 'status': 'Erro na verificação mecânica',
                 'validation': 'OK',
                 'mechanical': 'FAIL',
-                'confidence': float(conf) if conf is not None else None,
+                'confidence': conf,
                 'presence': presence,
                 'weight_ok': weight_ok,
                 'message': 'Falha ao detectar tampinha no depósito. Tente novamente.',
                 'color': 'red'
-            }), 400
+            }, 400)
 
+    except InferenceSaturated:
+        raise
     except Exception as outer_error:
         logger.error(f"❌ Erro no endpoint /validate_mechanical: {outer_error}", exc_info=True)
         return jsonify({
@@ -987,10 +1375,12 @@ def api_debug_confirm():
 
 
 @app.route('/api/save_deposit', methods=['POST'])
+@idempotent
+@admission_controlled('save_deposit')
 def api_save_deposit():
     """Salva depósito manual com classificação para testes e integração."""
     try:
-        classifier = _ensure_image_classifier()
+        classifier = _local_classifier()
         if not request.is_json:
             return jsonify({
                 'status': 'erro',
@@ -1018,28 +1408,29 @@ def api_save_deposit():
                 'timestamp': datetime.now().isoformat()
             }), 400
 
-        pred, conf, _, _ = classifier.classify_image(image, is_debug_mode=MODO_DEBUG) if classifier else (None, None, None, None)
+        pred, conf, _, _ = _classify_admitted('save_deposit', classifier, image, is_debug_mode=MODO_DEBUG).as_tuple()
         if pred != 1:
-            return jsonify({
+            return _kiosk_json({
                 'status': 'rejeitado',
                 'message': 'Item não classificado como tampinha',
                 'timestamp': datetime.now().isoformat()
-            }), 400
+            }, 400)
 
         final_confidence = float(data.get('confidence', conf if conf is not None else 0.0))
         deposit_id = None
         if db_connection:
             with db_connection as db:
-                deposit_id = db.save_deposit_data(final_confidence, True, True, 2500, 0.5)
-                db.save_interaction(DatabaseConnection.ResultadoInteracao.SUCESSO, deposit_id)
+                deposit_id = db.record_deposit_outcome(final_confidence, True, True, 2500, 0.5)
 
-        return jsonify({
+        return _kiosk_json({
             'status': 'sucesso',
             'message': 'Depósito salvo com sucesso',
             'deposit_id': deposit_id,
             'confidence': final_confidence,
             'timestamp': datetime.now().isoformat()
-        }), 200
+        }, 200)
+    except InferenceSaturated:
+        raise
     except Exception as e:
         logger.error(f"❌ Erro em /api/save_deposit: {e}", exc_info=True)
         return jsonify({
@@ -1049,15 +1440,87 @@ def api_save_deposit():
         }), 500
 
 
-def _ensure_db_connection() -> DatabaseConnection:
+def _ensure_db_connection() -> TotemRepository:
     """Garante conexão de banco inicializada para uso nas rotas."""
     global db_connection
     if db_connection is None:
-        db_connection = DatabaseConnection()
+        db_connection = open_repository(DATABASE_URL, DB_POOL_CONFIG)
         db_connection.init_db()
+        _attach_db_writer(db_connection)
+        _ensure_totals_reconciler(db_connection)
     return db_connection
 
 
+def _attach_db_writer(database: TotemRepository) -> None:
+    """Liga o group commit quando `DB_GROUP_COMMIT` está ativo (flush durável no encerramento; só SQLite)."""
+    if not DB_GROUP_COMMIT or not isinstance(database, DatabaseConnection) or database.writer is not None:
+        return
+    database.writer = GroupCommitWriter(
+        database,
+        interval_ms=DB_GROUP_COMMIT_INTERVAL_MS,
+        max_rows=DB_GROUP_COMMIT_MAX_ROWS
+    )
+    atexit.register(_close_db_writer)
+    logger.info(f"✅ Group commit ativo: flush a cada {DB_GROUP_COMMIT_INTERVAL_MS}ms ou {DB_GROUP_COMMIT_MAX_ROWS} escritas")
+
+
+def _close_db_writer() -> None:
+    """Grava as escritas pendentes do group commit e desliga o writer."""
+    if db_connection is not None and db_connection.writer is not None:
+        db_connection.writer.close()
+        db_connection.writer = None
+
+
+def _ensure_totals_reconciler(database: TotemRepository) -> TotalsReconciler | None:
+    """Reconcilia os contadores de totais ao iniciar e a cada `DB_TOTALS_RECONCILE_INTERVAL_SECONDS` (0 desliga)."""
+    global totals_reconciler
+    if totals_reconciler is None and DB_TOTALS_RECONCILE_INTERVAL_SECONDS > 0:
+        totals_reconciler = TotalsReconciler(database, interval_seconds=DB_TOTALS_RECONCILE_INTERVAL_SECONDS)
+        atexit.register(totals_reconciler.close)
+    return totals_reconciler
+
+
+def _ensure_period_stats() -> PeriodStatsCache:
+    """Garante o cache dos totais por período do dashboard."""
+    global period_stats
+    if period_stats is None:
+        period_stats = PeriodStatsCache(ttl_seconds=DASHBOARD_PERIOD_CACHE_TTL_SECONDS)
+    return period_stats
+
+
+def _ensure_snapshot_manager() -> SnapshotManager | None:
+    """Garante a thread de snapshots quando `ANALYTICS_SNAPSHOTS` está ativo (None caso contrário)."""
+    global snapshot_manager
+    if not ANALYTICS_SNAPSHOTS:
+        return None
+    if snapshot_manager is None:
+        database = _ensure_db_connection()
+        if not isinstance(database, DatabaseConnection):
+            return None  # backup online é do SQLite; no backend SQL as leituras vão ao banco compartilhado
+        snapshot_manager = SnapshotManager(
+            database.db_path,
+            ANALYTICS_SNAPSHOT_DIR,
+            interval_seconds=ANALYTICS_SNAPSHOT_INTERVAL_SECONDS,
+            keep=ANALYTICS_SNAPSHOT_KEEP,
+            pages_per_step=ANALYTICS_SNAPSHOT_PAGES_PER_STEP
+        )
+        snapshot_manager.start()
+        atexit.register(snapshot_manager.close)
+        logger.info(f"✅ Snapshots de analytics a cada {ANALYTICS_SNAPSHOT_INTERVAL_SECONDS:.0f}s em '{ANALYTICS_SNAPSHOT_DIR}'")
+    return snapshot_manager
+
+
+def _analytics_database() -> tuple[TotemRepository, dict]:
+    """Banco das leituras analíticas: snapshot mais recente ou, sem snapshot ainda, o banco vivo."""
+    manager = _ensure_snapshot_manager()
+    current = manager.reader() if manager is not None else None
+    if current is None:
+        return _ensure_db_connection(), {'kind': 'live'}
+    reader, info = current
+    details = info.as_dict()
+    return reader, {'kind': 'snapshot', 'taken_at': details['created_at'], 'age_seconds': details['age_seconds']}
+
+
 def _ensure_image_classifier() -> ImageClassifier | None:
     """Garante classificador carregado para uso nas rotas."""
     global image_classifier
@@ -1067,6 +1530,64 @@ def _ensure_image_classifier() -> ImageClassifier | None:
     return image_classifier
 
 
+def _ensure_inference_executor() -> ProcessPoolInferenceExecutor | None:
+    """Garante o pool de processos de inferência quando `INFERENCE_PROCESS_WORKERS` > 0.
+
+    Se o pool não subir (erro ao criar ou worker sem modelo no warm-up), ele é encerrado e a
+    falha fica registrada: o processo classifica na thread daí em diante, sem recriar o pool.
+    """
+    global inference_executor, _inference_executor_failed
+    if inference_executor is not None or INFERENCE_PROCESS_WORKERS <= 0 or _inference_executor_failed:
+        return inference_executor
+    with _inference_executor_lock:
+        if inference_executor is None and not _inference_executor_failed:
+            executor = None
+            try:
+                executor = ProcessPoolInferenceExecutor(INFERENCE_PROCESS_WORKERS)
+                if not executor.warm_up():
+                    raise RuntimeError('modelo não carregou em algum worker')
+                inference_executor = executor
+            except Exception as e:
+                _inference_executor_failed = True
+                logger.error(f"❌ Falha ao iniciar pool de inferência, classificando na thread: {e}", exc_info=True)
+                if executor is not None:
+                    executor.close()
+    return inference_executor
+
+
+def _local_classifier() -> ImageClassifier | None:
+    """Classificador no processo da requisição, carregado só quando não há pool de inferência.
+
+    Com o pool ativo o modelo vive apenas nos workers; carregá-lo também aqui dobraria a
+    memória por worker do gunicorn.
+    """
+    if _ensure_inference_executor() is not None:
+        return None
+    return _ensure_image_classifier()
+
+
+def _classify_admitted(route_name: str, classifier: ImageClassifier | None, image: np.ndarray,
+                       is_debug_mode: bool = False) -> InferenceResult:
+    """Classifica segurando a vaga do semáforo de inferência só durante a classificação.
+
+    Upload, chamada local ao ESP32 e escritas no banco ficam fora: um ESP32 lento não esgota
+    as vagas das demais rotas. InferenceSaturated (→ 429) se não houver vaga nem lugar na fila.
+    """
+    with _ensure_admission_controller().inference_slot(route_name):
+        return _classify_image(classifier, image, is_debug_mode=is_debug_mode)
+
+
+def _classify_image(classifier: ImageClassifier | None, image: np.ndarray, is_debug_mode: bool = False) -> InferenceResult:
+    """Classifica no pool de processos (se habilitado) ou na thread da requisição."""
+    executor = _ensure_inference_executor()
+    if executor is not None:
+        return executor.classify(image, is_debug_mode=is_debug_mode)
+    if not classifier:
+        return InferenceResult(None, None, None, "ERRO")
+    pred, conf, sat, method = classifier.classify_image(image, is_debug_mode=is_debug_mode)
+    return InferenceResult(pred, conf, sat, method, read_cv_metrics(classifier))
+
+
 @app.route('/api/admin/dashboard', methods=['GET'])
 def api_admin_dashboard():
     """
@@ -1082,33 +1603,28 @@ def api_admin_dashboard():
                 'timestamp': datetime.now().isoformat()
             }), 401
 
+        # Totais dos contadores mantidos por trigger; série e períodos por GROUP BY/LIMIT indexados
         with _ensure_db_connection() as db:
-            deposits = db.get_all_deposits()
+            aceitas = db.count_deposits()
             num_interactions = db.get_total_interacoes()
+            total_weight_grams = db.sum_deposit_weight_grams()
+            daily_counts = db.get_daily_deposit_counts(days=DASHBOARD_TREND_DAYS)
+            last_deposits = db.get_latest_deposits(limit=DASHBOARD_LATEST_DEPOSITS)
+            # today/week/month/year e change*: dias fechados em cache, só o dia corrente é consultado
+            period_fields = _ensure_period_stats().dashboard_fields(db)
 
         total_tampinhas = num_interactions
-        aceitas = len(deposits)
         rejeitadas = max(num_interactions - aceitas, 0)
         
         stats = {
             'total': total_tampinhas,
             'aceitas': aceitas,
             'rejeitadas': rejeitadas,
-            'impacto': (
-                sum(float(deposit.get('weight_value') or 0) for deposit in deposits) / 1000.0
-            ) * 0.002,
-            'changeTotal': 0,
-            'changeTaxa': 0,
-            'changeRejeitadas': 0,
-            'today': 0,
-            'week': 0,
-            'month': 0,
-            'year': 0
+            'impacto': (total_weight_grams / 1000.0) * 0.002,
+            **period_fields
         }
         
-        trend = build_daily_trend(deposits, days=7)
-        
-        last_deposits = deposits[:10]
+        trend = build_daily_trend_from_counts(daily_counts, days=DASHBOARD_TREND_DAYS)
         
         return jsonify({
             'success': True,
@@ -1138,11 +1654,34 @@ def api_admin_analytics_report():
                 'timestamp': datetime.now().isoformat()
             }), 401
 
-        with _ensure_db_connection() as db:
-            deposits = db.get_all_deposits()
-            interactions = db.get_all_interactions()
-
-        report = build_analytics_report(deposits, interactions)
+        range_args = [request.args.get(name) for name in ('from', 'to', 'granularity')]
+        if any(range_args):
+            try:
+                start, end, granularity = parse_analytics_range(*range_args)
+                labels = bucket_labels(granularity, start, end, max_buckets=ANALYTICS_MAX_BUCKETS)
+            except ValueError as e:
+                return jsonify({
+                    'status': 'erro',
+                    'error': str(e),
+                    'timestamp': datetime.now().isoformat()
+                }), 400
+
+            # Filtro e GROUP BY no banco: rollup para day/week/month, faixa indexada de timestamp para hour
+            database, source = _analytics_database()
+            with database as db:
+                buckets = db.get_analytics_buckets(granularity, start.timestamp(), end.timestamp())
+
+            report = build_analytics_report(buckets=buckets, granularity=granularity, labels=labels)
+            report['range'] = {'from': start.isoformat(), 'to': end.isoformat()}
+        else:
+            # Rollup diário (day, resultado): O(dias) linhas em vez de todo o histórico bruto
+            database, source = _analytics_database()
+            with database as db:
+                rollup_rows = db.get_daily_rollup()
+
+            report = build_analytics_report_from_rollup(rollup_rows)
+        # Idade dos dados: snapshot (cópia periódica) ou banco vivo
+        report['source'] = source
         return jsonify({
             'success': True,
             'report': report,
@@ -1157,6 +1696,113 @@ def api_admin_analytics_report():
         }), 500
 
 
+@app.route('/api/admin/export/<table>', methods=['GET'])
+def api_admin_export(table):
+    """Exporta deposits/interactions em stream (CSV ou NDJSON) com paginação por (timestamp, id).
+
+    `cursor` retoma após a última linha recebida; com `limit`, o cabeçalho `X-Next-Cursor`
+    traz o cursor da página seguinte (ausente na última página).
+    """
+    try:
+        expected_token = os.getenv('ADMIN_TOKEN', 'admin_token')
+        auth_header = request.headers.get('Authorization', '').strip()
+        if not is_admin_authenticated(auth_header, expected_token):
+            return jsonify({
+                'status': 'erro',
+                'error': 'Acesso não autorizado',
+                'timestamp': datetime.now().isoformat()
+            }), 401
+
+        if table not in EXPORT_COLUMNS:
+            return jsonify({
+                'status': 'erro',
+                'error': f"Tabela não exportável: {table}",
+                'timestamp': datetime.now().isoformat()
+            }), 404
+
+        export_format = request.args.get('format', 'csv').lower()
+        try:
+            if export_format not in EXPORT_FORMATS:
+                raise ValueError(f"Formato inválido: use {', '.join(EXPORT_FORMATS)}")
+            cursor = request.args.get('cursor')
+            after = decode_cursor(cursor) if cursor else None
+            limit = request.args.get('limit', type=int)
+            if limit is not None and limit <= 0:
+                raise ValueError("Parâmetro 'limit' deve ser positivo")
+        except ValueError as e:
+            return jsonify({
+                'status': 'erro',
+                'error': str(e),
+                'timestamp': datetime.now().isoformat()
+            }), 400
+
+        db = _ensure_db_connection()
+        headers = {'Content-Disposition': f'attachment; filename="{table}.{export_format}"'}
+        until = None
+        if limit is not None:
+            until, has_more = db.find_export_page_end(table, after, limit)
+            if has_more:
+                headers['X-Next-Cursor'] = encode_cursor(until)
+
+        columns = EXPORT_COLUMNS[table]
+        rows = db.iter_export_rows(table, after=after, until=until, batch_size=EXPORT_BATCH_SIZE)
+        if export_format == 'csv':
+            # Cabeçalho só no início: downloads retomados podem ser concatenados ao arquivo parcial
+            body = csv_chunks(columns, rows, header=after is None)
+        else:
+            body = ndjson_chunks(columns, rows)
+        return Response(body, mimetype=EXPORT_FORMATS[export_format], headers=headers)
+    except Exception as e:
+        logger.error(f"❌ Erro ao exportar {table}: {e}", exc_info=True)
+        return jsonify({
+            'status': 'erro',
+            'error': 'Erro interno ao exportar dados',
+            'timestamp': datetime.now().isoformat()
+        }), 500
+
+
+@app.route('/api/admin/metrics', methods=['GET'])
+def api_admin_metrics():
+    """Métricas operacionais do servidor (admissão: atendidas × descartadas)."""
+    try:
+        expected_token = os.getenv('ADMIN_TOKEN', 'admin_token')
+        auth_header = request.headers.get('Authorization', '').strip()
+        if not is_admin_authenticated(auth_header, expected_token):
+            return jsonify({
+                'status': 'erro',
+                'error': 'Acesso não autorizado',
+                'timestamp': datetime.now().isoformat()
+            }), 401
+
+        return jsonify({
+            'success': True,
+            'metrics': {
+                'admission': _ensure_admission_controller().snapshot(),
+                'inference': {
+                    'mode': 'process_pool' if inference_executor is not None else 'in_thread',
+                    'workers': inference_executor.workers if inference_executor is not None else 0,
+                    'pool_failed': _inference_executor_failed
+                },
+                'database': db_connection.pool_snapshot() if db_connection else None,
+                'db_writer': db_connection.writer.snapshot() if db_connection and db_connection.writer else None,
+                'snapshots': snapshot_manager.snapshot() if snapshot_manager is not None else None,
+                'totals_reconcile': totals_reconciler.snapshot() if totals_reconciler is not None else None,
+                'esp32_http': esp32_http.snapshot(),
+                'esp32_breakers': esp32_breakers.snapshot(),
+                'esp32_token': esp32_token_snapshot(),
+                'esp32_telemetry': esp32_telemetry.snapshot()
+            },
+            'timestamp': datetime.now().isoformat()
+        }), 200
+    except Exception as e:
+        logger.error(f"❌ Erro ao coletar métricas: {e}", exc_info=True)
+        return jsonify({
+            'status': 'erro',
+            'error': 'Erro interno ao coletar métricas',
+            'timestamp': datetime.now().isoformat()
+        }), 500
+
+
 if __name__ == '__main__':
     print("="*80)
     print("TOTEM IA - API FLASK")
@@ -1164,8 +1810,7 @@ if __name__ == '__main__':
     print("="*80)
     print()
 
-    image_classifier = ImageClassifier()
-    image_classifier.load_classifier()
+    _local_classifier()  # pool de inferência ou, sem ele, o modelo neste processo
     
     print("Servidor iniciando em http://0.0.0.0:5003")
     print("   Acesse http://localhost:5003 no navegador")
@@ -1174,8 +1819,7 @@ if __name__ == '__main__':
     print()
 
     try:
-        db_connection = DatabaseConnection()
-        db_connection.init_db()
+        _ensure_db_connection()
         app.run(host='0.0.0.0', port=5003, debug=False, use_reloader=False)
     except KeyboardInterrupt:
         print("\nServidor interrompido pelo usuario.")
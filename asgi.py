@@ -0,0 +1,740 @@
+#!/usr/bin/env python3
+"""
+TOTEM IA - entrada ASGI (FastAPI + uvicorn).
+
+Serve o mesmo contrato /api/* do app Flask com handlers assíncronos:
+- chamadas ao ESP32 via httpx (o worker não fica preso no round trip)
+- escritas no SQLite via aiosqlite
+- decodificação e classificação (CPU) em executor, fora do event loop
+- idempotência e admissão reutilizam os mesmos stores/controladores do app.py
+
+Páginas, admin e áudio continuam no Flask, montado via WSGI na raiz.
+
+Uso:
+    uvicorn asgi:app --host 0.0.0.0 --port 5003 --workers 2
+"""
+from __future__ import annotations
+
+import asyncio
+import base64
+import functools
+import hashlib
+import logging
+import os
+import time
+
+from collections.abc import Awaitable, Callable
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from datetime import datetime
+
+import cv2
+import httpx
+import numpy as np
+from fastapi import BackgroundTasks, FastAPI, Request
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.wsgi import WSGIMiddleware
+from fastapi.responses import JSONResponse, Response
+from starlette.datastructures import UploadFile
+
+import app as totem_flask
+from src.database.async_db import AsyncDatabaseConnection
+from src.database.db import DatabaseConnection
+from src.database.idempotency import ClaimStatus
+from src.hardware.esp32 import (
+    calculate_environmental_impact,
+    check_esp32_mechanical_async,
+    close_async_client,
+    confirm_esp32_detection_async,
+    esp32_breakers,
+    get_async_client,
+    get_esp32_sensors_async,
+    get_esp32_sensors_with_mechanical_async,
+)
+from src.modules.admission import AdmissionController, AdmissionDecision, InferenceSaturated, ShedReason
+from src.modules.json_provider import COMPACT_MEDIA_TYPE, compact_payload, dumps_bytes
+
+
+logger = logging.getLogger(__name__)
+
+# Threads para trabalho de CPU (decodificação + classificação). Com INFERENCE_PROCESS_WORKERS > 0
+# a classificação roda no pool de processos e a thread apenas aguarda o resultado.
+ASGI_CPU_WORKERS = int(os.getenv('ASGI_CPU_WORKERS', str(totem_flask.INFERENCE_MAX_IN_FLIGHT)))
+
+_cpu_executor = ThreadPoolExecutor(max_workers=ASGI_CPU_WORKERS, thread_name_prefix='totem-cpu')
+
+
+async def _run_cpu(func, *args, **kwargs):
+    """Executa função bloqueante no executor de CPU sem travar o event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_cpu_executor, functools.partial(func, *args, **kwargs))
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    """Pré-carrega modelo, pool de inferência e tabelas antes de aceitar requisições."""
+    await _run_cpu(totem_flask._local_classifier)  # pool de inferência ou, sem ele, o modelo aqui
+    await _run_cpu(totem_flask._ensure_db_connection)
+    logger.info("✅ ASGI: servidor pronto")
+    yield
+    await close_async_client()
+    await _run_cpu(totem_flask._close_db_writer)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse serializada com o mesmo provider do Flask (orjson + NumPy)."""
+
+    def render(self, content) -> bytes:
+        return dumps_bytes(content)
+
+
+app = FastAPI(title="TOTEM IA", lifespan=lifespan, default_response_class=FastJSONResponse)
+app.add_middleware(CORSMiddleware, allow_origins=['*'], allow_methods=['*'], allow_headers=['*'])
+
+
+def _error(status_code: int, error: str, **extra) -> JSONResponse:
+    """Resposta de erro no formato padrão da API."""
+    return FastJSONResponse({
+        'status': 'erro',
+        'error': error,
+        **extra,
+        'timestamp': datetime.now().isoformat()
+    }, status_code=status_code)
+
+
+def _wants_compact(request: Request) -> bool:
+    """Mesma negociação de `_wants_compact` do app.py (`?compact=1` ou `Accept`)."""
+    if request.query_params.get(totem_flask.COMPACT_QUERY_PARAM, '').strip().lower() in {'1', 'true', 'yes'}:
+        return True
+    return COMPACT_MEDIA_TYPE in request.headers.get('accept', '')
+
+
+def _kiosk_json(request: Request, payload: dict, status_code: int) -> FastJSONResponse:
+    """Resposta das rotas do totem, aplicando o esquema compacto quando negociado."""
+    if not _wants_compact(request):
+        return FastJSONResponse(payload, status_code=status_code)
+    return FastJSONResponse(compact_payload(payload), status_code=status_code, headers={'Vary': 'Accept'})
+
+
+def _async_db() -> AsyncDatabaseConnection | None:
+    """Conexão assíncrona no mesmo arquivo do `db_connection` do app Flask (None se indisponível ou não SQLite)."""
+    if not isinstance(totem_flask.db_connection, DatabaseConnection):
+        return None
+    return AsyncDatabaseConnection(totem_flask.db_connection.db_path)
+
+
+def _db_writer():
+    """GroupCommitWriter do app Flask, quando DB_GROUP_COMMIT está ativo."""
+    return getattr(totem_flask.db_connection, 'writer', None) if totem_flask.db_connection else None
+
+
+async def _save_interaction(resultado: DatabaseConnection.ResultadoInteracao, deposit_id: int | None = None) -> None:
+    writer = _db_writer()
+    if writer is not None:
+        writer.submit_interaction(resultado, deposit_id)
+        return
+    database = _async_db()
+    if database is None and totem_flask.db_connection:
+        # Backend SQLAlchemy: driver síncrono com pool próprio, fora do event loop
+        await _run_cpu(totem_flask.db_connection.save_interaction, resultado, deposit_id)
+        return
+    if database is None:
+        logger.warning("⚠️ Conexão com o banco de dados não estabelecida")
+        return
+    async with database as db:
+        await db.save_interaction(resultado, deposit_id)
+
+
+async def _save_deposit(confidence, presence, weight_ok, weight_value, plastico_reciclado_g) -> int | None:
+    """Grava depósito + interação de sucesso numa transação; retorna o id do depósito."""
+    writer = _db_writer()
+    if writer is not None:
+        try:
+            future = writer.submit_deposit_outcome(confidence, presence, weight_ok, weight_value, plastico_reciclado_g)
+            return await asyncio.wait_for(asyncio.wrap_future(future), writer.result_timeout_seconds)
+        except Exception as e:
+            logger.error(f"❌ Erro ao registrar depósito (group commit): {e}")
+            return None
+    database = _async_db()
+    if database is None and totem_flask.db_connection:
+        return await _run_cpu(totem_flask.db_connection.record_deposit_outcome,
+                              confidence, presence, weight_ok, weight_value, plastico_reciclado_g)
+    if database is None:
+        logger.warning("⚠️ Conexão com o banco de dados não estabelecida")
+        return None
+    async with database as db:
+        deposit_id = await db.record_deposit_outcome(confidence, presence, weight_ok, weight_value, plastico_reciclado_g)
+    return deposit_id
+
+
+# ============================================================================
+# 🔁 IDEMPOTÊNCIA + 🚦 ADMISSÃO (mesma semântica dos decorators do app.py)
+# ============================================================================
+def _client_key(request: Request) -> str:
+    """Identifica o totem: header `X-Kiosk-Id`, senão IP de origem (primeiro hop do proxy)."""
+    kiosk_id = request.headers.get(totem_flask.KIOSK_ID_HEADER, '').strip()
+    if kiosk_id:
+        return f"kiosk:{kiosk_id}"
+    forwarded_for = request.headers.get('X-Forwarded-For', '')
+    if forwarded_for:
+        return f"ip:{forwarded_for.split(',')[0].strip()}"
+    return f"ip:{request.client.host if request.client else 'desconhecido'}"
+
+
+async def _request_fingerprint(request: Request) -> str:
+    """Mesmo hash do `_request_fingerprint` do Flask (chaves compartilhadas entre os dois modos)."""
+    digest = hashlib.sha256(f"{request.method} {request.url.path}".encode('utf-8'))
+    if request.headers.get('content-type', '').startswith('application/json'):
+        digest.update(await request.body())
+        return digest.hexdigest()
+
+    form = await request.form()
+    files = {name: value for name, value in form.multi_items() if isinstance(value, UploadFile)}
+    fields = {name: value for name, value in form.multi_items() if not isinstance(value, UploadFile)}
+    for name in sorted(files):
+        upload = files[name]
+        digest.update(f"{name}:{upload.filename}".encode('utf-8'))
+        digest.update(await upload.read())
+        await upload.seek(0)
+    for name in sorted(fields):
+        digest.update(f"{name}={fields[name]}".encode('utf-8'))
+    return digest.hexdigest()
+
+
+async def _idempotent(request: Request, handler: Callable[[], Awaitable[Response]]) -> Response:
+    """Aplica semântica de `Idempotency-Key` ao handler (ver `idempotent` no app.py)."""
+    key = request.headers.get(totem_flask.IDEMPOTENCY_HEADER, '').strip()
+    if not key:
+        return await handler()
+
+    if len(key) > totem_flask.IDEMPOTENCY_KEY_MAX_LENGTH:
+        return _error(
+            400,
+            f'{totem_flask.IDEMPOTENCY_HEADER} muito longo (máximo {totem_flask.IDEMPOTENCY_KEY_MAX_LENGTH} caracteres)'
+        )
+
+    store = totem_flask._ensure_idempotency_store()
+    scoped_key = f"{request.url.path}:{key}"
+    fingerprint = await _request_fingerprint(request)
+    # `begin` pode esperar a requisição concorrente com a mesma chave: fora do event loop
+    claim = await asyncio.to_thread(store.begin, scoped_key, fingerprint)
+
+    if claim.status == ClaimStatus.REPLAY:
+        logger.info(f"🔁 Idempotência: reenviando resposta original para {request.url.path}")
+        return Response(
+            claim.response.body,
+            status_code=claim.response.status_code,
+            media_type='application/json',
+            headers={'Idempotent-Replayed': 'true'}
+        )
+
+    if claim.status == ClaimStatus.CONFLICT:
+        logger.warning(f"⚠️ Idempotência: chave reutilizada com payload diferente em {request.url.path}")
+        return _error(422, f'{totem_flask.IDEMPOTENCY_HEADER} já utilizado com outro conteúdo')
+
+    if claim.status == ClaimStatus.IN_PROGRESS:
+        logger.warning(f"⚠️ Idempotência: requisição duplicada ainda em andamento em {request.url.path}")
+        response = _error(409, 'Requisição com a mesma chave ainda em processamento')
+        response.headers['Retry-After'] = '1'
+        return response
+
+    try:
+        response = await handler()
+    except BaseException:
+        # Erro ou requisição cancelada: libera a chave já, em vez de deixá-la pendente até expirar.
+        # `shield` garante o abort mesmo se a tarefa for cancelada de novo durante a espera
+        await asyncio.shield(asyncio.to_thread(store.abort, scoped_key))
+        raise
+
+    if response.status_code < 500 and response.status_code != 429 and response.media_type == 'application/json':
+        await asyncio.to_thread(store.complete, scoped_key, fingerprint, response.status_code, bytes(response.body))
+    else:
+        await asyncio.to_thread(store.abort, scoped_key)
+    return response
+
+
+async def _admission_controlled(
+    route_name: str,
+    request: Request,
+    handler: Callable[[], Awaitable[Response]],
+) -> Response:
+    """Rate limit por totem (ver `admission_controlled` no app.py); a vaga de inferência é pedida em `_classify`."""
+    decision = totem_flask._ensure_admission_controller().check_rate(route_name, _client_key(request))
+    if not decision.admitted:
+        return _shed_response(request, decision)
+    try:
+        return await handler()
+    except InferenceSaturated as e:
+        return _shed_response(request, e.decision)
+
+
+def _shed_response(request: Request, decision: AdmissionDecision) -> Response:
+    if decision.reason == ShedReason.RATE_LIMITED:
+        message = 'Muitas requisições deste totem. Aguarde e tente novamente.'
+    else:
+        message = 'Servidor ocupado processando outras imagens. Tente novamente.'
+    logger.warning(f"🚦 Admissão: {request.url.path} descartada ({decision.reason.value})")
+    response = _error(429, message, reason=decision.reason.value)
+    response.headers['Retry-After'] = str(decision.retry_after_seconds)
+    return response
+
+
+async def _acquire_inference_slot(controller: AdmissionController, route_name: str) -> AdmissionDecision:
+    """`acquire_slot` pode aguardar na fila do semáforo: roda fora do event loop.
+
+    Se a requisição for cancelada durante a espera (cliente desconectou), a thread ainda conclui
+    a aquisição; a vaga obtida é devolvida quando ela terminar, em vez de vazar até o fim do processo.
+    """
+    acquisition = asyncio.ensure_future(asyncio.to_thread(controller.acquire_slot, route_name))
+    try:
+        return await asyncio.shield(acquisition)
+    except asyncio.CancelledError:
+        acquisition.add_done_callback(functools.partial(_release_if_admitted, controller))
+        raise
+
+
+def _release_if_admitted(controller: AdmissionController, acquisition: asyncio.Future) -> None:
+    if not acquisition.cancelled() and acquisition.exception() is None and acquisition.result().admitted:
+        controller.release()
+
+
+# ============================================================================
+# IMAGEM: decodificação + classificação no executor
+# ============================================================================
+def _decode_image_bytes(image_bytes: bytes) -> np.ndarray | None:
+    return cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_COLOR)
+
+
+def _decode_base64_image(image_field: str) -> np.ndarray | None:
+    image_data = image_field.split(',')[1] if ',' in image_field else image_field
+    return _decode_image_bytes(base64.b64decode(image_data))
+
+
+def _has_allowed_extension(filename: str) -> bool:
+    return '.' in filename and filename.rsplit('.', 1)[1].lower() in totem_flask.ALLOWED_EXTENSIONS
+
+
+async def _classify(route_name: str, image: np.ndarray, is_debug_mode: bool = False):
+    """Classifica segurando a vaga do semáforo só durante a classificação (ESP32 e banco ficam fora)."""
+    classifier = await _run_cpu(totem_flask._local_classifier)
+    controller = totem_flask._ensure_admission_controller()
+    decision = await _acquire_inference_slot(controller, route_name)
+    if not decision.admitted:
+        raise InferenceSaturated(decision)
+    try:
+        return await _run_cpu(totem_flask._classify_image, classifier, image, is_debug_mode=is_debug_mode)
+    finally:
+        controller.release()
+
+
+async def _read_json(request: Request) -> dict | None:
+    try:
+        return await request.json()
+    except Exception:
+        return None
+
+
+# ============================================================================
+# ROTAS /api/* (contrato idêntico ao app Flask)
+# ============================================================================
+@app.get('/api/health')
+async def health():
+    return {'status': 'ok', 'timestamp': datetime.now().isoformat()}
+
+
+@app.post('/api/classify')
+async def api_classify(request: Request):
+    return await _admission_controlled('classify', request, lambda: _classify_handler(request))
+
+
+async def _classify_handler(request: Request) -> Response:
+    try:
+        content_type = request.headers.get('content-type', '')
+        if content_type.startswith('application/json'):
+            data = await _read_json(request)
+            if not data or 'image' not in data:
+                return FastJSONResponse({'error': 'Nenhuma imagem fornecida'}, status_code=400)
+            image = await _run_cpu(_decode_base64_image, data['image'])
+        else:
+            form = await request.form() if content_type.startswith('multipart/') else {}
+            file = form.get('file')
+            if not isinstance(file, UploadFile):
+                return FastJSONResponse({'error': 'Envie uma imagem em base64 ou como arquivo'}, status_code=400)
+            if not file.filename:
+                return FastJSONResponse({'error': 'Nenhum arquivo selecionado'}, status_code=400)
+            if not _has_allowed_extension(file.filename):
+                return FastJSONResponse({'error': 'Tipo de arquivo nao permitido. Use: PNG, JPG, JPEG, GIF, BMP'}, status_code=400)
+            file_bytes = await file.read()
+            if len(file_bytes) > totem_flask.MAX_FILE_SIZE_BYTES:
+                return FastJSONResponse({'error': 'Arquivo muito grande. Maximo 10MB'}, status_code=400)
+            image = await _run_cpu(_decode_image_bytes, file_bytes)
+
+        if image is None:
+            return FastJSONResponse({'error': 'Erro ao processar imagem'}, status_code=400)
+
+        pred, conf, sat, method = (await _classify('classify', image, totem_flask.MODO_DEBUG)).as_tuple()
+
+        if pred is None:
+            return FastJSONResponse({
+                'status': 'erro',
+                'message': 'Erro ao analisar a imagem. Tente novamente.',
+                'timestamp': datetime.now().isoformat()
+            }, status_code=500)
+
+        is_tampinha = pred == 1
+        response = {
+            'status': 'sucesso' if is_tampinha else 'rejeitado',
+            'is_tampinha': is_tampinha,
+            'classification': 'TAMPINHA ACEITA!' if is_tampinha else 'NAO E TAMPINHA',
+            'confidence': conf,
+            'saturation': sat,
+            'method': method,
+            'timestamp': datetime.now().isoformat()
+        }
+        if is_tampinha:
+            response.update({'message': 'Tampinha aceita! Deposite na esteira.', 'color': 'green', 'icon': 'check'})
+        else:
+            response.update({
+                'message': 'Item rejeitado. Por favor, deposite apenas tampinhas!', 'color': 'red', 'icon': 'times'
+            })
+        return _kiosk_json(request, response, 200)
+
+    except InferenceSaturated:
+        raise
+    except Exception as e:
+        logger.error(f"Erro no endpoint /classify (ASGI): {e}", exc_info=True)
+        return FastJSONResponse({
+            'error': 'Erro interno ao classificar imagem',
+            'status': 'erro',
+            'timestamp': datetime.now().isoformat()
+        }, status_code=500)
+
+
+@app.post('/api/validate-complete')
+async def api_validate_complete(request: Request, background_tasks: BackgroundTasks):
+    return await _idempotent(request, lambda: _admission_controlled(
+        'validate_complete', request, lambda: _validate_complete_handler(request, background_tasks)
+    ))
+
+
+async def _validate_complete_handler(request: Request, background_tasks: BackgroundTasks) -> Response:
+    try:
+        content_type = request.headers.get('content-type', '')
+        if content_type.startswith('application/json'):
+            data = await _read_json(request)
+            if not data or 'image' not in data:
+                return FastJSONResponse({'error': 'Nenhuma imagem fornecida'}, status_code=400)
+            image = await _run_cpu(_decode_base64_image, data['image'])
+        else:
+            form = await request.form() if content_type.startswith('multipart/') else {}
+            file = form.get('file')
+            if not isinstance(file, UploadFile):
+                return FastJSONResponse({'error': 'Envie uma imagem em base64 ou como arquivo'}, status_code=400)
+            if not file.filename:
+                return FastJSONResponse({'error': 'Nenhum arquivo selecionado'}, status_code=400)
+            if not _has_allowed_extension(file.filename):
+                return FastJSONResponse({'error': 'Tipo de arquivo nao permitido'}, status_code=400)
+            image = await _run_cpu(_decode_image_bytes, await file.read())
+
+        if image is None:
+            return FastJSONResponse({'error': 'Erro ao processar imagem'}, status_code=400)
+
+        classification = await _classify('validate_complete', image)
+        pred, conf, sat, method = classification.as_tuple()
+
+        if pred is None:
+            await _save_interaction(DatabaseConnection.ResultadoInteracao.ERRO_DESCONHECIDO)
+            return FastJSONResponse({
+                'status': 'erro_classificacao',
+                'message': 'Erro ao classificar imagem',
+                'timestamp': datetime.now().isoformat()
+            }, status_code=500)
+
+        cv_debug = {} if _wants_compact(request) else totem_flask._build_cv_debug(classification.cv_metrics)
+
+        if pred != 1:
+            await _save_interaction(DatabaseConnection.ResultadoInteracao.REJEITADO)
+            logger.warning(f"❌ Item rejeitado: não é tampinha (conf: {conf:.2f})")
+            return _kiosk_json(request, {
+                'status': 'rejeitado',
+                'stage': 'classificacao',
+                'message': 'Item rejeitado - Não é tampinha',
+                'classification': 'NAO E TAMPINHA',
+                'confidence': conf,
+                'saturation': sat,
+                'method': method,
+                'cv_debug': cv_debug,
+                'timestamp': datetime.now().isoformat()
+            }, 200)
+
+        logger.info(f"✅ Classificação OK: TAMPINHA (conf: {conf:.2f})")
+        # Validação ESP32 roda depois da resposta, no próprio event loop (sem thread dedicada)
+        background_tasks.add_task(_validate_esp32_background, conf)
+
+        return _kiosk_json(request, {
+            'status': 'sucesso',
+            'message': '✅ Tampinha aceita! Processando depósito...',
+            'stages': {
+                'classificacao': {
+                    'status': 'sucesso',
+                    'is_tampinha': True,
+                    'confidence': conf,
+                    'saturation': sat,
+                    'method': method,
+                    'cv_debug': cv_debug,
+                }
+            },
+            'timestamp': datetime.now().isoformat()
+        }, 200)
+
+    except InferenceSaturated:
+        raise
+    except Exception as e:
+        logger.error(f"Erro em /validate-complete (ASGI): {e}", exc_info=True)
+        return _error(500, 'Erro interno na validação completa')
+
+
+async def _validate_esp32_background(conf: float | None) -> None:
+    """Versão assíncrona de `validate_esp32_background` do app.py (atualiza o mesmo `esp32_status`)."""
+    esp32_status = totem_flask.esp32_status
+    detection_confirm: asyncio.Task | None = None
+    try:
+        esp32_status['status'] = 'validating'
+        esp32_status['message'] = '⏳ Conectando ao ESP32...'
+
+        # Confirmação em paralelo com sensores/validação mecânica (não depende deles)
+        detection_confirm = asyncio.create_task(
+            confirm_esp32_detection_async('tampinha', float(conf) if conf is not None else 0.0)
+        )
+
+        combined = await get_esp32_sensors_with_mechanical_async()
+        sensors = combined[0] if combined is not None else await get_esp32_sensors_async()
+        presenca = sensors.get('presenca', True) if sensors else True
+        peso_raw = sensors.get('peso', 2600) if sensors else 2600
+        peso = int(peso_raw) if isinstance(peso_raw, (int, float)) else 2600
+        weight_ok = totem_flask.PESO_MIN_TAMPINHA <= peso <= totem_flask.PESO_MAX_TAMPINHA
+        esp32_status['message'] = f"✓ Presença={presenca}, Peso={peso}g"
+
+        esp32_check = combined[1] if combined is not None else await check_esp32_mechanical_async(presenca, peso)
+        if esp32_check is None:
+            logger.warning("⚠️ [Background] ESP32 offline, usando fallback")
+            esp32_status['message'] = "⚠️ ESP32 offline - usando fallback"
+        else:
+            esp32_status['message'] = f"✓ Validação mecânica: {esp32_check.get('status', 'OK')}"
+
+        await detection_confirm
+        esp32_status['message'] += " | ✓ Detecção confirmada"
+
+        plastico_reciclado_g = float(calculate_environmental_impact().get('plastico_reciclado_g', 0.5))
+        if totem_flask.db_connection:
+            deposit_id = await _save_deposit(conf, bool(presenca), weight_ok, peso, plastico_reciclado_g)
+            esp32_status['message'] += f" | 💾 Depósito #{deposit_id}"
+        else:
+            logger.warning("⚠️ [Background] Banco de dados não disponível")
+            esp32_status['message'] += " | ⚠️ BD indisponível"
+
+        esp32_status['status'] = 'success'
+        esp32_status['last_validation'] = datetime.now().isoformat()
+        logger.info("✅ [Background] Validação ESP32 concluída com sucesso!")
+    except Exception as e:
+        logger.error(f"❌ [Background] Erro na validação ESP32: {e}", exc_info=True)
+        esp32_status['status'] = 'error'
+        esp32_status['message'] = f"❌ Erro: {str(e)}"
+    finally:
+        # Falha antes do `await detection_confirm`: a confirmação não sobrevive ao handler
+        if detection_confirm is not None and not detection_confirm.done():
+            detection_confirm.cancel()
+        if detection_confirm is not None:
+            await asyncio.gather(detection_confirm, return_exceptions=True)
+
+
+@app.get('/api/esp32-status')
+async def get_esp32_status():
+    return totem_flask.esp32_status
+
+
+@app.get('/api/esp32-health')
+async def esp32_health():
+    try:
+        response = await get_async_client().get(
+            f"{totem_flask.ESP32_API_URL}/api/health",
+            timeout=totem_flask.ESP32_HEALTH_TIMEOUT_SECONDS
+        )
+        if response.status_code == 200:
+            return FastJSONResponse({
+                'status': 'online',
+                'esp32': response.json(),
+                'circuit_breakers': esp32_breakers.snapshot(),
+                'timestamp': datetime.now().isoformat()
+            }, status_code=200)
+        return FastJSONResponse({
+            'status': 'offline',
+            'message': f'ESP32 retornou {response.status_code}',
+            'circuit_breakers': esp32_breakers.snapshot(),
+            'timestamp': datetime.now().isoformat()
+        }, status_code=503)
+    except Exception as e:
+        logger.error(f"❌ Erro ao verificar ESP32: {e}")
+        return FastJSONResponse({
+            'status': 'offline',
+            'error': str(e),
+            'circuit_breakers': esp32_breakers.snapshot(),
+            'timestamp': datetime.now().isoformat()
+        }, status_code=503)
+
+
+@app.post('/api/validate_mechanical')
+async def validate_mechanical(request: Request):
+    return await _idempotent(request, lambda: _admission_controlled(
+        'validate_mechanical', request, lambda: _validate_mechanical_handler(request)
+    ))
+
+
+async def _validate_mechanical_handler(request: Request) -> Response:
+    try:
+        content_type = request.headers.get('content-type', '')
+        form = await request.form() if content_type.startswith('multipart/') else {}
+        file = form.get('image')
+        if not isinstance(file, UploadFile):
+            return FastJSONResponse({'error': 'Imagem não fornecida', 'validation': 'FAIL'}, status_code=400)
+        if not file.filename:
+            return FastJSONResponse({'error': 'Nenhum arquivo selecionado', 'validation': 'FAIL'}, status_code=400)
+
+        image = await _run_cpu(_decode_image_bytes, await file.read())
+        if image is None:
+            return FastJSONResponse({'error': 'Erro ao processar imagem', 'validation': 'FAIL'}, status_code=400)
+
+        pred, conf, sat, method = (await _classify('validate_mechanical', image, totem_flask.MODO_DEBUG)).as_tuple()
+
+        if pred is None:
+            await _save_interaction(DatabaseConnection.ResultadoInteracao.ERRO_DESCONHECIDO)
+            return FastJSONResponse({'error': 'Erro ao analisar a imagem', 'validation': 'FAIL'}, status_code=500)
+
+        if pred != 1:
+            await _save_interaction(DatabaseConnection.ResultadoInteracao.ERRO_CLASSIFICACAO)
+            return _kiosk_json(request, {
+                'status': 'Objeto não é tampinha',
+                'validation': 'FAIL',
+                'confidence': conf,
+                'message': 'Por favor, deposite apenas tampinhas!'
+            }, 400)
+
+        try:
+            logger.info(f"📡 Sinalizando ESP32 em {totem_flask.ESP32_IP} para verificação mecânica...")
+            esp32_response = await get_async_client().post(
+                f'http://{totem_flask.ESP32_IP}/check_mechanical',
+                json={'validation': 'OK'},
+                timeout=totem_flask.ESP32_LOCAL_TIMEOUT_SECONDS
+            )
+            esp32_data = esp32_response.json()
+            logger.info(f"✅ Resposta ESP32 Real: {esp32_data}")
+        except (httpx.ConnectError, httpx.TimeoutException):
+            logger.warning(f"⚠️ ESP32 não acessível, usando simulação de sensores")
+            esp32_data = {
+                'presence_detected': True,
+                'weight_ok': True,
+                'weight_value': 2500,
+                'timestamp': int(time.time()),
+                'simulated': True
+            }
+        except Exception as e:
+            logger.error(f"❌ Erro ao comunicar com ESP32: {str(e)}")
+            return FastJSONResponse({
+                'error': f'Erro ao comunicar com ESP32: {str(e)}',
+                'validation': 'OK',
+                'mechanical': 'UNKNOWN',
+                'confidence': conf,
+                'message': 'Erro na verificação mecânica. Tente novamente.'
+            }, status_code=500)
+
+        presence = esp32_data.get('presence_detected', esp32_data.get('presence', False))
+        weight_ok = esp32_data.get('weight_ok', False)
+
+        if presence and weight_ok:
+            impact = calculate_environmental_impact()
+            await _save_deposit(
+                conf, presence, weight_ok, esp32_data.get('weight_value', 0), impact.get('plastico_reciclado_g', 0)
+            )
+            return _kiosk_json(request, {
+                'status': 'Depósito autorizado!',
+                'validation': 'OK',
+                'mechanical': 'OK',
+                'confidence': conf,
+                'impacto': impact,
+                'message': '✅ Tampinha depositada com sucesso!',
+                'presence': presence,
+                'weight_ok': weight_ok,
+                'color': 'green'
+            }, 200)
+
+        logger.warning(f"❌ Verificação mecânica falhou: presença={presence}, peso={weight_ok}")
+        await _save_interaction(DatabaseConnection.ResultadoInteracao.ERRO_MECANICA)
+        return _kiosk_json(request, {
+            'status': 'Erro na verificação mecânica',
+            'validation': 'OK',
+            'mechanical': 'FAIL',
+            'confidence': conf,
+            'presence': presence,
+            'weight_ok': weight_ok,
+            'message': 'Falha ao detectar tampinha no depósito. Tente novamente.',
+            'color': 'red'
+        }, 400)
+
+    except InferenceSaturated:
+        raise
+    except Exception as outer_error:
+        logger.error(f"❌ Erro no endpoint /validate_mechanical (ASGI): {outer_error}", exc_info=True)
+        return FastJSONResponse({
+            'error': 'Erro interno na validação mecânica',
+            'validation': 'FAIL',
+            'timestamp': datetime.now().isoformat()
+        }, status_code=500)
+
+
+@app.post('/api/save_deposit')
+async def api_save_deposit(request: Request):
+    return await _idempotent(request, lambda: _admission_controlled(
+        'save_deposit', request, lambda: _save_deposit_handler(request)
+    ))
+
+
+async def _save_deposit_handler(request: Request) -> Response:
+    try:
+        if not request.headers.get('content-type', '').startswith('application/json'):
+            return _error(400, 'Payload JSON obrigatório')
+
+        data = await _read_json(request) or {}
+        if 'image' not in data:
+            return _error(400, 'Nenhuma imagem fornecida')
+
+        image = await _run_cpu(_decode_base64_image, data['image'])
+        if image is None:
+            return _error(400, 'Erro ao processar imagem')
+
+        pred, conf, _, _ = (await _classify('save_deposit', image, totem_flask.MODO_DEBUG)).as_tuple()
+        if pred != 1:
+            return _kiosk_json(request, {
+                'status': 'rejeitado',
+                'message': 'Item não classificado como tampinha',
+                'timestamp': datetime.now().isoformat()
+            }, 400)
+
+        final_confidence = float(data.get('confidence', conf if conf is not None else 0.0))
+        deposit_id = await _save_deposit(final_confidence, True, True, 2500, 0.5)
+
+        return _kiosk_json(request, {
+            'status': 'sucesso',
+            'message': 'Depósito salvo com sucesso',
+            'deposit_id': deposit_id,
+            'confidence': final_confidence,
+            'timestamp': datetime.now().isoformat()
+        }, 200)
+    except InferenceSaturated:
+        raise
+    except Exception as e:
+        logger.error(f"❌ Erro em /api/save_deposit (ASGI): {e}", exc_info=True)
+        return _error(500, 'Erro interno ao salvar depósito')
+
+
+# Demais rotas (páginas do totem, admin, áudio, debug) continuam servidas pelo Flask
+app.mount('/', WSGIMiddleware(totem_flask.app))
@@ -7,22 +7,34 @@ Gera gráficos com Matplotlib e Seaborn:
 - Distribuição de resultados (sucesso, rejeitado, etc.)
 - Correlação confiança ML × peso
 - Exportação CSV para análise externa
+- Exportação Parquet particionada por mês (month=YYYY-MM)
+
+As tabelas são lidas em blocos de tamanho fixo (`fetchmany`) e
+cada bloco só atualiza agregados vetorizados e é gravado nas exportações: a memória
+depende do tamanho do bloco, não do histórico.
 
 Uso:
     python scripts/analise_dados.py
     python scripts/analise_dados.py --output-dir relatorios/
+    python scripts/analise_dados.py --chunk-rows 200000 --no-parquet
+    python scripts/analise_dados.py --snapshot-dir snapshots   # lê o snapshot mais recente, não o banco vivo
 """
 from __future__ import annotations
 
 import argparse
 import csv
-import os
-from datetime import datetime
+import importlib.util
+import shutil
+import sqlite3
+import sys
 from pathlib import Path
+from typing import Iterator
 
 import matplotlib
 matplotlib.use('Agg')  # Backend sem display para servidor
 import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
 import seaborn as sns
 
 # Ajustar para encontrar o BD na raiz do projeto
@@ -31,53 +43,113 @@ PROJECT_ROOT = SCRIPT_DIR.parent
 DB_PATH = PROJECT_ROOT / "totem_data.db"
 OUTPUT_DIR = PROJECT_ROOT / "relatorios"
 
-
-def load_data(db_path: Path) -> tuple[list[dict], list[dict]]:
-    """Carrega deposits e interactions do SQLite."""
-    import sqlite3
-    if not db_path.exists():
-        print(f"⚠️ Banco não encontrado: {db_path}")
-        return [], []
-
-    conn = sqlite3.connect(str(db_path))
-    conn.row_factory = sqlite3.Row
-    cur = conn.cursor()
-
-    cur.execute("PRAGMA table_info(deposits)")
-    col_names = [r[1] for r in cur.fetchall()]
-    cur.execute("SELECT * FROM deposits ORDER BY timestamp")
-    deposits = [dict(zip(col_names, row)) for row in cur.fetchall()]
-
-    cur.execute("PRAGMA table_info(interactions)")
-    col_names = [r[1] for r in cur.fetchall()]
-    cur.execute("SELECT * FROM interactions ORDER BY timestamp")
-    interactions = [dict(zip(col_names, row)) for row in cur.fetchall()]
-
-    conn.close()
-    return deposits, interactions
-
-
-def plot_temporal_pattern(deposits: list[dict], output_path: Path) -> None:
+CHUNK_ROWS = 100_000
+
+DEPOSIT_COLUMNS = ["id", "timestamp", "ml_confidence", "weight_value", "weight_ok", "plastico_reciclado_g"]
+INTERACTION_COLUMNS = ["id", "deposit_id", "timestamp", "resultado"]
+NULLABLE_INT_COLUMNS = {"id", "deposit_id", "weight_value", "weight_ok"}
+
+# Grade fixa do histograma 2D confiança × peso (dispersão de milhões de pontos não é legível)
+CONFIDENCE_BINS = 50
+WEIGHT_BINS = 50
+
+
+def iter_chunks(conn: sqlite3.Connection, table: str, columns: list[str],
+                chunk_rows: int = CHUNK_ROWS) -> Iterator[tuple[list[tuple], pd.DataFrame]]:
+    """Blocos de até `chunk_rows` linhas (`fetchmany` de tamanho fixo): tuplas brutas e DataFrame.
+
+    As tuplas (colunas + `day`) vão direto para o CSV; o DataFrame, com `day`/`month` locais,
+    alimenta os agregados e o Parquet. Lê em ordem de id (varredura sequencial, sem saltos
+    pelo índice de timestamp) e usa a coluna `day` da migração 1 quando existe.
+    """
+    table_columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+    day_expr = "day" if "day" in table_columns else "date(timestamp, 'unixepoch', 'localtime')"
+    cursor = conn.execute(f"SELECT {', '.join(columns)}, {day_expr} AS day FROM {table} ORDER BY id")
+    while True:
+        rows = cursor.fetchmany(chunk_rows)
+        if not rows:
+            return
+        frame = pd.DataFrame.from_records(rows, columns=[*columns, "day"])
+        # Inteiras com NULL viram float no pandas; Int64 mantém o tipo no Parquet
+        for column in NULLABLE_INT_COLUMNS.intersection(columns):
+            frame[column] = frame[column].astype("Int64")
+        frame["month"] = frame["day"].str.slice(0, 7)
+        yield rows, frame
+
+
+class DepositAggregates:
+    """Agregados incrementais de deposits: contagem por dia, histograma e correlação confiança × peso."""
+
+    def __init__(self, weight_range: tuple[float, float]):
+        low, high = weight_range
+        if high <= low:
+            high = low + 1
+        self.rows = 0
+        self.counts_by_day = pd.Series(dtype="int64")
+        self.confidence_edges = np.linspace(0.0, 1.0, CONFIDENCE_BINS + 1)
+        self.weight_edges = np.linspace(low, high, WEIGHT_BINS + 1)
+        self.histogram = np.zeros((CONFIDENCE_BINS, WEIGHT_BINS), dtype=np.int64)
+        # Somatórios para Pearson sem guardar os pontos: n, Σx, Σy, Σx², Σy², Σxy
+        self._sums = np.zeros(6)
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        self.rows += len(chunk)
+        self.counts_by_day = self.counts_by_day.add(chunk["day"].value_counts(), fill_value=0)
+
+        pairs = chunk[["ml_confidence", "weight_value"]].dropna()
+        x = pairs["ml_confidence"].to_numpy(dtype=float)
+        y = pairs["weight_value"].to_numpy(dtype=float)
+        hist, _, _ = np.histogram2d(x, y, bins=(self.confidence_edges, self.weight_edges))
+        self.histogram += hist.astype(np.int64)
+        self._sums += (len(x), x.sum(), y.sum(), (x * x).sum(), (y * y).sum(), (x * y).sum())
+
+    @property
+    def pairs(self) -> int:
+        return int(self._sums[0])
+
+    def correlation(self) -> float | None:
+        n, sx, sy, sxx, syy, sxy = self._sums
+        if n < 2:
+            return None
+        denominator = np.sqrt((n * sxx - sx * sx) * (n * syy - sy * sy))
+        return float((n * sxy - sx * sy) / denominator) if denominator else None
+
+
+class ParquetMonthWriter:
+    """Grava blocos em `<root>/<tabela>/month=YYYY-MM/part-NNNNN.parquet` (layout Hive, lido por pd.read_parquet)."""
+
+    def __init__(self, root: Path, table: str):
+        self.root = root / table
+        self.parts = 0
+        if self.root.exists():
+            shutil.rmtree(self.root)  # nova execução substitui a exportação anterior em vez de duplicar partes
+
+    def write(self, chunk: pd.DataFrame) -> None:
+        for month, part in chunk.groupby("month", sort=False):
+            partition = self.root / f"month={month}"
+            partition.mkdir(parents=True, exist_ok=True)
+            part.drop(columns=["day", "month"]).to_parquet(
+                partition / f"part-{self.parts:05d}.parquet", index=False
+            )
+            self.parts += 1
+
+
+def plot_temporal_pattern(counts_by_day: pd.Series, output_path: Path) -> None:
     """Gráfico de depósitos por dia (padrão temporal)."""
-    if not deposits:
+    if counts_by_day.empty:
         print("⚠️ Sem dados para gráfico temporal")
         return
 
-    dates = []
-    for d in deposits:
-        ts = d.get("timestamp")
-        if ts is not None:
-            dates.append(datetime.fromtimestamp(ts).date())
-
-    from collections import Counter
-    counts = Counter(dates)
-    sorted_dates = sorted(counts.keys())
-    values = [counts[d] for d in sorted_dates]
+    counts_by_day = counts_by_day.sort_index()
+    dates = pd.to_datetime(counts_by_day.index)
+    positions = np.arange(len(counts_by_day))
+    # Um rótulo a cada N barras: com um ano de dados os 365 rótulos se sobreporiam
+    step = max(len(positions) // 30, 1)
 
     fig, ax = plt.subplots(figsize=(10, 5))
-    ax.bar(range(len(sorted_dates)), values, color="steelblue", edgecolor="navy", alpha=0.8)
-    ax.set_xticks(range(len(sorted_dates)))
-    ax.set_xticklabels([d.strftime("%d/%m") for d in sorted_dates], rotation=45)
+    ax.bar(positions, counts_by_day.to_numpy(), color="steelblue", edgecolor="navy", alpha=0.8)
+    ax.set_xticks(positions[::step])
+    ax.set_xticklabels(dates[::step].strftime("%d/%m"), rotation=45)
     ax.set_xlabel("Data")
     ax.set_ylabel("Número de depósitos")
     ax.set_title("Padrão temporal: depósitos por dia")
@@ -87,20 +159,15 @@ def plot_temporal_pattern(deposits: list[dict], output_path: Path) -> None:
     print(f"✅ Salvo: {output_path}")
 
 
-def plot_results_distribution(interactions: list[dict], output_path: Path) -> None:
+def plot_results_distribution(results: pd.Series, output_path: Path) -> None:
     """Gráfico de distribuição de resultados (sucesso, rejeitado, etc.)."""
-    if not interactions:
+    if results.empty:
         print("⚠️ Sem dados para gráfico de distribuição")
         return
 
-    from collections import Counter
-    results = Counter(i.get("resultado", "desconhecido") for i in interactions)
-    labels = list(results.keys())
-    sizes = list(results.values())
-
     fig, ax = plt.subplots(figsize=(8, 8))
-    colors = sns.color_palette("Set3", len(labels))
-    ax.pie(sizes, labels=labels, autopct="%1.1f%%", colors=colors, startangle=90)
+    colors = sns.color_palette("Set3", len(results))
+    ax.pie(results.to_numpy(), labels=results.index.tolist(), autopct="%1.1f%%", colors=colors, startangle=90)
     ax.set_title("Distribuição de resultados das interações")
     plt.tight_layout()
     plt.savefig(output_path, dpi=150, bbox_inches="tight")
@@ -108,80 +175,101 @@ def plot_results_distribution(interactions: list[dict], output_path: Path) -> No
     print(f"✅ Salvo: {output_path}")
 
 
-def plot_confidence_vs_weight(deposits: list[dict], output_path: Path) -> None:
-    """Gráfico de dispersão: confiança ML × peso (correlação)."""
-    confidences = []
-    weights = []
-    for d in deposits:
-        c, w = d.get("ml_confidence"), d.get("weight_value")
-        if c is not None and w is not None:
-            confidences.append(float(c))
-            weights.append(int(w))
-
-    if len(confidences) < 2:
+def plot_confidence_vs_weight(aggregates: DepositAggregates, output_path: Path) -> None:
+    """Densidade confiança ML × peso (histograma 2D) com a correlação de Pearson no título."""
+    if aggregates.pairs < 2:
         print("⚠️ Dados insuficientes para gráfico de correlação")
         return
 
     fig, ax = plt.subplots(figsize=(8, 6))
-    sns.scatterplot(x=confidences, y=weights, ax=ax, alpha=0.7)
+    mesh = ax.pcolormesh(aggregates.confidence_edges, aggregates.weight_edges,
+                         aggregates.histogram.T, cmap=sns.color_palette("rocket_r", as_cmap=True))
+    fig.colorbar(mesh, ax=ax, label="Depósitos")
+    correlation = aggregates.correlation()
     ax.set_xlabel("Confiança ML")
     ax.set_ylabel("Peso (g)")
-    ax.set_title("Correlação: confiança ML × peso do depósito")
+    title = "Correlação: confiança ML × peso do depósito"
+    ax.set_title(f"{title} (r = {correlation:.3f})" if correlation is not None else title)
     plt.tight_layout()
     plt.savefig(output_path, dpi=150, bbox_inches="tight")
     plt.close()
     print(f"✅ Salvo: {output_path}")
 
 
-def export_csv(deposits: list[dict], interactions: list[dict], output_path: Path) -> None:
-    """Exporta dados para CSV."""
-    if not deposits and not interactions:
-        print("⚠️ Sem dados para exportar CSV")
-        return
+def analyze(db_path: Path, output_dir: Path, chunk_rows: int = CHUNK_ROWS, parquet: bool = True) -> dict:
+    """Lê cada tabela uma vez em blocos, alimentando gráficos, CSV e Parquet; retorna as contagens lidas."""
+    if not db_path.exists():
+        print(f"⚠️ Banco não encontrado: {db_path}")
+        return {"deposits": 0, "interactions": 0}
 
-    with open(output_path, "w", newline="", encoding="utf-8") as f:
-        writer = csv.writer(f)
-        if deposits:
-            writer.writerow(["id", "timestamp", "ml_confidence", "weight_value", "weight_ok", "plastico_reciclado_g"])
-            for d in deposits:
-                writer.writerow([
-                    d.get("id"),
-                    d.get("timestamp"),
-                    d.get("ml_confidence"),
-                    d.get("weight_value"),
-                    d.get("weight_ok"),
-                    d.get("plastico_reciclado_g"),
-                ])
-        if interactions:
-            writer.writerow([])
-            writer.writerow(["id", "deposit_id", "timestamp", "resultado"])
-            for i in interactions:
-                writer.writerow([
-                    i.get("id"),
-                    i.get("deposit_id"),
-                    i.get("timestamp"),
-                    i.get("resultado"),
-                ])
-    print(f"✅ Salvo: {output_path}")
+    if parquet and importlib.util.find_spec("pyarrow") is None:
+        print("⚠️ pyarrow não instalado: exportação Parquet ignorada (pip install pyarrow)")
+        parquet = False
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(db_path))
+    try:
+        weight_range = conn.execute("SELECT MIN(weight_value), MAX(weight_value) FROM deposits").fetchone()
+        deposits = DepositAggregates((weight_range[0] or 0, weight_range[1] or 0))
+        results = pd.Series(dtype="int64")
+        interaction_rows = 0
+        parquet_root = output_dir / "parquet"
+        csv_path = output_dir / "dados_exportados.csv"
+
+        # CSV no formato de duas seções (deposits, linha vazia, interactions), escrito das tuplas brutas
+        with open(csv_path, "w", newline="", encoding="utf-8") as csv_file:
+            csv_writer = csv.writer(csv_file)
+            writer = ParquetMonthWriter(parquet_root, "deposits") if parquet else None
+            csv_writer.writerow(DEPOSIT_COLUMNS)
+            for rows, chunk in iter_chunks(conn, "deposits", DEPOSIT_COLUMNS, chunk_rows):
+                deposits.update(chunk)
+                csv_writer.writerows(row[:-1] for row in rows)
+                if writer:
+                    writer.write(chunk)
+
+            writer = ParquetMonthWriter(parquet_root, "interactions") if parquet else None
+            csv_writer.writerow([])
+            csv_writer.writerow(INTERACTION_COLUMNS)
+            for rows, chunk in iter_chunks(conn, "interactions", INTERACTION_COLUMNS, chunk_rows):
+                interaction_rows += len(chunk)
+                results = results.add(chunk["resultado"].fillna("desconhecido").value_counts(), fill_value=0)
+                csv_writer.writerows(row[:-1] for row in rows)
+                if writer:
+                    writer.write(chunk)
+        print(f"✅ Salvo: {csv_path}")
+        if parquet:
+            print(f"✅ Salvo: {parquet_root} (particionado por mês)")
+    finally:
+        conn.close()
+
+    print(f"📊 Lidos: {deposits.rows} depósitos, {interaction_rows} interações")
+    plot_temporal_pattern(deposits.counts_by_day.astype("int64"), output_dir / "padrao_temporal.png")
+    plot_results_distribution(results.astype("int64").sort_values(ascending=False),
+                              output_dir / "distribuicao_resultados.png")
+    plot_confidence_vs_weight(deposits, output_dir / "correlacao_confianca_peso.png")
+    return {"deposits": deposits.rows, "interactions": interaction_rows}
 
 
 def main() -> None:
     parser = argparse.ArgumentParser(description="Análise estatística dos dados do TOTEM IA")
     parser.add_argument("--db", default=str(DB_PATH), help="Caminho do banco SQLite")
     parser.add_argument("--output-dir", default=str(OUTPUT_DIR), help="Diretório de saída dos gráficos")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS, help="Linhas por bloco lido do banco")
+    parser.add_argument("--no-parquet", action="store_true", help="Não gerar a exportação Parquet")
+    parser.add_argument("--snapshot-dir", help="Ler o snapshot mais recente deste diretório (tira um se não houver)")
     args = parser.parse_args()
 
-    output_dir = Path(args.output_dir)
-    output_dir.mkdir(parents=True, exist_ok=True)
-
-    deposits, interactions = load_data(Path(args.db))
-    print(f"📊 Carregados: {len(deposits)} depósitos, {len(interactions)} interações")
+    db_path = Path(args.db)
+    if args.snapshot_dir:
+        sys.path.insert(0, str(PROJECT_ROOT))
+        from src.database.snapshots import SnapshotManager
 
-    plot_temporal_pattern(deposits, output_dir / "padrao_temporal.png")
-    plot_results_distribution(interactions, output_dir / "distribuicao_resultados.png")
-    plot_confidence_vs_weight(deposits, output_dir / "correlacao_confianca_peso.png")
-    export_csv(deposits, interactions, output_dir / "dados_exportados.csv")
+        manager = SnapshotManager(str(db_path), args.snapshot_dir)
+        latest = manager.latest() or manager.take_snapshot()
+        print(f"📦 Lendo snapshot {latest.path} ({latest.age_seconds:.0f}s de idade)")
+        db_path = Path(latest.path)
 
+    analyze(db_path, Path(args.output_dir), chunk_rows=args.chunk_rows, parquet=not args.no_parquet)
     print("✅ Análise concluída.")
 
 
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Retenção do banco do totem: move linhas antigas para arquivos SQLite mensais.
+
+O rollup diário dos meses arquivados fica no banco quente (dashboard e relatórios diários
+não mudam) e o relatório por hora anexa os arquivos frios quando o intervalo os alcança.
+
+Uso:
+    python scripts/archive_tool.py run                       # retenção de DB_RETENTION_DAYS (180)
+    python scripts/archive_tool.py run --retention-days 90 --archive-dir /data/archive
+    python scripts/archive_tool.py list                      # manifesto dos arquivos frios
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.database.archive import ARCHIVE_RETENTION_DAYS_DEFAULT  # noqa: E402
+from src.database.db import DatabaseConnection  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Retenção e arquivos frios TOTEM IA")
+    parser.add_argument('command', choices=('run', 'list'))
+    parser.add_argument('--db', default='totem_data.db', help='arquivo do banco (padrão: totem_data.db)')
+    parser.add_argument('--retention-days', type=int,
+                        default=int(os.getenv('DB_RETENTION_DAYS', str(ARCHIVE_RETENTION_DAYS_DEFAULT))),
+                        help='dias mantidos no banco quente (padrão: DB_RETENTION_DAYS ou 180)')
+    parser.add_argument('--archive-dir', default=os.getenv('DB_ARCHIVE_DIR', 'archive'),
+                        help='diretório dos arquivos mensais (padrão: DB_ARCHIVE_DIR ou ./archive)')
+    args = parser.parse_args()
+
+    db = DatabaseConnection(args.db)
+    db.init_db()  # garante migrações (manifesto de arquivos)
+
+    if args.command == 'list':
+        for item in db.get_archive_manifest():
+            print(f"{item['month']}  {item['deposits']:>9} depósitos  {item['interactions']:>9} interações  "
+                  f"até {item['archived_before']}  {item['path']}")
+        return 0
+
+    size_before = os.path.getsize(args.db)
+    results = db.archive_older_than(args.retention_days, args.archive_dir)
+    for item in results:
+        print(f"✅ {item['month']}: {item['deposits']} depósitos, {item['interactions']} interações → {item['path']}")
+    if not results:
+        print(f"✅ Nada com mais de {args.retention_days} dias para arquivar")
+    print(f"📦 {args.db}: {size_before / 1e6:.1f} MB → {os.path.getsize(args.db) / 1e6:.1f} MB")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Benchmark do scripts/analise_dados.py em banco sintético grande: caminho antigo
+(SELECT * em listas de dicts + Counter + CSV linha a linha) × leitura em blocos com
+agregados vetorizados, gráficos, CSV e Parquet por mês.
+
+Os dois modos geram os mesmos três gráficos e o CSV; o modo em blocos grava também o
+Parquet. Cada modo roda num subprocesso próprio para medir o pico de memória (ru_maxrss).
+
+Uso:
+    python scripts/benchmark_analise.py                    # 2.000.000 de depósitos
+    python scripts/benchmark_analise.py --rows 500000 --chunk-rows 50000
+    python scripts/benchmark_analise.py --db /tmp/analise.db --keep
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import random
+import resource
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+HISTORY_DAYS = 365
+BATCH_ROWS = 50_000
+
+
+def populate(db_path: Path, rows: int, seed: int = 42) -> None:
+    """Depósitos + interações (≈30% rejeições) espalhados no último ano, no schema atual."""
+    from src.database.db import DatabaseConnection
+    from src.database.pool import close_all_pools
+
+    DatabaseConnection(str(db_path)).init_db()
+    close_all_pools()
+
+    rng = random.Random(seed)
+    now = time.time()
+    conn = sqlite3.connect(str(db_path))
+    next_id = 1
+    while next_id <= rows:
+        batch = range(next_id, min(next_id + BATCH_ROWS, rows + 1))
+        deposits = [(i, now - rng.random() * HISTORY_DAYS * 86400, rng.uniform(0.6, 1.0), 1,
+                     rng.randint(2400, 2800), 1, 0.5) for i in batch]
+        conn.executemany('INSERT INTO deposits (id, timestamp, ml_confidence, presence_detected, weight_value, '
+                         'weight_ok, plastico_reciclado_g) VALUES (?, ?, ?, ?, ?, ?, ?)', deposits)
+        interactions = [(d[0], d[1], 'sucesso') for d in deposits]
+        interactions += [(None, d[1] + 1, 'rejeitado') for d in deposits if rng.random() < 0.43]
+        conn.executemany('INSERT INTO interactions (deposit_id, timestamp, resultado) VALUES (?, ?, ?)', interactions)
+        conn.commit()
+        next_id = batch.stop
+        print(f"\r  populando... {next_id - 1:,}/{rows:,}", end='', flush=True)
+    conn.close()
+    print()
+
+
+def run_legacy(db_path: Path, output_dir: Path) -> None:
+    """Caminho anterior: tudo em memória como dicts, Counter, dispersão ponto a ponto e CSV linha a linha."""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    conn = sqlite3.connect(str(db_path))
+    tables = {}
+    for table in ('deposits', 'interactions'):
+        col_names = [r[1] for r in conn.execute(f"PRAGMA table_info({table})")]
+        tables[table] = [dict(zip(col_names, row)) for row in conn.execute(f"SELECT * FROM {table} ORDER BY timestamp")]
+    conn.close()
+    deposits, interactions = tables['deposits'], tables['interactions']
+
+    counts = Counter(datetime.fromtimestamp(d['timestamp']).date() for d in deposits if d.get('timestamp') is not None)
+    sorted_dates = sorted(counts.keys())
+    fig, ax = plt.subplots(figsize=(10, 5))
+    ax.bar(range(len(sorted_dates)), [counts[d] for d in sorted_dates])
+    ax.set_xticks(range(len(sorted_dates)))
+    ax.set_xticklabels([d.strftime("%d/%m") for d in sorted_dates], rotation=45)
+    plt.savefig(output_dir / 'padrao_temporal.png', dpi=150, bbox_inches="tight")
+    plt.close()
+
+    results = Counter(i.get('resultado', 'desconhecido') for i in interactions)
+    fig, ax = plt.subplots(figsize=(8, 8))
+    ax.pie(list(results.values()), labels=list(results.keys()), autopct="%1.1f%%")
+    plt.savefig(output_dir / 'distribuicao_resultados.png', dpi=150, bbox_inches="tight")
+    plt.close()
+
+    pairs = [(float(d['ml_confidence']), int(d['weight_value'])) for d in deposits
+             if d.get('ml_confidence') is not None and d.get('weight_value') is not None]
+    fig, ax = plt.subplots(figsize=(8, 6))
+    sns.scatterplot(x=[p[0] for p in pairs], y=[p[1] for p in pairs], ax=ax, alpha=0.7)
+    plt.savefig(output_dir / 'correlacao_confianca_peso.png', dpi=150, bbox_inches="tight")
+    plt.close()
+
+    with open(output_dir / 'dados_exportados.csv', 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "timestamp", "ml_confidence", "weight_value", "weight_ok", "plastico_reciclado_g"])
+        for d in deposits:
+            writer.writerow([d.get("id"), d.get("timestamp"), d.get("ml_confidence"), d.get("weight_value"),
+                             d.get("weight_ok"), d.get("plastico_reciclado_g")])
+        writer.writerow([])
+        writer.writerow(["id", "deposit_id", "timestamp", "resultado"])
+        for i in interactions:
+            writer.writerow([i.get("id"), i.get("deposit_id"), i.get("timestamp"), i.get("resultado")])
+
+
+def run_mode(mode: str, db_path: Path, chunk_rows: int) -> dict:
+    output_dir = Path(tempfile.mkdtemp(prefix=f'analise_{mode}_'))
+    start = time.perf_counter()
+    if mode == 'legacy':
+        run_legacy(db_path, output_dir)
+    else:
+        import contextlib
+        import io
+
+        from scripts.analise_dados import analyze
+        with contextlib.redirect_stdout(io.StringIO()):
+            analyze(db_path, output_dir, chunk_rows=chunk_rows, parquet=True)
+    elapsed = time.perf_counter() - start
+    return {
+        'mode': mode,
+        'seconds': elapsed,
+        'peak_rss_mib': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'output_dir': str(output_dir),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark de scripts/analise_dados.py")
+    parser.add_argument('--rows', type=int, default=2_000_000, help='depósitos sintéticos (padrão: 2.000.000)')
+    parser.add_argument('--chunk-rows', type=int, default=100_000, help='linhas por bloco no modo em blocos')
+    parser.add_argument('--db', help='arquivo do banco (reaproveitado se já existir)')
+    parser.add_argument('--keep', action='store_true', help='não apagar o banco temporário')
+    parser.add_argument('--run-mode', choices=('legacy', 'chunked'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_mode:
+        print(json.dumps(run_mode(args.run_mode, Path(args.db), args.chunk_rows)))
+        return 0
+
+    db_path = Path(args.db) if args.db else Path(tempfile.mkdtemp(prefix='bench_analise_')) / 'analise.db'
+    if not db_path.exists():
+        print(f"📦 Gerando {args.rows:,} depósitos em {db_path}")
+        populate(db_path, args.rows)
+
+    results = []
+    for mode in ('legacy', 'chunked'):
+        completed = subprocess.run(
+            [sys.executable, __file__, '--run-mode', mode, '--db', str(db_path), '--chunk-rows', str(args.chunk_rows)],
+            capture_output=True, text=True, check=True
+        )
+        results.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+        shutil.rmtree(results[-1]['output_dir'], ignore_errors=True)
+
+    print(f"\n{'modo':<10} {'tempo (s)':>10} {'pico RSS (MiB)':>15}")
+    for result in results:
+        print(f"{result['mode']:<10} {result['seconds']:>10.2f} {result['peak_rss_mib']:>15.1f}")
+    legacy, chunked = results
+    print(f"\nmemória: {legacy['peak_rss_mib'] / chunked['peak_rss_mib']:.1f}x menor; "
+          f"tempo: {legacy['seconds'] / chunked['seconds']:.1f}x")
+
+    if not args.db and not args.keep:
+        db_path.unlink(missing_ok=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Benchmark do /api/admin/dashboard em banco sintético grande: caminho antigo
+(get_all_deposits + agregação em Python) × agregados SQL indexados.
+
+Uso:
+    python scripts/benchmark_dashboard.py                  # 1.000.000 de depósitos
+    python scripts/benchmark_dashboard.py --rows 200000 --repeat 5
+    python scripts/benchmark_dashboard.py --db /tmp/dash.db --keep
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.database.db import DatabaseConnection  # noqa: E402
+from src.database.pool import close_all_pools, get_pool  # noqa: E402
+from src.modules.sprint3_analytics import build_daily_trend, build_daily_trend_from_counts  # noqa: E402
+
+HISTORY_DAYS = 365
+BATCH_ROWS = 50_000
+
+
+def populate(db: DatabaseConnection, rows: int, seed: int = 42) -> None:
+    """Depósitos + interações (≈30% rejeições) espalhados no último ano."""
+    rng = random.Random(seed)
+    now = time.time()
+    with get_pool(db.db_path).lease() as conn:
+        next_id = 1
+        while next_id <= rows:
+            batch = range(next_id, min(next_id + BATCH_ROWS, rows + 1))
+            deposits = [(i, now - rng.random() * HISTORY_DAYS * 86400, rng.uniform(0.6, 1.0), 1,
+                         rng.randint(2400, 2800), 1, 0.5) for i in batch]
+            conn.executemany('INSERT INTO deposits (id, timestamp, ml_confidence, presence_detected, weight_value, '
+                             'weight_ok, plastico_reciclado_g) VALUES (?, ?, ?, ?, ?, ?, ?)', deposits)
+            interactions = [(d[0], d[1], 'sucesso') for d in deposits]
+            interactions += [(None, d[1] + 1, 'rejeitado') for d in deposits if rng.random() < 0.43]
+            conn.executemany('INSERT INTO interactions (deposit_id, timestamp, resultado) VALUES (?, ?, ?)', interactions)
+            conn.commit()
+            next_id = batch.stop
+            print(f"\r  populando... {next_id - 1:,}/{rows:,}", end='', flush=True)
+    print()
+
+
+def dashboard_python(db: DatabaseConnection) -> dict:
+    """Caminho anterior: materializa todo o histórico e agrega em Python."""
+    with db:
+        deposits = db.get_all_deposits()
+        total = db.get_total_interacoes()
+    return {
+        'aceitas': len(deposits),
+        'total': total,
+        'peso': sum(float(d.get('weight_value') or 0) for d in deposits),
+        'trend': build_daily_trend(deposits, days=7),
+        'deposits': deposits[:10],
+    }
+
+
+def dashboard_sql(db: DatabaseConnection) -> dict:
+    with db:
+        return {
+            'aceitas': db.count_deposits(),
+            'total': db.get_total_interacoes(),
+            'peso': db.sum_deposit_weight_grams(),
+            'trend': build_daily_trend_from_counts(db.get_daily_deposit_counts(days=7), days=7),
+            'deposits': db.get_latest_deposits(limit=10),
+        }
+
+
+def measure(func, db: DatabaseConnection, repeat: int) -> tuple[float, dict]:
+    samples = []
+    result = {}
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func(db)
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples), result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark do dashboard admin TOTEM IA")
+    parser.add_argument('--rows', type=int, default=1_000_000, help='depósitos sintéticos')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--db', help='arquivo do banco (padrão: temporário)')
+    parser.add_argument('--keep', action='store_true', help='reaproveita o banco se já populado')
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = args.db or str(Path(tmp) / 'dashboard.db')
+        db = DatabaseConnection(db_path)
+        db.init_db()
+        if not (args.keep and db.count_deposits() >= args.rows):
+            print(f"Gerando {args.rows:,} depósitos em {db_path}")
+            populate(db, args.rows)
+
+        python_ms, python_result = measure(dashboard_python, db, args.repeat)
+        sql_ms, sql_result = measure(dashboard_sql, db, args.repeat)
+        close_all_pools()
+
+    assert python_result['aceitas'] == sql_result['aceitas']
+    assert python_result['trend'] == sql_result['trend']
+    assert abs(python_result['peso'] - sql_result['peso']) < 1e-6 * max(python_result['peso'], 1)
+
+    print(f"{'caminho':<28} | {'p50 ms':>10}")
+    print("-" * 42)
+    print(f"{'get_all_deposits + Python':<28} | {python_ms:>10.1f}")
+    print(f"{'agregados SQL':<28} | {sql_ms:>10.1f}")
+    print(f"speedup: {python_ms / sql_ms:.0f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Benchmark do banco: conexão aberta/fechada por bloco (journal padrão) × pool SQLite
+em WAL com conexões emprestadas (DatabaseConnection).
+
+Mede inserts/s (depósito + interação, como /api/save-deposit) com N threads e a
+latência da leitura do dashboard (get_all_deposits + get_all_interactions).
+`pool-wal-atomic` grava os dois registros numa transação (record_deposit_outcome) e
+`group-commit` enfileira as gravações no GroupCommitWriter (um commit por lote).
+
+Uso:
+    python scripts/benchmark_db.py
+    python scripts/benchmark_db.py --inserts 2000 --threads 4 --reads 50
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.database.db import DatabaseConnection  # noqa: E402
+from src.database.group_commit import GroupCommitWriter  # noqa: E402
+from src.database.pool import PoolConfig, close_all_pools  # noqa: E402
+
+SUCESSO = DatabaseConnection.ResultadoInteracao.SUCESSO
+
+
+class OpenPerBlockDatabase:
+    """Comportamento anterior: `sqlite3.connect` + commit + close a cada operação."""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+
+    def save_deposit_outcome(self) -> None:
+        conn = sqlite3.connect(self.db_path)
+        try:
+            cursor = conn.execute(
+                'INSERT INTO deposits (timestamp, ml_confidence, presence_detected, weight_value, weight_ok, plastico_reciclado_g) '
+                'VALUES (?, ?, ?, ?, ?, ?)', (time.time(), 0.9, True, 2500, True, 0.5))
+            conn.commit()
+        finally:
+            conn.close()
+        conn = sqlite3.connect(self.db_path)
+        try:
+            conn.execute('INSERT INTO interactions (deposit_id, timestamp, resultado) VALUES (?, ?, ?)',
+                         (cursor.lastrowid, time.time(), SUCESSO.value))
+            conn.commit()
+        finally:
+            conn.close()
+
+    def read_dashboard(self) -> None:
+        for query in ('SELECT * FROM deposits ORDER BY timestamp DESC',
+                      'SELECT * FROM interactions ORDER BY timestamp DESC'):
+            conn = sqlite3.connect(self.db_path)
+            try:
+                conn.execute(query).fetchall()
+            finally:
+                conn.close()
+
+
+class PooledDatabase:
+    def __init__(self, db_path: str, pool_size: int, atomic: bool = False):
+        self.db = DatabaseConnection(db_path, pool_config=PoolConfig(size=pool_size))
+        self.atomic = atomic
+
+    def save_deposit_outcome(self) -> None:
+        with self.db as db:
+            if self.atomic:
+                db.record_deposit_outcome(0.9, True, True, 2500, 0.5)
+                return
+            deposit_id = db.save_deposit_data(0.9, True, True, 2500, 0.5)
+            db.save_interaction(SUCESSO, deposit_id)
+
+    def read_dashboard(self) -> None:
+        with self.db as db:
+            db.get_all_deposits()
+            db.get_all_interactions()
+
+
+def run_inserts(backend, inserts: int, threads: int) -> float:
+    """Depósitos por segundo com `threads` escritores concorrentes."""
+    per_thread = inserts // threads
+
+    def worker():
+        for _ in range(per_thread):
+            backend.save_deposit_outcome()
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    started = time.perf_counter()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    return per_thread * threads / (time.perf_counter() - started)
+
+
+def run_reads(backend, reads: int) -> tuple[float, float]:
+    """Latência (ms) mediana e p95 da leitura do dashboard."""
+    samples = []
+    for _ in range(reads):
+        started = time.perf_counter()
+        backend.read_dashboard()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.95) - 1]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark do banco SQLite TOTEM IA")
+    parser.add_argument('--inserts', type=int, default=1000)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--reads', type=int, default=30)
+    parser.add_argument('--pool-size', type=int, default=4)
+    parser.add_argument('--threads-group-commit', type=int, default=16,
+                        help='escritores concorrentes no cenário group-commit (totens em pico)')
+    parser.add_argument('--group-commit-ms', type=int, default=2, help='janela de flush do group commit')
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)  # logs por operação distorcem a medição
+
+    print(f"{'backend':<16} | {'inserts/s':>10} | {'dash p50 ms':>11} | {'dash p95 ms':>11}")
+    print("-" * 58)
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in ('open-per-block', 'pool-wal', 'pool-wal-atomic', 'group-commit'):
+            db_path = str(Path(tmp) / f'{name}.db')
+            DatabaseConnection(db_path).init_db()
+            close_all_pools()  # o baseline não pode herdar o arquivo já em WAL pelo init_db
+            if name == 'open-per-block':
+                sqlite3.connect(db_path).execute('PRAGMA journal_mode=DELETE').connection.close()
+                backend = OpenPerBlockDatabase(db_path)
+            else:
+                backend = PooledDatabase(db_path, args.pool_size, atomic=name != 'pool-wal')
+            threads = args.threads
+            if name == 'group-commit':
+                backend.db.writer = GroupCommitWriter(backend.db, interval_ms=args.group_commit_ms)
+                threads = args.threads_group_commit
+            rate = run_inserts(backend, args.inserts, threads)
+            p50, p95 = run_reads(backend, args.reads)
+            print(f"{name:<16} | {rate:>10.0f} | {p50:>11.2f} | {p95:>11.2f}")
+            if backend_writer := getattr(getattr(backend, 'db', None), 'writer', None):
+                stats = backend_writer.snapshot()
+                print(f"{'':<16}   lotes={stats['batches']} média={stats['avg_batch_rows']} linhas "
+                      f"commit médio={stats['avg_commit_ms']}ms")
+                backend_writer.close()
+            close_all_pools()
+
+
+if __name__ == '__main__':
+    main()
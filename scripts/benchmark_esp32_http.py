@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Benchmark das chamadas à API ESP32: `requests.get/post` avulsos (um handshake por chamada)
+× `PooledHttpSession` (keep-alive), contra um servidor local que imita a API.
+
+O servidor local aceita HTTP/1.1 keep-alive e atrasa cada conexão nova em --connect-delay-ms,
+simulando o handshake TCP+TLS com esp32-totem-server.onrender.com (sem TLS local).
+
+Uso:
+    python scripts/benchmark_esp32_http.py
+    python scripts/benchmark_esp32_http.py --deposits 200 --connect-delay-ms 80 --threads 4
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import requests
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.hardware.http_session import PooledHttpSession  # noqa: E402
+
+
+RESPONSES = {
+    '/api/auth/login': {'token': 'bench-token', 'expires_in': 3600},
+    '/api/sensors': {'presenca': True, 'peso': 2600, 'temperatura': 25.0},
+    '/api/check_mechanical': {'status': 'OK', 'message': 'Validação mecânica OK', 'peso': 2600},
+    '/api/confirm_detection': {'status': 'confirmed'},
+}
+
+
+def make_server(connect_delay_seconds: float) -> ThreadingHTTPServer:
+    class StandInHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'  # keep-alive
+        disable_nagle_algorithm = True
+
+        def setup(self):
+            time.sleep(connect_delay_seconds)  # custo de uma conexão nova (handshake)
+            super().setup()
+
+        def _reply(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            if length:
+                self.rfile.read(length)
+            body = json.dumps(RESPONSES.get(self.path, {})).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        do_GET = _reply
+        do_POST = _reply
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StandInHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def deposit_round_trip(get, post, base_url: str) -> float:
+    """Chamadas de um depósito (sensores, validação mecânica, confirmação), em ms."""
+    started = time.perf_counter()
+    get(f'{base_url}/api/sensors', timeout=(5, 10)).json()
+    post(f'{base_url}/api/check_mechanical', json={'presenca': True, 'peso': 2600}, timeout=(5, 10)).json()
+    post(f'{base_url}/api/confirm_detection', json={'detection_type': 'tampinha', 'confidence': 0.9},
+         timeout=(5, 10)).json()
+    return (time.perf_counter() - started) * 1000
+
+
+def run(get, post, base_url: str, deposits: int, threads: int) -> list[float]:
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        return list(executor.map(lambda _: deposit_round_trip(get, post, base_url), range(deposits)))
+
+
+def summary(label: str, latencies: list[float]) -> str:
+    ordered = sorted(latencies)
+    p95 = ordered[max(int(len(ordered) * 0.95) - 1, 0)]
+    return (f"{label:<22} média {statistics.mean(latencies):7.1f}ms   "
+            f"p50 {statistics.median(latencies):7.1f}ms   p95 {p95:7.1f}ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--deposits', type=int, default=100, help='depósitos simulados (3 chamadas cada)')
+    parser.add_argument('--threads', type=int, default=1, help='depósitos em paralelo')
+    parser.add_argument('--connect-delay-ms', type=float, default=50.0,
+                        help='atraso por conexão nova no servidor local (simula TCP+TLS)')
+    args = parser.parse_args()
+
+    server = make_server(args.connect_delay_ms / 1000)
+    base_url = f'http://127.0.0.1:{server.server_address[1]}'
+    try:
+        print(f"📡 Servidor local em {base_url} (conexão nova: +{args.connect_delay_ms:.0f}ms), "
+              f"{args.deposits} depósitos, {args.threads} thread(s)")
+        avulso = run(requests.get, requests.post, base_url, args.deposits, args.threads)
+        pooled = PooledHttpSession(pool_size=max(args.threads, 1))
+        sessao = run(pooled.get, pooled.post, base_url, args.deposits, args.threads)
+        print(summary('requests avulso', avulso))
+        print(summary('sessão keep-alive', sessao))
+        print(f"Ganho na média: {statistics.mean(avulso) / statistics.mean(sessao):.1f}x")
+        print(f"Métricas da sessão: {pooled.snapshot()}")
+        pooled.close()
+    finally:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark de throughput da classificação: thread da requisição × pool de processos.
+
+Simula N clientes concorrentes (threads, como um worker Flask com threads)
+classificando frames sintéticos e mede requisições/s e latência p50/p95.
+
+Uso:
+    python scripts/benchmark_inference.py
+    python scripts/benchmark_inference.py --workers 4 --requests 200 --clients 1 2 4 8
+"""
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.modules.image import ImageClassifier  # noqa: E402
+from src.modules.inference_pool import ProcessPoolInferenceExecutor  # noqa: E402
+
+
+def build_frames(count: int, size: tuple[int, int] = (480, 640)) -> list[np.ndarray]:
+    """Frames BGR sintéticos com um círculo colorido (similar a uma captura do totem)."""
+    rng = np.random.default_rng(42)
+    frames = []
+    for _ in range(count):
+        frame = rng.integers(0, 60, size=(*size, 3), dtype=np.uint8)
+        center = (size[1] // 2 + int(rng.integers(-20, 20)), size[0] // 2 + int(rng.integers(-20, 20)))
+        color = tuple(int(c) for c in rng.integers(0, 255, size=3))
+        cv2.circle(frame, center, 90, color, -1)
+        frames.append(frame)
+    return frames
+
+
+def run(classify, frames: list[np.ndarray], clients: int, total_requests: int) -> dict:
+    """Dispara `total_requests` classificações com `clients` threads concorrentes."""
+    latencies: list[float] = []
+
+    def one(index: int) -> None:
+        started = time.perf_counter()
+        classify(frames[index % len(frames)])
+        latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        list(pool.map(one, range(total_requests)))
+    elapsed = time.perf_counter() - started
+
+    ordered = sorted(latencies)
+    return {
+        'throughput_rps': total_requests / elapsed,
+        'p50_ms': statistics.median(ordered) * 1000,
+        'p95_ms': ordered[int(len(ordered) * 0.95) - 1] * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark de inferência TOTEM IA")
+    parser.add_argument('--workers', type=int, default=4, help='processos no pool')
+    parser.add_argument('--requests', type=int, default=100, help='classificações por cenário')
+    parser.add_argument('--clients', type=int, nargs='+', default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    frames = build_frames(16)
+
+    classifier = ImageClassifier()
+    classifier.load_classifier()
+    if classifier.model is None:
+        print("❌ Modelo não encontrado em models/svm/ — rode a partir da raiz do projeto")
+        sys.exit(1)
+
+    executor = ProcessPoolInferenceExecutor(args.workers)
+    executor.warm_up()
+
+    print(f"{'clientes':>8} | {'modo':<12} | {'req/s':>8} | {'p50 ms':>8} | {'p95 ms':>8}")
+    print("-" * 56)
+    try:
+        for clients in args.clients:
+            in_thread = run(classifier.classify_image, frames, clients, args.requests)
+            pooled = run(executor.classify, frames, clients, args.requests)
+            for mode, result in (('in-thread', in_thread), (f'pool[{args.workers}]', pooled)):
+                print(f"{clients:>8} | {mode:<12} | {result['throughput_rps']:>8.1f} | "
+                      f"{result['p50_ms']:>8.1f} | {result['p95_ms']:>8.1f}")
+    finally:
+        executor.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Benchmark de serialização JSON: provider padrão do Flask × FastJSONProvider,
+e tamanho do payload completo × compacto (tráfego do totem).
+
+Uso:
+    python scripts/benchmark_json.py
+    python scripts/benchmark_json.py --iterations 20000 --deposits 1000
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.modules.json_provider import compact_payload, dumps_bytes, orjson  # noqa: E402
+
+
+def validate_complete_payload() -> dict:
+    """Resposta de /api/validate-complete com escalares NumPy (como saem do classificador)."""
+    return {
+        'status': 'sucesso',
+        'message': '✅ Tampinha aceita! Processando depósito...',
+        'stages': {
+            'classificacao': {
+                'status': 'sucesso',
+                'is_tampinha': True,
+                'confidence': np.float64(0.9312345),
+                'saturation': np.float64(141.23456),
+                'method': 'SAT_HIGH',
+                'cv_debug': {
+                    'hough': np.int64(3),
+                    'hough_consistent': True,
+                    'circularity': np.float64(0.8712),
+                    'aspect_ratio': np.float64(1.0312),
+                    'ellipse_aspect': np.float64(1.0411),
+                    'contour_area': np.float64(15234.5),
+                },
+            }
+        },
+        'timestamp': datetime.now().isoformat(),
+    }
+
+
+def dashboard_payload(deposits: int) -> dict:
+    now = time.time()
+    return {
+        'success': True,
+        'stats': {'total': deposits * 2, 'aceitas': deposits, 'rejeitadas': deposits, 'impacto': 1.23},
+        'deposits': [
+            {
+                'id': i, 'timestamp': now - i * 60, 'ml_confidence': 0.9, 'presence_detected': 1,
+                'weight_value': 2500, 'weight_ok': 1, 'plastico_reciclado_g': 0.5,
+            }
+            for i in range(deposits)
+        ],
+    }
+
+
+def flask_default_dumps(obj) -> bytes:
+    """Equivalente ao DefaultJSONProvider (sort_keys, ensure_ascii) com conversões manuais."""
+    def default(value):
+        if isinstance(value, np.generic):
+            return value.item()
+        raise TypeError(type(value).__name__)
+    return json.dumps(obj, default=default, sort_keys=True, ensure_ascii=True).encode('utf-8')
+
+
+def measure(func, payload, iterations: int) -> float:
+    """Microssegundos por serialização."""
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func(payload)
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark de serialização JSON TOTEM IA")
+    parser.add_argument('--iterations', type=int, default=10000)
+    parser.add_argument('--deposits', type=int, default=500, help='depósitos no payload do dashboard')
+    args = parser.parse_args()
+
+    print(f"Backend rápido: {'orjson' if orjson is not None else 'json (stdlib, orjson não instalado)'}")
+    print(f"{'payload':<22} | {'flask µs':>9} | {'fast µs':>9} | {'bytes':>8} | {'compacto':>8}")
+    print("-" * 68)
+    scenarios = [
+        ('validate-complete', validate_complete_payload(), args.iterations),
+        (f'dashboard[{args.deposits}]', dashboard_payload(args.deposits), max(args.iterations // 100, 10)),
+    ]
+    for name, payload, iterations in scenarios:
+        baseline = measure(flask_default_dumps, payload, iterations)
+        fast = measure(dumps_bytes, payload, iterations)
+        full_size = len(dumps_bytes(payload))
+        compact_size = len(dumps_bytes(compact_payload(payload)))
+        print(f"{name:<22} | {baseline:>9.1f} | {fast:>9.1f} | {full_size:>8} | {compact_size:>8}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Importação em lote de exportações históricas (formato relatorios/dados_exportados.csv)
+de totens que rodaram offline.
+
+Lê o CSV em stream (seção de depósitos, linha em branco, seção de interações), descarta
+linhas já importadas pela chave (timestamp, id de origem) e grava em lotes com executemany,
+uma transação por lote. Após uma queda, rodar o mesmo comando retoma do último lote gravado
+(checkpoint por caminho + fingerprint do conteúdo: arquivos homônimos de pastas diferentes
+são importados separadamente).
+
+Uso:
+    python scripts/import_csv.py relatorios/dados_exportados.csv
+    python scripts/import_csv.py totem3.csv --source totem-3 --batch-rows 20000 --db outro.db
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.database.bulk_import import IMPORT_BATCH_ROWS_DEFAULT, ImportStats  # noqa: E402
+from src.database.db import DatabaseConnection  # noqa: E402
+
+
+def _print_progress(stats: ImportStats) -> None:
+    print(f"\r  {stats.rows_read:,} linhas lidas, {stats.inserted:,} gravadas, "
+          f"{stats.rows_per_second:,.0f} linhas/s", end='', flush=True)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Importação em lote de CSVs exportados TOTEM IA")
+    parser.add_argument('csv', nargs='+', help='arquivos CSV de duas seções (depósitos, interações)')
+    parser.add_argument('--db', default='totem_data.db', help='arquivo do banco (padrão: totem_data.db)')
+    parser.add_argument('--source', help='rótulo da origem nos logs (padrão: caminho do arquivo; só com um arquivo)')
+    parser.add_argument('--batch-rows', type=int, default=IMPORT_BATCH_ROWS_DEFAULT,
+                        help=f'linhas por lote/transação (padrão: {IMPORT_BATCH_ROWS_DEFAULT})')
+    args = parser.parse_args()
+    if args.source and len(args.csv) > 1:
+        parser.error('--source identifica um único arquivo; omita-o ao importar vários CSVs')
+
+    db = DatabaseConnection(args.db)
+    db.init_db()  # garante migrações (ledger e checkpoints de importação)
+
+    for csv_path in args.csv:
+        print(f"📦 {csv_path}")
+        try:
+            stats = db.import_csv(csv_path, source=args.source, batch_rows=args.batch_rows,
+                                  progress=_print_progress)
+        except (OSError, ValueError) as e:
+            print(f"\n❌ {csv_path}: {e}")
+            return 1
+        print(f"\r✅ {stats.deposits:,} depósitos e {stats.interactions:,} interações importados em "
+              f"{stats.seconds:.1f}s ({stats.rows_per_second:,.0f} linhas/s); {stats.duplicates:,} duplicadas, "
+              f"{stats.resumed_rows:,} já importadas antes, {stats.orphans:,} interações sem depósito")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
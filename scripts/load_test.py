@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Teste de carga das rotas de depósito: Flask (gunicorn, sync) × ASGI (uvicorn).
+
+Dispara requisições concorrentes contra um servidor já em execução e mede
+requisições/s, latência p50/p95 e respostas por status. Opcionalmente sobe um
+ESP32 "de mentira" local com latência configurável, para reproduzir o round trip
+que prende o worker síncrono em /api/validate_mechanical.
+
+Comparação com a mesma CPU (2 núcleos, 2 workers em cada modo):
+    python scripts/load_test.py --fake-esp32-port 8099 --esp32-delay-ms 300 --serve-only &
+    ESP32_IP=127.0.0.1:8099 taskset -c 0,1 gunicorn -w 2 -b 127.0.0.1:5003 app:app
+    ESP32_IP=127.0.0.1:8099 taskset -c 0,1 uvicorn asgi:app --workers 2 --port 5004
+
+Uso:
+    python scripts/load_test.py --url http://127.0.0.1:5003 --route validate_mechanical -c 32 -n 500
+    python scripts/load_test.py --url http://127.0.0.1:5004 --route save_deposit -c 32 -n 500
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import base64
+import json
+import statistics
+import sys
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import cv2
+import httpx
+import numpy as np
+
+ROUTES = {
+    'classify': '/api/classify',
+    'validate_complete': '/api/validate-complete',
+    'validate_mechanical': '/api/validate_mechanical',
+    'save_deposit': '/api/save_deposit',
+}
+
+
+def build_image() -> bytes:
+    """JPEG sintético com um círculo colorido (tampinha)."""
+    frame = np.full((480, 640, 3), 30, dtype=np.uint8)
+    cv2.circle(frame, (320, 240), 90, (0, 140, 255), -1)
+    ok, buffer = cv2.imencode('.jpg', frame)
+    if not ok:
+        raise RuntimeError("Falha ao gerar imagem sintética")
+    return buffer.tobytes()
+
+
+def start_fake_esp32(port: int, delay_ms: int) -> ThreadingHTTPServer:
+    """ESP32 local que responde /check_mechanical e /api/* após `delay_ms`."""
+    body = json.dumps({'presence_detected': True, 'weight_ok': True, 'weight_value': 2500}).encode('utf-8')
+
+    class Handler(BaseHTTPRequestHandler):
+        def _reply(self):
+            time.sleep(delay_ms / 1000.0)
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            self._reply()
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get('Content-Length') or 0))
+            self._reply()
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def run_load(url: str, route: str, concurrency: int, total: int, image: bytes) -> dict:
+    path = ROUTES[route]
+    image_b64 = base64.b64encode(image).decode('utf-8')
+    latencies: list[float] = []
+    statuses: Counter[int | str] = Counter()
+    next_index = 0
+
+    async def worker(client: httpx.AsyncClient, worker_id: int) -> None:
+        nonlocal next_index
+        # Um "totem" por cliente concorrente, para não medir o rate limit por totem
+        headers = {'X-Kiosk-Id': f'load-{worker_id}'}
+        while next_index < total:
+            next_index += 1
+            started = time.perf_counter()
+            try:
+                if route == 'validate_mechanical':
+                    response = await client.post(path, files={'image': ('cap.jpg', image, 'image/jpeg')}, headers=headers)
+                else:
+                    response = await client.post(path, json={'image': image_b64}, headers=headers)
+                statuses[response.status_code] += 1
+            except httpx.HTTPError as e:
+                statuses[type(e).__name__] += 1
+            latencies.append(time.perf_counter() - started)
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    started = time.perf_counter()
+    async with httpx.AsyncClient(base_url=url, timeout=60.0, limits=limits) as client:
+        await asyncio.gather(*(worker(client, i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    ordered = sorted(latencies)
+    return {
+        'requests': len(ordered),
+        'throughput_rps': len(ordered) / elapsed,
+        'p50_ms': statistics.median(ordered) * 1000,
+        'p95_ms': ordered[max(int(len(ordered) * 0.95) - 1, 0)] * 1000,
+        'statuses': dict(statuses),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Teste de carga TOTEM IA (Flask × ASGI)")
+    parser.add_argument('--url', default='http://127.0.0.1:5003')
+    parser.add_argument('--route', choices=sorted(ROUTES), default='validate_mechanical')
+    parser.add_argument('-c', '--concurrency', type=int, default=16)
+    parser.add_argument('-n', '--requests', type=int, default=200)
+    parser.add_argument('--fake-esp32-port', type=int, default=0, help='sobe ESP32 local nesta porta')
+    parser.add_argument('--esp32-delay-ms', type=int, default=300, help='latência simulada do ESP32')
+    parser.add_argument('--serve-only', action='store_true', help='apenas mantém o ESP32 local no ar')
+    args = parser.parse_args()
+
+    if args.fake_esp32_port:
+        start_fake_esp32(args.fake_esp32_port, args.esp32_delay_ms)
+        print(f"📡 ESP32 local em 127.0.0.1:{args.fake_esp32_port} (latência {args.esp32_delay_ms}ms)")
+        if args.serve_only:
+            threading.Event().wait()
+
+    result = asyncio.run(run_load(args.url, args.route, args.concurrency, args.requests, build_image()))
+
+    print(f"Alvo: {args.url}{ROUTES[args.route]}  (concorrência {args.concurrency})")
+    print(f"  requisições : {result['requests']}")
+    print(f"  req/s       : {result['throughput_rps']:.1f}")
+    print(f"  p50 / p95   : {result['p50_ms']:.1f} ms / {result['p95_ms']:.1f} ms")
+    print(f"  status      : {result['statuses']}")
+    if any(not isinstance(status, int) or status >= 500 for status in result['statuses']):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
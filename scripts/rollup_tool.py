@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Manutenção do rollup diário (daily_rollup) do banco do totem.
+
+Uso:
+    python scripts/rollup_tool.py check                 # compara rollup × tabelas brutas
+    python scripts/rollup_tool.py rebuild               # backfill/reconstrução completa
+    python scripts/rollup_tool.py check --db outro.db
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.database.db import DatabaseConnection  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Rollup diário TOTEM IA")
+    parser.add_argument('command', choices=('check', 'rebuild'))
+    parser.add_argument('--db', default='totem_data.db', help='arquivo do banco (padrão: totem_data.db)')
+    args = parser.parse_args()
+
+    db = DatabaseConnection(args.db)
+    db.init_db()  # garante migrações (tabela e triggers do rollup)
+
+    if args.command == 'rebuild':
+        rows = db.rebuild_daily_rollup()
+        print(f"✅ Rollup reconstruído: {rows} linhas (day, resultado)")
+        return 0
+
+    mismatches = db.check_daily_rollup()
+    if not mismatches:
+        print("✅ Rollup consistente com deposits/interactions")
+        return 0
+    for item in mismatches:
+        print(f"❌ {item['day']} {item['resultado']:<20} {item['metric']:<16} rollup={item['rollup']} bruto={item['raw']}")
+    print(f"{len(mismatches)} divergências — execute: python scripts/rollup_tool.py rebuild")
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
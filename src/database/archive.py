@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+
+from contextlib import contextmanager
+from datetime import date
+from pathlib import Path
+
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_RETENTION_DAYS_DEFAULT = 180
+# A tendência de 7 dias e os últimos depósitos do dashboard leem as tabelas quentes
+ARCHIVE_MIN_RETENTION_DAYS = 7
+ARCHIVE_FILE_TEMPLATE = 'totem_archive_{month}.db'
+ARCHIVE_SCHEMA = 'cold'
+AUTO_VACUUM_INCREMENTAL = 2
+
+# Mesmas colunas das tabelas quentes (inclusive `day`), sem os triggers de rollup: o rollup
+# dos meses arquivados continua no banco quente.
+_ARCHIVE_TABLES = {
+    'deposits': '''CREATE TABLE IF NOT EXISTS {schema}.deposits (
+        id INTEGER PRIMARY KEY,
+        timestamp REAL NOT NULL,
+        ml_confidence REAL,
+        presence_detected BOOLEAN,
+        weight_value INTEGER,
+        weight_ok BOOLEAN,
+        plastico_reciclado_g REAL,
+        created_at DATETIME,
+        day TEXT
+    )''',
+    'interactions': '''CREATE TABLE IF NOT EXISTS {schema}.interactions (
+        id INTEGER PRIMARY KEY,
+        deposit_id INTEGER,
+        timestamp REAL NOT NULL,
+        resultado TEXT NOT NULL,
+        created_at DATETIME,
+        day TEXT
+    )''',
+}
+_ARCHIVE_COLUMNS = {
+    'deposits': 'id, timestamp, ml_confidence, presence_detected, weight_value, weight_ok, '
+                'plastico_reciclado_g, created_at, day',
+    'interactions': 'id, deposit_id, timestamp, resultado, created_at, day',
+}
+
+
+def create_archive_manifest(conn: sqlite3.Connection) -> None:
+    """Manifesto no banco quente: um arquivo por mês, com o que já saiu das tabelas quentes."""
+    conn.execute('''CREATE TABLE IF NOT EXISTS archive_manifest (
+        month TEXT PRIMARY KEY,
+        path TEXT NOT NULL,
+        archived_before TEXT NOT NULL,
+        deposits INTEGER NOT NULL DEFAULT 0,
+        interactions INTEGER NOT NULL DEFAULT 0,
+        weight_sum REAL NOT NULL DEFAULT 0,
+        archived_at REAL NOT NULL
+    )''')
+
+
+def _has_manifest(conn: sqlite3.Connection) -> bool:
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'archive_manifest'"
+    ).fetchone() is not None
+
+
+def archived_horizon(conn: sqlite3.Connection) -> str | None:
+    """Primeiro dia (YYYY-MM-DD) ainda inteiro no banco quente, ou None se nada foi arquivado."""
+    if not _has_manifest(conn):
+        return None
+    return conn.execute('SELECT MAX(archived_before) FROM archive_manifest').fetchone()[0]
+
+
+def archived_totals(conn: sqlite3.Connection) -> dict:
+    """Depósitos, interações e peso (g) que estão nos arquivos frios."""
+    if not _has_manifest(conn):
+        return {'deposits': 0, 'interactions': 0, 'weight_sum': 0.0}
+    deposits, interactions, weight_sum = conn.execute(
+        'SELECT TOTAL(deposits), TOTAL(interactions), TOTAL(weight_sum) FROM archive_manifest'
+    ).fetchone()
+    return {'deposits': int(deposits), 'interactions': int(interactions), 'weight_sum': float(weight_sum)}
+
+
+def archive_paths_for_range(conn: sqlite3.Connection, hot_db_path: str, first_day: str, last_day: str) -> list[str]:
+    """Arquivos mensais que cobrem algum dia de [first_day, last_day]."""
+    if not _has_manifest(conn):
+        return []
+    rows = conn.execute(
+        'SELECT path FROM archive_manifest WHERE month BETWEEN ? AND ? ORDER BY month',
+        (first_day[:7], last_day[:7])
+    ).fetchall()
+    base = Path(hot_db_path).resolve().parent
+    return [str(base / path) for (path,) in rows]
+
+
+@contextmanager
+def attached_archives(conn: sqlite3.Connection, paths: list[str]):
+    """ATTACH dos arquivos frios na conexão (fora de transação) e DETACH ao sair; gera os nomes dos schemas."""
+    schemas = []
+    try:
+        for index, path in enumerate(paths):
+            if not os.path.exists(path):
+                logger.warning(f"⚠️ Arquivo frio ausente, ignorado: {path}")
+                continue
+            schema = f'archive_{index}'
+            conn.execute('ATTACH DATABASE ? AS ' + schema, (path,))
+            schemas.append(schema)
+        yield schemas
+    finally:
+        for schema in schemas:
+            conn.execute(f'DETACH DATABASE {schema}')
+
+
+def union_source(table: str, columns: str, schemas: list[str]) -> str:
+    """`main.<table>` ou um UNION ALL com as cópias frias (o SQLite empurra o WHERE para cada ramo)."""
+    if not schemas:
+        return f'main.{table}'
+    branches = [f'SELECT {columns} FROM {schema}.{table}' for schema in ('main', *schemas)]
+    return f"({' UNION ALL '.join(branches)})"
+
+
+def enable_incremental_vacuum(conn: sqlite3.Connection) -> bool:
+    """Liga auto_vacuum=INCREMENTAL (exige um VACUUM único); retorna True se precisou do VACUUM."""
+    if conn.execute('PRAGMA auto_vacuum').fetchone()[0] == AUTO_VACUUM_INCREMENTAL:
+        return False
+    logger.info("🔍 Ativando auto_vacuum=INCREMENTAL (VACUUM único, pode demorar em bancos grandes)")
+    conn.execute(f'PRAGMA auto_vacuum = {AUTO_VACUUM_INCREMENTAL}')
+    conn.execute('VACUUM')
+    return True
+
+
+def _month_bounds(month: str, cutoff_day: str) -> tuple[str, str]:
+    year, month_number = int(month[:4]), int(month[5:7])
+    next_month = date(year + month_number // 12, month_number % 12 + 1, 1).isoformat()
+    return f'{month}-01', min(next_month, cutoff_day)
+
+
+def _archive_month(conn: sqlite3.Connection, hot_db_path: str, archive_dir: Path, month: str,
+                   cutoff_day: str, now: float) -> dict:
+    path = archive_dir / ARCHIVE_FILE_TEMPLATE.format(month=month)
+    first_day, end_day = _month_bounds(month, cutoff_day)
+    conn.execute(f'ATTACH DATABASE ? AS {ARCHIVE_SCHEMA}', (str(path),))
+    try:
+        for ddl in _ARCHIVE_TABLES.values():
+            conn.execute(ddl.format(schema=ARCHIVE_SCHEMA))
+        conn.execute(f'CREATE INDEX IF NOT EXISTS {ARCHIVE_SCHEMA}.idx_deposits_timestamp ON deposits(timestamp)')
+        conn.execute(f'CREATE INDEX IF NOT EXISTS {ARCHIVE_SCHEMA}.idx_interactions_timestamp ON interactions(timestamp)')
+        conn.execute(f'PRAGMA {ARCHIVE_SCHEMA}.synchronous = FULL')
+
+        # 1) Cópia para o arquivo frio, numa transação que só escreve nele. Reexecuções após
+        #    falha são idempotentes (OR IGNORE pelo id, que o AUTOINCREMENT nunca reaproveita).
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            for table, columns in _ARCHIVE_COLUMNS.items():
+                conn.execute(f'''INSERT OR IGNORE INTO {ARCHIVE_SCHEMA}.{table} ({columns})
+                                 SELECT {columns} FROM main.{table} WHERE day >= ? AND day < ?''',
+                             (first_day, end_day))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+        # 2) Remoção do banco quente só do que já está no frio, junto com o manifesto.
+        #    Commits em arquivos anexados não são atômicos entre si no WAL; por isso duas etapas.
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            in_cold = f'id IN (SELECT id FROM {ARCHIVE_SCHEMA}.%s)'
+            deposits, weight_sum = conn.execute(
+                f'SELECT COUNT(*), TOTAL(weight_value) FROM main.deposits '
+                f'WHERE day >= ? AND day < ? AND {in_cold % "deposits"}', (first_day, end_day)
+            ).fetchone()
+            conn.execute(f'DELETE FROM main.deposits WHERE day >= ? AND day < ? AND {in_cold % "deposits"}',
+                         (first_day, end_day))
+            interactions = conn.execute(
+                f'DELETE FROM main.interactions WHERE day >= ? AND day < ? AND {in_cold % "interactions"}',
+                (first_day, end_day)
+            ).rowcount
+            relative_path = os.path.relpath(path.resolve(), Path(hot_db_path).resolve().parent)
+            conn.execute('''INSERT INTO archive_manifest
+                                (month, path, archived_before, deposits, interactions, weight_sum, archived_at)
+                            VALUES (?, ?, ?, ?, ?, ?, ?)
+                            ON CONFLICT(month) DO UPDATE SET
+                                archived_before = MAX(archived_before, excluded.archived_before),
+                                deposits = deposits + excluded.deposits,
+                                interactions = interactions + excluded.interactions,
+                                weight_sum = weight_sum + excluded.weight_sum,
+                                archived_at = excluded.archived_at''',
+                         (month, relative_path, end_day, deposits, interactions, weight_sum, now))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        conn.execute(f'VACUUM {ARCHIVE_SCHEMA}')  # arquivo frio compacto, sem páginas livres
+    finally:
+        conn.execute(f'DETACH DATABASE {ARCHIVE_SCHEMA}')
+    return {'month': month, 'path': str(path), 'deposits': deposits, 'interactions': interactions}
+
+
+def archive_before(conn: sqlite3.Connection, hot_db_path: str, archive_dir: str | Path,
+                   cutoff_day: str, now: float) -> list[dict]:
+    """Move deposits/interactions com day < cutoff_day para arquivos mensais e devolve o espaço.
+
+    O rollup diário não é tocado (DELETE não dispara os triggers de INSERT), então dashboard,
+    totais por período e relatórios diários continuam cobrindo o histórico inteiro.
+    """
+    archive_dir = Path(archive_dir)
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    months = [row[0] for row in conn.execute(
+        '''SELECT substr(day, 1, 7) AS month FROM deposits WHERE day < ?
+           UNION
+           SELECT substr(day, 1, 7) FROM interactions WHERE day < ?
+           ORDER BY month''', (cutoff_day, cutoff_day)
+    )]
+    results = [_archive_month(conn, hot_db_path, archive_dir, month, cutoff_day, now) for month in months]
+
+    enable_incremental_vacuum(conn)
+    freed = conn.execute('PRAGMA freelist_count').fetchone()[0]
+    conn.execute('PRAGMA incremental_vacuum')
+    conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+    if results:
+        logger.info(f"✅ Arquivados {sum(r['deposits'] for r in results)} depósitos e "
+                    f"{sum(r['interactions'] for r in results)} interações em {len(results)} arquivos; "
+                    f"{freed} páginas devolvidas ao sistema")
+    return results
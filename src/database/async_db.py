@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import logging
+import time
+
+import aiosqlite  # pyright: ignore[reportMissingImports]
+
+from src.database.db import DatabaseConnection
+from src.database.pool import DB_BUSY_TIMEOUT_MS_DEFAULT
+
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncDatabaseConnection:
+    """Escritas de depósito/interação via aiosqlite, para o modo ASGI (asgi.py).
+
+    Mesmo esquema e mesmo contrato de `DatabaseConnection` (erros são logados e
+    retornam None); a criação das tabelas continua em `DatabaseConnection.init_db`.
+    """
+
+    def __init__(self, db_path='totem_data.db'):
+        self.db_path = db_path
+        self.conn: aiosqlite.Connection | None = None
+
+    async def __aenter__(self):
+        try:
+            self.conn = await aiosqlite.connect(self.db_path)
+            # Mesmo arquivo em WAL do pool síncrono: espera o lock em vez de falhar com "database is locked"
+            await self.conn.execute(f'PRAGMA busy_timeout={DB_BUSY_TIMEOUT_MS_DEFAULT}')
+        except Exception as e:
+            logger.error(f"❌ Erro ao conectar ao banco (async): {e}")
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        if self.conn:
+            await self.conn.close()
+            self.conn = None
+
+    async def save_deposit_data(self, ml_confidence, presence_detected, weight_ok, weight_value, plastico_reciclado_g) -> int | None:
+        try:
+            if not self.conn:
+                raise Exception("Conexão com o banco de dados não estabelecida.")
+
+            cursor = await self.conn.execute('''INSERT INTO deposits
+                         (timestamp, ml_confidence, presence_detected, weight_value, weight_ok, plastico_reciclado_g)
+                         VALUES (?, ?, ?, ?, ?, ?)''',
+                      (time.time(), ml_confidence, presence_detected, weight_value, weight_ok, plastico_reciclado_g))
+            await self.conn.commit()
+            logger.info(f"✅ Dados do depósito inseridos no banco '{self.db_path}' (async).")
+            return cursor.lastrowid
+        except Exception as e:
+            logger.error(f"❌ Erro ao inserir depósito (async): {e}")
+            return None
+
+    async def save_interaction(self, resultado: DatabaseConnection.ResultadoInteracao, deposit_id: int | None = None) -> None:
+        try:
+            if not self.conn:
+                raise Exception("Conexão com o banco de dados não estabelecida.")
+
+            await self.conn.execute('''INSERT INTO interactions
+                         (deposit_id, timestamp, resultado)
+                         VALUES (?, ?, ?)''',
+                      (deposit_id, time.time(), resultado.value))
+            await self.conn.commit()
+            logger.info(f"✅ Interação registrada no banco '{self.db_path}' (async).")
+        except Exception as e:
+            logger.error(f"❌ Erro ao registrar interação (async): {e}")
+
+    async def record_deposit_outcome(self, ml_confidence, presence_detected, weight_ok, weight_value, plastico_reciclado_g,
+                                     resultado: DatabaseConnection.ResultadoInteracao = DatabaseConnection.ResultadoInteracao.SUCESSO) -> int | None:
+        """Depósito + interação numa única transação (ver `DatabaseConnection.record_deposit_outcome`)."""
+        try:
+            if not self.conn:
+                raise Exception("Conexão com o banco de dados não estabelecida.")
+
+            try:
+                now = time.time()
+                cursor = await self.conn.execute('''INSERT INTO deposits
+                             (timestamp, ml_confidence, presence_detected, weight_value, weight_ok, plastico_reciclado_g)
+                             VALUES (?, ?, ?, ?, ?, ?)''',
+                          (now, ml_confidence, presence_detected, weight_value, weight_ok, plastico_reciclado_g))
+                deposit_id = cursor.lastrowid
+                await self.conn.execute('''INSERT INTO interactions
+                             (deposit_id, timestamp, resultado)
+                             VALUES (?, ?, ?)''',
+                          (deposit_id, now, resultado.value))
+                await self.conn.commit()
+            except Exception:
+                await self.conn.rollback()
+                raise
+            logger.info(f"✅ Depósito #{deposit_id} e interação '{resultado.value}' registrados no banco '{self.db_path}' (async).")
+            return deposit_id
+        except Exception as e:
+            logger.error(f"❌ Erro ao registrar depósito (async): {e}")
+            return None
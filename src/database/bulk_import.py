@@ -0,0 +1,321 @@
+from __future__ import annotations
+
+import csv
+import hashlib
+import logging
+import sqlite3
+import time
+
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+
+
+logger = logging.getLogger(__name__)
+
+IMPORT_BATCH_ROWS_DEFAULT = 10_000  # linhas por executemany/transação (e por checkpoint)
+IMPORT_FINGERPRINT_BYTES = 64 * 1024  # início do arquivo que entra no fingerprint do checkpoint
+
+# Formato de relatorios/dados_exportados.csv (scripts/analise_dados.py): seção de depósitos,
+# linha em branco, seção de interações — cada uma com o próprio cabeçalho. A seção de depósitos
+# pode faltar (exportação sem depósitos): a seção é identificada pelas colunas do cabeçalho
+CSV_SECTIONS = ('deposits', 'interactions')
+CSV_INTERACTION_MARKERS = {'resultado', 'deposit_id'}  # colunas que só a seção de interações tem
+CSV_REQUIRED_COLUMNS = {
+    'deposits': {'id', 'timestamp'},
+    'interactions': {'id', 'timestamp', 'resultado'},
+}
+_INSERT_SQL = {
+    'deposits': '''INSERT INTO deposits (id, timestamp, ml_confidence, presence_detected, weight_value, weight_ok,
+                                         plastico_reciclado_g, day) VALUES (?, ?, ?, ?, ?, ?, ?, ?)''',
+    'interactions': 'INSERT INTO interactions (id, deposit_id, timestamp, resultado, day) VALUES (?, ?, ?, ?, ?)',
+}
+_LEDGER_KIND = {'deposits': 'deposit', 'interactions': 'interaction'}
+
+
+def create_import_ledger(conn: sqlite3.Connection) -> None:
+    """Ledger das linhas importadas (chave de origem → id gravado) e checkpoint por origem.
+
+    Os checkpoints por origem foram substituídos por create_file_checkpoints (migração 6).
+    """
+    conn.execute('''CREATE TABLE IF NOT EXISTS import_ledger (
+        kind TEXT NOT NULL,
+        timestamp REAL NOT NULL,
+        source_id INTEGER NOT NULL,
+        source TEXT NOT NULL,
+        target_id INTEGER NOT NULL,
+        PRIMARY KEY (kind, timestamp, source_id)
+    ) WITHOUT ROWID''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_import_ledger_source ON import_ledger(source, kind, source_id)')
+    conn.execute('''CREATE TABLE IF NOT EXISTS import_checkpoints (
+        source TEXT PRIMARY KEY,
+        section TEXT NOT NULL,
+        line INTEGER NOT NULL,
+        updated_at REAL NOT NULL
+    )''')
+
+
+def create_file_checkpoints(conn: sqlite3.Connection) -> None:
+    """Checkpoints por arquivo (caminho resolvido + fingerprint do conteúdo), com marca de conclusão.
+
+    Substitui os checkpoints por nome de origem: `t1/dados.csv` e `t2/dados.csv` tinham a mesma
+    chave e o segundo era pulado. Os checkpoints antigos não dizem a qual arquivo pertencem e são
+    descartados — reimportar relê do início e o ledger descarta as linhas que já entraram.
+    """
+    conn.execute('DROP TABLE IF EXISTS import_checkpoints')
+    conn.execute('''CREATE TABLE import_checkpoints (
+        file_key TEXT PRIMARY KEY,
+        source TEXT NOT NULL,
+        section TEXT NOT NULL,
+        line INTEGER NOT NULL,
+        completed INTEGER NOT NULL DEFAULT 0,
+        updated_at REAL NOT NULL
+    )''')
+
+
+def file_fingerprint(path: Path) -> str:
+    """Tamanho + sha256 dos primeiros bytes: distingue exportações diferentes no mesmo caminho."""
+    with open(path, 'rb') as f:
+        head = f.read(IMPORT_FINGERPRINT_BYTES)
+    return f"{path.stat().st_size}:{hashlib.sha256(head).hexdigest()[:16]}"
+
+
+def _section_for_header(header: list[str]) -> str:
+    return 'interactions' if CSV_INTERACTION_MARKERS & set(header) else 'deposits'
+
+
+def iter_export_sections(lines: Iterable[str]) -> Iterator[tuple[str, int, dict]]:
+    """(seção, linha do arquivo, valores por coluna) de um CSV de duas seções, em stream.
+
+    A linha em branco encerra uma seção; a seguinte é identificada pelo cabeçalho, não pela
+    posição. Levanta ValueError se um cabeçalho não tiver as colunas obrigatórias ou se as
+    seções vierem repetidas ou fora de ordem (interações antes dos depósitos).
+    """
+    reader = csv.reader(lines)
+    section, last_index = None, -1
+    header: list[str] | None = None
+    for row in reader:
+        if not any(cell.strip() for cell in row):
+            header = None
+            continue
+        if header is None:
+            header = [cell.strip() for cell in row]
+            section = _section_for_header(header)
+            missing = CSV_REQUIRED_COLUMNS[section] - set(header)
+            if missing:
+                raise ValueError(f"Seção '{section}' sem as colunas {sorted(missing)} (linha {reader.line_num})")
+            if CSV_SECTIONS.index(section) <= last_index:
+                raise ValueError(f"Seção '{section}' repetida ou fora de ordem (linha {reader.line_num})")
+            last_index = CSV_SECTIONS.index(section)
+            continue
+        yield section, reader.line_num, dict(zip(header, row))
+
+
+def _optional(value: str | None, cast):
+    if value is None or value.strip() == '':
+        return None
+    return cast(value)
+
+
+def _as_bool(value: str) -> int:
+    normalized = value.strip().lower()
+    if normalized in ('1', 'true', 't', 'sim'):
+        return 1
+    if normalized in ('0', 'false', 'f', 'nao', 'não'):
+        return 0
+    return int(float(normalized))
+
+
+@dataclass
+class ImportStats:
+    source: str
+    rows_read: int = 0
+    deposits: int = 0
+    interactions: int = 0
+    duplicates: int = 0
+    orphans: int = 0          # interações cujo depósito não está no arquivo nem no ledger
+    resumed_rows: int = 0     # linhas já cobertas pelo checkpoint de uma execução anterior
+    batches: int = 0
+    started: float = field(default_factory=time.perf_counter)
+    seconds: float = 0.0
+
+    @property
+    def inserted(self) -> int:
+        return self.deposits + self.interactions
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows_read / self.seconds if self.seconds > 0 else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            'source': self.source, 'rows_read': self.rows_read, 'deposits': self.deposits,
+            'interactions': self.interactions, 'duplicates': self.duplicates, 'orphans': self.orphans,
+            'resumed_rows': self.resumed_rows, 'batches': self.batches, 'seconds': round(self.seconds, 3),
+            'rows_per_second': round(self.rows_per_second, 1),
+        }
+
+
+class _BatchImporter:
+    """Grava lotes de uma seção: ids novos reservados sob BEGIN IMMEDIATE e um executemany por tabela.
+
+    O ledger guarda a chave do arquivo (não o rótulo da origem): o remapeamento de `deposit_id`
+    na retomada só enxerga depósitos deste mesmo arquivo.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, file_key: str, source: str, stats: ImportStats):
+        self.conn = conn
+        self.file_key = file_key
+        self.source = source
+        self.stats = stats
+        self.deposit_ids: dict[int, int] = {}  # id de origem → id gravado (depósitos desta execução)
+
+    def _next_id(self, table: str) -> int:
+        # AUTOINCREMENT: sqlite_sequence lembra ids já usados, inclusive os de linhas arquivadas
+        seq = self.conn.execute('SELECT seq FROM sqlite_sequence WHERE name = ?', (table,)).fetchone()
+        max_id = self.conn.execute(f'SELECT MAX(id) FROM {table}').fetchone()[0]
+        return max(seq[0] if seq else 0, max_id or 0) + 1
+
+    def _in_ledger(self, kind: str, timestamp: float, source_id: int) -> bool:
+        return self.conn.execute('SELECT 1 FROM import_ledger WHERE kind = ? AND timestamp = ? AND source_id = ?',
+                                 (kind, timestamp, source_id)).fetchone() is not None
+
+    def _already_in_table(self, table: str, timestamp: float, source_id: int) -> bool:
+        """Mesma (timestamp, id) já no banco: o CSV foi exportado deste próprio banco."""
+        return self.conn.execute(f'SELECT 1 FROM {table} WHERE id = ? AND timestamp = ?',
+                                 (source_id, timestamp)).fetchone() is not None
+
+    def _deposit_target(self, source_deposit_id: int) -> int | None:
+        target = self.deposit_ids.get(source_deposit_id)
+        if target is None:
+            row = self.conn.execute('''SELECT target_id FROM import_ledger
+                                       WHERE source = ? AND kind = 'deposit' AND source_id = ?''',
+                                    (self.file_key, source_deposit_id)).fetchone()
+            target = row[0] if row else None
+        return target
+
+    def _row(self, table: str, new_id: int, timestamp: float, values: dict) -> tuple:
+        # `day` já preenchido (data local, igual ao trigger): evita o UPDATE por linha do trigger de `day`
+        day = datetime.fromtimestamp(timestamp).date().isoformat()
+        if table == 'deposits':
+            return (new_id, timestamp,
+                    _optional(values.get('ml_confidence'), float),
+                    _optional(values.get('presence_detected'), _as_bool),
+                    _optional(values.get('weight_value'), lambda v: int(float(v))),
+                    _optional(values.get('weight_ok'), _as_bool),
+                    _optional(values.get('plastico_reciclado_g'), float),
+                    day)
+        source_deposit_id = _optional(values.get('deposit_id'), lambda v: int(float(v)))
+        deposit_id = self._deposit_target(source_deposit_id) if source_deposit_id is not None else None
+        if source_deposit_id is not None and deposit_id is None:
+            self.stats.orphans += 1
+        return new_id, deposit_id, timestamp, values['resultado'].strip(), day
+
+    def flush(self, table: str, batch: list[tuple[int, dict]]) -> None:
+        kind = _LEDGER_KIND[table]
+        self.conn.execute('BEGIN IMMEDIATE')
+        try:
+            next_id = self._next_id(table)
+            rows, ledger, seen, mapped = [], [], set(), {}
+            for _, values in batch:
+                timestamp, source_id = float(values['timestamp']), int(float(values['id']))
+                if (timestamp, source_id) in seen or self._in_ledger(kind, timestamp, source_id):
+                    self.stats.duplicates += 1
+                    continue
+                seen.add((timestamp, source_id))
+                if self._already_in_table(table, timestamp, source_id):
+                    self.stats.duplicates += 1
+                    ledger.append((kind, timestamp, source_id, self.file_key, source_id))
+                    mapped[source_id] = source_id
+                    continue
+                rows.append(self._row(table, next_id, timestamp, values))
+                ledger.append((kind, timestamp, source_id, self.file_key, next_id))
+                mapped[source_id] = next_id
+                next_id += 1
+            self.conn.executemany(_INSERT_SQL[table], rows)
+            self.conn.executemany('''INSERT INTO import_ledger (kind, timestamp, source_id, source, target_id)
+                                     VALUES (?, ?, ?, ?, ?)''', ledger)
+            # Checkpoint na mesma transação: após uma queda, a retomada começa depois deste lote
+            self._save_checkpoint(table, batch[-1][0], completed=False)
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        if table == 'deposits':
+            self.deposit_ids.update(mapped)
+        setattr(self.stats, table, getattr(self.stats, table) + len(rows))
+        self.stats.batches += 1
+
+    def complete(self, section: str, line: int) -> None:
+        """Marca o arquivo como lido até o fim: a próxima execução não retoma, relê do início."""
+        self.conn.execute('BEGIN IMMEDIATE')
+        try:
+            self._save_checkpoint(section, line, completed=True)
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+
+    def _save_checkpoint(self, section: str, line: int, completed: bool) -> None:
+        self.conn.execute('''INSERT INTO import_checkpoints (file_key, source, section, line, completed, updated_at)
+                             VALUES (?, ?, ?, ?, ?, ?)
+                             ON CONFLICT(file_key) DO UPDATE SET
+                                 source = excluded.source, section = excluded.section, line = excluded.line,
+                                 completed = excluded.completed, updated_at = excluded.updated_at''',
+                          (self.file_key, self.source, section, line, int(completed), time.time()))
+
+
+def import_export_csv(conn: sqlite3.Connection, csv_path: str | Path, source: str | None = None,
+                      batch_rows: int = IMPORT_BATCH_ROWS_DEFAULT,
+                      progress: Callable[[ImportStats], None] | None = None) -> ImportStats:
+    """Importa um CSV de duas seções (depósitos, interações) em lotes com executemany.
+
+    Cada lote é uma transação com o checkpoint do arquivo (caminho resolvido + fingerprint do
+    conteúdo, não o nome nem `source`): reexecutar após uma queda retoma depois do último lote
+    gravado; um arquivo já lido até o fim é relido do início. O ledger (timestamp, id de origem)
+    descarta linhas já importadas — inclusive por outra origem ou exportadas deste mesmo banco.
+    Linhas recebem ids novos (os ids dos totens offline colidem entre si); `deposit_id` das
+    interações é remapeado. Rollup diário, `day` e contadores de totais são mantidos pelos triggers.
+    """
+    csv_path = Path(csv_path).resolve()
+    file_key = f"{csv_path}#{file_fingerprint(csv_path)}"
+    source = source or str(csv_path)
+    stats = ImportStats(source)
+    checkpoint = conn.execute('SELECT section, line, completed FROM import_checkpoints WHERE file_key = ?',
+                              (file_key,)).fetchone()
+    resume_after = (-1, 0)
+    if checkpoint and checkpoint[2]:
+        logger.info(f"🔍 '{source}' já importado até o fim: relendo (o ledger descarta as duplicadas)")
+    elif checkpoint:
+        resume_after = (CSV_SECTIONS.index(checkpoint[0]), checkpoint[1])
+        logger.info(f"🔍 Retomando importação de '{source}' após {checkpoint[0]} linha {checkpoint[1]}")
+
+    importer = _BatchImporter(conn, file_key, source, stats)
+    batch_table, batch = None, []
+    last_read = (CSV_SECTIONS[0], 0)
+    with open(csv_path, newline='', encoding='utf-8') as csv_file:
+        for table, line, values in iter_export_sections(csv_file):
+            stats.rows_read += 1
+            last_read = (table, line)
+            if (CSV_SECTIONS.index(table), line) <= resume_after:
+                stats.resumed_rows += 1
+                continue
+            if table != batch_table:
+                if batch:
+                    importer.flush(batch_table, batch)
+                batch_table, batch = table, []
+            batch.append((line, values))
+            if len(batch) >= batch_rows:
+                importer.flush(batch_table, batch)
+                batch = []
+                stats.seconds = time.perf_counter() - stats.started
+                if progress:
+                    progress(stats)
+        if batch:
+            importer.flush(batch_table, batch)
+    importer.complete(*last_read)
+    stats.seconds = time.perf_counter() - stats.started
+    logger.info(f"✅ Importação de '{source}': {stats.deposits} depósitos, {stats.interactions} interações, "
+                f"{stats.duplicates} duplicadas, {stats.rows_per_second:.0f} linhas/s")
+    return stats
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import logging
+import sqlite3
+import threading
+
+from src.database.archive import archived_totals
+
+
+logger = logging.getLogger(__name__)
+
+# Totais do histórico inteiro (banco quente + arquivos frios) mostrados a cada refresh do dashboard
+TOTAL_COUNTERS = ('interactions', 'deposits', 'weight_sum')
+TOTALS_RECONCILE_INTERVAL_SECONDS_DEFAULT = 3600.0
+
+
+def create_totals(conn: sqlite3.Connection) -> None:
+    """Tabela `totals` (uma linha por contador) e triggers que a incrementam no mesmo INSERT.
+
+    Só INSERT mexe nos contadores: o DELETE da retenção move linhas para os arquivos frios,
+    que continuam contando no total.
+    """
+    conn.execute('''CREATE TABLE IF NOT EXISTS totals (
+        name TEXT PRIMARY KEY,
+        value REAL NOT NULL DEFAULT 0
+    ) WITHOUT ROWID''')
+    conn.executemany('INSERT OR IGNORE INTO totals (name, value) VALUES (?, 0)', [(name,) for name in TOTAL_COUNTERS])
+    conn.execute('''CREATE TRIGGER IF NOT EXISTS trg_interactions_totals
+                    AFTER INSERT ON interactions
+                    BEGIN
+                        UPDATE totals SET value = value + 1 WHERE name = 'interactions';
+                    END''')
+    conn.execute('''CREATE TRIGGER IF NOT EXISTS trg_deposits_totals
+                    AFTER INSERT ON deposits
+                    BEGIN
+                        UPDATE totals SET value = value + 1 WHERE name = 'deposits';
+                        UPDATE totals SET value = value + COALESCE(NEW.weight_value, 0) WHERE name = 'weight_sum';
+                    END''')
+
+
+def load_totals(conn: sqlite3.Connection) -> dict:
+    """Contadores mantidos (leitura por chave primária, custo constante)."""
+    values = dict(conn.execute('SELECT name, value FROM totals').fetchall())
+    return {
+        'interactions': int(values.get('interactions', 0)),
+        'deposits': int(values.get('deposits', 0)),
+        'weight_sum': float(values.get('weight_sum', 0.0)),
+    }
+
+
+def _counted_totals(conn: sqlite3.Connection) -> dict:
+    """Totais recontados: COUNT/TOTAL das tabelas quentes + manifesto dos arquivos frios."""
+    interactions = conn.execute('SELECT COUNT(*) FROM interactions').fetchone()[0]
+    deposits, weight_sum = conn.execute('SELECT COUNT(*), TOTAL(weight_value) FROM deposits').fetchone()
+    archived = archived_totals(conn)
+    return {
+        'interactions': interactions + archived['interactions'],
+        'deposits': deposits + archived['deposits'],
+        'weight_sum': float(weight_sum) + archived['weight_sum'],
+    }
+
+
+def _drift(stored: dict, counted: dict, tolerance: float = 1e-6) -> dict:
+    return {name: {'stored': stored[name], 'counted': counted[name]}
+            for name in TOTAL_COUNTERS
+            if abs(float(stored[name]) - float(counted[name])) > tolerance * max(abs(float(counted[name])), 1.0)}
+
+
+def rebuild_totals(conn: sqlite3.Connection) -> dict:
+    """Regrava os contadores com a recontagem (backfill). Não faz commit."""
+    counted = _counted_totals(conn)
+    conn.executemany('INSERT OR REPLACE INTO totals (name, value) VALUES (?, ?)', list(counted.items()))
+    return counted
+
+
+def reconcile_totals(conn: sqlite3.Connection) -> dict:
+    """Compara contadores e recontagem num snapshot de leitura; corrige sob lock de escrita se divergirem.
+
+    Retorna as divergências encontradas (vazio = consistente). Contadores e linhas mudam na
+    mesma transação (triggers), então INSERTs concorrentes não aparecem como divergência.
+    """
+    conn.execute('BEGIN')
+    try:
+        drift = _drift(load_totals(conn), _counted_totals(conn))
+    finally:
+        conn.rollback()
+    if not drift:
+        return {}
+
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        drift = _drift(load_totals(conn), _counted_totals(conn))
+        if drift:
+            rebuild_totals(conn)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    if drift:
+        logger.warning(f"⚠️ Contadores do dashboard divergentes, corrigidos: {drift}")
+    return drift
+
+
+class TotalsReconciler:
+    """Thread que reconcilia os contadores ao iniciar e a cada `interval_seconds`.
+
+    `database` é um `DatabaseConnection` (usa `reconcile_totals()`); com vários workers,
+    cada um reconcilia a mesma tabela — a correção é idempotente.
+    """
+
+    def __init__(self, database, interval_seconds: float = TOTALS_RECONCILE_INTERVAL_SECONDS_DEFAULT):
+        self.database = database
+        self.interval_seconds = max(interval_seconds, 1.0)
+        self._stopped = threading.Event()
+        self.stats = {'runs': 0, 'corrections': 0, 'last_drift': {}}
+        self._thread = threading.Thread(target=self._run, name='db-totals-reconcile', daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                drift = self.database.reconcile_totals()
+                self.stats['runs'] += 1
+                self.stats['last_drift'] = drift
+                if drift:
+                    self.stats['corrections'] += 1
+            except Exception as e:
+                logger.error(f"❌ Falha ao reconciliar contadores: {e}")
+            self._stopped.wait(self.interval_seconds)
+
+    def close(self) -> None:
+        self._stopped.set()
+        self._thread.join(timeout=5)
+
+    def snapshot(self) -> dict:
+        return {'interval_seconds': self.interval_seconds, **self.stats}
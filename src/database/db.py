@@ -2,71 +2,179 @@ from __future__ import annotations
 
 import sqlite3
 import logging
+import threading
 import time 
 
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
 from enum import Enum
 
+from src.database.archive import (
+    ARCHIVE_MIN_RETENTION_DAYS,
+    archive_before,
+    archive_paths_for_range,
+    attached_archives,
+    union_source,
+)
+from src.database.bulk_import import IMPORT_BATCH_ROWS_DEFAULT, ImportStats, import_export_csv
+from src.database.counters import load_totals, reconcile_totals
+from src.database.migrations import apply_migrations
+from src.database.pool import PoolConfig, get_pool
+from src.database.rollups import (
+    ROLLUP_DEPOSIT_RESULTADO,
+    ROLLUP_METRICS,
+    check_daily_rollup,
+    load_daily_rollup,
+    load_rollup_buckets,
+    rebuild_daily_rollup,
+)
+
 
 logger = logging.getLogger(__name__)
 
 
+# Consultas do dashboard (cobertas por idx_deposits_timestamp / idx_interactions_timestamp)
+SELECT_DEPOSITS_SQL = '''SELECT id, timestamp, ml_confidence, presence_detected, weight_value, weight_ok, plastico_reciclado_g FROM deposits ORDER BY timestamp DESC'''
+SELECT_INTERACTIONS_SQL = '''SELECT id, deposit_id, timestamp, resultado
+                       FROM interactions
+                       ORDER BY timestamp DESC'''
+
+# Colunas exportadas por tabela (ordem das colunas do CSV); a ordem das linhas é (timestamp, id)
+EXPORT_COLUMNS = {
+    'deposits': ('id', 'timestamp', 'ml_confidence', 'presence_detected', 'weight_value', 'weight_ok',
+                 'plastico_reciclado_g'),
+    'interactions': ('id', 'deposit_id', 'timestamp', 'resultado'),
+}
+EXPORT_BATCH_SIZE_DEFAULT = 1000
+
+
+def _deposit_row_to_dict(row) -> dict:
+    return {
+        'id': row[0],
+        'timestamp': row[1],
+        'ml_confidence': row[2],
+        'presence_detected': row[3],
+        'weight_value': row[4],
+        'weight_ok': row[5],
+        'plastico_reciclado_g': row[6]
+    }
+
+
+def _insert_deposit(cursor, timestamp, ml_confidence, presence_detected, weight_ok, weight_value, plastico_reciclado_g) -> int:
+    cursor.execute('''INSERT INTO deposits
+                 (timestamp, ml_confidence, presence_detected, weight_value, weight_ok, plastico_reciclado_g)
+                 VALUES (?, ?, ?, ?, ?, ?)''',
+              (timestamp, ml_confidence, presence_detected, weight_value, weight_ok, plastico_reciclado_g))
+    return cursor.lastrowid
+
+
+def _insert_interaction(cursor, timestamp, resultado_value: str, deposit_id: int | None) -> int:
+    cursor.execute('''INSERT INTO interactions
+                 (deposit_id, timestamp, resultado)
+                 VALUES (?, ?, ?)''',
+              (deposit_id, timestamp, resultado_value))
+    return cursor.lastrowid
+
 
 class DatabaseConnection:
-    def __init__(self, db_path='totem_data.db'):
+    """Acesso ao banco do totem com conexões emprestadas de um pool (WAL).
+
+    `with db as conn_holder:` empresta uma conexão do pool do arquivo no primeiro uso e a
+    devolve no fim do bloco; blocos aninhados na mesma thread reutilizam a mesma conexão.
+    `conn` é por thread: a mesma instância pode ser usada pela thread da requisição
+    e pelas threads de background sem compartilhar a conexão.
+
+    Com um `writer` (GroupCommitWriter) anexado, `save_interaction` e
+    `record_deposit_outcome` são enfileirados e gravados em lote pela thread do writer.
+
+    `hot_db_path` é o banco de origem quando `db_path` é uma cópia (snapshot): os caminhos
+    dos arquivos frios no manifesto são relativos a ele.
+    """
+
+    def __init__(self, db_path='totem_data.db', pool_config: PoolConfig | None = None,
+                 hot_db_path: str | None = None):
         self.db_path = db_path
-        self.conn = None
+        self.hot_db_path = hot_db_path or db_path
+        self.pool_config = pool_config
+        self._local = threading.local()
+        self.writer = None
+
+    @property
+    def conn(self) -> sqlite3.Connection | None:
+        # Empréstimo preguiçoso: dentro de um `with`, a conexão só sai do pool no primeiro uso,
+        # então blocos que apenas enfileiram no writer não seguram conexão.
+        if getattr(self._local, 'conn', None) is None and getattr(self._local, 'depth', 0) > 0:
+            self.__connect()
+        return getattr(self._local, 'conn', None)
+
+    @conn.setter
+    def conn(self, value: sqlite3.Connection | None) -> None:
+        self._local.conn = value
 
     def __enter__(self):
-        self.__connect()
+        self._local.depth = getattr(self._local, 'depth', 0) + 1
         return self
 
     def __exit__(self, exc_type, exc_value, traceback):
-        self.__close()
+        self._local.depth = max(getattr(self._local, 'depth', 1) - 1, 0)
+        if self._local.depth == 0:
+            self.__close()
 
     def __connect(self):
         try:
-            self.conn = sqlite3.connect(self.db_path)
-            logger.info(f"✅ Conexão com o banco de dados '{self.db_path}' aberta.")
+            self._local.conn = get_pool(self.db_path, self.pool_config).acquire()
+            logger.debug(f"✅ Conexão com o banco de dados '{self.db_path}' emprestada do pool.")
         except Exception as e:
             logger.error(f"❌ Erro ao conectar ao banco: {e}")
 
     def __close(self):
-        if self.conn:
-            self.conn.close()
-            logger.info(f"✅ Conexão com o banco de dados '{self.db_path}' fechada.")
-            self.conn = None
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            get_pool(self.db_path, self.pool_config).release(conn)
+            logger.debug(f"✅ Conexão com o banco de dados '{self.db_path}' devolvida ao pool.")
+            self._local.conn = None
+
+    @contextmanager
+    def __leased(self):
+        """Conexão do bloco `with` atual ou, fora dele, um empréstimo só para a operação."""
+        owned = getattr(self._local, 'depth', 0) == 0 and getattr(self._local, 'conn', None) is None
+        if owned:
+            self.__connect()
+        if not self.conn:
+            raise Exception("Conexão com o banco de dados não estabelecida.")
+        try:
+            yield self.conn
+        finally:
+            if owned:
+                self.__close()
     
     
     def init_db(self):
         try:
-            if not self.conn:
-                self.__connect()
-            
-            if not self.conn:
-                raise Exception("Conexão com o banco de dados não estabelecida.")
-
-            c = self.conn.cursor()
-            c.execute('''CREATE TABLE IF NOT EXISTS deposits (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp REAL NOT NULL,
-                ml_confidence REAL,
-                presence_detected BOOLEAN,
-                weight_value INTEGER,
-                weight_ok BOOLEAN,
-                plastico_reciclado_g REAL,
-                created_at DATETIME DEFAULT CURRENT_TIMESTAMP
-            )''')
-
-            c.execute('''CREATE TABLE IF NOT EXISTS interactions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                deposit_id INTEGER,
-                timestamp REAL NOT NULL,
-                resultado TEXT NOT NULL, -- 'sucesso', 'erro_classificacao', 'erro_mecanica', 'rejeitado', etc.
-                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY(deposit_id) REFERENCES deposits(id)
-            )''')
-            self.conn.commit()
-            logger.info(f"✅ Tabelas criadas/validadas com sucesso no banco '{self.db_path}'.")
+            with self.__leased() as conn:
+                c = conn.cursor()
+                c.execute('''CREATE TABLE IF NOT EXISTS deposits (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    timestamp REAL NOT NULL,
+                    ml_confidence REAL,
+                    presence_detected BOOLEAN,
+                    weight_value INTEGER,
+                    weight_ok BOOLEAN,
+                    plastico_reciclado_g REAL,
+                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+                )''')
+
+                c.execute('''CREATE TABLE IF NOT EXISTS interactions (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    deposit_id INTEGER,
+                    timestamp REAL NOT NULL,
+                    resultado TEXT NOT NULL, -- 'sucesso', 'erro_classificacao', 'erro_mecanica', 'rejeitado', etc.
+                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                    FOREIGN KEY(deposit_id) REFERENCES deposits(id)
+                )''')
+                conn.commit()
+                version = apply_migrations(conn)
+            logger.info(f"✅ Tabelas criadas/validadas com sucesso no banco '{self.db_path}' (schema v{version}).")
         except Exception as e:
             logger.error(f"❌ Erro ao criar tabelas: {e}")
 
@@ -74,20 +182,12 @@ class DatabaseConnection:
     # deposit_id = db.save_deposit_data(conf, presenca, True, peso_kg, 0)
     def save_deposit_data(self, ml_confidence, presence_detected, weight_ok, weight_value, plastico_reciclado_g) -> int | None:
         try:
-            if not self.conn:
-                self.__connect()
-
-            if not self.conn:
-                raise Exception("Conexão com o banco de dados não estabelecida.")
-
-            c = self.conn.cursor()
-            result = c.execute('''INSERT INTO deposits 
-                         (timestamp, ml_confidence, presence_detected, weight_value, weight_ok, plastico_reciclado_g)
-                         VALUES (?, ?, ?, ?, ?, ?)''',
-                      (time.time(), ml_confidence, presence_detected, weight_value, weight_ok, plastico_reciclado_g))
-            self.conn.commit()
+            with self.__leased() as conn:
+                deposit_id = _insert_deposit(conn.cursor(), time.time(), ml_confidence, presence_detected,
+                                             weight_ok, weight_value, plastico_reciclado_g)
+                conn.commit()
             logger.info(f"✅ Dados do depósito inseridos no banco '{self.db_path}'.")
-            return result.lastrowid if result else None
+            return deposit_id
         except Exception as e:
             logger.error(f"❌ Erro ao inserir depósito: {e}")
             return None
@@ -101,35 +201,53 @@ class DatabaseConnection:
         ERRO_DESCONHECIDO = 'erro_desconhecido'
 
     def save_interaction(self, resultado: ResultadoInteracao, deposit_id: int | None = None) -> None:
+        if self.writer is not None:
+            # Fire-and-forget: a rota não espera o lote; erros são logados pelo writer
+            self.writer.submit_interaction(resultado, deposit_id)
+            return
         try:
-            if not self.conn:
-                self.__connect()
-
-            if not self.conn:
-                raise Exception("Conexão com o banco de dados não estabelecida.")
-
-            c = self.conn.cursor()
-            c.execute('''INSERT INTO interactions 
-                         (deposit_id, timestamp, resultado)
-                         VALUES (?, ?, ?)''',
-                      (deposit_id, time.time(), resultado.value))
-            self.conn.commit()
+            with self.__leased() as conn:
+                _insert_interaction(conn.cursor(), time.time(), resultado.value, deposit_id)
+                conn.commit()
             logger.info(f"✅ Interação registrada no banco '{self.db_path}'.")
         except Exception as e:
             logger.error(f"❌ Erro ao registrar interação: {e}")
+
+
+    def record_deposit_outcome(self, ml_confidence, presence_detected, weight_ok, weight_value, plastico_reciclado_g,
+                               resultado: ResultadoInteracao = ResultadoInteracao.SUCESSO) -> int | None:
+        """Grava o depósito e a interação correspondente numa única transação (um commit).
+
+        Se qualquer um dos INSERTs falhar, nenhum dos dois é persistido. Retorna o id do depósito.
+        """
+        try:
+            if self.writer is not None:
+                # O id do depósito vai na resposta: espera o lote que contém este registro
+                return self.writer.submit_deposit_outcome(
+                    ml_confidence, presence_detected, weight_ok, weight_value, plastico_reciclado_g, resultado
+                ).result(timeout=self.writer.result_timeout_seconds)
+            with self.__leased() as conn:
+                try:
+                    c = conn.cursor()
+                    now = time.time()
+                    deposit_id = _insert_deposit(c, now, ml_confidence, presence_detected, weight_ok,
+                                                 weight_value, plastico_reciclado_g)
+                    _insert_interaction(c, now, resultado.value, deposit_id)
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+            logger.info(f"✅ Depósito #{deposit_id} e interação '{resultado.value}' registrados no banco '{self.db_path}'.")
+            return deposit_id
+        except Exception as e:
+            logger.error(f"❌ Erro ao registrar depósito: {e}")
+            return None
     
 
     def get_total_interacoes(self) -> int:
         try:
-            if not self.conn:
-                self.__connect()
-            if not self.conn:
-                raise Exception("Conexão com o banco de dados não estabelecida.")
-
-            c = self.conn.cursor()
-            c.execute('''SELECT COUNT(*) FROM interactions''')
-            resultado = c.fetchone()
-            total = resultado[0] if resultado else 0
+            with self.__leased() as conn:
+                total = load_totals(conn)['interactions']
             logger.info(f"ℹ️ Total de interações no banco: {total}")
             return total
         except Exception as e:
@@ -137,28 +255,234 @@ class DatabaseConnection:
             return 0
 
 
+    # ------------------------------------------------------------------
+    # Agregações do dashboard (índices da migração 1; não carregam o histórico)
+    # ------------------------------------------------------------------
+    def get_totals(self) -> dict:
+        """Interações, depósitos e peso (g) do histórico inteiro, dos contadores mantidos por trigger."""
+        try:
+            with self.__leased() as conn:
+                return load_totals(conn)
+        except Exception as e:
+            logger.error(f"❌ Erro ao ler contadores de totais: {e}", exc_info=True)
+            return {'interactions': 0, 'deposits': 0, 'weight_sum': 0.0}
+
+    def count_deposits(self) -> int:
+        return self.get_totals()['deposits']
+
+    def sum_deposit_weight_grams(self) -> float:
+        return self.get_totals()['weight_sum']
+
+    def reconcile_totals(self) -> dict:
+        """Reconta os totais (banco quente + arquivos frios) e corrige os contadores; retorna as divergências."""
+        with self.__leased() as conn:
+            return reconcile_totals(conn)
+
+    def get_daily_deposit_counts(self, days: int = 7) -> dict[str, int]:
+        """Depósitos por dia (chave YYYY-MM-DD, horário local) dos últimos `days` dias, incluindo hoje."""
+        try:
+            first_day = (date.today() - timedelta(days=days - 1)).isoformat()
+            with self.__leased() as conn:
+                rows = conn.execute('''SELECT day, COUNT(*) FROM deposits
+                                       WHERE day >= ?
+                                       GROUP BY day''', (first_day,)).fetchall()
+            return {day: count for day, count in rows}
+        except Exception as e:
+            logger.error(f"❌ Erro ao agrupar depósitos por dia: {e}", exc_info=True)
+            return {}
+
+    def get_latest_deposits(self, limit: int = 10) -> list[dict]:
+        """Os `limit` depósitos mais recentes (mesmo formato de `get_all_deposits`)."""
+        try:
+            with self.__leased() as conn:
+                rows = conn.execute(f'{SELECT_DEPOSITS_SQL} LIMIT ?', (limit,)).fetchall()
+            return [_deposit_row_to_dict(row) for row in rows]
+        except Exception as e:
+            logger.error(f"❌ Erro ao buscar últimos depósitos: {e}", exc_info=True)
+            return []
+
+
+    # ------------------------------------------------------------------
+    # Rollup diário (day, resultado) — mantido por triggers no mesmo INSERT
+    # ------------------------------------------------------------------
+    def get_daily_rollup(self, first_day: str | None = None, last_day: str | None = None) -> list[dict]:
+        try:
+            with self.__leased() as conn:
+                return load_daily_rollup(conn, first_day, last_day)
+        except Exception as e:
+            logger.error(f"❌ Erro ao ler rollup diário: {e}", exc_info=True)
+            return []
+
+    def get_rollup_totals(self, first_day: str, last_day: str) -> dict:
+        """Interações e depósitos somados no intervalo de dias [first_day, last_day] (faixa da PK)."""
+        try:
+            with self.__leased() as conn:
+                row = conn.execute('''SELECT TOTAL(interactions), TOTAL(deposits) FROM daily_rollup
+                                      WHERE day BETWEEN ? AND ?''', (first_day, last_day)).fetchone()
+            return {'interactions': int(row[0]), 'deposits': int(row[1])}
+        except Exception as e:
+            logger.error(f"❌ Erro ao somar rollup de {first_day} a {last_day}: {e}", exc_info=True)
+            return {'interactions': 0, 'deposits': 0}
+
+    def get_analytics_buckets(self, granularity: str, start_ts: float, end_ts: float) -> list[dict]:
+        """Métricas por (bucket, resultado) no intervalo [start_ts, end_ts).
+
+        `day`/`week`/`month` leem o rollup diário (limites considerados em dias inteiros);
+        `hour` agrupa as tabelas brutas por faixa de timestamp indexada.
+        """
+        try:
+            with self.__leased() as conn:
+                if granularity != 'hour':
+                    first_day = datetime.fromtimestamp(start_ts).date().isoformat()
+                    last_day = datetime.fromtimestamp(end_ts - 1e-6).date().isoformat()
+                    return load_rollup_buckets(conn, granularity, first_day, last_day)
+                # Meses já arquivados são anexados só durante a consulta
+                paths = archive_paths_for_range(conn, self.hot_db_path,
+                                                datetime.fromtimestamp(start_ts).date().isoformat(),
+                                                datetime.fromtimestamp(end_ts - 1e-6).date().isoformat())
+                with attached_archives(conn, paths) as schemas:
+                    return self.__hourly_buckets(conn, start_ts, end_ts, schemas)
+        except Exception as e:
+            logger.error(f"❌ Erro ao agregar analytics por {granularity}: {e}", exc_info=True)
+            return []
+
+    @staticmethod
+    def __hourly_buckets(conn: sqlite3.Connection, start_ts: float, end_ts: float,
+                         archive_schemas: list[str]) -> list[dict]:
+        interactions = union_source('interactions', 'timestamp, resultado', archive_schemas)
+        deposits = union_source('deposits', 'timestamp, ml_confidence, weight_value, plastico_reciclado_g',
+                                archive_schemas)
+        bucket_expr = "strftime('%Y-%m-%dT%H:00', timestamp, 'unixepoch', 'localtime')"
+        buckets: dict[tuple[str, str], dict] = {}
+
+        def bucket(label: str, resultado: str) -> dict:
+            return buckets.setdefault((label, resultado), {
+                'bucket': label, 'resultado': resultado, **{metric: 0 for metric in ROLLUP_METRICS}
+            })
+
+        for label, resultado, count in conn.execute(
+                f'''SELECT {bucket_expr} AS bucket, resultado, COUNT(*) FROM {interactions}
+                    WHERE timestamp >= ? AND timestamp < ?
+                    GROUP BY bucket, resultado''', (start_ts, end_ts)):
+            bucket(label, resultado)['interactions'] = count
+        for label, deposits, conf_sum, conf_count, weight_sum, weight_count, plastico_sum in conn.execute(
+                f'''SELECT {bucket_expr} AS bucket, COUNT(*), TOTAL(ml_confidence), COUNT(ml_confidence),
+                           TOTAL(weight_value), COUNT(weight_value), TOTAL(plastico_reciclado_g)
+                    FROM {deposits}
+                    WHERE timestamp >= ? AND timestamp < ?
+                    GROUP BY bucket''', (start_ts, end_ts)):
+            bucket(label, ROLLUP_DEPOSIT_RESULTADO).update({
+                'deposits': deposits, 'confidence_sum': conf_sum, 'confidence_count': conf_count,
+                'weight_sum': weight_sum, 'weight_count': weight_count, 'plastico_sum': plastico_sum,
+            })
+        return sorted(buckets.values(), key=lambda row: (row['bucket'], row['resultado']))
+
+    def rebuild_daily_rollup(self) -> int:
+        """Recalcula o rollup a partir das tabelas brutas numa transação; retorna as linhas gravadas."""
+        with self.__leased() as conn:
+            try:
+                conn.execute('BEGIN IMMEDIATE')
+                rows = rebuild_daily_rollup(conn)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        logger.info(f"✅ Rollup diário reconstruído: {rows} linhas (day, resultado)")
+        return rows
+
+    def check_daily_rollup(self) -> list[dict]:
+        """Divergências entre o rollup e as tabelas brutas (vazio = consistente)."""
+        with self.__leased() as conn:
+            conn.execute('BEGIN')  # mesmo snapshot do WAL para tabelas brutas e rollup
+            try:
+                return check_daily_rollup(conn)
+            finally:
+                conn.rollback()
+
+
+    def archive_older_than(self, retention_days: int, archive_dir: str, today: date | None = None) -> list[dict]:
+        """Move linhas com mais de `retention_days` dias para arquivos mensais em `archive_dir`.
+
+        O rollup dos meses arquivados fica no banco quente; o espaço liberado é devolvido
+        com incremental_vacuum. Retorna um resumo por mês arquivado.
+        """
+        if retention_days < ARCHIVE_MIN_RETENTION_DAYS:
+            raise ValueError(f"Retenção mínima no banco quente: {ARCHIVE_MIN_RETENTION_DAYS} dias")
+        cutoff_day = ((today or date.today()) - timedelta(days=retention_days)).isoformat()
+        with self.__leased() as conn:
+            return archive_before(conn, self.db_path, archive_dir, cutoff_day, time.time())
+
+    def import_csv(self, csv_path: str, source: str | None = None, batch_rows: int = IMPORT_BATCH_ROWS_DEFAULT,
+                   progress=None) -> ImportStats:
+        """Importa um CSV de duas seções (dados_exportados.csv) em lotes; retomável pelo checkpoint da origem."""
+        with self.__leased() as conn:
+            return import_export_csv(conn, csv_path, source=source, batch_rows=batch_rows, progress=progress)
+
+    def get_archive_manifest(self) -> list[dict]:
+        """Arquivos frios registrados (mês, caminho, contagens), do mais antigo ao mais novo."""
+        with self.__leased() as conn:
+            cursor = conn.execute('''SELECT month, path, archived_before, deposits, interactions, weight_sum, archived_at
+                                     FROM archive_manifest ORDER BY month''')
+            columns = [description[0] for description in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def iter_export_rows(self, table: str, after: tuple[float, int] | None = None,
+                         until: tuple[float, int] | None = None,
+                         batch_size: int = EXPORT_BATCH_SIZE_DEFAULT):
+        """Gera as linhas de `table` (tuplas em EXPORT_COLUMNS) em ordem de (timestamp, id).
+
+        Paginação por chave: cada lote é `WHERE (timestamp, id) > último visto LIMIT batch_size`
+        sobre o índice de timestamp, numa leitura curta própria — a memória fica limitada a um
+        lote e nenhuma transação de leitura fica aberta enquanto o cliente consome o stream.
+        `after` é exclusivo e `until` inclusivo.
+        """
+        columns = EXPORT_COLUMNS[table]
+        ts_index, id_index = columns.index('timestamp'), columns.index('id')
+        sql = f'''SELECT {', '.join(columns)} FROM {table}
+                  WHERE (timestamp, id) > (?, ?) AND (timestamp, id) <= (?, ?)
+                  ORDER BY timestamp, id LIMIT ?'''
+        last = after or (float('-inf'), 0)
+        upper = until or (float('inf'), 0)
+        while True:
+            with self.__leased() as conn:
+                rows = conn.execute(sql, (*last, *upper, batch_size)).fetchall()
+            yield from rows
+            if len(rows) < batch_size:
+                return
+            last = (rows[-1][ts_index], rows[-1][id_index])
+
+    def find_export_page_end(self, table: str, after: tuple[float, int] | None, limit: int) -> tuple[tuple[float, int] | None, bool]:
+        """(timestamp, id) da última linha de uma página de `limit` linhas e se há linhas depois dela.
+
+        Retorna (None, False) quando restam menos de `limit` linhas: a página vai até o fim.
+
+        Percorre só o índice de timestamp (consulta coberta), então o cursor da próxima
+        página pode ir no cabeçalho antes do corpo ser transmitido.
+        """
+        EXPORT_COLUMNS[table]  # valida o nome da tabela antes de montar o SQL
+        last = after or (float('-inf'), 0)
+        with self.__leased() as conn:
+            rows = conn.execute(
+                f'''SELECT timestamp, id FROM {table}
+                    WHERE (timestamp, id) > (?, ?)
+                    ORDER BY timestamp, id LIMIT 2 OFFSET ?''',
+                (*last, limit - 1)
+            ).fetchall()
+        if not rows:
+            return None, False
+        return (rows[0][0], rows[0][1]), len(rows) > 1
+
+    def pool_snapshot(self) -> dict:
+        """Estado do pool de conexões do arquivo (/api/admin/metrics)."""
+        return get_pool(self.db_path, self.pool_config).snapshot()
+
     def get_all_deposits(self) -> list[dict]:
         try:
-            if not self.conn:
-                self.__connect()
-            if not self.conn:
-                raise Exception("Conexão com o banco de dados não estabelecida.")
-
-            c = self.conn.cursor()
-            c.execute('''SELECT id, timestamp, ml_confidence, presence_detected, weight_value, weight_ok, plastico_reciclado_g FROM deposits ORDER BY timestamp DESC''')
-            rows = c.fetchall()
-            deposits = [
-                {
-                    'id': row[0],
-                    'timestamp': row[1],
-                    'ml_confidence': row[2],
-                    'presence_detected': row[3],
-                    'weight_value': row[4],
-                    'weight_ok': row[5],
-                    'plastico_reciclado_g': row[6]
-                }
-                for row in rows
-            ]
+            with self.__leased() as conn:
+                c = conn.cursor()
+                c.execute(SELECT_DEPOSITS_SQL)
+                rows = c.fetchall()
+            deposits = [_deposit_row_to_dict(row) for row in rows]
             logger.info(f"ℹ️ Recuperados {len(deposits)} depósitos do banco")
             return deposits
         except Exception as e:
@@ -169,18 +493,10 @@ class DatabaseConnection:
     def get_all_interactions(self) -> list[dict]:
         """Retorna todas as interações registradas, da mais recente para a mais antiga."""
         try:
-            if not self.conn:
-                self.__connect()
-            if not self.conn:
-                raise Exception("Conexão com o banco de dados não estabelecida.")
-
-            c = self.conn.cursor()
-            c.execute(
-                '''SELECT id, deposit_id, timestamp, resultado
-                   FROM interactions
-                   ORDER BY timestamp DESC'''
-            )
-            rows = c.fetchall()
+            with self.__leased() as conn:
+                c = conn.cursor()
+                c.execute(SELECT_INTERACTIONS_SQL)
+                rows = c.fetchall()
             interactions = [
                 {
                     'id': row[0],
@@ -195,5 +511,3 @@ class DatabaseConnection:
         except Exception as e:
             logger.error(f"❌ Erro ao buscar interações: {e}", exc_info=True)
             return []
-
-
@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+
+from src.database.db import DatabaseConnection, _insert_deposit, _insert_interaction
+from src.database.pool import get_pool
+
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# Configuração padrão do group commit
+# =============================================================================
+GROUP_COMMIT_INTERVAL_MS_DEFAULT = 20      # janela máxima de espera antes do flush
+GROUP_COMMIT_MAX_ROWS_DEFAULT = 64         # intenções por transação
+GROUP_COMMIT_RESULT_TIMEOUT_SECONDS = 5.0  # espera de quem precisa do id gravado
+
+
+@dataclass
+class _WriteIntent:
+    kind: str  # 'interaction' | 'deposit_outcome'
+    args: tuple
+    timestamp: float = field(default_factory=time.time)
+    future: Future = field(default_factory=Future)
+
+
+class GroupCommitWriter:
+    """Escritor único que agrupa INSERTs de depósitos/interações em uma transação.
+
+    As rotas enfileiram intenções de escrita (`submit_*`) e recebem um `Future` com o id
+    da linha; a thread do writer grava a cada `interval_ms` ou `max_rows` intenções,
+    com um único commit por lote. `close()` grava o que estiver na fila e faz checkpoint
+    do WAL antes de encerrar.
+    """
+
+    def __init__(self, database: DatabaseConnection,
+                 interval_ms: int = GROUP_COMMIT_INTERVAL_MS_DEFAULT,
+                 max_rows: int = GROUP_COMMIT_MAX_ROWS_DEFAULT,
+                 result_timeout_seconds: float = GROUP_COMMIT_RESULT_TIMEOUT_SECONDS):
+        self.database = database
+        self.interval_seconds = max(interval_ms, 1) / 1000.0
+        self.max_rows = max(max_rows, 1)
+        self.result_timeout_seconds = result_timeout_seconds
+        self._queue: queue.Queue[_WriteIntent | None] = queue.Queue()
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+        self.stats = {
+            'batches': 0,
+            'rows': 0,
+            'failed_rows': 0,
+            'max_batch_rows': 0,
+            'commit_ms_total': 0.0,
+            'commit_ms_max': 0.0,
+        }
+        self._thread = threading.Thread(target=self._run, name='db-group-commit', daemon=True)
+        self._thread.start()
+
+    # ------------------------------------------------------------------
+    # API das rotas
+    # ------------------------------------------------------------------
+    def submit_interaction(self, resultado: DatabaseConnection.ResultadoInteracao,
+                           deposit_id: int | None = None) -> Future:
+        """Enfileira uma interação; o Future resolve com o id da interação."""
+        return self._submit('interaction', (resultado.value, deposit_id))
+
+    def submit_deposit_outcome(self, ml_confidence, presence_detected, weight_ok, weight_value, plastico_reciclado_g,
+                               resultado: DatabaseConnection.ResultadoInteracao = DatabaseConnection.ResultadoInteracao.SUCESSO) -> Future:
+        """Enfileira depósito + interação (mesmo lote); o Future resolve com o id do depósito."""
+        return self._submit('deposit_outcome', (ml_confidence, presence_detected, weight_ok, weight_value,
+                                                plastico_reciclado_g, resultado.value))
+
+    def _submit(self, kind: str, args: tuple) -> Future:
+        intent = _WriteIntent(kind, args)
+        if self._stopped.is_set():
+            intent.future.set_exception(RuntimeError("GroupCommitWriter encerrado"))
+            return intent.future
+        self._queue.put(intent)
+        return intent.future
+
+    # ------------------------------------------------------------------
+    # Thread do writer
+    # ------------------------------------------------------------------
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is None:
+                break
+            batch = [first]
+            deadline = time.monotonic() + self.interval_seconds
+            while len(batch) < self.max_rows:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    intent = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if intent is None:
+                    stopping = True
+                    break
+                batch.append(intent)
+            self._flush(batch)
+        # Encerramento: grava o que ainda estiver na fila
+        remaining_intents = []
+        while True:
+            try:
+                intent = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if intent is not None:
+                remaining_intents.append(intent)
+        for start in range(0, len(remaining_intents), self.max_rows):
+            self._flush(remaining_intents[start:start + self.max_rows])
+
+    @staticmethod
+    def _apply(cursor, intent: _WriteIntent) -> int:
+        if intent.kind == 'interaction':
+            resultado_value, deposit_id = intent.args
+            return _insert_interaction(cursor, intent.timestamp, resultado_value, deposit_id)
+        *deposit_args, resultado_value = intent.args
+        deposit_id = _insert_deposit(cursor, intent.timestamp, *deposit_args)
+        _insert_interaction(cursor, intent.timestamp, resultado_value, deposit_id)
+        return deposit_id
+
+    def _flush(self, batch: list[_WriteIntent]) -> None:
+        """Um commit para o lote; se falhar, regrava intenção por intenção para isolar a ruim."""
+        pool = get_pool(self.database.db_path, self.database.pool_config)
+        started = time.perf_counter()
+        try:
+            with pool.lease() as conn:
+                try:
+                    cursor = conn.cursor()
+                    row_ids = [self._apply(cursor, intent) for intent in batch]
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+        except Exception as e:
+            logger.warning(f"⚠️ Lote de {len(batch)} escritas falhou, gravando individualmente: {e}")
+            self._flush_individually(pool, batch)
+            return
+        self._record_batch(len(batch), (time.perf_counter() - started) * 1000)
+        for intent, row_id in zip(batch, row_ids):
+            intent.future.set_result(row_id)
+
+    def _flush_individually(self, pool, batch: list[_WriteIntent]) -> None:
+        for intent in batch:
+            started = time.perf_counter()
+            try:
+                with pool.lease() as conn:
+                    try:
+                        row_id = self._apply(conn.cursor(), intent)
+                        conn.commit()
+                    except Exception:
+                        conn.rollback()
+                        raise
+            except Exception as e:
+                logger.error(f"❌ Erro ao gravar {intent.kind}: {e}")
+                with self._lock:
+                    self.stats['failed_rows'] += 1
+                intent.future.set_exception(e)
+                continue
+            self._record_batch(1, (time.perf_counter() - started) * 1000)
+            intent.future.set_result(row_id)
+
+    def _record_batch(self, rows: int, commit_ms: float) -> None:
+        with self._lock:
+            self.stats['batches'] += 1
+            self.stats['rows'] += rows
+            self.stats['max_batch_rows'] = max(self.stats['max_batch_rows'], rows)
+            self.stats['commit_ms_total'] += commit_ms
+            self.stats['commit_ms_max'] = max(self.stats['commit_ms_max'], commit_ms)
+
+    # ------------------------------------------------------------------
+    # Métricas e encerramento
+    # ------------------------------------------------------------------
+    def snapshot(self) -> dict:
+        with self._lock:
+            batches = self.stats['batches']
+            return {
+                'queue_depth': self._queue.qsize(),
+                'batches': batches,
+                'rows': self.stats['rows'],
+                'failed_rows': self.stats['failed_rows'],
+                'avg_batch_rows': round(self.stats['rows'] / batches, 2) if batches else 0.0,
+                'max_batch_rows': self.stats['max_batch_rows'],
+                'avg_commit_ms': round(self.stats['commit_ms_total'] / batches, 3) if batches else 0.0,
+                'max_commit_ms': round(self.stats['commit_ms_max'], 3),
+                'interval_ms': round(self.interval_seconds * 1000),
+                'max_rows': self.max_rows,
+            }
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Flush durável: grava a fila, faz checkpoint do WAL e encerra a thread."""
+        if self._stopped.is_set():
+            return
+        self._stopped.set()
+        self._queue.put(None)
+        self._thread.join(timeout=timeout)
+        try:
+            with get_pool(self.database.db_path, self.database.pool_config).lease() as conn:
+                conn.execute('PRAGMA wal_checkpoint(FULL)')
+            logger.info(f"✅ GroupCommitWriter encerrado ({self.stats['rows']} escritas em {self.stats['batches']} lotes)")
+        except Exception as e:
+            logger.error(f"❌ Erro no checkpoint final do WAL: {e}")
@@ -0,0 +1,279 @@
+from __future__ import annotations
+
+import logging
+import sqlite3
+import threading
+import time
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from enum import Enum
+
+
+logger = logging.getLogger(__name__)
+
+
+# =============================================================================
+# Limites padrão do armazenamento de chaves de idempotência
+# =============================================================================
+IDEMPOTENCY_TTL_SECONDS = 600.0        # retries do totem chegam em segundos; 10 min cobre reconexões longas
+IDEMPOTENCY_MAX_ENTRIES = 1024         # entradas no LRU em memória (por worker)
+IDEMPOTENCY_WAIT_TIMEOUT_SECONDS = 30.0  # espera máxima por uma requisição duplicada em andamento
+IDEMPOTENCY_POLL_INTERVAL_SECONDS = 0.05  # intervalo de polling quando o dono está em outro worker
+IDEMPOTENCY_STALE_PENDING_SECONDS = 120.0  # reserva 'pending' sem conclusão (worker morto) pode ser assumida
+
+
+class ClaimStatus(Enum):
+    OWNER = 'owner'          # esta requisição deve executar o pipeline
+    REPLAY = 'replay'        # resposta original disponível para reenvio
+    CONFLICT = 'conflict'    # mesma chave usada com payload diferente
+    IN_PROGRESS = 'in_progress'  # duplicata ainda em andamento após o tempo de espera
+
+
+@dataclass(frozen=True)
+class StoredResponse:
+    status_code: int
+    body: bytes
+    fingerprint: str
+    stored_at: float
+
+
+@dataclass(frozen=True)
+class Claim:
+    status: ClaimStatus
+    response: StoredResponse | None = None
+
+
+class IdempotencyStore:
+    """Armazena respostas por `Idempotency-Key` para absorver retries do totem.
+
+    Duas camadas:
+        - LRU em memória (limitado por `max_entries`) para retries no mesmo worker;
+        - tabela SQLite `idempotency_keys` para compartilhar o estado entre workers
+          (`SQLAlchemyIdempotencyStore` usa a mesma tabela no banco compartilhado entre instâncias).
+
+    Uma duplicata concorrente espera o resultado da requisição em andamento
+    (via `threading.Event` no mesmo processo, ou polling da tabela entre processos)
+    em vez de reexecutar classificação, ESP32 e gravação no banco.
+    """
+
+    def __init__(
+        self,
+        db_path: str = 'totem_data.db',
+        ttl_seconds: float = IDEMPOTENCY_TTL_SECONDS,
+        max_entries: int = IDEMPOTENCY_MAX_ENTRIES,
+        wait_timeout_seconds: float = IDEMPOTENCY_WAIT_TIMEOUT_SECONDS,
+    ):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.wait_timeout_seconds = wait_timeout_seconds
+        self._lock = threading.Lock()
+        self._cache: OrderedDict[str, StoredResponse] = OrderedDict()
+        self._inflight: dict[str, threading.Event] = {}
+        self._table_ready = False
+
+    # -------------------------------------------------------------------------
+    # SQLite
+    # -------------------------------------------------------------------------
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=self.wait_timeout_seconds)
+        if not self._table_ready:
+            conn.execute('''CREATE TABLE IF NOT EXISTS idempotency_keys (
+                key TEXT PRIMARY KEY,
+                fingerprint TEXT NOT NULL,
+                state TEXT NOT NULL, -- 'pending' | 'done'
+                status_code INTEGER,
+                body BLOB,
+                created_at REAL NOT NULL
+            )''')
+            conn.commit()
+            self._table_ready = True
+        return conn
+
+    def _read_row(self, key: str) -> tuple | None:
+        conn = self._connect()
+        try:
+            return conn.execute(
+                '''SELECT fingerprint, state, status_code, body, created_at
+                   FROM idempotency_keys WHERE key = ?''',
+                (key,)
+            ).fetchone()
+        finally:
+            conn.close()
+
+    def _try_insert_pending(self, key: str, fingerprint: str, now: float) -> bool:
+        """Tenta reservar a chave; retorna True se esta requisição virou a dona."""
+        conn = self._connect()
+        try:
+            cursor = conn.execute(
+                '''INSERT OR IGNORE INTO idempotency_keys (key, fingerprint, state, created_at)
+                   VALUES (?, ?, 'pending', ?)''',
+                (key, fingerprint, now)
+            )
+            if cursor.rowcount == 1:
+                conn.commit()
+                return True
+            # Chave expirada (ou reserva órfã de worker morto): assume a posse
+            cursor = conn.execute(
+                '''UPDATE idempotency_keys
+                   SET fingerprint = ?, state = 'pending', status_code = NULL, body = NULL, created_at = ?
+                   WHERE key = ?
+                     AND (created_at < ? OR (state = 'pending' AND created_at < ?))''',
+                (fingerprint, now, key, now - self.ttl_seconds, now - IDEMPOTENCY_STALE_PENDING_SECONDS)
+            )
+            conn.commit()
+            return cursor.rowcount == 1
+        finally:
+            conn.close()
+
+    # -------------------------------------------------------------------------
+    # LRU em memória
+    # -------------------------------------------------------------------------
+    def _cache_get(self, key: str, now: float) -> StoredResponse | None:
+        stored = self._cache.get(key)
+        if stored is None:
+            return None
+        if now - stored.stored_at > self.ttl_seconds:
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        return stored
+
+    def _cache_put(self, key: str, stored: StoredResponse) -> None:
+        self._cache[key] = stored
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+    # -------------------------------------------------------------------------
+    # API pública
+    # -------------------------------------------------------------------------
+    def begin(self, key: str, fingerprint: str) -> Claim:
+        """Reserva a chave ou devolve a resposta original/duplicata em andamento.
+
+        Args:
+            key: Chave de idempotência (já com escopo da rota)
+            fingerprint: Hash do payload, para detectar reuso da chave com outro conteúdo
+
+        Returns:
+            Claim com o status da reserva e, em caso de REPLAY, a resposta armazenada
+        """
+        deadline = time.monotonic() + self.wait_timeout_seconds
+        while True:
+            now = time.time()
+            with self._lock:
+                stored = self._cache_get(key, now)
+                if stored is not None:
+                    return self._replay_or_conflict(stored, fingerprint)
+                event = self._inflight.get(key)
+                if event is None:
+                    event = threading.Event()
+                    self._inflight[key] = event
+                    local_owner = True
+                else:
+                    local_owner = False
+
+            if not local_owner:
+                # Duplicata concorrente no mesmo worker: espera o dono terminar
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not event.wait(remaining):
+                    return Claim(ClaimStatus.IN_PROGRESS)
+                continue
+
+            try:
+                claim = self._claim_shared(key, fingerprint, now, deadline)
+            except Exception:
+                self._release_inflight(key)
+                raise
+            if claim.status != ClaimStatus.OWNER:
+                self._release_inflight(key)
+            return claim
+
+    def _claim_shared(self, key: str, fingerprint: str, now: float, deadline: float) -> Claim:
+        """Reserva a chave na tabela compartilhada entre workers."""
+        while True:
+            if self._try_insert_pending(key, fingerprint, now):
+                return Claim(ClaimStatus.OWNER)
+
+            row = self._read_row(key)
+            if row is None:
+                # Dono abortou entre o INSERT e a leitura: tenta de novo
+                now = time.time()
+                continue
+
+            row_fingerprint, state, status_code, body, created_at = row
+            if state == 'done':
+                stored = StoredResponse(int(status_code), bytes(body or b''), row_fingerprint, created_at)
+                with self._lock:
+                    self._cache_put(key, stored)
+                return self._replay_or_conflict(stored, fingerprint)
+
+            if row_fingerprint != fingerprint:
+                return Claim(ClaimStatus.CONFLICT)
+
+            # Pendente em outro worker: polling até concluir ou estourar o prazo
+            if time.monotonic() >= deadline:
+                return Claim(ClaimStatus.IN_PROGRESS)
+            time.sleep(IDEMPOTENCY_POLL_INTERVAL_SECONDS)
+            now = time.time()
+
+    @staticmethod
+    def _replay_or_conflict(stored: StoredResponse, fingerprint: str) -> Claim:
+        if stored.fingerprint != fingerprint:
+            return Claim(ClaimStatus.CONFLICT)
+        return Claim(ClaimStatus.REPLAY, stored)
+
+    def _store_done(self, key: str, status_code: int, body: bytes, stored_at: float) -> None:
+        """Marca a chave como concluída e remove as expiradas."""
+        conn = self._connect()
+        try:
+            conn.execute(
+                '''UPDATE idempotency_keys
+                   SET state = 'done', status_code = ?, body = ?, created_at = ?
+                   WHERE key = ?''',
+                (status_code, body, stored_at, key)
+            )
+            conn.execute(
+                'DELETE FROM idempotency_keys WHERE created_at < ?',
+                (stored_at - self.ttl_seconds,)
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _delete_pending(self, key: str) -> None:
+        conn = self._connect()
+        try:
+            conn.execute(
+                "DELETE FROM idempotency_keys WHERE key = ? AND state = 'pending'",
+                (key,)
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+    def complete(self, key: str, fingerprint: str, status_code: int, body: bytes) -> None:
+        """Registra a resposta final da requisição dona e libera as duplicatas em espera."""
+        stored = StoredResponse(status_code, body, fingerprint, time.time())
+        try:
+            self._store_done(key, status_code, body, stored.stored_at)
+        except Exception as e:
+            logger.error(f"❌ Erro ao persistir resposta idempotente: {e}")
+        with self._lock:
+            self._cache_put(key, stored)
+        self._release_inflight(key)
+
+    def abort(self, key: str) -> None:
+        """Descarta a reserva (ex.: erro 5xx) para que um retry possa reexecutar."""
+        try:
+            self._delete_pending(key)
+        except Exception as e:
+            logger.error(f"❌ Erro ao liberar chave idempotente: {e}")
+        self._release_inflight(key)
+
+    def _release_inflight(self, key: str) -> None:
+        with self._lock:
+            event = self._inflight.pop(key, None)
+        if event is not None:
+            event.set()
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import logging
+import sqlite3
+import time
+
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from src.database.archive import create_archive_manifest
+from src.database.bulk_import import create_file_checkpoints, create_import_ledger
+from src.database.counters import create_totals, rebuild_totals
+from src.database.rollups import create_daily_rollup, rebuild_daily_rollup
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    description: str
+    apply: Callable[[sqlite3.Connection], None]
+
+
+# =============================================================================
+# Migrações (em ordem; nunca editar uma já publicada — adicionar uma nova)
+# =============================================================================
+
+def _m001_indices_e_dia(conn: sqlite3.Connection) -> None:
+    """Índices das consultas por tempo/resultado e coluna `day` (YYYY-MM-DD, horário local)."""
+    for table in ('deposits', 'interactions'):
+        conn.execute(f'ALTER TABLE {table} ADD COLUMN day TEXT')
+        conn.execute(f"UPDATE {table} SET day = date(timestamp, 'unixepoch', 'localtime')")
+        # Preenchida no próprio INSERT (mesma transação), para qualquer escritor: pool, aiosqlite, writer
+        conn.execute(f'''CREATE TRIGGER IF NOT EXISTS trg_{table}_day
+                         AFTER INSERT ON {table} WHEN NEW.day IS NULL
+                         BEGIN
+                             UPDATE {table} SET day = date(NEW.timestamp, 'unixepoch', 'localtime') WHERE id = NEW.id;
+                         END''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_deposits_timestamp ON deposits(timestamp)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_interactions_timestamp ON interactions(timestamp)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_interactions_resultado_timestamp ON interactions(resultado, timestamp)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_deposits_day ON deposits(day)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_interactions_day_resultado ON interactions(day, resultado)')
+
+
+def _m002_rollup_diario(conn: sqlite3.Connection) -> None:
+    """Rollup (day, resultado) mantido por triggers, com backfill do histórico existente."""
+    create_daily_rollup(conn)
+    rebuild_daily_rollup(conn)
+
+
+def _m003_manifesto_de_arquivo(conn: sqlite3.Connection) -> None:
+    """Manifesto dos arquivos frios mensais (retenção do banco quente)."""
+    create_archive_manifest(conn)
+
+
+def _m004_contadores_totais(conn: sqlite3.Connection) -> None:
+    """Contadores de totais do dashboard mantidos por triggers, com backfill."""
+    create_totals(conn)
+    rebuild_totals(conn)
+
+
+def _m005_ledger_de_importacao(conn: sqlite3.Connection) -> None:
+    """Ledger e checkpoints da importação em lote de CSVs exportados."""
+    create_import_ledger(conn)
+
+
+def _m006_checkpoints_por_arquivo(conn: sqlite3.Connection) -> None:
+    """Checkpoints de importação por caminho + fingerprint do conteúdo, com marca de conclusão."""
+    create_file_checkpoints(conn)
+
+
+MIGRATIONS: list[Migration] = [
+    Migration(1, 'índices por timestamp/resultado e coluna day', _m001_indices_e_dia),
+    Migration(2, 'rollup diário por (day, resultado)', _m002_rollup_diario),
+    Migration(3, 'manifesto de arquivos frios mensais', _m003_manifesto_de_arquivo),
+    Migration(4, 'contadores de totais do dashboard', _m004_contadores_totais),
+    Migration(5, 'ledger de importação de CSV', _m005_ledger_de_importacao),
+    Migration(6, 'checkpoints de importação por arquivo', _m006_checkpoints_por_arquivo),
+]
+
+
+def current_version(conn: sqlite3.Connection) -> int:
+    row = conn.execute('SELECT MAX(version) FROM schema_version').fetchone()
+    return row[0] or 0
+
+
+def apply_migrations(conn: sqlite3.Connection, migrations: list[Migration] | None = None) -> int:
+    """Aplica as migrações pendentes em ordem, cada uma na sua transação; retorna a versão final.
+
+    `BEGIN IMMEDIATE` serializa a verificação entre processos (ex.: vários workers do uvicorn
+    iniciando juntos): quem pega o lock depois encontra a versão já aplicada.
+    """
+    migrations = sorted(migrations if migrations is not None else MIGRATIONS, key=lambda m: m.version)
+    conn.execute('''CREATE TABLE IF NOT EXISTS schema_version (
+        version INTEGER PRIMARY KEY,
+        description TEXT NOT NULL,
+        applied_at REAL NOT NULL
+    )''')
+    conn.commit()
+
+    version = current_version(conn)
+    for migration in migrations:
+        if migration.version <= version:
+            continue
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            if current_version(conn) >= migration.version:
+                conn.rollback()
+                version = migration.version
+                continue
+            migration.apply(conn)
+            conn.execute('INSERT INTO schema_version (version, description, applied_at) VALUES (?, ?, ?)',
+                         (migration.version, migration.description, time.time()))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            logger.error(f"❌ Migração {migration.version} ({migration.description}) falhou; banco mantido na versão {version}")
+            raise
+        version = migration.version
+        logger.info(f"✅ Migração {migration.version} aplicada: {migration.description}")
+    return version
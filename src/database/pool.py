@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import logging
+import queue
+import sqlite3
+import threading
+
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# Configuração padrão do pool SQLite
+# =============================================================================
+DB_POOL_SIZE_DEFAULT = 4                  # conexões de longa duração por arquivo de banco
+DB_BUSY_TIMEOUT_MS_DEFAULT = 5000         # espera por lock de escrita antes de "database is locked"
+DB_CACHE_SIZE_KIB_DEFAULT = 8192          # cache de páginas por conexão (PRAGMA cache_size negativo = KiB)
+DB_LEASE_TIMEOUT_SECONDS_DEFAULT = 10.0   # espera máxima por uma conexão livre no pool
+
+
+@dataclass(frozen=True)
+class PoolConfig:
+    size: int = DB_POOL_SIZE_DEFAULT
+    busy_timeout_ms: int = DB_BUSY_TIMEOUT_MS_DEFAULT
+    cache_size_kib: int = DB_CACHE_SIZE_KIB_DEFAULT
+    lease_timeout_seconds: float = DB_LEASE_TIMEOUT_SECONDS_DEFAULT
+    read_only: bool = False  # arquivo imutável (snapshots): sem WAL nem locks
+
+
+class PoolExhausted(Exception):
+    """Nenhuma conexão livre dentro do `lease_timeout_seconds`."""
+
+
+class SQLitePool:
+    """Pool thread-safe de conexões SQLite de longa duração.
+
+    As conexões são abertas sob demanda (até `size`) com WAL, `synchronous=NORMAL`,
+    busy timeout e cache ajustados, e emprestadas via `lease()` em vez de abertas
+    e fechadas a cada bloco. Uma conexão é usada por uma thread por vez.
+    """
+
+    def __init__(self, db_path: str, config: PoolConfig | None = None):
+        self.db_path = db_path
+        self.config = config or PoolConfig()
+        self._idle: queue.LifoQueue[sqlite3.Connection] = queue.LifoQueue()
+        self._all: list[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._closed = False
+        self.stats = {'leases': 0, 'waits': 0, 'created': 0}
+
+    def _open(self) -> sqlite3.Connection:
+        if self.config.read_only:
+            conn = sqlite3.connect(
+                f"{Path(self.db_path).resolve().as_uri()}?mode=ro&immutable=1",
+                uri=True,
+                check_same_thread=False
+            )
+            conn.execute(f'PRAGMA cache_size=-{int(self.config.cache_size_kib)}')
+            conn.execute('PRAGMA temp_store=MEMORY')
+            return conn
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.config.busy_timeout_ms / 1000.0,
+            check_same_thread=False  # o pool garante uso exclusivo por lease
+        )
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute(f'PRAGMA busy_timeout={int(self.config.busy_timeout_ms)}')
+        conn.execute(f'PRAGMA cache_size=-{int(self.config.cache_size_kib)}')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        return conn
+
+    def acquire(self) -> sqlite3.Connection:
+        """Empresta uma conexão (ociosa, nova se abaixo do limite, ou espera uma liberar)."""
+        if self._closed:
+            raise PoolExhausted(f"Pool de '{self.db_path}' fechado")
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = None
+            with self._lock:
+                if len(self._all) < self.config.size:
+                    conn = self._open()
+                    self._all.append(conn)
+                    self.stats['created'] += 1
+            if conn is None:
+                with self._lock:
+                    self.stats['waits'] += 1
+                try:
+                    conn = self._idle.get(timeout=self.config.lease_timeout_seconds)
+                except queue.Empty:
+                    raise PoolExhausted(
+                        f"Nenhuma conexão livre em {self.config.lease_timeout_seconds}s ('{self.db_path}')"
+                    ) from None
+        with self._lock:
+            self.stats['leases'] += 1
+        return conn
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        """Devolve a conexão; transação esquecida aberta é desfeita."""
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ Conexão descartada do pool '{self.db_path}': {e}")
+            with self._lock:
+                if conn in self._all:
+                    self._all.remove(conn)
+            return
+        if self._closed:
+            conn.close()
+            return
+        self._idle.put(conn)
+
+    @contextmanager
+    def lease(self):
+        """`with pool.lease() as conn:` — empresta e devolve uma conexão."""
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def snapshot(self) -> dict:
+        return {
+            'db_path': self.db_path,
+            'size': self.config.size,
+            'open': len(self._all),
+            'idle': self._idle.qsize(),
+            **self.stats,
+        }
+
+    def close(self) -> None:
+        """Fecha as conexões ociosas; as emprestadas fecham ao serem devolvidas."""
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+_pools: dict[str, SQLitePool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_path: str, config: PoolConfig | None = None) -> SQLitePool:
+    """Pool compartilhado por arquivo de banco (a primeira configuração registrada vale)."""
+    with _pools_lock:
+        pool = _pools.get(db_path)
+        if pool is None or pool._closed:
+            pool = SQLitePool(db_path, config)
+            _pools[db_path] = pool
+        return pool
+
+
+def close_pool(db_path: str) -> None:
+    """Fecha e esquece o pool de um arquivo (ex.: snapshot removido do disco)."""
+    with _pools_lock:
+        pool = _pools.pop(db_path, None)
+    if pool is not None:
+        pool.close()
+
+
+def close_all_pools() -> None:
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.close()
+        _pools.clear()
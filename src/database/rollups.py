@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import logging
+import sqlite3
+
+from src.database.archive import archived_horizon
+
+
+logger = logging.getLogger(__name__)
+
+# Depósitos só existem para tampinhas aceitas: as métricas de depósito entram no bucket
+# do resultado de sucesso (mesmo valor de DatabaseConnection.ResultadoInteracao.SUCESSO).
+ROLLUP_DEPOSIT_RESULTADO = 'sucesso'
+
+ROLLUP_METRICS = (
+    'interactions',
+    'deposits',
+    'confidence_sum',
+    'confidence_count',
+    'weight_sum',
+    'weight_count',
+    'plastico_sum',
+)
+
+_DAY_EXPR = "COALESCE(NEW.day, date(NEW.timestamp, 'unixepoch', 'localtime'))"
+
+
+def create_daily_rollup(conn: sqlite3.Connection) -> None:
+    """Tabela daily_rollup (day, resultado) e triggers que a mantêm na mesma transação do INSERT."""
+    conn.execute('''CREATE TABLE IF NOT EXISTS daily_rollup (
+        day TEXT NOT NULL,
+        resultado TEXT NOT NULL,
+        interactions INTEGER NOT NULL DEFAULT 0,
+        deposits INTEGER NOT NULL DEFAULT 0,
+        confidence_sum REAL NOT NULL DEFAULT 0,
+        confidence_count INTEGER NOT NULL DEFAULT 0,
+        weight_sum REAL NOT NULL DEFAULT 0,
+        weight_count INTEGER NOT NULL DEFAULT 0,
+        plastico_sum REAL NOT NULL DEFAULT 0,
+        PRIMARY KEY (day, resultado)
+    ) WITHOUT ROWID''')
+    # O dia é calculado aqui também: a ordem de execução entre triggers do mesmo evento não é garantida
+    conn.execute(f'''CREATE TRIGGER IF NOT EXISTS trg_interactions_rollup
+                     AFTER INSERT ON interactions
+                     BEGIN
+                         INSERT INTO daily_rollup (day, resultado, interactions)
+                         VALUES ({_DAY_EXPR}, NEW.resultado, 1)
+                         ON CONFLICT(day, resultado) DO UPDATE SET interactions = interactions + 1;
+                     END''')
+    conn.execute(f'''CREATE TRIGGER IF NOT EXISTS trg_deposits_rollup
+                     AFTER INSERT ON deposits
+                     BEGIN
+                         INSERT INTO daily_rollup (day, resultado, deposits, confidence_sum, confidence_count,
+                                                   weight_sum, weight_count, plastico_sum)
+                         VALUES ({_DAY_EXPR}, '{ROLLUP_DEPOSIT_RESULTADO}', 1,
+                                 COALESCE(NEW.ml_confidence, 0), NEW.ml_confidence IS NOT NULL,
+                                 COALESCE(NEW.weight_value, 0), NEW.weight_value IS NOT NULL,
+                                 COALESCE(NEW.plastico_reciclado_g, 0))
+                         ON CONFLICT(day, resultado) DO UPDATE SET
+                             deposits = deposits + 1,
+                             confidence_sum = confidence_sum + excluded.confidence_sum,
+                             confidence_count = confidence_count + excluded.confidence_count,
+                             weight_sum = weight_sum + excluded.weight_sum,
+                             weight_count = weight_count + excluded.weight_count,
+                             plastico_sum = plastico_sum + excluded.plastico_sum;
+                     END''')
+
+
+def _raw_rollup_rows(conn: sqlite3.Connection, first_day: str | None = None) -> dict[tuple[str, str], dict]:
+    """Rollup recalculado a partir de deposits/interactions (a partir de `first_day`, se informado)."""
+    rows: dict[tuple[str, str], dict] = {}
+
+    def bucket(day: str, resultado: str) -> dict:
+        return rows.setdefault((day, resultado), {metric: 0 for metric in ROLLUP_METRICS})
+
+    for day, resultado, count in conn.execute(
+            '''SELECT day, resultado, COUNT(*) FROM interactions
+               WHERE day >= COALESCE(?, day) GROUP BY day, resultado''', (first_day,)):
+        bucket(day, resultado)['interactions'] = count
+    for day, deposits, conf_sum, conf_count, weight_sum, weight_count, plastico_sum in conn.execute(
+            '''SELECT day, COUNT(*), TOTAL(ml_confidence), COUNT(ml_confidence),
+                      TOTAL(weight_value), COUNT(weight_value), TOTAL(plastico_reciclado_g)
+               FROM deposits WHERE day >= COALESCE(?, day) GROUP BY day''', (first_day,)):
+        bucket(day, ROLLUP_DEPOSIT_RESULTADO).update({
+            'deposits': deposits,
+            'confidence_sum': conf_sum,
+            'confidence_count': conf_count,
+            'weight_sum': weight_sum,
+            'weight_count': weight_count,
+            'plastico_sum': plastico_sum,
+        })
+    return rows
+
+
+def rebuild_daily_rollup(conn: sqlite3.Connection) -> int:
+    """Recalcula o rollup inteiro a partir das tabelas brutas (backfill); retorna as linhas gravadas.
+
+    Não faz commit: roda na transação de quem chamou (migração ou `DatabaseConnection`).
+    Dias já arquivados (antes de `archived_horizon`) não estão mais nas tabelas quentes:
+    o rollup deles é preservado como está.
+    """
+    horizon = archived_horizon(conn)
+    rows = _raw_rollup_rows(conn, horizon)
+    conn.execute('DELETE FROM daily_rollup WHERE day >= COALESCE(?, day)', (horizon,))
+    conn.executemany(
+        f'''INSERT INTO daily_rollup (day, resultado, {', '.join(ROLLUP_METRICS)})
+            VALUES (?, ?, {', '.join('?' for _ in ROLLUP_METRICS)})''',
+        [(day, resultado, *(metrics[m] for m in ROLLUP_METRICS)) for (day, resultado), metrics in rows.items()]
+    )
+    return len(rows)
+
+
+def load_daily_rollup(conn: sqlite3.Connection, first_day: str | None = None, last_day: str | None = None) -> list[dict]:
+    """Linhas do rollup (day, resultado, métricas) no intervalo [first_day, last_day], em ordem de dia."""
+    rows = conn.execute(
+        f'''SELECT day, resultado, {', '.join(ROLLUP_METRICS)} FROM daily_rollup
+            WHERE day >= COALESCE(?, day) AND day <= COALESCE(?, day)
+            ORDER BY day, resultado''',
+        (first_day, last_day)
+    ).fetchall()
+    return [dict(zip(('day', 'resultado', *ROLLUP_METRICS), row)) for row in rows]
+
+
+# Expressão do bucket sobre a coluna day do rollup (semana começa na segunda-feira)
+ROLLUP_BUCKET_EXPR = {
+    'day': 'day',
+    'week': "date(day, '-' || ((CAST(strftime('%w', day) AS INTEGER) + 6) % 7) || ' days')",
+    'month': 'substr(day, 1, 7)',
+}
+
+
+def load_rollup_buckets(conn: sqlite3.Connection, granularity: str, first_day: str, last_day: str) -> list[dict]:
+    """Rollup reagrupado por dia/semana/mês no intervalo [first_day, last_day] (faixa da PK)."""
+    bucket_expr = ROLLUP_BUCKET_EXPR[granularity]
+    rows = conn.execute(
+        f'''SELECT {bucket_expr} AS bucket, resultado, {', '.join(f'SUM({m})' for m in ROLLUP_METRICS)}
+            FROM daily_rollup
+            WHERE day BETWEEN ? AND ?
+            GROUP BY bucket, resultado
+            ORDER BY bucket, resultado''',
+        (first_day, last_day)
+    ).fetchall()
+    return [dict(zip(('bucket', 'resultado', *ROLLUP_METRICS), row)) for row in rows]
+
+
+def check_daily_rollup(conn: sqlite3.Connection, tolerance: float = 1e-6) -> list[dict]:
+    """Compara o rollup com as tabelas brutas; retorna as divergências (lista vazia = consistente).
+
+    Só cobre os dias ainda no banco quente (a partir de `archived_horizon`).
+    """
+    horizon = archived_horizon(conn)
+    raw = _raw_rollup_rows(conn, horizon)
+    stored = {(row['day'], row['resultado']): row for row in load_daily_rollup(conn, horizon)}
+    mismatches = []
+    for key in sorted(raw.keys() | stored.keys()):
+        raw_metrics = raw.get(key, {})
+        stored_metrics = stored.get(key, {})
+        for metric in ROLLUP_METRICS:
+            expected = raw_metrics.get(metric, 0)
+            actual = stored_metrics.get(metric, 0)
+            if abs(float(expected) - float(actual)) > tolerance * max(abs(float(expected)), 1.0):
+                mismatches.append({'day': key[0], 'resultado': key[1], 'metric': metric,
+                                   'rollup': actual, 'raw': expected})
+    if mismatches:
+        logger.warning(f"⚠️ Rollup diário divergente em {len(mismatches)} métricas")
+    return mismatches
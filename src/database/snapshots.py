@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+from src.database.db import DatabaseConnection
+from src.database.pool import PoolConfig, close_pool
+
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# Configuração padrão dos snapshots de leitura
+# =============================================================================
+SNAPSHOT_INTERVAL_SECONDS_DEFAULT = 300.0  # um snapshot a cada 5 minutos
+SNAPSHOT_KEEP_DEFAULT = 3                  # snapshots mantidos no diretório
+SNAPSHOT_PAGES_PER_STEP_DEFAULT = 256      # páginas copiadas por passo do backup (1 MiB com páginas de 4 KiB)
+SNAPSHOT_STEP_PAUSE_SECONDS_DEFAULT = 0.005
+SNAPSHOT_POOL_SIZE = 2                     # conexões somente leitura por snapshot
+SNAPSHOT_MAX_RESTART_FACTOR = 4            # passos além do necessário antes de copiar em um passo só
+
+_TIMESTAMP_FORMAT = '%Y%m%dT%H%M%S%f'
+
+
+@dataclass(frozen=True)
+class SnapshotInfo:
+    path: str
+    created_at: float
+
+    @property
+    def age_seconds(self) -> float:
+        return max(time.time() - self.created_at, 0.0)
+
+    def as_dict(self) -> dict:
+        return {
+            'path': self.path,
+            'created_at': datetime.fromtimestamp(self.created_at).isoformat(),
+            'age_seconds': round(self.age_seconds, 1),
+        }
+
+
+class _BackupRestarting(Exception):
+    """O arquivo de origem mudou tantas vezes que o backup em passos não termina."""
+
+
+class SnapshotManager:
+    """Cópias periódicas do banco vivo para as leituras pesadas de analytics.
+
+    Cada snapshot é feito com a API de backup online do SQLite (`Connection.backup`) em passos
+    de `pages_per_step` páginas com uma pausa entre eles: o lock de leitura na origem dura um
+    passo e os kiosks continuam gravando. Se escritas na origem reiniciarem a cópia vezes demais,
+    ela é refeita num passo só (no WAL a leitura não bloqueia escritores).
+
+    O arquivo é gravado com sufixo `.tmp`, convertido para journal_mode=DELETE e publicado com
+    `os.replace`, então leitores só veem snapshots completos; os `keep` mais recentes ficam no disco.
+    """
+
+    def __init__(self, db_path: str, snapshot_dir: str | Path,
+                 interval_seconds: float = SNAPSHOT_INTERVAL_SECONDS_DEFAULT,
+                 keep: int = SNAPSHOT_KEEP_DEFAULT,
+                 pages_per_step: int = SNAPSHOT_PAGES_PER_STEP_DEFAULT,
+                 step_pause_seconds: float = SNAPSHOT_STEP_PAUSE_SECONDS_DEFAULT):
+        self.db_path = db_path
+        self.snapshot_dir = Path(snapshot_dir)
+        self.interval_seconds = max(interval_seconds, 1.0)
+        self.keep = max(keep, 1)
+        self.pages_per_step = max(pages_per_step, 1)
+        self.step_pause_seconds = max(step_pause_seconds, 0.0)
+        self._prefix = f'{Path(db_path).stem}_'
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+        published = self._scan()
+        self._latest = published[-1] if published else None
+        self._reader: DatabaseConnection | None = None
+        self.stats = {
+            'taken': 0,
+            'failed': 0,
+            'single_step_fallbacks': 0,
+            'last_duration_ms': 0.0,
+            'last_error': None,
+        }
+
+    # ------------------------------------------------------------------
+    # Snapshots
+    # ------------------------------------------------------------------
+    def _scan(self) -> list[SnapshotInfo]:
+        """Snapshots publicados no diretório, do mais antigo ao mais novo."""
+        if not self.snapshot_dir.is_dir():
+            return []
+        snapshots = []
+        for path in self.snapshot_dir.glob(f'{self._prefix}*.db'):
+            try:
+                created = datetime.strptime(path.stem[len(self._prefix):], _TIMESTAMP_FORMAT)
+            except ValueError:
+                continue
+            snapshots.append(SnapshotInfo(str(path), created.timestamp()))
+        return sorted(snapshots, key=lambda info: info.created_at)
+
+    def _copy(self, source: sqlite3.Connection, target: sqlite3.Connection, pages: int) -> None:
+        total_steps = [0]
+
+        def progress(status, remaining, total):
+            total_steps[0] += 1
+            if pages > 0 and total_steps[0] > SNAPSHOT_MAX_RESTART_FACTOR * (total // pages + 1):
+                raise _BackupRestarting()
+            if self.step_pause_seconds and remaining:
+                time.sleep(self.step_pause_seconds)  # janela para os escritores entre os passos
+
+        source.backup(target, pages=pages, progress=progress)
+
+    def take_snapshot(self) -> SnapshotInfo:
+        """Copia o banco vivo para um novo snapshot, publica e remove os excedentes."""
+        with self._lock:
+            self.snapshot_dir.mkdir(parents=True, exist_ok=True)
+            created_at = time.time()
+            final_path = self.snapshot_dir / f'{self._prefix}{datetime.fromtimestamp(created_at).strftime(_TIMESTAMP_FORMAT)}.db'
+            tmp_path = final_path.with_suffix('.db.tmp')
+            started = time.perf_counter()
+            try:
+                source = sqlite3.connect(self.db_path)
+                target = sqlite3.connect(str(tmp_path))
+                try:
+                    try:
+                        self._copy(source, target, self.pages_per_step)
+                    except _BackupRestarting:
+                        self.stats['single_step_fallbacks'] += 1
+                        logger.warning("⚠️ Backup em passos reiniciado por escritas; copiando em um passo só")
+                        self._copy(source, target, -1)
+                    # Snapshot é só leitura: sem WAL não precisa de -wal/-shm ao lado
+                    target.execute('PRAGMA journal_mode=DELETE')
+                finally:
+                    target.close()
+                    source.close()
+                os.replace(tmp_path, final_path)
+            except Exception as e:
+                self.stats['failed'] += 1
+                self.stats['last_error'] = str(e)
+                tmp_path.unlink(missing_ok=True)
+                raise
+            info = SnapshotInfo(str(final_path), created_at)
+            self._latest = info
+            self.stats['taken'] += 1
+            self.stats['last_duration_ms'] = round((time.perf_counter() - started) * 1000, 1)
+            self.stats['last_error'] = None
+            self._prune()
+        logger.info(f"✅ Snapshot de analytics gravado em {self.stats['last_duration_ms']}ms: {final_path}")
+        return info
+
+    def _prune(self) -> None:
+        for info in self._scan()[:-self.keep]:
+            close_pool(info.path)
+            try:
+                os.remove(info.path)
+            except OSError as e:
+                logger.warning(f"⚠️ Snapshot antigo não removido ({info.path}): {e}")
+
+    def latest(self) -> SnapshotInfo | None:
+        """Snapshot mais recente já publicado (None antes do primeiro)."""
+        return self._latest
+
+    def reader(self) -> tuple[DatabaseConnection, SnapshotInfo] | None:
+        """Conexão somente leitura (pool próprio) para o snapshot mais recente, com a idade dele."""
+        latest = self.latest()
+        if latest is None:
+            return None
+        reader = self._reader
+        if reader is None or reader.db_path != latest.path:
+            reader = DatabaseConnection(latest.path, pool_config=PoolConfig(size=SNAPSHOT_POOL_SIZE, read_only=True),
+                                        hot_db_path=self.db_path)
+            self._reader = reader
+        return reader, latest
+
+    # ------------------------------------------------------------------
+    # Thread periódica
+    # ------------------------------------------------------------------
+    def start(self) -> None:
+        """Tira um snapshot a cada `interval_seconds` numa thread de background."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name='db-snapshots', daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                self.take_snapshot()
+            except Exception as e:
+                logger.error(f"❌ Falha ao gravar snapshot de analytics: {e}")
+            self._stopped.wait(self.interval_seconds)
+
+    def close(self) -> None:
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval_seconds)
+            self._thread = None
+
+    def snapshot(self) -> dict:
+        latest = self.latest()
+        return {
+            'snapshot_dir': str(self.snapshot_dir),
+            'interval_seconds': self.interval_seconds,
+            'keep': self.keep,
+            'latest': latest.as_dict() if latest else None,
+            **self.stats,
+        }
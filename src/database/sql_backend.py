@@ -0,0 +1,545 @@
+from __future__ import annotations
+
+import logging
+import time
+
+from collections.abc import Iterator
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    Float,
+    Index,
+    Integer,
+    LargeBinary,
+    MetaData,
+    String,
+    Table,
+    and_,
+    cast,
+    create_engine,
+    delete,
+    func,
+    insert,
+    or_,
+    select,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError
+
+from src.database.counters import TOTAL_COUNTERS
+from src.database.db import EXPORT_BATCH_SIZE_DEFAULT, EXPORT_COLUMNS, DatabaseConnection
+from src.database.idempotency import IDEMPOTENCY_STALE_PENDING_SECONDS, IdempotencyStore
+from src.database.rollups import ROLLUP_DEPOSIT_RESULTADO, ROLLUP_METRICS
+
+
+logger = logging.getLogger(__name__)
+
+SQL_POOL_SIZE_DEFAULT = 4
+SQL_POOL_RECYCLE_SECONDS = 1800  # conexões renovadas antes do timeout de ociosidade do servidor
+
+metadata = MetaData()
+
+deposits_table = Table(
+    'deposits', metadata,
+    Column('id', Integer, primary_key=True, autoincrement=True),
+    Column('timestamp', Float, nullable=False),
+    Column('ml_confidence', Float),
+    Column('presence_detected', Boolean),
+    Column('weight_value', Integer),
+    Column('weight_ok', Boolean),
+    Column('plastico_reciclado_g', Float),
+    Column('created_at', DateTime, server_default=func.current_timestamp()),
+    Column('day', String(10)),
+    Index('idx_deposits_timestamp', 'timestamp', 'id'),
+    Index('idx_deposits_day', 'day'),
+)
+
+interactions_table = Table(
+    'interactions', metadata,
+    Column('id', Integer, primary_key=True, autoincrement=True),
+    Column('deposit_id', Integer),
+    Column('timestamp', Float, nullable=False),
+    Column('resultado', String(32), nullable=False),
+    Column('created_at', DateTime, server_default=func.current_timestamp()),
+    Column('day', String(10)),
+    Index('idx_interactions_timestamp', 'timestamp', 'id'),
+    Index('idx_interactions_day_resultado', 'day', 'resultado'),
+)
+
+daily_rollup_table = Table(
+    'daily_rollup', metadata,
+    Column('day', String(10), primary_key=True),
+    Column('resultado', String(32), primary_key=True),
+    Column('interactions', Integer, nullable=False, default=0),
+    Column('deposits', Integer, nullable=False, default=0),
+    Column('confidence_sum', Float, nullable=False, default=0),
+    Column('confidence_count', Integer, nullable=False, default=0),
+    Column('weight_sum', Float, nullable=False, default=0),
+    Column('weight_count', Integer, nullable=False, default=0),
+    Column('plastico_sum', Float, nullable=False, default=0),
+)
+
+totals_table = Table(
+    'totals', metadata,
+    Column('name', String(32), primary_key=True),
+    Column('value', Float, nullable=False, default=0),
+)
+
+idempotency_keys_table = Table(
+    'idempotency_keys', metadata,
+    Column('key', String(512), primary_key=True),
+    Column('fingerprint', String(64), nullable=False),
+    Column('state', String(16), nullable=False),  # 'pending' | 'done'
+    Column('status_code', Integer),
+    Column('body', LargeBinary),
+    Column('created_at', Float, nullable=False),
+)
+
+_TABLES = {'deposits': deposits_table, 'interactions': interactions_table}
+_UPSERT_DIALECTS = {'postgresql': postgresql.insert, 'sqlite': sqlite.insert}
+
+
+def _local_day(timestamp: float) -> str:
+    """Mesmo `day` do trigger do SQLite: data local do timestamp."""
+    return datetime.fromtimestamp(timestamp).date().isoformat()
+
+
+def _bucket_label(granularity: str, day: str) -> str:
+    if granularity == 'week':
+        parsed = date.fromisoformat(day)
+        return (parsed - timedelta(days=parsed.weekday())).isoformat()
+    if granularity == 'month':
+        return day[:7]
+    return day
+
+
+class SQLAlchemyRepository:
+    """`TotemRepository` sobre SQLAlchemy Core, para um banco compartilhado entre instâncias.
+
+    O pool de conexões é o do engine. Rollup diário e contadores de totais são atualizados
+    na mesma transação do INSERT (upsert nativo no PostgreSQL/SQLite), como os triggers do
+    backend SQLite. Retenção em arquivos frios e snapshots continuam exclusivos do SQLite.
+    """
+
+    ResultadoInteracao = DatabaseConnection.ResultadoInteracao
+
+    def __init__(self, database_url: str, pool_size: int = SQL_POOL_SIZE_DEFAULT):
+        self.database_url = database_url
+        self.engine = create_engine(
+            database_url,
+            pool_size=pool_size,
+            max_overflow=pool_size,
+            pool_pre_ping=True,
+            pool_recycle=SQL_POOL_RECYCLE_SECONDS,
+        )
+        self.writer = None  # group commit é específico do backend SQLite
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return None
+
+    def init_db(self):
+        try:
+            metadata.create_all(self.engine)
+            with self.engine.begin() as conn:
+                existing = set(conn.execute(select(totals_table.c.name)).scalars())
+                missing = [{'name': name, 'value': 0} for name in TOTAL_COUNTERS if name not in existing]
+                if missing:
+                    conn.execute(insert(totals_table), missing)
+            logger.info(f"✅ Tabelas criadas/validadas com sucesso ({self.engine.url.render_as_string(hide_password=True)}).")
+        except Exception as e:
+            logger.error(f"❌ Erro ao criar tabelas: {e}")
+
+    # ------------------------------------------------------------------
+    # Escrita (linha + rollup + contadores na mesma transação)
+    # ------------------------------------------------------------------
+    def _add_to_rollup(self, conn, day: str, resultado: str, increments: dict) -> None:
+        upsert = _UPSERT_DIALECTS.get(conn.dialect.name)
+        key = {'day': day, 'resultado': resultado}
+        if upsert is not None:
+            stmt = upsert(daily_rollup_table).values(**key, **increments)
+            conn.execute(stmt.on_conflict_do_update(
+                index_elements=['day', 'resultado'],
+                set_={metric: daily_rollup_table.c[metric] + stmt.excluded[metric] for metric in increments}
+            ))
+            return
+        updated = conn.execute(
+            update(daily_rollup_table)
+            .where(and_(daily_rollup_table.c.day == day, daily_rollup_table.c.resultado == resultado))
+            .values({metric: daily_rollup_table.c[metric] + value for metric, value in increments.items()})
+        ).rowcount
+        if not updated:
+            conn.execute(insert(daily_rollup_table).values(**key, **increments))
+
+    @staticmethod
+    def _add_to_totals(conn, increments: dict) -> None:
+        for name, value in increments.items():
+            conn.execute(update(totals_table).where(totals_table.c.name == name)
+                         .values(value=totals_table.c.value + value))
+
+    def _insert_deposit(self, conn, timestamp, ml_confidence, presence_detected, weight_ok, weight_value,
+                        plastico_reciclado_g) -> int:
+        day = _local_day(timestamp)
+        deposit_id = conn.execute(insert(deposits_table).values(
+            timestamp=timestamp, ml_confidence=ml_confidence, presence_detected=presence_detected,
+            weight_value=weight_value, weight_ok=weight_ok, plastico_reciclado_g=plastico_reciclado_g, day=day
+        )).inserted_primary_key[0]
+        self._add_to_rollup(conn, day, ROLLUP_DEPOSIT_RESULTADO, {
+            'deposits': 1,
+            'confidence_sum': ml_confidence or 0,
+            'confidence_count': int(ml_confidence is not None),
+            'weight_sum': weight_value or 0,
+            'weight_count': int(weight_value is not None),
+            'plastico_sum': plastico_reciclado_g or 0,
+        })
+        self._add_to_totals(conn, {'deposits': 1, 'weight_sum': weight_value or 0})
+        return deposit_id
+
+    def _insert_interaction(self, conn, timestamp, resultado_value: str, deposit_id: int | None) -> int:
+        day = _local_day(timestamp)
+        interaction_id = conn.execute(insert(interactions_table).values(
+            deposit_id=deposit_id, timestamp=timestamp, resultado=resultado_value, day=day
+        )).inserted_primary_key[0]
+        self._add_to_rollup(conn, day, resultado_value, {'interactions': 1})
+        self._add_to_totals(conn, {'interactions': 1})
+        return interaction_id
+
+    def save_deposit_data(self, ml_confidence, presence_detected, weight_ok, weight_value, plastico_reciclado_g) -> int | None:
+        try:
+            with self.engine.begin() as conn:
+                deposit_id = self._insert_deposit(conn, time.time(), ml_confidence, presence_detected, weight_ok,
+                                                  weight_value, plastico_reciclado_g)
+            logger.info(f"✅ Dados do depósito inseridos no banco (#{deposit_id}).")
+            return deposit_id
+        except Exception as e:
+            logger.error(f"❌ Erro ao inserir dados do depósito: {e}")
+            return None
+
+    def save_interaction(self, resultado: DatabaseConnection.ResultadoInteracao, deposit_id: int | None = None) -> None:
+        try:
+            with self.engine.begin() as conn:
+                self._insert_interaction(conn, time.time(), resultado.value, deposit_id)
+            logger.info(f"✅ Interação '{resultado.value}' registrada no banco.")
+        except Exception as e:
+            logger.error(f"❌ Erro ao registrar interação: {e}")
+
+    def record_deposit_outcome(self, ml_confidence, presence_detected, weight_ok, weight_value, plastico_reciclado_g,
+                               resultado: DatabaseConnection.ResultadoInteracao = DatabaseConnection.ResultadoInteracao.SUCESSO) -> int | None:
+        """Depósito + interação numa transação; retorna o id do depósito."""
+        try:
+            timestamp = time.time()
+            with self.engine.begin() as conn:
+                deposit_id = self._insert_deposit(conn, timestamp, ml_confidence, presence_detected, weight_ok,
+                                                  weight_value, plastico_reciclado_g)
+                self._insert_interaction(conn, timestamp, resultado.value, deposit_id)
+            logger.info(f"✅ Depósito #{deposit_id} e interação '{resultado.value}' registrados no banco.")
+            return deposit_id
+        except Exception as e:
+            logger.error(f"❌ Erro ao registrar depósito: {e}")
+            return None
+
+    # ------------------------------------------------------------------
+    # Agregados
+    # ------------------------------------------------------------------
+    def get_totals(self) -> dict:
+        try:
+            with self.engine.connect() as conn:
+                values = dict(conn.execute(select(totals_table.c.name, totals_table.c.value)).all())
+            return {
+                'interactions': int(values.get('interactions', 0)),
+                'deposits': int(values.get('deposits', 0)),
+                'weight_sum': float(values.get('weight_sum', 0.0)),
+            }
+        except Exception as e:
+            logger.error(f"❌ Erro ao ler contadores de totais: {e}", exc_info=True)
+            return {'interactions': 0, 'deposits': 0, 'weight_sum': 0.0}
+
+    def get_total_interacoes(self) -> int:
+        return self.get_totals()['interactions']
+
+    def count_deposits(self) -> int:
+        return self.get_totals()['deposits']
+
+    def sum_deposit_weight_grams(self) -> float:
+        return self.get_totals()['weight_sum']
+
+    @staticmethod
+    def _counted_totals(conn) -> dict:
+        interactions = conn.execute(select(func.count()).select_from(interactions_table)).scalar_one()
+        deposits, weight_sum = conn.execute(
+            select(func.count(), func.coalesce(func.sum(deposits_table.c.weight_value), 0))
+        ).one()
+        return {'interactions': interactions, 'deposits': deposits, 'weight_sum': float(weight_sum)}
+
+    def reconcile_totals(self) -> dict:
+        """Reconta os totais e corrige os contadores (linhas de `totals` travadas durante a correção)."""
+        with self.engine.begin() as conn:
+            stored = dict(conn.execute(select(totals_table.c.name, totals_table.c.value).with_for_update()).all())
+            counted = self._counted_totals(conn)
+            drift = {name: {'stored': stored.get(name, 0), 'counted': counted[name]}
+                     for name in TOTAL_COUNTERS if abs(float(stored.get(name, 0)) - float(counted[name])) > 1e-6}
+            for name in drift:
+                conn.execute(update(totals_table).where(totals_table.c.name == name).values(value=counted[name]))
+        if drift:
+            logger.warning(f"⚠️ Contadores do dashboard divergentes, corrigidos: {drift}")
+        return drift
+
+    def get_daily_deposit_counts(self, days: int = 7) -> dict[str, int]:
+        try:
+            first_day = (date.today() - timedelta(days=days - 1)).isoformat()
+            with self.engine.connect() as conn:
+                rows = conn.execute(
+                    select(deposits_table.c.day, func.count())
+                    .where(deposits_table.c.day >= first_day)
+                    .group_by(deposits_table.c.day)
+                ).all()
+            return {day: count for day, count in rows}
+        except Exception as e:
+            logger.error(f"❌ Erro ao agrupar depósitos por dia: {e}", exc_info=True)
+            return {}
+
+    def get_latest_deposits(self, limit: int = 10) -> list[dict]:
+        try:
+            return self._select_deposits(limit)
+        except Exception as e:
+            logger.error(f"❌ Erro ao buscar últimos depósitos: {e}", exc_info=True)
+            return []
+
+    def get_daily_rollup(self, first_day: str | None = None, last_day: str | None = None) -> list[dict]:
+        try:
+            query = select(daily_rollup_table.c.day, daily_rollup_table.c.resultado,
+                           *(daily_rollup_table.c[m] for m in ROLLUP_METRICS))
+            if first_day is not None:
+                query = query.where(daily_rollup_table.c.day >= first_day)
+            if last_day is not None:
+                query = query.where(daily_rollup_table.c.day <= last_day)
+            with self.engine.connect() as conn:
+                rows = conn.execute(query.order_by(daily_rollup_table.c.day, daily_rollup_table.c.resultado)).all()
+            return [dict(zip(('day', 'resultado', *ROLLUP_METRICS), row)) for row in rows]
+        except Exception as e:
+            logger.error(f"❌ Erro ao ler rollup diário: {e}", exc_info=True)
+            return []
+
+    def get_rollup_totals(self, first_day: str, last_day: str) -> dict:
+        try:
+            with self.engine.connect() as conn:
+                interactions, deposits = conn.execute(
+                    select(func.coalesce(func.sum(daily_rollup_table.c.interactions), 0),
+                           func.coalesce(func.sum(daily_rollup_table.c.deposits), 0))
+                    .where(daily_rollup_table.c.day.between(first_day, last_day))
+                ).one()
+            return {'interactions': int(interactions), 'deposits': int(deposits)}
+        except Exception as e:
+            logger.error(f"❌ Erro ao somar rollup de {first_day} a {last_day}: {e}", exc_info=True)
+            return {'interactions': 0, 'deposits': 0}
+
+    def get_analytics_buckets(self, granularity: str, start_ts: float, end_ts: float) -> list[dict]:
+        """Mesmo contrato de `DatabaseConnection.get_analytics_buckets`.
+
+        day/week/month reagrupam o rollup diário (O(dias) linhas); hour agrupa no banco por hora
+        UTC do timestamp e rotula em horário local (fusos com offset de hora inteira).
+        """
+        try:
+            if granularity != 'hour':
+                first_day = datetime.fromtimestamp(start_ts).date().isoformat()
+                last_day = datetime.fromtimestamp(end_ts - 1e-6).date().isoformat()
+                rows = self.get_daily_rollup(first_day, last_day)
+                label_of = lambda row: _bucket_label(granularity, row['day'])  # noqa: E731
+            else:
+                rows = self._hourly_rows(start_ts, end_ts)
+                label_of = lambda row: datetime.fromtimestamp(row['hour'] * 3600).strftime('%Y-%m-%dT%H:00')  # noqa: E731
+            buckets: dict[tuple[str, str], dict] = {}
+            for row in rows:
+                label = label_of(row)
+                bucket = buckets.setdefault((label, row['resultado']), {
+                    'bucket': label, 'resultado': row['resultado'], **{metric: 0 for metric in ROLLUP_METRICS}
+                })
+                for metric in ROLLUP_METRICS:
+                    bucket[metric] += row.get(metric, 0)
+            return sorted(buckets.values(), key=lambda row: (row['bucket'], row['resultado']))
+        except Exception as e:
+            logger.error(f"❌ Erro ao agregar analytics por {granularity}: {e}", exc_info=True)
+            return []
+
+    def _hourly_rows(self, start_ts: float, end_ts: float) -> list[dict]:
+        with self.engine.connect() as conn:
+            def hour_of(column):
+                # CAST trunca no SQLite; no PostgreSQL arredonda, por isso floor
+                return cast(column / 3600, Integer) if conn.dialect.name == 'sqlite' else func.floor(column / 3600)
+
+            interactions_hour = hour_of(interactions_table.c.timestamp).label('hour')
+            deposits_hour = hour_of(deposits_table.c.timestamp).label('hour')
+            rows = [
+                {'hour': int(hour), 'resultado': resultado, 'interactions': count}
+                for hour, resultado, count in conn.execute(
+                    select(interactions_hour, interactions_table.c.resultado, func.count())
+                    .where(interactions_table.c.timestamp >= start_ts, interactions_table.c.timestamp < end_ts)
+                    .group_by(interactions_hour, interactions_table.c.resultado)
+                )
+            ]
+            for hour, deposits, conf_sum, conf_count, weight_sum, weight_count, plastico_sum in conn.execute(
+                    select(deposits_hour, func.count(),
+                           func.coalesce(func.sum(deposits_table.c.ml_confidence), 0),
+                           func.count(deposits_table.c.ml_confidence),
+                           func.coalesce(func.sum(deposits_table.c.weight_value), 0),
+                           func.count(deposits_table.c.weight_value),
+                           func.coalesce(func.sum(deposits_table.c.plastico_reciclado_g), 0))
+                    .where(deposits_table.c.timestamp >= start_ts, deposits_table.c.timestamp < end_ts)
+                    .group_by(deposits_hour)):
+                rows.append({
+                    'hour': int(hour), 'resultado': ROLLUP_DEPOSIT_RESULTADO, 'deposits': deposits,
+                    'confidence_sum': float(conf_sum), 'confidence_count': conf_count,
+                    'weight_sum': float(weight_sum), 'weight_count': weight_count, 'plastico_sum': float(plastico_sum),
+                })
+        return rows
+
+    # ------------------------------------------------------------------
+    # Paginação por chave e listagens
+    # ------------------------------------------------------------------
+    def iter_export_rows(self, table: str, after: tuple[float, int] | None = None,
+                         until: tuple[float, int] | None = None,
+                         batch_size: int = EXPORT_BATCH_SIZE_DEFAULT) -> Iterator[tuple]:
+        """Linhas de `table` em ordem de (timestamp, id), uma consulta curta por lote."""
+        source = _TABLES[table]
+        columns = EXPORT_COLUMNS[table]
+        key = tuple_(source.c.timestamp, source.c.id)
+        last = after or (float('-inf'), 0)
+        upper = until or (float('inf'), 0)
+        ts_index, id_index = columns.index('timestamp'), columns.index('id')
+        while True:
+            with self.engine.connect() as conn:
+                rows = [tuple(row) for row in conn.execute(
+                    select(*(source.c[c] for c in columns))
+                    .where(key > tuple_(*last), key <= tuple_(*upper))
+                    .order_by(source.c.timestamp, source.c.id)
+                    .limit(batch_size)
+                )]
+            yield from rows
+            if len(rows) < batch_size:
+                return
+            last = (rows[-1][ts_index], rows[-1][id_index])
+
+    def find_export_page_end(self, table: str, after: tuple[float, int] | None,
+                             limit: int) -> tuple[tuple[float, int] | None, bool]:
+        source = _TABLES[table]
+        last = after or (float('-inf'), 0)
+        with self.engine.connect() as conn:
+            rows = conn.execute(
+                select(source.c.timestamp, source.c.id)
+                .where(tuple_(source.c.timestamp, source.c.id) > tuple_(*last))
+                .order_by(source.c.timestamp, source.c.id)
+                .limit(2).offset(limit - 1)
+            ).all()
+        if not rows:
+            return None, False
+        return (rows[0][0], rows[0][1]), len(rows) > 1
+
+    def _select_deposits(self, limit: int | None = None) -> list[dict]:
+        query = select(*(deposits_table.c[c] for c in EXPORT_COLUMNS['deposits'])).order_by(deposits_table.c.timestamp.desc())
+        if limit is not None:
+            query = query.limit(limit)
+        with self.engine.connect() as conn:
+            return [dict(row._mapping) for row in conn.execute(query)]
+
+    def get_all_deposits(self) -> list[dict]:
+        try:
+            deposits = self._select_deposits()
+            logger.info(f"ℹ️ Recuperados {len(deposits)} depósitos do banco")
+            return deposits
+        except Exception as e:
+            logger.error(f"❌ Erro ao buscar depósitos: {e}", exc_info=True)
+            return []
+
+    def get_all_interactions(self) -> list[dict]:
+        try:
+            query = select(*(interactions_table.c[c] for c in EXPORT_COLUMNS['interactions'])) \
+                .order_by(interactions_table.c.timestamp.desc())
+            with self.engine.connect() as conn:
+                interactions = [dict(row._mapping) for row in conn.execute(query)]
+            logger.info(f"ℹ️ Recuperadas {len(interactions)} interações do banco")
+            return interactions
+        except Exception as e:
+            logger.error(f"❌ Erro ao buscar interações: {e}", exc_info=True)
+            return []
+
+    def pool_snapshot(self) -> dict:
+        pool = self.engine.pool
+        return {
+            'url': self.engine.url.render_as_string(hide_password=True),
+            'size': pool.size(),
+            'checked_out': pool.checkedout(),
+            'overflow': pool.overflow(),
+        }
+
+    def close(self) -> None:
+        self.engine.dispose()
+
+
+class SQLAlchemyIdempotencyStore(IdempotencyStore):
+    """`IdempotencyStore` com a tabela `idempotency_keys` no banco compartilhado.
+
+    Mesmo protocolo da versão SQLite (reserva 'pending' → 'done'); como a tabela fica no
+    banco de todas as instâncias, um retry que cai em outra instância recebe a resposta
+    original em vez de gravar o depósito de novo.
+    """
+
+    def __init__(self, engine: Engine, **options):
+        super().__init__(engine.url.render_as_string(hide_password=True), **options)
+        self.engine = engine
+
+    def _ensure_table(self) -> None:
+        if not self._table_ready:
+            idempotency_keys_table.create(self.engine, checkfirst=True)
+            self._table_ready = True
+
+    def _read_row(self, key: str) -> tuple | None:
+        self._ensure_table()
+        table = idempotency_keys_table
+        with self.engine.connect() as conn:
+            row = conn.execute(
+                select(table.c.fingerprint, table.c.state, table.c.status_code, table.c.body, table.c.created_at)
+                .where(table.c.key == key)
+            ).first()
+        return tuple(row) if row is not None else None
+
+    def _try_insert_pending(self, key: str, fingerprint: str, now: float) -> bool:
+        self._ensure_table()
+        table = idempotency_keys_table
+        try:
+            with self.engine.begin() as conn:
+                conn.execute(insert(table).values(key=key, fingerprint=fingerprint, state='pending', created_at=now))
+            return True
+        except IntegrityError:
+            pass
+        # Chave expirada (ou reserva órfã de instância morta): assume a posse
+        with self.engine.begin() as conn:
+            return conn.execute(
+                update(table)
+                .where(and_(table.c.key == key, or_(
+                    table.c.created_at < now - self.ttl_seconds,
+                    and_(table.c.state == 'pending', table.c.created_at < now - IDEMPOTENCY_STALE_PENDING_SECONDS),
+                )))
+                .values(fingerprint=fingerprint, state='pending', status_code=None, body=None, created_at=now)
+            ).rowcount == 1
+
+    def _store_done(self, key: str, status_code: int, body: bytes, stored_at: float) -> None:
+        self._ensure_table()
+        table = idempotency_keys_table
+        with self.engine.begin() as conn:
+            conn.execute(update(table).where(table.c.key == key)
+                         .values(state='done', status_code=status_code, body=body, created_at=stored_at))
+            conn.execute(delete(table).where(table.c.created_at < stored_at - self.ttl_seconds))
+
+    def _delete_pending(self, key: str) -> None:
+        self._ensure_table()
+        table = idempotency_keys_table
+        with self.engine.begin() as conn:
+            conn.execute(delete(table).where(and_(table.c.key == key, table.c.state == 'pending')))
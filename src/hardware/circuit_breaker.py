@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+
+from collections.abc import Callable
+
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# Configuração padrão dos circuit breakers
+# =============================================================================
+BREAKER_FAILURE_THRESHOLD_DEFAULT = 3     # falhas/timeouts seguidos até abrir
+BREAKER_RESET_SECONDS_DEFAULT = 30.0      # tempo aberto antes da sondagem (half-open)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitBreaker:
+    """Circuit breaker de um endpoint: closed → open após N falhas seguidas → half_open → closed.
+
+    Aberto, `allow()` nega na hora (o chamador usa o fallback sem esperar timeouts). Depois de
+    `reset_seconds`, uma única chamada passa como sondagem; sucesso fecha o circuito, falha
+    reabre por mais `reset_seconds`. Se a sondagem não reportar resultado nesse prazo, outra é
+    liberada.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = BREAKER_FAILURE_THRESHOLD_DEFAULT,
+                 reset_seconds: float = BREAKER_RESET_SECONDS_DEFAULT,
+                 clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.failure_threshold = max(failure_threshold, 1)
+        self.reset_seconds = max(reset_seconds, 0.0)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe_started_at: float | None = None
+        self.stats = {
+            'successes': 0,
+            'failures': 0,
+            'short_circuited': 0,  # chamadas respondidas com fallback sem tentar
+            'trips': 0,
+            'last_error': None,
+        }
+
+    def allow(self) -> bool:
+        """True se a chamada deve ser feita (circuito fechado ou esta é a sondagem)."""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            now = self._clock()
+            if self.state == OPEN and now - self._opened_at >= self.reset_seconds:
+                self.state = HALF_OPEN
+                self._probe_started_at = now
+                logger.info(f"🔍 ESP32 {self.name}: circuito semiaberto, enviando sondagem")
+                return True
+            if (self.state == HALF_OPEN and self._probe_started_at is not None
+                    and now - self._probe_started_at >= self.reset_seconds):
+                self._probe_started_at = now  # sondagem anterior não voltou
+                return True
+            self.stats['short_circuited'] += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.stats['successes'] += 1
+            self.consecutive_failures = 0
+            if self.state != CLOSED:
+                logger.info(f"✅ ESP32 {self.name}: circuito fechado")
+            self.state = CLOSED
+            self._probe_started_at = None
+
+    def record_failure(self, error: str | None = None) -> None:
+        with self._lock:
+            self.stats['failures'] += 1
+            self.stats['last_error'] = error
+            self.consecutive_failures += 1
+            if self.state == HALF_OPEN or (self.state == CLOSED
+                                           and self.consecutive_failures >= self.failure_threshold):
+                self.state = OPEN
+                self._opened_at = self._clock()
+                self._probe_started_at = None
+                self.stats['trips'] += 1
+                logger.warning(f"⚠️ ESP32 {self.name}: circuito aberto após {self.consecutive_failures} "
+                               f"falha(s); fallback imediato por {self.reset_seconds:.0f}s")
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            retry_in = None
+            if self.state == OPEN:
+                retry_in = round(max(self.reset_seconds - (self._clock() - self._opened_at), 0.0), 1)
+            return {
+                'state': self.state,
+                'consecutive_failures': self.consecutive_failures,
+                'failure_threshold': self.failure_threshold,
+                'reset_seconds': self.reset_seconds,
+                'retry_in_seconds': retry_in,
+                **self.stats,
+            }
+
+
+class CircuitBreakerRegistry:
+    """Um `CircuitBreaker` por endpoint, criado no primeiro uso com a mesma configuração."""
+
+    def __init__(self, failure_threshold: int = BREAKER_FAILURE_THRESHOLD_DEFAULT,
+                 reset_seconds: float = BREAKER_RESET_SECONDS_DEFAULT,
+                 clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._breakers: dict[str, CircuitBreaker] = {}
+
+    def get(self, name: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(name)
+            if breaker is None:
+                breaker = CircuitBreaker(name, self.failure_threshold, self.reset_seconds, self._clock)
+                self._breakers[name] = breaker
+            return breaker
+
+    def reset(self) -> None:
+        with self._lock:
+            self._breakers.clear()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {name: breaker.snapshot() for name, breaker in sorted(breakers.items())}
@@ -1,12 +1,44 @@
 from __future__ import annotations
 
+import asyncio
 import logging
 import os
+import threading
+
+import httpx
 import requests
 
+from collections.abc import Callable
 from datetime import datetime
 from dotenv import load_dotenv
 
+from src.hardware.circuit_breaker import (
+    BREAKER_FAILURE_THRESHOLD_DEFAULT,
+    BREAKER_RESET_SECONDS_DEFAULT,
+    CircuitBreaker,
+    CircuitBreakerRegistry,
+)
+from src.hardware.http_session import (
+    HTTP_BACKOFF_SECONDS_DEFAULT,
+    HTTP_CONNECT_TIMEOUT_SECONDS_DEFAULT,
+    HTTP_POOL_SIZE_DEFAULT,
+    HTTP_READ_TIMEOUT_SECONDS_DEFAULT,
+    HTTP_RETRIES_DEFAULT,
+    PooledHttpSession,
+)
+from src.hardware.telemetry import (
+    TELEMETRY_BUFFER_SIZE_DEFAULT,
+    TELEMETRY_MAX_AGE_SECONDS_DEFAULT,
+    TELEMETRY_MAX_DEVICES_DEFAULT,
+    TelemetryStore,
+)
+from src.hardware.token_refresh import (
+    LOGIN_BACKOFF_MAX_SECONDS_DEFAULT,
+    LOGIN_BACKOFF_SECONDS_DEFAULT,
+    TOKEN_REFRESH_MARGIN_SECONDS_DEFAULT,
+    TokenRefresher,
+)
+
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +54,48 @@ JWT_SECRET = 'xxxxxxxxx'
 esp32_jwt_token = None
 esp32_token_expiry = None
 
+# Renovação do token: um login por vez, antecipado em background e com backoff após falhas
+ESP32_TOKEN_WAIT_POLL_SECONDS = 0.05  # espera do cliente assíncrono por um login em andamento
+token_refresher = TokenRefresher(
+    refresh_margin_seconds=float(os.getenv('ESP32_TOKEN_REFRESH_MARGIN_SECONDS',
+                                           str(TOKEN_REFRESH_MARGIN_SECONDS_DEFAULT))),
+    backoff_seconds=float(os.getenv('ESP32_LOGIN_BACKOFF_SECONDS', str(LOGIN_BACKOFF_SECONDS_DEFAULT))),
+    backoff_max_seconds=float(os.getenv('ESP32_LOGIN_BACKOFF_MAX_SECONDS', str(LOGIN_BACKOFF_MAX_SECONDS_DEFAULT))),
+)
+
+# Recursos anunciados pelo firmware no login (`capabilities`); firmware antigo não anuncia nada
+ESP32_COMBINED_CAPABILITY = 'sensors_mechanical'
+ESP32_COMBINED_ENDPOINT = '/api/sensors_mechanical'
+esp32_capabilities: frozenset[str] = frozenset()
+
+# Sessão HTTP compartilhada (keep-alive): login, sensores, validação mecânica e health check
+# reaproveitam as conexões TCP+TLS com a API em vez de um handshake por chamada
+ESP32_LOGIN_READ_TIMEOUT_SECONDS = 30.0
+http_session = PooledHttpSession(
+    pool_size=int(os.getenv('ESP32_HTTP_POOL_SIZE', str(HTTP_POOL_SIZE_DEFAULT))),
+    connect_timeout=float(os.getenv('ESP32_CONNECT_TIMEOUT_SECONDS', str(HTTP_CONNECT_TIMEOUT_SECONDS_DEFAULT))),
+    read_timeout=float(os.getenv('ESP32_READ_TIMEOUT_SECONDS', str(HTTP_READ_TIMEOUT_SECONDS_DEFAULT))),
+    retries=int(os.getenv('ESP32_HTTP_RETRIES', str(HTTP_RETRIES_DEFAULT))),
+    backoff_seconds=float(os.getenv('ESP32_HTTP_BACKOFF_SECONDS', str(HTTP_BACKOFF_SECONDS_DEFAULT))),
+)
+
+# Circuit breaker por endpoint (login incluído): com a API fora do ar, o fallback sai na hora
+# em vez de cada depósito esperar os timeouts de conexão/leitura
+ESP32_LOGIN_ENDPOINT = '/api/auth/login'
+esp32_breakers = CircuitBreakerRegistry(
+    failure_threshold=int(os.getenv('ESP32_BREAKER_FAILURE_THRESHOLD', str(BREAKER_FAILURE_THRESHOLD_DEFAULT))),
+    reset_seconds=float(os.getenv('ESP32_BREAKER_RESET_SECONDS', str(BREAKER_RESET_SECONDS_DEFAULT))),
+)
+
+# Telemetria empurrada pelo ESP32 (POST /api/esp32/telemetry): leituras frescas do dispositivo
+# deste totem (ESP32_DEVICE_ID) dispensam o GET /api/sensors na validação
+ESP32_TELEMETRY_DEVICE_ID_MAX_LENGTH = 64
+telemetry_store = TelemetryStore(
+    buffer_size=int(os.getenv('ESP32_TELEMETRY_BUFFER_SIZE', str(TELEMETRY_BUFFER_SIZE_DEFAULT))),
+    max_age_seconds=float(os.getenv('ESP32_TELEMETRY_MAX_AGE_SECONDS', str(TELEMETRY_MAX_AGE_SECONDS_DEFAULT))),
+    max_devices=int(os.getenv('ESP32_TELEMETRY_MAX_DEVICES', str(TELEMETRY_MAX_DEVICES_DEFAULT))),
+)
+
 
 def _get_esp32_api_url() -> str:
     """Retorna URL da API ESP32 a partir do ambiente."""
@@ -33,14 +107,53 @@ def _get_esp32_device_key() -> str:
     return os.getenv('ESP32_DEVICE_KEY', ESP32_DEVICE_KEY)
 
 
-def get_esp32_jwt_token() -> str | None:
-    """Obtém um token JWT válido da API ESP32"""
-    global esp32_jwt_token, esp32_token_expiry
+def get_esp32_telemetry_token() -> str:
+    """Token Bearer aceito na ingestão de telemetria (vazio = ingestão desabilitada)."""
+    return os.getenv('ESP32_TELEMETRY_TOKEN', '')
 
-    # Se tem token válido, retorna
-    if esp32_jwt_token and esp32_token_expiry and datetime.now().timestamp() < esp32_token_expiry:
-        logger.info("✅ ESP32 JWT: Usando token em cache (válido)")
+
+def get_esp32_device_id() -> str | None:
+    """device_id da telemetria deste totem (vazio = só se houver um único dispositivo fresco)."""
+    return os.getenv('ESP32_DEVICE_ID', '').strip() or None
+
+
+def _record_status(breaker: CircuitBreaker, status_code: int) -> None:
+    """5xx conta como falha do endpoint; demais respostas mostram que ele está no ar."""
+    if status_code >= 500:
+        breaker.record_failure(f'HTTP {status_code}')
+    else:
+        breaker.record_success()
+
+
+def _login_allowed() -> CircuitBreaker | None:
+    """Breaker do login se a chamada pode ser feita; None com o circuito aberto."""
+    breaker = esp32_breakers.get(ESP32_LOGIN_ENDPOINT)
+    if not breaker.allow():
+        logger.warning("⚠️ ESP32: circuito aberto para o login, sem token até a próxima sondagem")
+        return None
+    return breaker
+
+
+def _cached_token(now: float | None = None) -> str | None:
+    """Token em cache se ainda válido."""
+    now = datetime.now().timestamp() if now is None else now
+    if esp32_jwt_token and esp32_token_expiry and now < esp32_token_expiry:
         return esp32_jwt_token
+    return None
+
+
+def _record_login_result(token: str | None, background: bool = False, error: str | None = None) -> None:
+    if token:
+        token_refresher.record_success(esp32_token_expiry, background=background)
+    else:
+        token_refresher.record_failure(error or 'login recusado')
+
+
+def _login(background: bool = False) -> str | None:
+    """POST /api/auth/login e cache do token. Chamado com `token_refresher.lock` adquirido."""
+    breaker = _login_allowed()
+    if breaker is None:
+        return None
 
     try:
         logger.info("🔐 ESP32: Realizando login para obter JWT token...")
@@ -50,37 +163,109 @@ def get_esp32_jwt_token() -> str | None:
         logger.info(f"   URL: {api_url}/api/auth/login")
         logger.info(f"   Device ID: {device_key}")
 
-        login_response = requests.post(
+        login_response = http_session.post(
             f"{api_url}/api/auth/login",
             json={
                 "device_id": device_key,
                 "device_key": device_key
             },
-            timeout=30
+            timeout=http_session.timeout(ESP32_LOGIN_READ_TIMEOUT_SECONDS)
         )
         
         logger.info(f"📡 ESP32 LOGIN RESPONSE: {login_response.status_code}")
         logger.info(f"   Resposta: {login_response.text[:300]}")
         
-        if login_response.status_code == 200:
-            data = login_response.json()
-            esp32_jwt_token = data['token']
-            esp32_token_expiry = datetime.now().timestamp() + data.get('expires_in', 86400) - 60
-            logger.info(f"✅ ESP32 JWT: Token obtido com sucesso!")
-            logger.info(f"   Token: {esp32_jwt_token[:30]}...")
-            logger.info(f"   Expira em: {data.get('expires_in', 86400)} segundos")
-            return esp32_jwt_token
-        else:
-            logger.error(f"❌ ESP32: Erro ao fazer login: {login_response.status_code}")
-            logger.error(f"   Resposta: {login_response.text}")
-            return None
+        _record_status(breaker, login_response.status_code)
+        token = _cache_login_response(login_response)
+        _record_login_result(token, background=background, error=f'HTTP {login_response.status_code}')
+        return token
     except Exception as e:
+        breaker.record_failure(str(e))
+        token_refresher.record_failure(str(e))
         logger.error(f"❌ ESP32: Erro ao obter token JWT: {e}")
         return None
 
 
+def _refresh_in_background() -> None:
+    """Renova o token numa thread enquanto o atual continua sendo servido (se nenhum login estiver em curso)."""
+    if not token_refresher.lock.acquire(blocking=False):
+        return
+
+    def run():
+        try:
+            logger.info("🔄 ESP32 JWT: Renovando token em background (perto de expirar)...")
+            _login(background=True)
+        finally:
+            token_refresher.lock.release()
+
+    try:
+        threading.Thread(target=run, daemon=True).start()
+    except Exception:
+        token_refresher.lock.release()
+        raise
+
+
+def _serve_cached(now: float) -> str | None:
+    token = _cached_token(now)
+    if token:
+        logger.info("✅ ESP32 JWT: Usando token em cache (válido)")
+        if token_refresher.due(esp32_token_expiry, now):
+            _refresh_in_background()
+    return token
+
+
+def get_esp32_jwt_token() -> str | None:
+    """Obtém um token JWT válido da API ESP32 (login único entre threads, renovação antecipada)."""
+    token = _serve_cached(datetime.now().timestamp())
+    if token:
+        return token
+
+    # Token expirado: uma thread faz o login; as demais esperam e usam o token novo
+    with token_refresher.lock:
+        token = _cached_token()
+        if token:
+            return token
+        if token_refresher.in_backoff():
+            logger.warning(f"⚠️ ESP32 JWT: login em backoff por mais "
+                           f"{token_refresher.retry_in_seconds():.0f}s, sem token")
+            return None
+        return _login()
+
+
+def token_snapshot() -> dict:
+    """Estado do token e da renovação (métricas)."""
+    expires_in = None
+    if esp32_token_expiry:
+        expires_in = round(esp32_token_expiry - datetime.now().timestamp(), 1)
+    return {'has_token': bool(esp32_jwt_token), 'expires_in_seconds': expires_in, **token_refresher.snapshot()}
+
+
+def _cache_login_response(login_response) -> str | None:
+    """Guarda o token do login (resposta `requests` ou `httpx`) no cache do módulo."""
+    global esp32_jwt_token, esp32_token_expiry, esp32_capabilities
+
+    if login_response.status_code == 200:
+        data = login_response.json()
+        esp32_jwt_token = data['token']
+        esp32_token_expiry = datetime.now().timestamp() + data.get('expires_in', 86400) - 60
+        esp32_capabilities = frozenset(data.get('capabilities') or ())
+        logger.info(f"✅ ESP32 JWT: Token obtido com sucesso!")
+        logger.info(f"   Token: {esp32_jwt_token[:30]}...")
+        logger.info(f"   Expira em: {data.get('expires_in', 86400)} segundos")
+        return esp32_jwt_token
+    else:
+        logger.error(f"❌ ESP32: Erro ao fazer login: {login_response.status_code}")
+        logger.error(f"   Resposta: {login_response.text}")
+        return None
+
+
 def call_esp32_api(endpoint: str, method: str = 'GET', data: dict | None = None) -> dict | None:
     """Realiza chamada à API ESP32 com autenticação JWT"""
+    breaker = esp32_breakers.get(endpoint)
+    if not breaker.allow():
+        logger.warning(f"⚠️ ESP32: Circuito aberto para {endpoint}. Usando fallback.")
+        return _get_fallback_response(endpoint)
+
     token = get_esp32_jwt_token()
     
     if not token:
@@ -100,36 +285,46 @@ def call_esp32_api(endpoint: str, method: str = 'GET', data: dict | None = None)
     
     try:
         if method == 'GET':
-            response = requests.get(url, headers=headers, timeout=10)  # Aumentado para 10s
+            response = http_session.get(url, headers=headers, timeout=http_session.timeout())
         elif method == 'POST':
-            response = requests.post(url, json=data, headers=headers, timeout=10)  # Aumentado para 10s
+            response = http_session.post(url, json=data, headers=headers, timeout=http_session.timeout())
         else:
             logger.error(f"❌ Método HTTP não suportado: {method}")
             return None
         
-        logger.info(f"📡 ESP32 RESPONSE: {response.status_code}")
-        logger.info(f"   Resposta: {response.text[:500]}")
-        
-        if response.status_code in [200, 201]:
-            logger.info(f"✅ ESP32: Sucesso - {endpoint}")
-            return response.json()
-        else:
-            logger.error(f"❌ ESP32: API retornou {response.status_code}: {response.text}")
-            return _get_fallback_response(endpoint)
+        _record_status(breaker, response.status_code)
+        return _parse_esp32_response(endpoint, response)
     except requests.exceptions.ConnectTimeout:
+        breaker.record_failure('timeout de conexão')
         logger.warning(f"⚠️ ESP32: Timeout na conexão (ESP32 offline ou lento). Usando fallback.")
         return _get_fallback_response(endpoint)
     except requests.exceptions.ReadTimeout:
+        breaker.record_failure('timeout de leitura')
         logger.warning(f"⚠️ ESP32: Timeout na leitura (ESP32 respondendo lentamente). Usando fallback.")
         return _get_fallback_response(endpoint)
     except requests.exceptions.ConnectionError:
+        breaker.record_failure('conexão recusada')
         logger.warning(f"⚠️ ESP32: Não conseguiu conectar (offline). Usando fallback.")
         return _get_fallback_response(endpoint)
     except Exception as e:
+        breaker.record_failure(str(e))
         logger.error(f"❌ ESP32: Erro ao chamar API: {e}")
         return _get_fallback_response(endpoint)
 
 
+def _parse_esp32_response(endpoint: str, response) -> dict | None:
+    """Interpreta a resposta da API ESP32 (`requests` ou `httpx`): JSON em 2xx, senão fallback."""
+    logger.info(f"📡 ESP32 RESPONSE: {response.status_code}")
+    logger.info(f"   Resposta: {response.text[:500]}")
+
+    if response.status_code in [200, 201]:
+        logger.info(f"✅ ESP32: Sucesso - {endpoint}")
+        return response.json()
+    else:
+        logger.error(f"❌ ESP32: API retornou {response.status_code}: {response.text}")
+        return _get_fallback_response(endpoint)
+
+
 def _get_fallback_response(endpoint: str) -> dict:
     """Retorna resposta de fallback quando ESP32 está offline."""
     fallbacks = {
@@ -137,6 +332,10 @@ def _get_fallback_response(endpoint: str) -> dict:
         '/api/check_mechanical': {'status': 'OK', 'message': 'Validação mecânica OK (fallback)', 'peso': 2600},
         '/api/confirm_detection': {'status': 'confirmed', 'timestamp': '2026-03-05T17:30:00Z'},
     }
+    fallbacks[ESP32_COMBINED_ENDPOINT] = {
+        'sensors': fallbacks['/api/sensors'],
+        'mechanical': fallbacks['/api/check_mechanical'],
+    }
     return fallbacks.get(endpoint, {})
 
 
@@ -182,8 +381,67 @@ def _validate_sensors_response(data: dict | None) -> dict | None:
     return {'presenca': presenca, 'peso': peso, 'temperatura': temp}
 
 
+def _parse_telemetry_reading(data) -> dict:
+    """Valida uma leitura empurrada pelo dispositivo; ValueError em vez de valores de fallback."""
+    if not isinstance(data, dict):
+        raise ValueError('leitura deve ser um objeto JSON')
+    presenca = data.get('presenca')
+    if not isinstance(presenca, bool):
+        raise ValueError('presenca deve ser booleano')
+    peso = data.get('peso')
+    if isinstance(peso, bool) or not isinstance(peso, (int, float)) or not PESO_MIN_VALIDO <= peso <= PESO_MAX_VALIDO:
+        raise ValueError(f'peso deve ser numérico entre {PESO_MIN_VALIDO} e {PESO_MAX_VALIDO}')
+    temperatura = data.get('temperatura', 25.0)
+    if (isinstance(temperatura, bool) or not isinstance(temperatura, (int, float))
+            or not TEMP_MIN_VALIDO <= temperatura <= TEMP_MAX_VALIDO):
+        raise ValueError(f'temperatura deve ser numérica entre {TEMP_MIN_VALIDO} e {TEMP_MAX_VALIDO}')
+    return {'presenca': presenca, 'peso': int(peso), 'temperatura': float(temperatura)}
+
+
+def ingest_esp32_telemetry(payload: dict) -> int:
+    """Guarda leituras enviadas pelo ESP32 (ou relay) no buffer do dispositivo.
+
+    Aceita uma leitura (`{"device_id", "presenca", "peso", "temperatura"}`) ou um lote
+    (`{"device_id", "readings": [...]}`, no máximo o tamanho do buffer). Tudo ou nada: uma
+    leitura inválida rejeita o lote com ValueError.
+    """
+    if not isinstance(payload, dict):
+        raise ValueError('payload deve ser um objeto JSON')
+    device_id = str(payload.get('device_id') or '').strip()
+    if not device_id or len(device_id) > ESP32_TELEMETRY_DEVICE_ID_MAX_LENGTH:
+        raise ValueError(f'device_id obrigatório (até {ESP32_TELEMETRY_DEVICE_ID_MAX_LENGTH} caracteres)')
+
+    raw_readings = payload['readings'] if 'readings' in payload else [payload]
+    if not isinstance(raw_readings, list) or not raw_readings:
+        raise ValueError('readings deve ser uma lista não vazia')
+    if len(raw_readings) > telemetry_store.buffer_size:
+        raise ValueError(f'no máximo {telemetry_store.buffer_size} leituras por envio')
+
+    try:
+        readings = [_parse_telemetry_reading(reading) for reading in raw_readings]
+    except ValueError:
+        telemetry_store.record_rejected(len(raw_readings))
+        raise
+    return telemetry_store.ingest(device_id, readings)
+
+
+def _local_sensors() -> dict | None:
+    """Leitura agregada da janela fresca de telemetria deste totem, se houver."""
+    reading = telemetry_store.reading(get_esp32_device_id())
+    if reading is not None:
+        logger.info(f"✅ ESP32 Sensores (telemetria local): Presença={reading['presenca']}, "
+                    f"Peso={reading['peso']}g, Temp={reading['temperatura']}")
+    return reading
+
+
 def get_esp32_sensors() -> dict | None:
-    """Obtém leitura dos sensores do ESP32 (com validação de tipos e faixas)."""
+    """Obtém leitura dos sensores do ESP32 (com validação de tipos e faixas).
+
+    Usa a telemetria local quando há leitura fresca; senão consulta GET /api/sensors.
+    """
+    local = _local_sensors()
+    if local is not None:
+        return local
     logger.info("🔌 ESP32: Lendo sensores...")
     result = call_esp32_api('/api/sensors', 'GET')
     if result:
@@ -219,6 +477,58 @@ def check_esp32_mechanical(presenca: bool, peso: float) -> dict | None:
     return result
 
 
+def esp32_supports(capability: str) -> bool:
+    """True se o firmware anunciou `capability` no último login."""
+    return capability in esp32_capabilities
+
+
+def _split_combined_response(data: dict | None) -> tuple[dict, dict] | None:
+    """(sensores validados, validação mecânica) da resposta combinada; None se faltar uma parte."""
+    if not isinstance(data, dict):
+        return None
+    sensors = _validate_sensors_response(data.get('sensors'))
+    mechanical = data.get('mechanical')
+    if sensors is None or not isinstance(mechanical, dict):
+        return None
+    return sensors, mechanical
+
+
+def get_esp32_sensors_with_mechanical() -> tuple[dict, dict] | None:
+    """Sensores e validação mecânica numa só requisição, se o firmware anunciar o recurso.
+
+    None quando o firmware não suporta (ou a resposta veio incompleta) ou quando há telemetria
+    local fresca: o chamador segue pelo caminho sequencial `get_esp32_sensors()` →
+    `check_esp32_mechanical()`.
+    """
+    if not esp32_supports(ESP32_COMBINED_CAPABILITY) or telemetry_store.fresh(get_esp32_device_id()):
+        return None
+    logger.info("🔌 ESP32: Lendo sensores + validação mecânica (requisição combinada)...")
+    return _split_combined_response(call_esp32_api(ESP32_COMBINED_ENDPOINT, 'GET'))
+
+
+def start_esp32_call(func: Callable, *args) -> Callable[[float | None], object]:
+    """Roda `func(*args)` numa thread e devolve `wait(timeout)` com o resultado (None em erro).
+
+    Para chamadas independentes do resto da validação, como a confirmação de detecção.
+    """
+    result = {}
+
+    def run():
+        try:
+            result['value'] = func(*args)
+        except Exception as e:
+            logger.error(f"❌ ESP32: Erro em chamada concorrente: {e}")
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+
+    def wait(timeout: float | None = None):
+        thread.join(timeout)
+        return result.get('value')
+
+    return wait
+
+
 def calculate_environmental_impact() -> dict[str, float]:
     """Calcula e retorna impacto ambiental por tampinha"""
     return {
@@ -226,4 +536,160 @@ def calculate_environmental_impact() -> dict[str, float]:
         'co2_evitado_g': 2.3,
         'agua_economizada_ml': 15,
         'arvores_preservadas_cm2': 8
-    }
\ No newline at end of file
+    }
+
+
+# =============================================================================
+# Cliente assíncrono (modo ASGI - asgi.py)
+# =============================================================================
+# Mesmo contrato das funções síncronas acima (token em cache, fallback, validação),
+# mas sem bloquear o worker durante o round trip ao ESP32.
+ESP32_ASYNC_TIMEOUT_SECONDS = 10.0
+ESP32_ASYNC_LOGIN_TIMEOUT_SECONDS = 30.0
+
+_async_client: httpx.AsyncClient | None = None
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """Cliente httpx compartilhado (keep-alive) para as chamadas assíncronas."""
+    global _async_client
+    if _async_client is None or _async_client.is_closed:
+        _async_client = httpx.AsyncClient(timeout=ESP32_ASYNC_TIMEOUT_SECONDS)
+    return _async_client
+
+
+async def close_async_client() -> None:
+    """Fecha o cliente assíncrono (shutdown do servidor ASGI)."""
+    global _async_client
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
+
+
+async def get_esp32_jwt_token_async() -> str | None:
+    """Versão assíncrona de `get_esp32_jwt_token` (mesmo cache, mesmo single-flight e backoff)."""
+    token = _serve_cached(datetime.now().timestamp())
+    if token:
+        return token
+
+    # Espera sem bloquear o loop enquanto outro login (thread ou corrotina) está em andamento
+    while not token_refresher.lock.acquire(blocking=False):
+        await asyncio.sleep(ESP32_TOKEN_WAIT_POLL_SECONDS)
+    try:
+        token = _cached_token()
+        if token:
+            return token
+        if token_refresher.in_backoff():
+            logger.warning("⚠️ ESP32 JWT: login em backoff, sem token")
+            return None
+        breaker = _login_allowed()
+        if breaker is None:
+            return None
+        try:
+            logger.info("🔐 ESP32: Realizando login para obter JWT token (async)...")
+            device_key = _get_esp32_device_key()
+            login_response = await get_async_client().post(
+                f"{_get_esp32_api_url()}/api/auth/login",
+                json={
+                    "device_id": device_key,
+                    "device_key": device_key
+                },
+                timeout=ESP32_ASYNC_LOGIN_TIMEOUT_SECONDS
+            )
+            logger.info(f"📡 ESP32 LOGIN RESPONSE: {login_response.status_code}")
+            _record_status(breaker, login_response.status_code)
+            token = _cache_login_response(login_response)
+            _record_login_result(token, error=f'HTTP {login_response.status_code}')
+            return token
+        except Exception as e:
+            breaker.record_failure(str(e))
+            token_refresher.record_failure(str(e))
+            logger.error(f"❌ ESP32: Erro ao obter token JWT: {e}")
+            return None
+    finally:
+        token_refresher.lock.release()
+
+
+async def call_esp32_api_async(endpoint: str, method: str = 'GET', data: dict | None = None) -> dict | None:
+    """Versão assíncrona de `call_esp32_api` (httpx); compartilha os circuit breakers."""
+    breaker = esp32_breakers.get(endpoint)
+    if not breaker.allow():
+        logger.warning(f"⚠️ ESP32: Circuito aberto para {endpoint}. Usando fallback.")
+        return _get_fallback_response(endpoint)
+
+    token = await get_esp32_jwt_token_async()
+
+    if not token:
+        logger.error("❌ Não foi possível obter token JWT")
+        return None
+
+    headers = {
+        'Authorization': f'Bearer {token}',
+        'Content-Type': 'application/json'
+    }
+
+    url = f"{_get_esp32_api_url()}{endpoint}"
+
+    logger.info(f"📡 ESP32 REQUEST (async): {method} {endpoint}")
+
+    try:
+        client = get_async_client()
+        if method == 'GET':
+            response = await client.get(url, headers=headers)
+        elif method == 'POST':
+            response = await client.post(url, json=data, headers=headers)
+        else:
+            logger.error(f"❌ Método HTTP não suportado: {method}")
+            return None
+        _record_status(breaker, response.status_code)
+        return _parse_esp32_response(endpoint, response)
+    except httpx.TimeoutException:
+        breaker.record_failure('timeout')
+        logger.warning(f"⚠️ ESP32: Timeout (ESP32 offline ou lento). Usando fallback.")
+        return _get_fallback_response(endpoint)
+    except httpx.ConnectError:
+        breaker.record_failure('conexão recusada')
+        logger.warning(f"⚠️ ESP32: Não conseguiu conectar (offline). Usando fallback.")
+        return _get_fallback_response(endpoint)
+    except Exception as e:
+        breaker.record_failure(str(e))
+        logger.error(f"❌ ESP32: Erro ao chamar API: {e}")
+        return _get_fallback_response(endpoint)
+
+
+async def get_esp32_sensors_async() -> dict | None:
+    """Versão assíncrona de `get_esp32_sensors`."""
+    local = _local_sensors()
+    if local is not None:
+        return local
+    logger.info("🔌 ESP32: Lendo sensores (async)...")
+    result = await call_esp32_api_async('/api/sensors', 'GET')
+    if result:
+        validated = _validate_sensors_response(result)
+        if validated:
+            return validated
+        return _get_fallback_response('/api/sensors')
+    return None
+
+
+async def get_esp32_sensors_with_mechanical_async() -> tuple[dict, dict] | None:
+    """Versão assíncrona de `get_esp32_sensors_with_mechanical`."""
+    if not esp32_supports(ESP32_COMBINED_CAPABILITY) or telemetry_store.fresh(get_esp32_device_id()):
+        return None
+    return _split_combined_response(await call_esp32_api_async(ESP32_COMBINED_ENDPOINT, 'GET'))
+
+
+async def confirm_esp32_detection_async(detection_type: str, confidence: float) -> dict | None:
+    """Versão assíncrona de `confirm_esp32_detection`."""
+    return await call_esp32_api_async('/api/confirm_detection', 'POST', {
+        'detection_type': detection_type,
+        'confidence': float(confidence)
+    })
+
+
+async def check_esp32_mechanical_async(presenca: bool, peso: float) -> dict | None:
+    """Versão assíncrona de `check_esp32_mechanical`."""
+    return await call_esp32_api_async('/api/check_mechanical', 'POST', {
+        'presenca': presenca,
+        'peso': peso
+    })
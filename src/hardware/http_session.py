@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+
+import requests
+
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# Configuração padrão da sessão HTTP compartilhada
+# =============================================================================
+HTTP_POOL_SIZE_DEFAULT = 8                # conexões keep-alive mantidas por host
+HTTP_CONNECT_TIMEOUT_SECONDS_DEFAULT = 5.0
+HTTP_READ_TIMEOUT_SECONDS_DEFAULT = 10.0
+HTTP_RETRIES_DEFAULT = 2                  # novas tentativas (GET/HEAD e falhas de conexão)
+HTTP_BACKOFF_SECONDS_DEFAULT = 0.3        # espera 0.3s, 0.6s, ... entre tentativas
+HTTP_RETRY_STATUS = (502, 503, 504)       # respostas do proxy do Render durante cold start
+
+
+class PooledHttpSession:
+    """`requests.Session` compartilhada entre threads, com pool de conexões keep-alive.
+
+    A sessão é criada na primeira chamada. O `HTTPAdapter` mantém até `pool_size` conexões
+    abertas por host (uma chamada a mais abre conexão extra em vez de esperar). O `Retry` do
+    urllib3 repete com backoff só GET/HEAD em erro de leitura ou status 502/503/504; falhas de
+    conexão (requisição não enviada) são repetidas em qualquer método. Timeouts são pares
+    (conexão, leitura). `snapshot()` informa quantas requisições reaproveitaram uma conexão.
+    """
+
+    def __init__(self, pool_size: int = HTTP_POOL_SIZE_DEFAULT,
+                 connect_timeout: float = HTTP_CONNECT_TIMEOUT_SECONDS_DEFAULT,
+                 read_timeout: float = HTTP_READ_TIMEOUT_SECONDS_DEFAULT,
+                 retries: int = HTTP_RETRIES_DEFAULT,
+                 backoff_seconds: float = HTTP_BACKOFF_SECONDS_DEFAULT):
+        self.pool_size = max(pool_size, 1)
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.retries = max(retries, 0)
+        self.backoff_seconds = max(backoff_seconds, 0.0)
+        self._session: requests.Session | None = None
+        self._adapter: HTTPAdapter | None = None
+        self._lock = threading.Lock()
+        self.stats = {
+            'requests': 0,
+            'errors': 0,
+            'timeouts': 0,
+            'total_latency_ms': 0.0,
+        }
+
+    @property
+    def session(self) -> requests.Session:
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    retry = Retry(
+                        total=self.retries,
+                        connect=self.retries,
+                        read=self.retries,
+                        status=self.retries,
+                        backoff_factor=self.backoff_seconds,
+                        status_forcelist=HTTP_RETRY_STATUS,
+                        allowed_methods=frozenset({'GET', 'HEAD'}),
+                        raise_on_status=False,
+                    )
+                    adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size,
+                                          max_retries=retry)
+                    session = requests.Session()
+                    session.mount('http://', adapter)
+                    session.mount('https://', adapter)
+                    self._adapter = adapter
+                    self._session = session
+        return self._session
+
+    def timeout(self, read_timeout: float | None = None) -> tuple[float, float]:
+        """Par (conexão, leitura); `read_timeout` sobrescreve só a leitura (ex.: login lento)."""
+        return self.connect_timeout, self.read_timeout if read_timeout is None else read_timeout
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault('timeout', self.timeout())
+        started = time.perf_counter()
+        try:
+            return self.session.request(method, url, **kwargs)
+        except requests.exceptions.Timeout:
+            self._count('timeouts')
+            raise
+        except Exception:
+            self._count('errors')
+            raise
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            with self._lock:
+                self.stats['requests'] += 1
+                self.stats['total_latency_ms'] += elapsed_ms
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request('POST', url, **kwargs)
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self.stats[key] += 1
+
+    def _connection_counts(self) -> tuple[int, int]:
+        """(conexões abertas, requisições enviadas) somadas nos pools do urllib3, por host."""
+        if self._adapter is None:
+            return 0, 0
+        pools = self._adapter.poolmanager.pools
+        opened = sent = 0
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is not None:
+                opened += pool.num_connections
+                sent += pool.num_requests
+        return opened, sent
+
+    def close(self) -> None:
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+            self._session = None
+            self._adapter = None
+
+    def snapshot(self) -> dict:
+        opened, sent = self._connection_counts()
+        with self._lock:
+            stats = dict(self.stats)
+        requests_made = stats.pop('requests')
+        total_latency_ms = stats.pop('total_latency_ms')
+        return {
+            'pool_size': self.pool_size,
+            'timeout': list(self.timeout()),
+            'retries': self.retries,
+            'requests': requests_made,
+            **stats,
+            'avg_latency_ms': round(total_latency_ms / requests_made, 1) if requests_made else 0.0,
+            'connections_opened': opened,
+            'connections_reused': max(sent - opened, 0),
+            'reuse_ratio': round((sent - opened) / sent, 3) if sent else 0.0,
+        }
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import hmac
+import statistics
+import threading
+import time
+
+from collections import deque
+from collections.abc import Callable
+
+
+# =============================================================================
+# Configuração padrão da telemetria enviada pelo ESP32
+# =============================================================================
+TELEMETRY_BUFFER_SIZE_DEFAULT = 32      # leituras guardadas por dispositivo (anel)
+TELEMETRY_MAX_AGE_SECONDS_DEFAULT = 2.0  # idade máxima para a leitura substituir GET /api/sensors
+TELEMETRY_MAX_DEVICES_DEFAULT = 16
+
+
+def is_device_authenticated(auth_header: str, expected_token: str) -> bool:
+    """Valida token Bearer do dispositivo (comparação em tempo constante)."""
+    if not expected_token or not auth_header or not auth_header.startswith('Bearer '):
+        return False
+    token = auth_header.split(' ', 1)[1].strip()
+    return hmac.compare_digest(token.encode('utf-8'), expected_token.encode('utf-8'))
+
+
+class TelemetryStore:
+    """Últimas leituras empurradas por dispositivo, num anel em memória com controle de idade.
+
+    A idade conta a partir do recebimento no servidor (relógio monotônico), não do relógio do
+    dispositivo. `reading(device_id)` agrega as leituras do dispositivo com no máximo
+    `max_age_seconds` (mediana de peso e temperatura; presença se qualquer uma a viu), em vez de
+    confiar numa amostra só. Sem `device_id`, só responde se exatamente um dispositivo estiver
+    com leituras frescas — com mais de um não há como saber qual é o deste totem. Em qualquer
+    outro caso devolve None e o chamador consulta a API remota.
+    """
+
+    def __init__(self, buffer_size: int = TELEMETRY_BUFFER_SIZE_DEFAULT,
+                 max_age_seconds: float = TELEMETRY_MAX_AGE_SECONDS_DEFAULT,
+                 max_devices: int = TELEMETRY_MAX_DEVICES_DEFAULT,
+                 clock: Callable[[], float] = time.monotonic):
+        self.buffer_size = max(buffer_size, 1)
+        self.max_age_seconds = max(max_age_seconds, 0.0)
+        self.max_devices = max(max_devices, 1)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._buffers: dict[str, deque[tuple[float, dict]]] = {}
+            self.stats = {
+                'ingested': 0,
+                'rejected': 0,
+                'local_hits': 0,     # leituras servidas sem ir à API
+                'stale_misses': 0,   # havia leitura, mas velha demais
+                'empty_misses': 0,   # nenhuma leitura recebida ainda
+                'ambiguous_misses': 0,  # vários dispositivos frescos e nenhum configurado
+            }
+
+    def ingest(self, device_id: str, readings: list[dict]) -> int:
+        """Guarda as leituras (na ordem recebida) no anel do dispositivo; retorna quantas entraram.
+
+        ValueError se o dispositivo for novo e o limite de dispositivos já tiver sido atingido.
+        """
+        now = self._clock()
+        with self._lock:
+            buffer = self._buffers.get(device_id)
+            if buffer is None:
+                if len(self._buffers) >= self.max_devices:
+                    raise ValueError(f'limite de {self.max_devices} dispositivos atingido')
+                buffer = self._buffers[device_id] = deque(maxlen=self.buffer_size)
+            for reading in readings:
+                buffer.append((now, dict(reading)))
+            self.stats['ingested'] += len(readings)
+            return len(readings)
+
+    def record_rejected(self, count: int = 1) -> None:
+        with self._lock:
+            self.stats['rejected'] += count
+
+    def _fresh_window(self, buffer: deque[tuple[float, dict]], now: float) -> list[dict]:
+        return [reading for received_at, reading in buffer if now - received_at <= self.max_age_seconds]
+
+    def _resolve(self, device_id: str | None) -> tuple[list[dict], str | None]:
+        """(janela fresca do dispositivo, motivo da falta) — motivo é a chave de estatística."""
+        now = self._clock()
+        if device_id is not None:
+            buffer = self._buffers.get(device_id)
+            if not buffer:
+                return [], 'empty_misses'
+            window = self._fresh_window(buffer, now)
+            return window, None if window else 'stale_misses'
+        if not self._buffers:
+            return [], 'empty_misses'
+        windows = [window for window in (self._fresh_window(b, now) for b in self._buffers.values()) if window]
+        if not windows:
+            return [], 'stale_misses'
+        if len(windows) > 1:
+            return [], 'ambiguous_misses'
+        return windows[0], None
+
+    def fresh(self, device_id: str | None = None) -> bool:
+        """True se `reading(device_id)` responderia localmente (sem contar nas estatísticas)."""
+        with self._lock:
+            return bool(self._resolve(device_id)[0])
+
+    def reading(self, device_id: str | None = None) -> dict | None:
+        """Leitura agregada da janela fresca do dispositivo, ou None (ver docstring da classe)."""
+        with self._lock:
+            window, miss = self._resolve(device_id)
+            if miss:
+                self.stats[miss] += 1
+                return None
+            self.stats['local_hits'] += 1
+        return {
+            'presenca': any(r['presenca'] for r in window),
+            'peso': int(statistics.median(r['peso'] for r in window)),
+            'temperatura': float(statistics.median(r['temperatura'] for r in window)),
+        }
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            now = self._clock()
+            devices = {}
+            for device_id, buffer in sorted(self._buffers.items()):
+                age = now - buffer[-1][0] if buffer else None
+                devices[device_id] = {
+                    'readings': len(buffer),
+                    'age_seconds': round(age, 1) if age is not None else None,
+                    'stale': age is None or age > self.max_age_seconds,
+                    'latest': dict(buffer[-1][1]) if buffer else None,
+                }
+            return {
+                'max_age_seconds': self.max_age_seconds,
+                'buffer_size': self.buffer_size,
+                'devices': devices,
+                **self.stats,
+            }
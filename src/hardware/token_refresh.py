@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+
+from collections.abc import Callable
+
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# Configuração padrão da renovação do token
+# =============================================================================
+TOKEN_REFRESH_MARGIN_SECONDS_DEFAULT = 300.0  # renova em background quando faltar menos que isso
+LOGIN_BACKOFF_SECONDS_DEFAULT = 5.0           # espera após a 1ª falha de login (dobra a cada falha)
+LOGIN_BACKOFF_MAX_SECONDS_DEFAULT = 300.0
+
+
+class TokenRefresher:
+    """Política de renovação de um token com validade: single-flight, antecipação e backoff.
+
+    O token continua onde o cliente já o guarda; esta classe só decide quando renovar.
+    `lock` garante um login por vez (quem chega durante a renovação espera e reaproveita o
+    token novo). `due()` indica renovação antecipada: o token ainda vale e é servido enquanto
+    o login roda em background. Falhas de login abrem uma janela de backoff exponencial em
+    que nenhum login novo é tentado.
+    """
+
+    def __init__(self, refresh_margin_seconds: float = TOKEN_REFRESH_MARGIN_SECONDS_DEFAULT,
+                 backoff_seconds: float = LOGIN_BACKOFF_SECONDS_DEFAULT,
+                 backoff_max_seconds: float = LOGIN_BACKOFF_MAX_SECONDS_DEFAULT,
+                 clock: Callable[[], float] = time.time):
+        self.refresh_margin_seconds = max(refresh_margin_seconds, 0.0)
+        self.backoff_seconds = max(backoff_seconds, 0.0)
+        self.backoff_max_seconds = max(backoff_max_seconds, self.backoff_seconds)
+        self._clock = clock
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        self.consecutive_failures = 0
+        self._retry_at = 0.0
+        self._lifetime: float | None = None
+        self.stats = {
+            'logins': 0,
+            'background_refreshes': 0,
+            'failures': 0,
+            'last_error': None,
+        }
+
+    def due(self, expiry: float, now: float | None = None) -> bool:
+        """True se o token (ainda válido) já deve ser renovado em background."""
+        now = self._clock() if now is None else now
+        margin = self.refresh_margin_seconds
+        if self._lifetime is not None:
+            margin = min(margin, self._lifetime / 2)  # token de vida curta não renova sem parar
+        return expiry - now < margin and not self.in_backoff(now)
+
+    def in_backoff(self, now: float | None = None) -> bool:
+        now = self._clock() if now is None else now
+        return now < self._retry_at
+
+    def retry_in_seconds(self) -> float:
+        return max(self._retry_at - self._clock(), 0.0)
+
+    def record_success(self, expiry: float, background: bool = False) -> None:
+        now = self._clock()
+        self._lifetime = max(expiry - now, 0.0)
+        self.consecutive_failures = 0
+        self._retry_at = 0.0
+        self.stats['logins'] += 1
+        if background:
+            self.stats['background_refreshes'] += 1
+
+    def record_failure(self, error: str | None = None) -> None:
+        self.consecutive_failures += 1
+        delay = min(self.backoff_seconds * 2 ** (self.consecutive_failures - 1), self.backoff_max_seconds)
+        self._retry_at = self._clock() + delay
+        self.stats['failures'] += 1
+        self.stats['last_error'] = error
+        logger.warning(f"⚠️ ESP32 JWT: login falhou ({self.consecutive_failures}x), nova tentativa em {delay:.0f}s")
+
+    def snapshot(self) -> dict:
+        return {
+            'refresh_margin_seconds': self.refresh_margin_seconds,
+            'refreshing': self.lock.locked(),
+            'consecutive_failures': self.consecutive_failures,
+            'retry_in_seconds': round(self.retry_in_seconds(), 1),
+            **self.stats,
+        }
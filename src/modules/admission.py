@@ -0,0 +1,257 @@
+from __future__ import annotations
+
+import math
+import threading
+import time
+
+from collections import OrderedDict
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from enum import Enum
+
+
+# =============================================================================
+# Limites padrão de admissão nas rotas de inferência
+# =============================================================================
+RATE_LIMIT_MAX_CLIENTS = 4096            # buckets mantidos em memória (LRU por totem/cliente)
+INFERENCE_MAX_IN_FLIGHT_DEFAULT = 4      # classificações simultâneas por worker
+INFERENCE_MAX_QUEUE_DEFAULT = 8          # requisições aguardando vaga antes de descartar
+INFERENCE_QUEUE_TIMEOUT_SECONDS = 2.0    # espera máxima na fila antes do 429
+
+_PERIOD_SECONDS = {'s': 1.0, 'sec': 1.0, 'm': 60.0, 'min': 60.0, 'h': 3600.0, 'hour': 3600.0}
+
+
+class ShedReason(Enum):
+    RATE_LIMITED = 'rate_limited'
+    SATURATED = 'saturated'
+
+
+@dataclass(frozen=True)
+class RoutePolicy:
+    """Limite de taxa por totem/cliente para uma rota (token bucket)."""
+    requests: int
+    period_seconds: float
+    burst: int
+
+    @property
+    def rate_per_second(self) -> float:
+        return self.requests / self.period_seconds
+
+
+def parse_route_policy(spec: str) -> RoutePolicy:
+    """Converte especificação `"<N>/<período>[:burst]"` em RoutePolicy.
+
+    Exemplos: `"60/min"`, `"2/s:5"`, `"600/hour:30"`.
+
+    Raises:
+        ValueError: se a especificação for inválida
+    """
+    rate_part, _, burst_part = spec.strip().partition(':')
+    count_text, _, period_text = rate_part.partition('/')
+    requests = int(count_text)
+    period = _PERIOD_SECONDS.get(period_text.strip().lower() or 's')
+    if period is None:
+        raise ValueError(f"Período inválido em '{spec}' (use s, min ou hour)")
+    burst = int(burst_part) if burst_part else requests
+    if requests <= 0 or burst <= 0:
+        raise ValueError(f"Limite deve ser positivo em '{spec}'")
+    return RoutePolicy(requests=requests, period_seconds=period, burst=burst)
+
+
+class TokenBucket:
+    """Token bucket clássico: `burst` tokens, reposição contínua a `rate` tokens/s."""
+
+    def __init__(self, rate_per_second: float, burst: int, now: float | None = None):
+        self.rate = rate_per_second
+        self.capacity = float(burst)
+        self.tokens = float(burst)
+        self.updated_at = time.monotonic() if now is None else now
+
+    def try_acquire(self, now: float) -> tuple[bool, float]:
+        """Consome um token se disponível.
+
+        Returns:
+            (permitido, segundos até o próximo token quando negado)
+        """
+        elapsed = max(now - self.updated_at, 0.0)
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+        self.updated_at = now
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return True, 0.0
+        return False, (1.0 - self.tokens) / self.rate
+
+
+class RateLimiter:
+    """Um token bucket por chave de cliente, com número de chaves limitado (LRU)."""
+
+    def __init__(self, policy: RoutePolicy, max_clients: int = RATE_LIMIT_MAX_CLIENTS):
+        self.policy = policy
+        self.max_clients = max_clients
+        self._buckets: OrderedDict[str, TokenBucket] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def try_acquire(self, client_key: str) -> tuple[bool, float]:
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(client_key)
+            if bucket is None:
+                bucket = TokenBucket(self.policy.rate_per_second, self.policy.burst, now)
+                self._buckets[client_key] = bucket
+                while len(self._buckets) > self.max_clients:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(client_key)
+            return bucket.try_acquire(now)
+
+
+class InferenceAdmission:
+    """Semáforo global de inferências em andamento com fila de espera curta."""
+
+    def __init__(
+        self,
+        max_in_flight: int = INFERENCE_MAX_IN_FLIGHT_DEFAULT,
+        max_queue: int = INFERENCE_MAX_QUEUE_DEFAULT,
+        queue_timeout_seconds: float = INFERENCE_QUEUE_TIMEOUT_SECONDS,
+    ):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout_seconds = queue_timeout_seconds
+        self.in_flight = 0
+        self.waiting = 0
+        self._cond = threading.Condition()
+
+    def acquire(self) -> bool:
+        """Obtém uma vaga; espera na fila até `queue_timeout_seconds` se houver espaço nela."""
+        with self._cond:
+            if self.in_flight < self.max_in_flight:
+                self.in_flight += 1
+                return True
+            if self.waiting >= self.max_queue:
+                return False
+            self.waiting += 1
+            try:
+                admitted = self._cond.wait_for(
+                    lambda: self.in_flight < self.max_in_flight,
+                    timeout=self.queue_timeout_seconds
+                )
+                if admitted:
+                    self.in_flight += 1
+                return admitted
+            finally:
+                self.waiting -= 1
+
+    def release(self) -> None:
+        with self._cond:
+            self.in_flight = max(self.in_flight - 1, 0)
+            self._cond.notify()
+
+
+@dataclass(frozen=True)
+class AdmissionDecision:
+    admitted: bool
+    reason: ShedReason | None = None
+    retry_after_seconds: int = 0
+
+
+class InferenceSaturated(Exception):
+    """Semáforo de inferência sem vaga (nem na fila): a rota responde 429 `saturated`."""
+
+    def __init__(self, decision: AdmissionDecision):
+        super().__init__(decision.reason.value if decision.reason else 'saturated')
+        self.decision = decision
+
+
+class AdmissionController:
+    """Controle de admissão das rotas de inferência.
+
+    Ordem das verificações:
+        1. Token bucket por (rota, totem/cliente) → 429 `rate_limited` (`check_rate`, na entrada da rota)
+        2. Semáforo global de inferência com fila curta → 429 `saturated` (`inference_slot`, só em
+           volta da classificação: E/S do ESP32 e escritas no banco não seguram vaga)
+
+    Mantém contadores de requisições atendidas e descartadas por rota.
+    O semáforo é por processo: com N workers do gunicorn, o limite efetivo é N × `max_in_flight`.
+    """
+
+    def __init__(
+        self,
+        policies: dict[str, RoutePolicy],
+        admission: InferenceAdmission | None = None,
+        max_clients: int = RATE_LIMIT_MAX_CLIENTS,
+    ):
+        self.policies = dict(policies)
+        self.admission = admission or InferenceAdmission()
+        self._limiters = {route: RateLimiter(policy, max_clients) for route, policy in self.policies.items()}
+        self._counters: dict[str, dict[str, int]] = {}
+        self._counters_lock = threading.Lock()
+
+    def _count(self, route: str, field: str) -> None:
+        with self._counters_lock:
+            counters = self._counters.setdefault(
+                route, {'served': 0, 'shed_rate_limited': 0, 'shed_saturated': 0}
+            )
+            counters[field] += 1
+
+    def check_rate(self, route: str, client_key: str) -> AdmissionDecision:
+        """Token bucket da rota para o totem/cliente; não ocupa vaga no semáforo."""
+        limiter = self._limiters.get(route)
+        if limiter is not None:
+            allowed, retry_after = limiter.try_acquire(client_key)
+            if not allowed:
+                self._count(route, 'shed_rate_limited')
+                return AdmissionDecision(False, ShedReason.RATE_LIMITED, max(math.ceil(retry_after), 1))
+        return AdmissionDecision(True)
+
+    def acquire_slot(self, route: str) -> AdmissionDecision:
+        """Vaga no semáforo (pode esperar na fila); se admitida, o chamador DEVE chamar `release()`."""
+        if not self.admission.acquire():
+            self._count(route, 'shed_saturated')
+            return AdmissionDecision(
+                False, ShedReason.SATURATED, max(math.ceil(self.admission.queue_timeout_seconds), 1)
+            )
+        self._count(route, 'served')
+        return AdmissionDecision(True)
+
+    @contextmanager
+    def inference_slot(self, route: str) -> Iterator[None]:
+        """Segura uma vaga durante o bloco; InferenceSaturated se não houver vaga nem lugar na fila."""
+        decision = self.acquire_slot(route)
+        if not decision.admitted:
+            raise InferenceSaturated(decision)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def admit(self, route: str, client_key: str) -> AdmissionDecision:
+        """`check_rate` + `acquire_slot`; se admitida, o chamador DEVE chamar `release()`."""
+        decision = self.check_rate(route, client_key)
+        if not decision.admitted:
+            return decision
+        return self.acquire_slot(route)
+
+    def release(self) -> None:
+        self.admission.release()
+
+    def snapshot(self) -> dict:
+        """Contadores atuais (atendidas × descartadas) e ocupação do semáforo."""
+        with self._counters_lock:
+            routes = {route: dict(counters) for route, counters in self._counters.items()}
+        totals = {'served': 0, 'shed_rate_limited': 0, 'shed_saturated': 0}
+        for counters in routes.values():
+            for field, value in counters.items():
+                totals[field] += value
+        return {
+            'routes': routes,
+            'totals': totals,
+            'in_flight': self.admission.in_flight,
+            'waiting': self.admission.waiting,
+            'max_in_flight': self.admission.max_in_flight,
+            'max_queue': self.admission.max_queue,
+            'policies': {
+                route: {'requests': p.requests, 'period_seconds': p.period_seconds, 'burst': p.burst}
+                for route, p in self.policies.items()
+            }
+        }
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import base64
+import csv
+import io
+import json
+
+from typing import Iterable, Iterator
+
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+}
+EXPORT_ROWS_PER_CHUNK = 500  # linhas por pedaço escrito no socket
+
+
+def encode_cursor(position: tuple[float, int]) -> str:
+    """Token opaco (base64url de "timestamp:id") da última linha entregue."""
+    timestamp, row_id = position
+    return base64.urlsafe_b64encode(f"{timestamp!r}:{int(row_id)}".encode('ascii')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token: str) -> tuple[float, int]:
+    """Inverso de `encode_cursor`; levanta ValueError para tokens malformados."""
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)).decode('ascii')
+        timestamp, row_id = raw.split(':')
+        return float(timestamp), int(row_id)
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("Cursor de exportação inválido") from None
+
+
+def csv_chunks(columns: Iterable[str], rows: Iterable[tuple],
+               rows_per_chunk: int = EXPORT_ROWS_PER_CHUNK, header: bool = True) -> Iterator[str]:
+    """CSV em pedaços de `rows_per_chunk` linhas; só um pedaço fica em memória."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(columns)
+    pending = 0
+    for row in rows:
+        writer.writerow(row)
+        pending += 1
+        if pending == rows_per_chunk:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def ndjson_chunks(columns: Iterable[str], rows: Iterable[tuple],
+                  rows_per_chunk: int = EXPORT_ROWS_PER_CHUNK) -> Iterator[bytes]:
+    """Um objeto JSON por linha, agrupados em pedaços de `rows_per_chunk` linhas."""
+    columns = tuple(columns)
+    chunk: list[bytes] = []
+    for row in rows:
+        # Linhas do SQLite só têm tipos primitivos: json da stdlib basta e mantém o módulo sem Flask
+        chunk.append(json.dumps(dict(zip(columns, row)), ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+        if len(chunk) == rows_per_chunk:
+            yield b'\n'.join(chunk) + b'\n'
+            chunk = []
+    if chunk:
+        yield b'\n'.join(chunk) + b'\n'
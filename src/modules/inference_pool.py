@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+import atexit
+import logging
+import multiprocessing
+import queue
+import threading
+
+from dataclasses import dataclass, field
+from multiprocessing import shared_memory
+
+import numpy as np  # pyright: ignore[reportMissingImports]
+
+from src.modules.image import ImageClassifier
+
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# Configuração padrão do pool de inferência
+# =============================================================================
+INFERENCE_FRAME_SLOT_BYTES = 8 * 1024 * 1024  # 8MB ≈ frame 1920×1080×3 (uint8) com folga
+INFERENCE_SLOTS_PER_WORKER = 2                # frames em trânsito por processo (um classificando, um na fila)
+INFERENCE_TASK_TIMEOUT_SECONDS = 10.0         # tempo máximo por classificação no pool
+
+# Atributos de CV que `classify_image` deixa no classificador (usados no `cv_debug` das rotas)
+CV_METRIC_ATTRIBUTES = {
+    'hough': '_last_hough_count',
+    'hough_consistent': '_last_hough_consistent',
+    'circularity': '_last_circularity',
+    'aspect_ratio': '_last_aspect_ratio',
+    'ellipse_aspect': '_last_ellipse_aspect',
+    'contour_area': '_last_contour_area',
+}
+
+
+@dataclass(frozen=True)
+class InferenceResult:
+    prediction: int | None
+    confidence: float | None
+    saturation: float | None
+    method: str
+    cv_metrics: dict = field(default_factory=dict)
+
+    def as_tuple(self) -> tuple[int | None, float | None, float | None, str]:
+        """Mesma forma de retorno de `ImageClassifier.classify_image`."""
+        return self.prediction, self.confidence, self.saturation, self.method
+
+
+def read_cv_metrics(classifier: object) -> dict:
+    """Lê as métricas de CV da última classificação feita pelo classificador."""
+    return {name: getattr(classifier, attribute, 0) for name, attribute in CV_METRIC_ATTRIBUTES.items()}
+
+
+# =============================================================================
+# Lado do processo worker
+# =============================================================================
+_WORKER_CLASSIFIER: ImageClassifier | None = None
+
+
+def _init_worker() -> None:
+    """Carrega o modelo SVM uma única vez por processo (pré-aquecimento)."""
+    global _WORKER_CLASSIFIER
+    _WORKER_CLASSIFIER = ImageClassifier()
+    _WORKER_CLASSIFIER.load_classifier()
+
+
+def _worker_ready(_: int) -> bool:
+    return _WORKER_CLASSIFIER is not None and _WORKER_CLASSIFIER.model is not None
+
+
+def _attach_shared_memory(name: str) -> shared_memory.SharedMemory:
+    """Abre o segmento sem registrá-lo no resource tracker (o dono é o processo pai)."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+    except TypeError:
+        from multiprocessing import resource_tracker
+        segment = shared_memory.SharedMemory(name=name)
+        try:
+            resource_tracker.unregister(segment._name, 'shared_memory')
+        except Exception:
+            pass
+        return segment
+
+
+def _classify_shared_frame(
+    segment_name: str,
+    shape: tuple[int, ...],
+    dtype: str,
+    is_debug_mode: bool,
+) -> tuple[int | None, float | None, float | None, str, dict]:
+    """Classifica o frame lido diretamente da memória compartilhada (sem pickle do array)."""
+    if _WORKER_CLASSIFIER is None:
+        return None, None, None, "ERRO", {}
+    segment = _attach_shared_memory(segment_name)
+    try:
+        frame = np.ndarray(shape, dtype=np.dtype(dtype), buffer=segment.buf)
+        prediction, confidence, saturation, method = _WORKER_CLASSIFIER.classify_image(
+            frame, is_debug_mode=is_debug_mode
+        )
+        del frame
+        metrics = read_cv_metrics(_WORKER_CLASSIFIER)
+        return (
+            None if prediction is None else int(prediction),
+            None if confidence is None else float(confidence),
+            None if saturation is None else float(saturation),
+            method,
+            {name: value.item() if isinstance(value, np.generic) else value for name, value in metrics.items()},
+        )
+    finally:
+        segment.close()
+
+
+# =============================================================================
+# Lado do processo Flask
+# =============================================================================
+class _FrameSlots:
+    """Segmentos de memória compartilhada pré-alocados e reutilizados entre requisições."""
+
+    def __init__(self, count: int, slot_bytes: int):
+        self.slot_bytes = slot_bytes
+        self._segments = [shared_memory.SharedMemory(create=True, size=slot_bytes) for _ in range(count)]
+        self._free: queue.Queue[shared_memory.SharedMemory] = queue.Queue()
+        for segment in self._segments:
+            self._free.put(segment)
+
+    def acquire(self, nbytes: int, timeout: float) -> tuple[shared_memory.SharedMemory, bool]:
+        """Retorna (segmento, é_dedicado). Frames maiores que o slot usam segmento dedicado."""
+        if nbytes > self.slot_bytes:
+            return shared_memory.SharedMemory(create=True, size=nbytes), True
+        return self._free.get(timeout=timeout), False
+
+    def release(self, segment: shared_memory.SharedMemory, dedicated: bool) -> None:
+        if dedicated:
+            segment.close()
+            segment.unlink()
+        else:
+            self._free.put(segment)
+
+    def replace(self, segment: shared_memory.SharedMemory) -> None:
+        """Descarta um slot que ainda pode estar em uso por um worker e aloca outro no lugar."""
+        segment.close()
+        segment.unlink()
+        fresh = shared_memory.SharedMemory(create=True, size=self.slot_bytes)
+        self._segments = [s for s in self._segments if s is not segment] + [fresh]
+        self._free.put(fresh)
+
+    def close(self) -> None:
+        for segment in self._segments:
+            try:
+                segment.close()
+                segment.unlink()
+            except FileNotFoundError:
+                pass
+
+
+class ProcessPoolInferenceExecutor:
+    """Executa `ImageClassifier.classify_image` em processos pré-aquecidos.
+
+    Extração de features (HOG, reduções NumPy, contornos) e o SVC seguram o GIL;
+    em processos separados as classificações escalam com os núcleos. Cada worker
+    carrega o modelo uma vez no initializer; o frame decodificado é copiado para
+    um segmento `multiprocessing.shared_memory` e só nome/shape/dtype vão no pickle.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        slot_bytes: int = INFERENCE_FRAME_SLOT_BYTES,
+        task_timeout_seconds: float = INFERENCE_TASK_TIMEOUT_SECONDS,
+    ):
+        if workers < 1:
+            raise ValueError("workers deve ser >= 1")
+        self.workers = workers
+        self.task_timeout_seconds = task_timeout_seconds
+        self._slots = _FrameSlots(workers * INFERENCE_SLOTS_PER_WORKER, slot_bytes)
+        # spawn: não herda threads/conexões do processo Flask (fork com threads é inseguro)
+        context = multiprocessing.get_context('spawn')
+        try:
+            self._pool = context.Pool(processes=workers, initializer=_init_worker)
+        except Exception:
+            self._slots.close()  # sem isso os segmentos de memória compartilhada vazam
+            raise
+        self._closed = False
+        self._close_lock = threading.Lock()
+        atexit.register(self.close)
+
+    def warm_up(self) -> bool:
+        """Bloqueia até os workers responderem com o modelo carregado."""
+        ready = self._pool.map(_worker_ready, range(self.workers), chunksize=1)
+        if not all(ready):
+            logger.error("❌ Pool de inferência: modelo não carregou em algum worker")
+            return False
+        logger.info(f"✅ Pool de inferência pronto ({self.workers} processos)")
+        return True
+
+    def classify(self, image: np.ndarray | None, is_debug_mode: bool = False) -> InferenceResult:
+        """Classifica a imagem no pool; erros retornam o contrato padrão `(None, None, None, "ERRO")`."""
+        if image is None or not isinstance(image, np.ndarray):
+            return InferenceResult(None, None, None, "ERRO")
+
+        frame = np.ascontiguousarray(image)
+        try:
+            segment, dedicated = self._slots.acquire(frame.nbytes, timeout=self.task_timeout_seconds)
+        except queue.Empty:
+            logger.error("❌ Pool de inferência: nenhum slot de memória compartilhada livre")
+            return InferenceResult(None, None, None, "ERRO")
+
+        timed_out = False
+        try:
+            staged = np.ndarray(frame.shape, dtype=frame.dtype, buffer=segment.buf)
+            staged[...] = frame
+            del staged
+            pending = self._pool.apply_async(
+                _classify_shared_frame,
+                (segment.name, frame.shape, frame.dtype.str, is_debug_mode)
+            )
+            prediction, confidence, saturation, method, metrics = pending.get(timeout=self.task_timeout_seconds)
+            return InferenceResult(prediction, confidence, saturation, method, metrics)
+        except multiprocessing.TimeoutError:
+            logger.error(f"❌ Pool de inferência: timeout após {self.task_timeout_seconds}s")
+            timed_out = True
+            return InferenceResult(None, None, None, "ERRO")
+        except Exception as e:
+            logger.error(f"❌ Pool de inferência: erro ao classificar: {e}", exc_info=True)
+            return InferenceResult(None, None, None, "ERRO")
+        finally:
+            if timed_out and not dedicated:
+                # O worker ainda pode estar lendo o slot: troca por um novo em vez de reutilizar
+                self._slots.replace(segment)
+            else:
+                self._slots.release(segment, dedicated)
+
+    def close(self) -> None:
+        with self._close_lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._pool.terminate()
+        self._pool.join()
+        self._slots.close()
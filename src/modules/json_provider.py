@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import json
+
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+
+import numpy as np  # pyright: ignore[reportMissingImports]
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson  # pyright: ignore[reportMissingImports]
+except ImportError:  # orjson é opcional: sem ele, usa json da stdlib com o mesmo `default`
+    orjson = None
+
+
+# =============================================================================
+# Resposta compacta (tráfego do totem)
+# =============================================================================
+COMPACT_MEDIA_TYPE = 'application/vnd.totem.compact+json'
+COMPACT_DROP_FIELDS = frozenset({'timestamp', 'cv_debug', 'color', 'icon'})  # só exibição/debug
+COMPACT_FLOAT_DECIMALS = 3
+
+
+def json_default(obj):
+    """Serializa tipos que o JSON padrão não conhece (escalares/arrays NumPy, datas, Enum)."""
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, Decimal):
+        return float(obj)
+    raise TypeError(f"Objeto do tipo {type(obj).__name__} não é serializável em JSON")
+
+
+def dumps_bytes(obj, sort_keys: bool = False) -> bytes:
+    """Serializa para bytes UTF-8 (orjson quando disponível)."""
+    if orjson is not None:
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=json_default, option=option)
+    return json.dumps(
+        obj, default=json_default, sort_keys=sort_keys, ensure_ascii=False, separators=(',', ':')
+    ).encode('utf-8')
+
+
+def compact_payload(payload):
+    """Esquema compacto: remove campos de exibição/debug e arredonda floats."""
+    if isinstance(payload, dict):
+        return {
+            key: compact_payload(value)
+            for key, value in payload.items()
+            if key not in COMPACT_DROP_FIELDS
+        }
+    if isinstance(payload, (list, tuple)):
+        return [compact_payload(value) for value in payload]
+    if isinstance(payload, (float, np.floating)):
+        return round(float(payload), COMPACT_FLOAT_DECIMALS)
+    return payload
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Provider JSON do Flask com orjson e suporte a NumPy (dispensa `float(...)` nas rotas).
+
+    Registrado em `app.json`; `jsonify` e `request.get_json` passam a usá-lo.
+    """
+
+    sort_keys = False
+
+    def dumps(self, obj, **kwargs) -> str:
+        return dumps_bytes(obj, sort_keys=kwargs.get('sort_keys', self.sort_keys)).decode('utf-8')
+
+    def loads(self, s: str | bytes, **kwargs):
+        if orjson is not None:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        # Evita o round trip bytes → str → bytes do `DefaultJSONProvider.response`
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps_bytes(obj, sort_keys=self.sort_keys), mimetype=self.mimetype)
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import threading
+import time
+
+from datetime import date, timedelta
+
+
+PERIODS = ('today', 'week', 'month', 'year')
+PERIOD_CACHE_TTL_SECONDS_DEFAULT = 3600.0  # dias fechados só mudam com importação/reprocessamento
+
+
+def period_ranges(period: str, today: date) -> tuple[tuple[date, date], tuple[date, date]]:
+    """(início, fim) do período corrente até hoje e do anterior com o mesmo número de dias decorridos.
+
+    Ex.: em 10/mar o mês corrente é 01–10/mar e o anterior 01–10/fev, para não comparar um mês
+    parcial com um mês completo.
+    """
+    if period == 'today':
+        start = today
+        previous_start = today - timedelta(days=1)
+        previous_period_end = previous_start
+    elif period == 'week':
+        start = today - timedelta(days=today.weekday())  # segunda-feira
+        previous_start = start - timedelta(days=7)
+        previous_period_end = start - timedelta(days=1)
+    elif period == 'month':
+        start = today.replace(day=1)
+        previous_period_end = start - timedelta(days=1)
+        previous_start = previous_period_end.replace(day=1)
+    elif period == 'year':
+        start = today.replace(month=1, day=1)
+        previous_start = start.replace(year=start.year - 1)
+        previous_period_end = start - timedelta(days=1)
+    else:
+        raise ValueError(f"Período desconhecido: {period}")
+    previous_end = min(previous_start + (today - start), previous_period_end)
+    return (start, today), (previous_start, previous_end)
+
+
+def percent_change(current: float, previous: float) -> float:
+    if previous == 0:
+        return 0.0 if current == 0 else 100.0
+    return round((current - previous) / previous * 100, 1)
+
+
+class PeriodStatsCache:
+    """Campos today/week/month/year e change* do dashboard a partir do rollup diário.
+
+    Somas de dias já fechados são guardadas por (primeiro dia, último dia) — a chave muda
+    sozinha quando o período vira — e só o dia corrente é lido a cada chamada.
+    """
+
+    def __init__(self, ttl_seconds: float = PERIOD_CACHE_TTL_SECONDS_DEFAULT):
+        self.ttl_seconds = ttl_seconds
+        self._closed: dict[tuple[str, str], tuple[float, dict]] = {}
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0}
+
+    def _closed_totals(self, db, first: date, last: date) -> dict:
+        key = (first.isoformat(), last.isoformat())
+        now = time.monotonic()
+        with self._lock:
+            cached = self._closed.get(key)
+            if cached is not None and now - cached[0] < self.ttl_seconds:
+                self.stats['hits'] += 1
+                return cached[1]
+            self.stats['misses'] += 1
+        totals = db.get_rollup_totals(*key)
+        with self._lock:
+            # Chaves de dias que já saíram de qualquer período só ocupariam memória
+            self._closed = {k: v for k, v in self._closed.items() if now - v[0] < self.ttl_seconds}
+            self._closed[key] = (now, totals)
+        return totals
+
+    def _totals(self, db, first: date, last: date, today: date, today_totals: dict) -> dict:
+        totals = {'interactions': 0, 'deposits': 0}
+        closed_last = min(last, today - timedelta(days=1))
+        if first <= closed_last:
+            closed = self._closed_totals(db, first, closed_last)
+            totals = {key: totals[key] + closed[key] for key in totals}
+        if first <= today <= last:
+            totals = {key: totals[key] + today_totals[key] for key in totals}
+        return totals
+
+    def dashboard_fields(self, db, today: date | None = None) -> dict:
+        today = today or date.today()
+        today_totals = db.get_rollup_totals(today.isoformat(), today.isoformat())
+
+        current: dict[str, dict] = {}
+        previous: dict[str, dict] = {}
+        for period in PERIODS:
+            (start, end), (previous_start, previous_end) = period_ranges(period, today)
+            current[period] = self._totals(db, start, end, today, today_totals)
+            previous[period] = self._totals(db, previous_start, previous_end, today, today_totals)
+
+        def rejected(totals: dict) -> int:
+            return max(totals['interactions'] - totals['deposits'], 0)
+
+        def acceptance_rate(totals: dict) -> float:
+            return totals['deposits'] / totals['interactions'] * 100 if totals['interactions'] else 0.0
+
+        return {
+            **{period: current[period]['interactions'] for period in PERIODS},
+            'changeTotal': percent_change(current['month']['interactions'], previous['month']['interactions']),
+            # Diferença em pontos percentuais da taxa de aceite (semana × semana anterior)
+            'changeTaxa': round(acceptance_rate(current['week']) - acceptance_rate(previous['week']), 1),
+            'changeRejeitadas': percent_change(rejected(current['month']), rejected(previous['month'])),
+        }
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._closed.clear()
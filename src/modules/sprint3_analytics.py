@@ -1,6 +1,17 @@
 from __future__ import annotations
 
-from datetime import datetime, timedelta
+from datetime import date, datetime, time, timedelta
+
+
+ANALYTICS_GRANULARITIES = ('hour', 'day', 'week', 'month')
+# Janela usada quando só a granularidade (ou só `to`) é informada
+ANALYTICS_DEFAULT_SPANS = {
+    'hour': timedelta(days=1),
+    'day': timedelta(days=30),
+    'week': timedelta(weeks=12),
+    'month': timedelta(days=365),
+}
+ANALYTICS_MAX_BUCKETS_DEFAULT = 366
 
 
 def is_admin_authenticated(auth_header: str, expected_token: str) -> bool:
@@ -13,25 +24,121 @@ def is_admin_authenticated(auth_header: str, expected_token: str) -> bool:
 
 def build_daily_trend(deposits: list[dict], days: int = 7) -> dict[str, list]:
     """Monta série diária real baseada no timestamp dos depósitos."""
-    today = datetime.now().date()
-    date_buckets = {today - timedelta(days=i): 0 for i in range(days)}
-
+    counts_by_day: dict[str, int] = {}
     for deposit in deposits:
         timestamp = deposit.get('timestamp')
         if isinstance(timestamp, (int, float)):
-            deposit_date = datetime.fromtimestamp(timestamp).date()
-            if deposit_date in date_buckets:
-                date_buckets[deposit_date] += 1
+            day_key = datetime.fromtimestamp(timestamp).date().isoformat()
+            counts_by_day[day_key] = counts_by_day.get(day_key, 0) + 1
+    return build_daily_trend_from_counts(counts_by_day, days=days)
+
 
+def build_daily_trend_from_counts(counts_by_day: dict[str, int], days: int = 7) -> dict[str, list]:
+    """Série diária a partir de contagens já agregadas por dia (chave YYYY-MM-DD)."""
+    today = datetime.now().date()
     ordered_dates = [today - timedelta(days=i) for i in range(days - 1, -1, -1)]
     return {
         'labels': [day.strftime('%a') for day in ordered_dates],
-        'values': [date_buckets[day] for day in ordered_dates]
+        'values': [int(counts_by_day.get(day.isoformat(), 0)) for day in ordered_dates]
     }
 
 
-def build_analytics_report(deposits: list[dict], interactions: list[dict]) -> dict:
-    """Consolida métricas de uso e impacto para relatório analítico."""
+def _parse_range_bound(value: str, name: str, inclusive_end: bool = False) -> datetime:
+    """Data (YYYY-MM-DD) ou data-hora ISO em horário local; `to` só com data inclui o dia inteiro."""
+    try:
+        if len(value) == 10:
+            day = date.fromisoformat(value)
+            return datetime.combine(day + timedelta(days=1) if inclusive_end else day, time.min)
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"Parâmetro '{name}' inválido: use YYYY-MM-DD ou data-hora ISO 8601") from None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed
+
+
+def parse_analytics_range(from_value: str | None, to_value: str | None, granularity: str | None,
+                          now: datetime | None = None) -> tuple[datetime, datetime, str]:
+    """Valida `from`/`to`/`granularity` da API e retorna o intervalo [início, fim) e a granularidade.
+
+    Para day/week/month o intervalo é estendido para dias inteiros (granularidade do rollup).
+
+    Levanta ValueError com mensagem para o cliente quando algum parâmetro é inválido.
+    """
+    granularity = (granularity or 'day').strip().lower()
+    if granularity not in ANALYTICS_GRANULARITIES:
+        raise ValueError(f"Granularidade inválida: use {', '.join(ANALYTICS_GRANULARITIES)}")
+    end = _parse_range_bound(to_value, 'to', inclusive_end=True) if to_value else (now or datetime.now())
+    start = _parse_range_bound(from_value, 'from') if from_value else end - ANALYTICS_DEFAULT_SPANS[granularity]
+    if start >= end:
+        raise ValueError("Intervalo vazio: 'from' deve ser anterior a 'to'")
+    if granularity != 'hour':
+        # O rollup só tem dias inteiros: arredonda para [00:00 do primeiro dia, 00:00 após o último)
+        start = datetime.combine(start.date(), time.min)
+        end = datetime.combine((end - timedelta(microseconds=1)).date() + timedelta(days=1), time.min)
+    return start, end, granularity
+
+
+def _bucket_start(granularity: str, moment: datetime) -> datetime:
+    if granularity == 'hour':
+        return moment.replace(minute=0, second=0, microsecond=0)
+    day = datetime.combine(moment.date(), time.min)
+    if granularity == 'week':
+        return day - timedelta(days=day.weekday())  # segunda-feira, igual ao bucket SQL
+    if granularity == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def _next_bucket(granularity: str, bucket: datetime) -> datetime:
+    if granularity == 'hour':
+        return bucket + timedelta(hours=1)
+    if granularity == 'week':
+        return bucket + timedelta(weeks=1)
+    if granularity == 'month':
+        return bucket.replace(year=bucket.year + bucket.month // 12, month=bucket.month % 12 + 1)
+    return bucket + timedelta(days=1)
+
+
+def _bucket_label(granularity: str, bucket: datetime) -> str:
+    if granularity == 'hour':
+        return bucket.strftime('%Y-%m-%dT%H:00')
+    if granularity == 'month':
+        return bucket.strftime('%Y-%m')
+    return bucket.date().isoformat()
+
+
+def bucket_labels(granularity: str, start: datetime, end: datetime,
+                  max_buckets: int = ANALYTICS_MAX_BUCKETS_DEFAULT) -> list[str]:
+    """Rótulos de todos os buckets de [start, end), no mesmo formato do GROUP BY do banco.
+
+    Levanta ValueError se passar de `max_buckets`, limitando o tamanho da resposta.
+    """
+    labels = []
+    bucket = _bucket_start(granularity, start)
+    while bucket < end:
+        if len(labels) == max_buckets:
+            raise ValueError(f"Intervalo gera mais de {max_buckets} buckets por {granularity}: "
+                             "reduza o período ou use uma granularidade maior")
+        labels.append(_bucket_label(granularity, bucket))
+        bucket = _next_bucket(granularity, bucket)
+    return labels
+
+
+def build_analytics_report(deposits: list[dict] | None = None, interactions: list[dict] | None = None, *,
+                           buckets: list[dict] | None = None, granularity: str = 'day',
+                           labels: list[str] | None = None, trend_days: int = 7) -> dict:
+    """Consolida métricas de uso e impacto para relatório analítico.
+
+    Com `buckets` (linhas já agregadas por bucket e resultado, ver `get_analytics_buckets`)
+    as listas brutas não são usadas; com `labels` a resposta ganha a série densa `series`
+    no lugar de `trend_7d`.
+    """
+    if buckets is not None:
+        return _report_from_buckets(buckets, granularity, labels, trend_days)
+
+    deposits = deposits or []
+    interactions = interactions or []
     total_interactions = len(interactions)
     aceitas = len(deposits)
     rejeitadas = max(total_interactions - aceitas, 0)
@@ -67,3 +174,62 @@ def build_analytics_report(deposits: list[dict], interactions: list[dict]) -> di
         'interaction_results': results_distribution,
         'generated_at': datetime.now().isoformat()
     }
+
+
+def _report_from_buckets(buckets: list[dict], granularity: str, labels: list[str] | None,
+                         trend_days: int) -> dict:
+    total_interactions = sum(int(row['interactions']) for row in buckets)
+    aceitas = sum(int(row['deposits']) for row in buckets)
+    rejeitadas = max(total_interactions - aceitas, 0)
+    confidence_sum = sum(float(row['confidence_sum']) for row in buckets)
+    confidence_count = sum(int(row['confidence_count']) for row in buckets)
+    weight_sum = sum(float(row['weight_sum']) for row in buckets)
+    weight_count = sum(int(row['weight_count']) for row in buckets)
+
+    results_distribution: dict[str, int] = {}
+    interactions_by_bucket: dict[str, int] = {}
+    deposits_by_bucket: dict[str, int] = {}
+    for row in buckets:
+        if row['interactions']:
+            result_name = str(row['resultado'])
+            results_distribution[result_name] = results_distribution.get(result_name, 0) + int(row['interactions'])
+            interactions_by_bucket[row['bucket']] = interactions_by_bucket.get(row['bucket'], 0) + int(row['interactions'])
+        if row['deposits']:
+            deposits_by_bucket[row['bucket']] = deposits_by_bucket.get(row['bucket'], 0) + int(row['deposits'])
+
+    report = {
+        'kpis': {
+            'total_interactions': total_interactions,
+            'accepted_deposits': aceitas,
+            'rejected_or_failed': rejeitadas,
+            'acceptance_rate_percent': round((aceitas / total_interactions) * 100, 2) if total_interactions else 0.0,
+            'avg_ml_confidence': round(confidence_sum / confidence_count, 4) if confidence_count else 0.0,
+            'avg_weight_grams': round(weight_sum / weight_count, 2) if weight_count else 0.0,
+            'total_recycled_kg': round(weight_sum / 1000.0, 3)
+        },
+    }
+    if labels is None:
+        report['trend_7d'] = build_daily_trend_from_counts(deposits_by_bucket, days=trend_days)
+    else:
+        interactions_series = [interactions_by_bucket.get(label, 0) for label in labels]
+        deposits_series = [deposits_by_bucket.get(label, 0) for label in labels]
+        report['granularity'] = granularity
+        report['series'] = {
+            'labels': labels,
+            'interactions': interactions_series,
+            'accepted_deposits': deposits_series,
+            'rejected_or_failed': [max(total - accepted, 0) for total, accepted in zip(interactions_series, deposits_series)],
+            'acceptance_rate_percent': [
+                round(accepted / total * 100, 2) if total else 0.0
+                for total, accepted in zip(interactions_series, deposits_series)
+            ],
+        }
+    report['interaction_results'] = results_distribution
+    report['generated_at'] = datetime.now().isoformat()
+    return report
+
+
+def build_analytics_report_from_rollup(rollup_rows: list[dict], trend_days: int = 7) -> dict:
+    """Mesmo relatório de `build_analytics_report`, lido do rollup diário (O(dias), não O(eventos))."""
+    return build_analytics_report(buckets=[{**row, 'bucket': row['day']} for row in rollup_rows],
+                                  granularity='day', trend_days=trend_days)
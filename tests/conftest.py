@@ -1,15 +1,83 @@
 """
 Fixtures específicas para testes na pasta tests/.
 """
+import base64
+import threading
+
 import pytest
 import numpy as np
 import cv2
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 from pathlib import Path
 
+import app as app_module
 from app import app
+from src.hardware import esp32
 from src.modules.image import ImageClassifier
 from src.database.db import DatabaseConnection
+from src.database.pool import close_all_pools
+from src.database.repository import TotemRepository, open_repository
+
+
+@pytest.fixture(autouse=True)
+def reset_admission_controller():
+    """Isola contadores e token buckets de admissão entre testes."""
+    app_module.admission_controller = None
+    yield
+    app_module.admission_controller = None
+
+
+@pytest.fixture(autouse=True)
+def reset_period_stats():
+    """Cache de totais por período do dashboard não vaza entre testes com bancos falsos."""
+    app_module.period_stats = None
+    yield
+    app_module.period_stats = None
+
+
+@pytest.fixture(autouse=True)
+def reset_esp32_breakers():
+    """Falhas simuladas num teste não deixam circuitos abertos, backoff de login nem telemetria para o próximo."""
+    esp32.esp32_breakers.reset()
+    esp32.token_refresher.reset()
+    esp32.telemetry_store.reset()
+    esp32.esp32_capabilities = frozenset()
+    yield
+    # A validação ESP32 em background do /api/validate-complete sobrevive ao teste e, com os
+    # patches já desfeitos, registra falhas de login reais; espera ela antes de limpar o estado
+    for thread in threading.enumerate():
+        if thread.name.endswith('(validate_esp32_background)'):
+            thread.join(timeout=5)
+    esp32.esp32_breakers.reset()
+    esp32.token_refresher.reset()
+    esp32.telemetry_store.reset()
+    esp32.esp32_capabilities = frozenset()
+
+
+# Backends do repositório escolhidos por DATABASE_URL: testes que usam `repository` rodam em ambos
+DATABASE_URL_TEMPLATES = {
+    'sqlite': 'sqlite:///{path}',                # DatabaseConnection (padrão, pool WAL)
+    'sqlalchemy': 'sqlite+pysqlite:///{path}',   # SQLAlchemyRepository (mesmo código do banco compartilhado)
+}
+
+
+@pytest.fixture(params=sorted(DATABASE_URL_TEMPLATES))
+def database_url(request, tmp_path) -> str:
+    """DATABASE_URL de um banco temporário, um parâmetro por backend."""
+    return DATABASE_URL_TEMPLATES[request.param].format(path=tmp_path / f"{request.param}.db")
+
+
+@pytest.fixture
+def repository(database_url) -> TotemRepository:
+    """Repositório aberto por `open_repository(DATABASE_URL)` e usado pelo app nas rotas."""
+    repo = open_repository(database_url)
+    repo.init_db()
+    with patch('app.DATABASE_URL', database_url), patch('app.db_connection', repo):
+        yield repo
+    close = getattr(repo, 'close', None)
+    if close is not None:
+        close()
+    close_all_pools()
 
 
 @pytest.fixture
@@ -29,6 +97,17 @@ def mock_classifier() -> ImageClassifier:
     return classifier
 
 
+@pytest.fixture
+def sqlite_database(tmp_path) -> DatabaseConnection:
+    """DatabaseConnection num arquivo temporário com migrações aplicadas; pools fechados ao final."""
+    db = DatabaseConnection(str(tmp_path / "totem.db"))
+    db.init_db()
+    yield db
+    if db.writer is not None:
+        db.writer.close()
+    close_all_pools()
+
+
 @pytest.fixture
 def test_db(tmp_path) -> DatabaseConnection:
     """Banco de dados SQLite em memória/temp para testes."""
@@ -47,6 +126,14 @@ def create_image_with_saturation(saturation: int, size: int = 128) -> np.ndarray
     return cv2.cvtColor(hsv, cv2.COLOR_HSV2BGR)
 
 
+@pytest.fixture
+def image_b64() -> str:
+    """JPEG 16x16 em base64, como o totem envia no campo `image`."""
+    ok, buffer = cv2.imencode('.jpg', np.zeros((16, 16, 3), dtype=np.uint8))
+    assert ok
+    return base64.b64encode(buffer).decode('utf-8')
+
+
 @pytest.fixture
 def high_saturation_image() -> np.ndarray:
     """Imagem com saturação alta (>120) → deve classificar como tampinha."""
@@ -196,6 +196,26 @@ class TestApiAdminLogin:
         assert data['success'] is True
 
 
+def _dashboard_db(aceitas: int = 0, total_interacoes: int = 0, peso_total: float = 0.0) -> MagicMock:
+    """DatabaseConnection falso com os agregados usados pelo dashboard."""
+    mock_db = MagicMock()
+    mock_db.count_deposits.return_value = aceitas
+    mock_db.get_total_interacoes.return_value = total_interacoes
+    mock_db.sum_deposit_weight_grams.return_value = peso_total
+    mock_db.get_daily_deposit_counts.return_value = {}
+    mock_db.get_latest_deposits.return_value = []
+    mock_db.get_rollup_totals.return_value = {'interactions': 0, 'deposits': 0}
+    return mock_db
+
+
+def _rollup_row(resultado: str, day: str = '2026-01-01', **metrics) -> dict:
+    """Linha de daily_rollup com métricas zeradas por padrão."""
+    row = {'day': day, 'resultado': resultado, 'interactions': 0, 'deposits': 0, 'confidence_sum': 0.0,
+           'confidence_count': 0, 'weight_sum': 0.0, 'weight_count': 0, 'plastico_sum': 0.0}
+    row.update(metrics)
+    return row
+
+
 class TestApiAdminDashboard:
     """Testes da rota GET /api/admin/dashboard."""
 
@@ -204,9 +224,7 @@ class TestApiAdminDashboard:
         with patch('app.is_admin_authenticated', return_value=True), \
              patch('app._ensure_db_connection') as mock_db_ctx:
             
-            mock_db = MagicMock()
-            mock_db.get_all_deposits.return_value = []
-            mock_db.get_total_interacoes.return_value = 0
+            mock_db = _dashboard_db()
             mock_db_ctx.return_value.__enter__.return_value = mock_db
             mock_db_ctx.return_value.__exit__.return_value = None
             
@@ -255,9 +273,7 @@ class TestApiAdminDashboard:
         with patch('app.is_admin_authenticated', return_value=True), \
              patch('app._ensure_db_connection') as mock_db_ctx:
             
-            mock_db = MagicMock()
-            mock_db.get_all_deposits.return_value = []
-            mock_db.get_total_interacoes.return_value = 5
+            mock_db = _dashboard_db(total_interacoes=5)
             mock_db_ctx.return_value.__enter__.return_value = mock_db
             mock_db_ctx.return_value.__exit__.return_value = None
             
@@ -277,13 +293,8 @@ class TestApiAdminDashboard:
         with patch('app.is_admin_authenticated', return_value=True), \
              patch('app._ensure_db_connection') as mock_db_ctx:
             
-            mock_db = MagicMock()
             # 2 depósitos de 1000g cada = 2kg, impacto = 2kg * 0.002 = 0.004
-            mock_db.get_all_deposits.return_value = [
-                {'weight_value': 1000},
-                {'weight_value': 1000},
-            ]
-            mock_db.get_total_interacoes.return_value = 2
+            mock_db = _dashboard_db(aceitas=2, total_interacoes=2, peso_total=2000.0)
             mock_db_ctx.return_value.__enter__.return_value = mock_db
             mock_db_ctx.return_value.__exit__.return_value = None
             
@@ -293,15 +304,12 @@ class TestApiAdminDashboard:
         assert data['stats']['impacto'] == 0.004
 
     def test_dashboard_limita_depositos_aos_10_ultimos(self, client):
-        """Retorna apenas os 10 últimos depósitos."""
+        """Busca apenas os 10 últimos depósitos (LIMIT no SQL), sem carregar o histórico."""
         with patch('app.is_admin_authenticated', return_value=True), \
              patch('app._ensure_db_connection') as mock_db_ctx:
             
-            mock_db = MagicMock()
-            # 15 depósitos, mas deve retornar apenas 10
-            deposits = [{'id': i} for i in range(15)]
-            mock_db.get_all_deposits.return_value = deposits
-            mock_db.get_total_interacoes.return_value = 15
+            mock_db = _dashboard_db(aceitas=15, total_interacoes=15)
+            mock_db.get_latest_deposits.return_value = [{'id': i} for i in range(10)]
             mock_db_ctx.return_value.__enter__.return_value = mock_db
             mock_db_ctx.return_value.__exit__.return_value = None
             
@@ -309,15 +317,15 @@ class TestApiAdminDashboard:
         
         data = response.get_json()
         assert len(data['deposits']) == 10
+        mock_db.get_latest_deposits.assert_called_once_with(limit=10)
+        mock_db.get_all_deposits.assert_not_called()
 
     def test_dashboard_trend_tem_7_dias(self, client):
         """Verifica que trend contém dados de 7 dias."""
         with patch('app.is_admin_authenticated', return_value=True), \
              patch('app._ensure_db_connection') as mock_db_ctx:
             
-            mock_db = MagicMock()
-            mock_db.get_all_deposits.return_value = []
-            mock_db.get_total_interacoes.return_value = 0
+            mock_db = _dashboard_db()
             mock_db_ctx.return_value.__enter__.return_value = mock_db
             mock_db_ctx.return_value.__exit__.return_value = None
             
@@ -333,9 +341,7 @@ class TestApiAdminDashboard:
         with patch('app.is_admin_authenticated', return_value=True), \
              patch('app._ensure_db_connection') as mock_db_ctx:
             
-            mock_db = MagicMock()
-            mock_db.get_all_deposits.return_value = []
-            mock_db.get_total_interacoes.return_value = 0
+            mock_db = _dashboard_db()
             mock_db_ctx.return_value.__enter__.return_value = mock_db
             mock_db_ctx.return_value.__exit__.return_value = None
             
@@ -357,8 +363,7 @@ class TestApiAdminAnalyticsReport:
              patch('app._ensure_db_connection') as mock_db_ctx:
             
             mock_db = MagicMock()
-            mock_db.get_all_deposits.return_value = []
-            mock_db.get_all_interactions.return_value = []
+            mock_db.get_daily_rollup.return_value = []
             mock_db_ctx.return_value.__enter__.return_value = mock_db
             mock_db_ctx.return_value.__exit__.return_value = None
             
@@ -399,8 +404,7 @@ class TestApiAdminAnalyticsReport:
              patch('app._ensure_db_connection') as mock_db_ctx:
             
             mock_db = MagicMock()
-            mock_db.get_all_deposits.return_value = []
-            mock_db.get_all_interactions.return_value = []
+            mock_db.get_daily_rollup.return_value = []
             mock_db_ctx.return_value.__enter__.return_value = mock_db
             mock_db_ctx.return_value.__exit__.return_value = None
             
@@ -417,14 +421,11 @@ class TestApiAdminAnalyticsReport:
              patch('app._ensure_db_connection') as mock_db_ctx:
             
             mock_db = MagicMock()
-            mock_db.get_all_deposits.return_value = [
-                {'ml_confidence': 0.9, 'weight_value': 1000},
-                {'ml_confidence': 0.8, 'weight_value': 2000},
-            ]
-            mock_db.get_all_interactions.return_value = [
-                {'resultado': 'sucesso'},
-                {'resultado': 'sucesso'},
-                {'resultado': 'rejeitado'},
+            # 2 depósitos (confiança 0.9/0.8, 1000g/2000g) e 3 interações (2 sucesso, 1 rejeitado)
+            mock_db.get_daily_rollup.return_value = [
+                _rollup_row('sucesso', interactions=2, deposits=2, confidence_sum=1.7, confidence_count=2,
+                            weight_sum=3000.0, weight_count=2),
+                _rollup_row('rejeitado', interactions=1),
             ]
             mock_db_ctx.return_value.__enter__.return_value = mock_db
             mock_db_ctx.return_value.__exit__.return_value = None
@@ -437,6 +438,90 @@ class TestApiAdminAnalyticsReport:
         assert kpis['accepted_deposits'] == 2
         assert kpis['acceptance_rate_percent'] > 0
 
+    def test_analytics_com_intervalo_e_granularidade(self, client):
+        """from/to/granularity consultam buckets agregados no banco e retornam série densa."""
+        with patch('app.is_admin_authenticated', return_value=True), \
+             patch('app._ensure_db_connection') as mock_db_ctx:
+
+            mock_db = MagicMock()
+            mock_db.get_analytics_buckets.return_value = [
+                {**_rollup_row('sucesso', interactions=2, deposits=2), 'bucket': '2026-01'},
+            ]
+            mock_db_ctx.return_value.__enter__.return_value = mock_db
+            mock_db_ctx.return_value.__exit__.return_value = None
+
+            response = client.get('/api/admin/analytics-report?from=2026-01-01&to=2026-03-31&granularity=month')
+
+        assert response.status_code == 200
+        report = response.get_json()['report']
+        assert mock_db.get_analytics_buckets.call_args.args[0] == 'month'
+        mock_db.get_daily_rollup.assert_not_called()
+        assert report['series']['labels'] == ['2026-01', '2026-02', '2026-03']
+        assert report['series']['interactions'] == [2, 0, 0]
+        assert report['kpis']['total_interactions'] == 2
+
+    def test_analytics_retorna_400_com_parametros_invalidos(self, client):
+        """Granularidade desconhecida ou intervalo acima do limite de buckets retornam 400."""
+        with patch('app.is_admin_authenticated', return_value=True), \
+             patch('app._ensure_db_connection') as mock_db_ctx:
+            invalid = client.get('/api/admin/analytics-report?granularity=minute')
+            too_many = client.get('/api/admin/analytics-report?from=2020-01-01&to=2026-01-01&granularity=hour')
+
+        assert invalid.status_code == 400
+        assert too_many.status_code == 400
+        assert too_many.get_json()['status'] == 'erro'
+        mock_db_ctx.assert_not_called()
+
+
+class TestApiAdminExport:
+    """Testes da rota GET /api/admin/export/<table> (stream com cursor)."""
+
+    @pytest.fixture
+    def export_db(self, repository):
+        """Banco real nos dois backends (DATABASE_URL parametrizado no conftest), usado pelo app."""
+        from src.database.db import DatabaseConnection
+
+        for _ in range(5):
+            repository.save_interaction(DatabaseConnection.ResultadoInteracao.REJEITADO)
+        return repository
+
+    def test_exporta_csv_em_paginas_com_cursor(self, client, export_db):
+        """limit + X-Next-Cursor percorre a tabela sem repetir linhas."""
+        with patch('app.is_admin_authenticated', return_value=True):
+            first = client.get('/api/admin/export/interactions?limit=3')
+            cursor = first.headers['X-Next-Cursor']
+            second = client.get(f'/api/admin/export/interactions?limit=3&cursor={cursor}')
+
+        assert first.status_code == 200
+        assert first.mimetype == 'text/csv'
+        first_lines = first.get_data(as_text=True).splitlines()
+        assert first_lines[0] == 'id,deposit_id,timestamp,resultado'
+        assert [line.split(',')[0] for line in first_lines[1:]] == ['1', '2', '3']
+        assert 'X-Next-Cursor' not in second.headers
+        assert [line.split(',')[0] for line in second.get_data(as_text=True).splitlines()] == ['4', '5']
+
+    def test_exporta_ndjson_completo(self, client, export_db):
+        """Sem limit, o stream vai até o fim da tabela."""
+        with patch('app.is_admin_authenticated', return_value=True):
+            response = client.get('/api/admin/export/interactions?format=ndjson')
+
+        records = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        assert response.mimetype == 'application/x-ndjson'
+        assert [record['id'] for record in records] == [1, 2, 3, 4, 5]
+
+    def test_parametros_invalidos(self, client, export_db):
+        """Tabela desconhecida → 404; formato, cursor ou limit inválidos → 400."""
+        with patch('app.is_admin_authenticated', return_value=True):
+            assert client.get('/api/admin/export/sqlite_master').status_code == 404
+            assert client.get('/api/admin/export/deposits?format=xml').status_code == 400
+            assert client.get('/api/admin/export/deposits?cursor=%25%25').status_code == 400
+            assert client.get('/api/admin/export/deposits?limit=0').status_code == 400
+
+    def test_export_retorna_401_sem_autenticacao(self, client):
+        with patch('app.is_admin_authenticated', return_value=False):
+            response = client.get('/api/admin/export/deposits')
+        assert response.status_code == 401
+
 
 class TestAdminAuthenticationHelper:
     """Testes da função is_admin_authenticated."""
@@ -52,11 +52,15 @@ class TestAdminCompleteFlow:
              patch('app._ensure_db_connection') as mock_db_ctx:
             
             mock_db = MagicMock()
-            mock_db.get_all_deposits.return_value = [
+            mock_db.count_deposits.return_value = 2
+            mock_db.get_total_interacoes.return_value = 5
+            mock_db.sum_deposit_weight_grams.return_value = 2000.0
+            mock_db.get_daily_deposit_counts.return_value = {}
+            mock_db.get_rollup_totals.return_value = {'interactions': 0, 'deposits': 0}
+            mock_db.get_latest_deposits.return_value = [
                 {'weight_value': 500, 'ml_confidence': 0.9},
                 {'weight_value': 1500, 'ml_confidence': 0.85},
             ]
-            mock_db.get_total_interacoes.return_value = 5
             mock_db_ctx.return_value.__enter__.return_value = mock_db
             mock_db_ctx.return_value.__exit__.return_value = None
             
@@ -76,16 +80,17 @@ class TestAdminCompleteFlow:
              patch('app._ensure_db_connection') as mock_db_ctx:
             
             mock_db = MagicMock()
-            mock_db.get_all_deposits.return_value = [
-                {'weight_value': 500, 'ml_confidence': 0.9},
-                {'weight_value': 1500, 'ml_confidence': 0.85},
-            ]
-            mock_db.get_all_interactions.return_value = [
-                {'resultado': 'sucesso'},
-                {'resultado': 'sucesso'},
-                {'resultado': 'rejeitado'},
-                {'resultado': 'sucesso'},
-                {'resultado': 'falha'},
+            # Rollup diário: 2 depósitos (500g/1500g) e 5 interações (3 sucesso, 1 rejeitado, 1 falha)
+            mock_db.get_daily_rollup.return_value = [
+                {'day': '2026-01-01', 'resultado': 'sucesso', 'interactions': 3, 'deposits': 2,
+                 'confidence_sum': 1.75, 'confidence_count': 2, 'weight_sum': 2000.0, 'weight_count': 2,
+                 'plastico_sum': 0.0},
+                {'day': '2026-01-01', 'resultado': 'rejeitado', 'interactions': 1, 'deposits': 0,
+                 'confidence_sum': 0.0, 'confidence_count': 0, 'weight_sum': 0.0, 'weight_count': 0,
+                 'plastico_sum': 0.0},
+                {'day': '2026-01-01', 'resultado': 'falha', 'interactions': 1, 'deposits': 0,
+                 'confidence_sum': 0.0, 'confidence_count': 0, 'weight_sum': 0.0, 'weight_count': 0,
+                 'plastico_sum': 0.0},
             ]
             mock_db_ctx.return_value.__enter__.return_value = mock_db
             mock_db_ctx.return_value.__exit__.return_value = None
@@ -158,8 +163,12 @@ class TestAdminCompleteFlow:
              patch('app._ensure_db_connection') as mock_db_ctx:
             
             mock_db = MagicMock()
-            mock_db.get_all_deposits.return_value = []
+            mock_db.count_deposits.return_value = 0
             mock_db.get_total_interacoes.return_value = 0
+            mock_db.sum_deposit_weight_grams.return_value = 0.0
+            mock_db.get_daily_deposit_counts.return_value = {}
+            mock_db.get_rollup_totals.return_value = {'interactions': 0, 'deposits': 0}
+            mock_db.get_latest_deposits.return_value = []
             mock_db_ctx.return_value.__enter__.return_value = mock_db
             mock_db_ctx.return_value.__exit__.return_value = None
             
@@ -189,8 +198,12 @@ class TestAdminHeadersAndSecurity:
              patch('app._ensure_db_connection') as mock_db_ctx:
             
             mock_db = MagicMock()
-            mock_db.get_all_deposits.return_value = []
+            mock_db.count_deposits.return_value = 0
             mock_db.get_total_interacoes.return_value = 0
+            mock_db.sum_deposit_weight_grams.return_value = 0.0
+            mock_db.get_daily_deposit_counts.return_value = {}
+            mock_db.get_rollup_totals.return_value = {'interactions': 0, 'deposits': 0}
+            mock_db.get_latest_deposits.return_value = []
             mock_db_ctx.return_value.__enter__.return_value = mock_db
             mock_db_ctx.return_value.__exit__.return_value = None
             
@@ -205,8 +218,7 @@ class TestAdminHeadersAndSecurity:
              patch('app._ensure_db_connection') as mock_db_ctx:
             
             mock_db = MagicMock()
-            mock_db.get_all_deposits.return_value = []
-            mock_db.get_all_interactions.return_value = []
+            mock_db.get_daily_rollup.return_value = []
             mock_db_ctx.return_value.__enter__.return_value = mock_db
             mock_db_ctx.return_value.__exit__.return_value = None
             
@@ -258,8 +270,12 @@ class TestAdminDataValidation:
              patch('app._ensure_db_connection') as mock_db_ctx:
             
             mock_db = MagicMock()
-            mock_db.get_all_deposits.return_value = []
+            mock_db.count_deposits.return_value = 0
             mock_db.get_total_interacoes.return_value = 0
+            mock_db.sum_deposit_weight_grams.return_value = 0.0
+            mock_db.get_daily_deposit_counts.return_value = {}
+            mock_db.get_rollup_totals.return_value = {'interactions': 0, 'deposits': 0}
+            mock_db.get_latest_deposits.return_value = []
             mock_db_ctx.return_value.__enter__.return_value = mock_db
             mock_db_ctx.return_value.__exit__.return_value = None
             
@@ -278,8 +294,7 @@ class TestAdminDataValidation:
              patch('app._ensure_db_connection') as mock_db_ctx:
             
             mock_db = MagicMock()
-            mock_db.get_all_deposits.return_value = []
-            mock_db.get_all_interactions.return_value = []
+            mock_db.get_daily_rollup.return_value = []
             mock_db_ctx.return_value.__enter__.return_value = mock_db
             mock_db_ctx.return_value.__exit__.return_value = None
             
@@ -298,8 +313,12 @@ class TestAdminDataValidation:
              patch('app._ensure_db_connection') as mock_db_ctx:
             
             mock_db = MagicMock()
-            mock_db.get_all_deposits.return_value = []
+            mock_db.count_deposits.return_value = 0
             mock_db.get_total_interacoes.return_value = 0
+            mock_db.sum_deposit_weight_grams.return_value = 0.0
+            mock_db.get_daily_deposit_counts.return_value = {}
+            mock_db.get_rollup_totals.return_value = {'interactions': 0, 'deposits': 0}
+            mock_db.get_latest_deposits.return_value = []
             mock_db_ctx.return_value.__enter__.return_value = mock_db
             mock_db_ctx.return_value.__exit__.return_value = None
             
@@ -316,12 +335,13 @@ class TestAdminDataValidation:
              patch('app._ensure_db_connection') as mock_db_ctx:
             
             mock_db = MagicMock()
-            mock_db.get_all_deposits.return_value = [
-                {'ml_confidence': 0.9, 'weight_value': 1000}
-            ]
-            mock_db.get_all_interactions.return_value = [
-                {'resultado': 'sucesso'},
-                {'resultado': 'rejeitado'},
+            mock_db.get_daily_rollup.return_value = [
+                {'day': '2026-01-01', 'resultado': 'sucesso', 'interactions': 1, 'deposits': 1,
+                 'confidence_sum': 0.9, 'confidence_count': 1, 'weight_sum': 1000.0, 'weight_count': 1,
+                 'plastico_sum': 0.0},
+                {'day': '2026-01-01', 'resultado': 'rejeitado', 'interactions': 1, 'deposits': 0,
+                 'confidence_sum': 0.0, 'confidence_count': 0, 'weight_sum': 0.0, 'weight_count': 0,
+                 'plastico_sum': 0.0},
             ]
             mock_db_ctx.return_value.__enter__.return_value = mock_db
             mock_db_ctx.return_value.__exit__.return_value = None
@@ -0,0 +1,266 @@
+"""
+Testes de controle de admissão — rate limit por totem e semáforo de inferência.
+
+Cobre:
+    parse_route_policy, TokenBucket, RateLimiter, InferenceAdmission, AdmissionController
+    429 + Retry-After nas rotas de inferência, vaga do semáforo só durante a classificação
+    (ESP32 lento não descarta outras requisições) e contadores em /api/admin/metrics
+"""
+from __future__ import annotations
+
+import base64
+import threading
+from io import BytesIO
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+import app as app_module
+from app import app
+from src.modules.admission import (
+    AdmissionController,
+    InferenceAdmission,
+    InferenceSaturated,
+    RateLimiter,
+    RoutePolicy,
+    ShedReason,
+    TokenBucket,
+    parse_route_policy,
+)
+from src.modules.inference_pool import InferenceResult
+
+TAMPINHA = InferenceResult(1, 0.95, 130.0, 'SAT_HIGH')
+
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    with app.test_client() as flask_client:
+        yield flask_client
+
+
+# =============================================================================
+# TestParseRoutePolicy
+# =============================================================================
+
+class TestParseRoutePolicy:
+    @pytest.mark.parametrize("spec,requests,period,burst", [
+        ('60/min', 60, 60.0, 60),
+        ('2/s:5', 2, 1.0, 5),
+        ('600/hour:30', 600, 3600.0, 30),
+    ])
+    def test_formatos_validos(self, spec, requests, period, burst):
+        policy = parse_route_policy(spec)
+        assert (policy.requests, policy.period_seconds, policy.burst) == (requests, period, burst)
+
+    @pytest.mark.parametrize("spec", ['abc', '10/dia', '0/min', '10/min:0'])
+    def test_formatos_invalidos_levantam_value_error(self, spec):
+        with pytest.raises(ValueError):
+            parse_route_policy(spec)
+
+
+# =============================================================================
+# TestTokenBucket / TestRateLimiter
+# =============================================================================
+
+class TestTokenBucket:
+    def test_permite_ate_o_burst_e_depois_nega(self):
+        bucket = TokenBucket(rate_per_second=1.0, burst=3, now=0.0)
+        assert [bucket.try_acquire(0.0)[0] for _ in range(4)] == [True, True, True, False]
+
+    def test_repoe_tokens_com_o_tempo(self):
+        bucket = TokenBucket(rate_per_second=2.0, burst=1, now=0.0)
+        bucket.try_acquire(0.0)
+        allowed, retry_after = bucket.try_acquire(0.1)
+        assert allowed is False
+        assert retry_after == pytest.approx(0.4)
+        assert bucket.try_acquire(0.5)[0] is True
+
+
+class TestRateLimiter:
+    def test_buckets_independentes_por_totem(self):
+        limiter = RateLimiter(RoutePolicy(requests=1, period_seconds=60, burst=1))
+        assert limiter.try_acquire('kiosk:a')[0] is True
+        assert limiter.try_acquire('kiosk:a')[0] is False
+        assert limiter.try_acquire('kiosk:b')[0] is True
+
+    def test_numero_de_clientes_limitado(self):
+        limiter = RateLimiter(RoutePolicy(requests=1, period_seconds=60, burst=1), max_clients=2)
+        for key in ('a', 'b', 'c'):
+            limiter.try_acquire(key)
+        assert list(limiter._buckets) == ['b', 'c']
+
+
+# =============================================================================
+# TestInferenceAdmission
+# =============================================================================
+
+class TestInferenceAdmission:
+    def test_sem_fila_descarta_quando_cheio(self):
+        admission = InferenceAdmission(max_in_flight=1, max_queue=0)
+        assert admission.acquire() is True
+        assert admission.acquire() is False
+
+    def test_fila_expira_apos_timeout(self):
+        admission = InferenceAdmission(max_in_flight=1, max_queue=1, queue_timeout_seconds=0.05)
+        admission.acquire()
+        assert admission.acquire() is False
+        assert admission.waiting == 0
+
+    def test_requisicao_na_fila_entra_quando_vaga_libera(self):
+        admission = InferenceAdmission(max_in_flight=1, max_queue=1, queue_timeout_seconds=5)
+        admission.acquire()
+        results = []
+        waiter = threading.Thread(target=lambda: results.append(admission.acquire()))
+        waiter.start()
+
+        admission.release()
+        waiter.join(timeout=5)
+
+        assert results == [True]
+        assert admission.in_flight == 1
+
+
+# =============================================================================
+# TestAdmissionController
+# =============================================================================
+
+class TestAdmissionController:
+    def test_contabiliza_atendidas_e_descartadas(self):
+        controller = AdmissionController(
+            {'classify': RoutePolicy(requests=1, period_seconds=60, burst=1)},
+            InferenceAdmission(max_in_flight=4, max_queue=0)
+        )
+        first = controller.admit('classify', 'kiosk:a')
+        controller.release()
+        second = controller.admit('classify', 'kiosk:a')
+
+        assert first.admitted is True
+        assert second.admitted is False
+        assert second.reason == ShedReason.RATE_LIMITED
+        assert second.retry_after_seconds >= 1
+        snapshot = controller.snapshot()
+        assert snapshot['routes']['classify'] == {'served': 1, 'shed_rate_limited': 1, 'shed_saturated': 0}
+
+    def test_saturacao_descarta_com_motivo_saturated(self):
+        controller = AdmissionController({}, InferenceAdmission(max_in_flight=1, max_queue=0))
+        controller.admit('classify', 'kiosk:a')
+        decision = controller.admit('classify', 'kiosk:b')
+        assert decision.reason == ShedReason.SATURATED
+        assert controller.snapshot()['totals']['shed_saturated'] == 1
+
+    def test_rate_limit_nao_ocupa_vaga(self):
+        controller = AdmissionController({}, InferenceAdmission(max_in_flight=1, max_queue=0))
+        assert controller.check_rate('classify', 'kiosk:a').admitted is True
+        assert controller.admission.in_flight == 0
+
+    def test_inference_slot_libera_ao_sair_e_levanta_quando_saturado(self):
+        controller = AdmissionController({}, InferenceAdmission(max_in_flight=1, max_queue=0))
+        with controller.inference_slot('classify'):
+            assert controller.admission.in_flight == 1
+            with pytest.raises(InferenceSaturated) as exc_info:
+                with controller.inference_slot('classify'):
+                    pass
+        assert exc_info.value.decision.reason == ShedReason.SATURATED
+        assert controller.admission.in_flight == 0
+
+
+# =============================================================================
+# TestAdmissionRoutes
+# =============================================================================
+
+class TestAdmissionRoutes:
+    def test_totem_acima_do_limite_recebe_429_com_retry_after(self, client):
+        app_module.admission_controller = AdmissionController(
+            {'classify': RoutePolicy(requests=1, period_seconds=60, burst=1)}
+        )
+        headers = {'X-Kiosk-Id': 'totem-01'}
+        client.post('/api/classify', json={}, headers=headers)
+        response = client.post('/api/classify', json={}, headers=headers)
+
+        assert response.status_code == 429
+        assert int(response.headers['Retry-After']) >= 1
+        data = response.get_json()
+        assert data['status'] == 'erro'
+        assert data['reason'] == 'rate_limited'
+        assert 'timestamp' in data
+
+    def test_outro_totem_nao_e_afetado(self, client):
+        app_module.admission_controller = AdmissionController(
+            {'classify': RoutePolicy(requests=1, period_seconds=60, burst=1)}
+        )
+        client.post('/api/classify', json={}, headers={'X-Kiosk-Id': 'totem-01'})
+        response = client.post('/api/classify', json={}, headers={'X-Kiosk-Id': 'totem-02'})
+        assert response.status_code == 400
+
+    def test_servidor_saturado_retorna_429(self, client, image_b64):
+        saturated = InferenceAdmission(max_in_flight=1, max_queue=0)
+        saturated.acquire()
+        app_module.admission_controller = AdmissionController({}, saturated)
+
+        with patch('app._ensure_image_classifier', return_value=MagicMock()), \
+                patch('app._classify_image', return_value=TAMPINHA) as mock_classify:
+            response = client.post('/api/save_deposit', json={'image': image_b64})
+
+        assert response.status_code == 429
+        assert response.get_json()['reason'] == 'saturated'
+        mock_classify.assert_not_called()
+
+    def test_semaforo_liberado_apos_requisicao(self, client, image_b64):
+        with patch('app._ensure_image_classifier', return_value=MagicMock()), \
+                patch('app._classify_image', return_value=TAMPINHA):
+            client.post('/api/classify', json={'image': image_b64})
+        assert app_module.admission_controller.admission.in_flight == 0
+
+    def test_esp32_lento_nao_segura_vaga_de_inferencia(self, image_b64):
+        app.config['TESTING'] = True
+        app_module.admission_controller = AdmissionController({}, InferenceAdmission(max_in_flight=1, max_queue=0))
+        esp32_called, unblock = threading.Event(), threading.Event()
+        responses = {}
+
+        def esp32_travado(*args, **kwargs):
+            esp32_called.set()
+            unblock.wait(timeout=5)
+            raise app_module.requests.exceptions.Timeout('ESP32 não respondeu')
+
+        def validar_mecanica():
+            with app.test_client() as slow_client:
+                responses['mechanical'] = slow_client.post('/api/validate_mechanical', data={
+                    'image': (BytesIO(base64.b64decode(image_b64)), 'cap.jpg')
+                }, content_type='multipart/form-data')
+
+        with patch('app._ensure_image_classifier', return_value=MagicMock()), \
+                patch('app._classify_image', return_value=TAMPINHA), \
+                patch('app.requests.post', side_effect=esp32_travado), patch('app.db_connection', None):
+            worker = threading.Thread(target=validar_mecanica)
+            worker.start()
+            try:
+                assert esp32_called.wait(timeout=5)
+                in_flight_during_esp32 = app_module.admission_controller.admission.in_flight
+                with app.test_client() as other_client:
+                    other = other_client.post('/api/classify', json={'image': image_b64})
+            finally:
+                unblock.set()
+                worker.join(timeout=10)
+
+        assert in_flight_during_esp32 == 0
+        assert other.status_code == 200
+        assert responses['mechanical'].status_code == 200
+        assert app_module.admission_controller.snapshot()['totals']['shed_saturated'] == 0
+
+    def test_metrics_expoe_contadores_de_admissao(self, client, image_b64):
+        with patch('app._ensure_image_classifier', return_value=MagicMock()), \
+                patch('app._classify_image', return_value=TAMPINHA):
+            client.post('/api/classify', json={'image': image_b64})
+        with patch('app.is_admin_authenticated', return_value=True):
+            response = client.get('/api/admin/metrics')
+
+        assert response.status_code == 200
+        admission = response.get_json()['metrics']['admission']
+        assert admission['routes']['classify']['served'] == 1
+        assert admission['totals']['shed_saturated'] == 0
+
+    def test_metrics_sem_token_retorna_401(self, client):
+        with patch('app.is_admin_authenticated', return_value=False):
+            response = client.get('/api/admin/metrics')
+        assert response.status_code == 401
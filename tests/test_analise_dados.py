@@ -0,0 +1,68 @@
+"""
+Testes de scripts/analise_dados.py (leitura em blocos, CSV de duas seções e Parquet por mês).
+"""
+import csv
+from datetime import datetime
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("matplotlib")
+pytest.importorskip("seaborn")
+pytest.importorskip("pyarrow")
+
+from scripts.analise_dados import analyze  # noqa: E402
+from src.database.db import DatabaseConnection  # noqa: E402
+from src.database.pool import close_all_pools  # noqa: E402
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = tmp_path / "analise.db"
+    db = DatabaseConnection(str(path))
+    db.init_db()
+    with db as conn_holder:
+        conn = conn_holder.conn
+        for month, weight in ((1, 2500), (2, None), (2, 2600)):
+            ts = datetime(2026, month, 10, 12).timestamp()
+            deposit_id = conn.execute(
+                'INSERT INTO deposits (timestamp, ml_confidence, weight_value, weight_ok) VALUES (?, ?, ?, ?)',
+                (ts, 0.9, weight, 1)).lastrowid
+            conn.execute("INSERT INTO interactions (deposit_id, timestamp, resultado) VALUES (?, ?, 'sucesso')",
+                         (deposit_id, ts))
+        conn.execute("INSERT INTO interactions (timestamp, resultado) VALUES (?, 'rejeitado')",
+                     (datetime(2026, 2, 11).timestamp(),))
+        conn.commit()
+    close_all_pools()
+    return path
+
+
+class TestAnaliseDados:
+    def test_blocos_pequenos_geram_as_mesmas_saidas(self, db_path, tmp_path):
+        output_dir = tmp_path / "out"
+        assert analyze(db_path, output_dir, chunk_rows=2) == {"deposits": 3, "interactions": 4}
+
+        with open(output_dir / "dados_exportados.csv", newline="", encoding="utf-8") as f:
+            rows = list(csv.reader(f))
+        assert rows[0] == ["id", "timestamp", "ml_confidence", "weight_value", "weight_ok", "plastico_reciclado_g"]
+        assert [row[3] for row in rows[1:4]] == ["2500", "", "2600"]
+        assert rows[4] == []
+        assert rows[5] == ["id", "deposit_id", "timestamp", "resultado"]
+        assert len(rows) == 10
+
+        for name in ("padrao_temporal.png", "distribuicao_resultados.png", "correlacao_confianca_peso.png"):
+            assert (output_dir / name).stat().st_size > 0
+
+    def test_parquet_particionado_por_mes(self, db_path, tmp_path):
+        output_dir = tmp_path / "out"
+        analyze(db_path, output_dir, chunk_rows=2)
+        analyze(db_path, output_dir, chunk_rows=2)  # reexecução substitui as partes
+
+        deposits = pd.read_parquet(output_dir / "parquet" / "deposits")
+        assert sorted(p.name for p in (output_dir / "parquet" / "deposits").iterdir()) == [
+            "month=2026-01", "month=2026-02"
+        ]
+        assert len(deposits) == 3
+        assert str(deposits["weight_value"].dtype) == "Int64"
+        interactions = pd.read_parquet(output_dir / "parquet" / "interactions")
+        assert interactions["resultado"].value_counts().to_dict() == {"sucesso": 3, "rejeitado": 1}
@@ -0,0 +1,138 @@
+"""
+Testes dos filtros de intervalo e granularidade do relatório analítico.
+
+Cobre:
+    Validação de from/to/granularity, rótulos de bucket com limite,
+    agregação por hora/dia/semana/mês no banco (SQLite e SQLAlchemy) e série densa do relatório
+"""
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+
+from src.database.db import DatabaseConnection
+from src.modules.sprint3_analytics import build_analytics_report, bucket_labels, parse_analytics_range
+
+SUCESSO = DatabaseConnection.ResultadoInteracao.SUCESSO
+REJEITADO = DatabaseConnection.ResultadoInteracao.REJEITADO
+
+
+@pytest.fixture
+def database(repository):
+    """Repositório nos dois backends (DATABASE_URL parametrizado no conftest)."""
+    return repository
+
+
+def _insert_at(db, moment: datetime, resultado, weight: float | None = None) -> None:
+    """Grava pela API do repositório com o relógio no instante desejado (triggers/rollup incluídos)."""
+    with patch('time.time', return_value=moment.timestamp()):
+        if weight is not None:
+            db.record_deposit_outcome(0.9, True, True, weight, 0.5, resultado)
+        else:
+            db.save_interaction(resultado)
+
+
+def _report(db, from_value: str, to_value: str, granularity: str) -> dict:
+    start, end, granularity = parse_analytics_range(from_value, to_value, granularity)
+    labels = bucket_labels(granularity, start, end, max_buckets=1000)
+    buckets = db.get_analytics_buckets(granularity, start.timestamp(), end.timestamp())
+    return build_analytics_report(buckets=buckets, granularity=granularity, labels=labels)
+
+
+# =============================================================================
+# TestParseAnalyticsRange
+# =============================================================================
+
+class TestParseAnalyticsRange:
+    def test_to_so_com_data_inclui_o_dia_inteiro(self):
+        start, end, granularity = parse_analytics_range('2026-01-01', '2026-01-31', 'day')
+        assert (start, end, granularity) == (datetime(2026, 1, 1), datetime(2026, 2, 1), 'day')
+
+    def test_hora_preserva_data_hora(self):
+        start, end, _ = parse_analytics_range('2026-01-01T08:30', '2026-01-01T10:00', 'hour')
+        assert (start, end) == (datetime(2026, 1, 1, 8, 30), datetime(2026, 1, 1, 10, 0))
+
+    def test_dia_arredonda_para_dias_inteiros(self):
+        start, end, _ = parse_analytics_range('2026-01-01T08:30', '2026-01-02T10:00', 'week')
+        assert (start, end) == (datetime(2026, 1, 1), datetime(2026, 1, 3))
+
+    def test_janela_padrao_quando_so_granularidade(self):
+        now = datetime(2026, 3, 10, 15, 20)
+        start, end, _ = parse_analytics_range(None, None, 'hour', now=now)
+        assert (start, end) == (datetime(2026, 3, 9, 15, 20), now)
+
+    @pytest.mark.parametrize('args', [
+        ('2026-01-01', '2026-01-31', 'minute'),
+        ('ontem', None, 'day'),
+        ('2026-02-01', '2026-01-01', 'day'),
+    ])
+    def test_parametros_invalidos(self, args):
+        with pytest.raises(ValueError):
+            parse_analytics_range(*args)
+
+
+# =============================================================================
+# TestBucketLabels
+# =============================================================================
+
+class TestBucketLabels:
+    def test_semana_comeca_na_segunda(self):
+        # 2026-01-01 é quinta-feira
+        assert bucket_labels('week', datetime(2026, 1, 1), datetime(2026, 1, 13)) == [
+            '2025-12-29', '2026-01-05', '2026-01-12'
+        ]
+
+    def test_mes_vira_o_ano(self):
+        assert bucket_labels('month', datetime(2025, 11, 15), datetime(2026, 2, 1)) == ['2025-11', '2025-12', '2026-01']
+
+    def test_limite_de_buckets(self):
+        assert len(bucket_labels('hour', datetime(2026, 1, 1), datetime(2026, 1, 2), max_buckets=24)) == 24
+        with pytest.raises(ValueError):
+            bucket_labels('hour', datetime(2026, 1, 1), datetime(2026, 1, 2, 1), max_buckets=24)
+
+
+# =============================================================================
+# TestAnalyticsBuckets
+# =============================================================================
+
+class TestAnalyticsBuckets:
+    def test_hora_agrega_tabelas_brutas_no_intervalo(self, database):
+        _insert_at(database, datetime(2026, 1, 5, 9, 10), SUCESSO, weight=2000)
+        _insert_at(database, datetime(2026, 1, 5, 9, 50), REJEITADO)
+        _insert_at(database, datetime(2026, 1, 5, 11, 0), SUCESSO, weight=3000)
+        _insert_at(database, datetime(2026, 1, 5, 12, 0), SUCESSO, weight=9999)  # fora do intervalo
+
+        report = _report(database, '2026-01-05T09:00', '2026-01-05T12:00', 'hour')
+
+        assert report['series']['labels'] == ['2026-01-05T09:00', '2026-01-05T10:00', '2026-01-05T11:00']
+        assert report['series']['interactions'] == [2, 0, 1]
+        assert report['series']['accepted_deposits'] == [1, 0, 1]
+        assert report['series']['acceptance_rate_percent'] == [50.0, 0.0, 100.0]
+        assert report['kpis']['total_recycled_kg'] == 5.0
+        assert report['interaction_results'] == {'sucesso': 2, 'rejeitado': 1}
+
+    @pytest.mark.parametrize('granularity', ['day', 'week', 'month'])
+    def test_rollup_reagrupado_bate_com_horas(self, database, granularity):
+        for day in (5, 6, 12, 31):
+            _insert_at(database, datetime(2026, 1, day, 10), SUCESSO, weight=1000)
+            _insert_at(database, datetime(2026, 1, day, 18), REJEITADO)
+        _insert_at(database, datetime(2026, 2, 1, 10), SUCESSO, weight=1000)
+
+        report = _report(database, '2026-01-01', '2026-01-31', granularity)
+        hourly = _report(database, '2026-01-01', '2026-01-31T23:59:59', 'hour')
+
+        assert report['kpis'] == hourly['kpis']
+        assert report['kpis']['total_interactions'] == 8
+        assert sum(report['series']['accepted_deposits']) == 4
+        assert 'trend_7d' not in report
+
+    def test_semana_agrupa_por_segunda_feira(self, database):
+        _insert_at(database, datetime(2026, 1, 5, 10), SUCESSO, weight=1000)   # segunda
+        _insert_at(database, datetime(2026, 1, 11, 10), SUCESSO, weight=1000)  # domingo
+        _insert_at(database, datetime(2026, 1, 12, 10), REJEITADO)              # segunda seguinte
+
+        report = _report(database, '2026-01-05', '2026-01-18', 'week')
+
+        assert report['series']['labels'] == ['2026-01-05', '2026-01-12']
+        assert report['series']['interactions'] == [2, 1]
+        assert report['series']['rejected_or_failed'] == [0, 1]
@@ -125,7 +125,7 @@ class TestValidateMechanicalUncoveredBranches:
         payload = {"image": (io.BytesIO(b"abc"), "img.jpg")}
         fake_img = np.zeros((8, 8, 3), dtype=np.uint8)
         fake_db = MagicMock()
-        fake_db.save_deposit_data.return_value = 123
+        fake_db.record_deposit_outcome.return_value = 123
         fake_ctx = MagicMock()
         fake_ctx.__enter__.return_value = fake_db
         fake_ctx.__exit__.return_value = None
@@ -140,8 +140,7 @@ class TestValidateMechanicalUncoveredBranches:
             mock_post.return_value = mock_resp
             response = client.post("/api/validate_mechanical", data=payload, content_type="multipart/form-data")
         assert response.status_code == 200
-        assert fake_db.save_deposit_data.called
-        assert fake_db.save_interaction.called
+        assert fake_db.record_deposit_outcome.called
 
     def test_validate_mechanical_timeout_esp32_usa_fallback(self, client):
         import requests
@@ -265,8 +264,7 @@ class TestValidateCompleteUncoveredBranches:
             mock_clf.classify_image.return_value = (1, 0.95, 120.0, "SAT_HIGH")
             response = client.post("/api/validate-complete", json=payload)
         assert response.status_code == 200
-        assert fake_db.save_deposit_data.called
-        assert fake_db.save_interaction.called
+        assert fake_db.record_deposit_outcome.called
 
     def test_validate_complete_sucesso_com_db_none(self, client):
         img_bytes = _img_bytes()
@@ -358,5 +356,4 @@ class TestValidateCompleteUncoveredBranches:
             mock_clf.classify_image.return_value = (1, 0.95, 120.0, "SAT_HIGH")
             response = client.post("/api/validate-complete", json=payload)
         assert response.status_code == 200
-        assert fake_db.save_deposit_data.called
-        assert fake_db.save_interaction.called
+        assert fake_db.record_deposit_outcome.called
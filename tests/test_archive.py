@@ -0,0 +1,125 @@
+"""
+Testes da retenção em arquivos frios mensais (src/database/archive.py).
+
+Cobre:
+    Movimentação por mês com manifesto, preservação do rollup e dos totais do dashboard,
+    reexecução idempotente, incremental_vacuum e consultas por hora com ATTACH dos arquivos
+"""
+from datetime import date, datetime
+
+import pytest
+
+from src.database.db import DatabaseConnection
+
+SUCESSO = DatabaseConnection.ResultadoInteracao.SUCESSO
+REJEITADO = DatabaseConnection.ResultadoInteracao.REJEITADO
+TODAY = date(2026, 6, 15)
+
+
+def _insert_at(db: DatabaseConnection, moment: datetime, resultado, weight: int | None = None) -> None:
+    ts = moment.timestamp()
+    with db as conn_holder:
+        conn = conn_holder.conn
+        deposit_id = None
+        if weight is not None:
+            deposit_id = conn.execute('INSERT INTO deposits (timestamp, ml_confidence, weight_value) VALUES (?, ?, ?)',
+                                      (ts, 0.9, weight)).lastrowid
+        conn.execute('INSERT INTO interactions (deposit_id, timestamp, resultado) VALUES (?, ?, ?)',
+                     (deposit_id, ts, resultado.value))
+        conn.commit()
+
+
+def _popular(db: DatabaseConnection) -> None:
+    _insert_at(db, datetime(2026, 1, 10, 9), SUCESSO, weight=2500)
+    _insert_at(db, datetime(2026, 1, 20, 9), REJEITADO)
+    _insert_at(db, datetime(2026, 2, 3, 14), SUCESSO, weight=2600)
+    _insert_at(db, datetime(2026, 6, 1, 10), SUCESSO, weight=2700)
+
+
+def _hot_count(db: DatabaseConnection, table: str) -> int:
+    with db as conn_holder:
+        return conn_holder.conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+
+
+# =============================================================================
+# TestArchiveRetention
+# =============================================================================
+
+class TestArchiveRetention:
+    def test_move_meses_antigos_e_preserva_rollup_e_totais(self, sqlite_database, tmp_path):
+        _popular(sqlite_database)
+        rollup_antes = sqlite_database.get_daily_rollup()
+
+        results = sqlite_database.archive_older_than(90, str(tmp_path / "archive"), today=TODAY)
+
+        assert [(r['month'], r['deposits'], r['interactions']) for r in results] == [
+            ('2026-01', 1, 2), ('2026-02', 1, 1)
+        ]
+        assert (tmp_path / "archive" / "totem_archive_2026-01.db").exists()
+        assert _hot_count(sqlite_database, 'interactions') == 1
+        assert sqlite_database.get_daily_rollup() == rollup_antes
+        assert sqlite_database.check_daily_rollup() == []
+        assert sqlite_database.count_deposits() == 3
+        assert sqlite_database.get_total_interacoes() == 4
+        assert sqlite_database.sum_deposit_weight_grams() == 7800
+
+    def test_rebuild_nao_apaga_rollup_arquivado(self, sqlite_database, tmp_path):
+        _popular(sqlite_database)
+        sqlite_database.archive_older_than(90, str(tmp_path / "archive"), today=TODAY)
+        rollup_antes = sqlite_database.get_daily_rollup()
+
+        sqlite_database.rebuild_daily_rollup()
+        assert sqlite_database.get_daily_rollup() == rollup_antes
+
+    def test_reexecucao_e_idempotente(self, sqlite_database, tmp_path):
+        _popular(sqlite_database)
+        archive_dir = str(tmp_path / "archive")
+        sqlite_database.archive_older_than(90, archive_dir, today=TODAY)
+        assert sqlite_database.archive_older_than(90, archive_dir, today=TODAY) == []
+
+        manifest = sqlite_database.get_archive_manifest()
+        assert [(m['month'], m['deposits'], m['interactions']) for m in manifest] == [
+            ('2026-01', 1, 2), ('2026-02', 1, 1)
+        ]
+        assert manifest[0]['path'] == 'archive/totem_archive_2026-01.db'
+
+    def test_ativa_incremental_vacuum(self, sqlite_database, tmp_path):
+        _popular(sqlite_database)
+        sqlite_database.archive_older_than(90, str(tmp_path / "archive"), today=TODAY)
+        with sqlite_database as conn_holder:
+            assert conn_holder.conn.execute('PRAGMA auto_vacuum').fetchone()[0] == 2
+
+    def test_retencao_minima(self, sqlite_database, tmp_path):
+        with pytest.raises(ValueError):
+            sqlite_database.archive_older_than(3, str(tmp_path / "archive"), today=TODAY)
+
+
+# =============================================================================
+# TestArchivedAnalytics
+# =============================================================================
+
+class TestArchivedAnalytics:
+    def test_consulta_por_hora_anexa_arquivos_do_intervalo(self, sqlite_database, tmp_path):
+        _popular(sqlite_database)
+        sqlite_database.archive_older_than(90, str(tmp_path / "archive"), today=TODAY)
+
+        start, end = datetime(2026, 1, 10).timestamp(), datetime(2026, 6, 2).timestamp()
+        buckets = sqlite_database.get_analytics_buckets('hour', start, end)
+
+        assert [(b['bucket'], b['resultado'], b['interactions'], b['deposits']) for b in buckets] == [
+            ('2026-01-10T09:00', 'sucesso', 1, 1),
+            ('2026-01-20T09:00', 'rejeitado', 1, 0),
+            ('2026-02-03T14:00', 'sucesso', 1, 1),
+            ('2026-06-01T10:00', 'sucesso', 1, 1),
+        ]
+        with sqlite_database as conn_holder:  # os arquivos são desanexados após a consulta
+            assert [row[1] for row in conn_holder.conn.execute('PRAGMA database_list')] == ['main']
+
+    def test_arquivo_ausente_e_ignorado(self, sqlite_database, tmp_path):
+        _popular(sqlite_database)
+        sqlite_database.archive_older_than(90, str(tmp_path / "archive"), today=TODAY)
+        (tmp_path / "archive" / "totem_archive_2026-02.db").unlink()
+
+        buckets = sqlite_database.get_analytics_buckets('hour', datetime(2026, 1, 1).timestamp(),
+                                                 datetime(2026, 3, 1).timestamp())
+        assert sum(b['interactions'] for b in buckets) == 2
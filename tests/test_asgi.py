@@ -0,0 +1,291 @@
+"""
+Testes do modo ASGI (asgi.py) — mesmo contrato /api/* do Flask com handlers assíncronos.
+
+Cobre:
+    Rotas portadas (/api/health, /api/save_deposit, /api/validate_mechanical)
+    Idempotência e admissão no ASGI
+    Rotas não portadas servidas pelo Flask montado
+    Validação ESP32 em background: confirmação não sobrevive a falhas
+    Cliente ESP32 assíncrono (httpx) e AsyncDatabaseConnection (aiosqlite)
+"""
+from __future__ import annotations
+
+import asyncio
+import base64
+import sqlite3
+from datetime import datetime
+from unittest.mock import patch
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from starlette.requests import Request
+
+import app as app_module
+import asgi
+from src.database.async_db import AsyncDatabaseConnection
+from src.database.db import DatabaseConnection
+from src.database.idempotency import IdempotencyStore
+from src.database.pool import close_all_pools
+from src.hardware import esp32
+from src.modules.admission import AdmissionController, InferenceAdmission, RoutePolicy
+from src.modules.inference_pool import InferenceResult
+
+
+@pytest.fixture
+def client():
+    return TestClient(asgi.app)
+
+
+@pytest.fixture
+def tampinha():
+    with patch('app._classify_image', return_value=InferenceResult(1, 0.93, 140.0, 'SAT_HIGH')) as mock:
+        yield mock
+
+
+@pytest.fixture
+def db(tmp_path):
+    connection = DatabaseConnection(str(tmp_path / "asgi.db"))
+    connection.init_db()
+    with patch('app.db_connection', connection):
+        yield connection
+    close_all_pools()
+
+
+@pytest.fixture
+def reset_esp32_client():
+    esp32.esp32_jwt_token = 'token'
+    esp32.esp32_token_expiry = datetime.now().timestamp() + 3600
+    yield
+    esp32._async_client = None
+    esp32.esp32_jwt_token = None
+    esp32.esp32_token_expiry = None
+
+
+# =============================================================================
+# TestAsgiRoutes
+# =============================================================================
+
+class TestAsgiRoutes:
+    def test_health(self, client):
+        response = client.get('/api/health')
+        assert response.status_code == 200
+        assert response.json()['status'] == 'ok'
+
+    def test_save_deposit_sem_json_retorna_400(self, client):
+        response = client.post('/api/save_deposit', data={'image': 'x'})
+        assert response.status_code == 400
+        data = response.json()
+        assert data['status'] == 'erro'
+        assert 'timestamp' in data
+
+    def test_save_deposit_grava_via_aiosqlite(self, client, tampinha, db, image_b64):
+        response = client.post('/api/save_deposit', json={'image': image_b64})
+
+        assert response.status_code == 200
+        deposit_id = response.json()['deposit_id']
+        with sqlite3.connect(db.db_path) as conn:
+            assert conn.execute('SELECT COUNT(*) FROM deposits').fetchone()[0] == 1
+            assert conn.execute('SELECT deposit_id, resultado FROM interactions').fetchone() == (deposit_id, 'sucesso')
+
+    def test_save_deposit_rejeitado_quando_nao_e_tampinha(self, client, image_b64):
+        with patch('app._classify_image', return_value=InferenceResult(0, 0.2, 10.0, 'SAT_VERY_LOW')), \
+             patch('app.db_connection', None):
+            response = client.post('/api/save_deposit', json={'image': image_b64})
+        assert response.status_code == 400
+        assert response.json()['status'] == 'rejeitado'
+
+    def test_validate_mechanical_esp32_offline_usa_simulacao(self, client, tampinha, db, image_b64):
+        async def offline(*args, **kwargs):
+            raise httpx.ConnectError('offline')
+
+        with patch.object(httpx.AsyncClient, 'post', side_effect=offline):
+            response = client.post('/api/validate_mechanical',
+                                   files={'image': ('cap.jpg', base64.b64decode(image_b64), 'image/jpeg')})
+
+        assert response.status_code == 200
+        assert response.json()['mechanical'] == 'OK'
+
+    def test_rota_nao_portada_e_servida_pelo_flask(self, client):
+        response = client.post('/api/admin/login', json={})
+        assert response.status_code == 400
+        assert response.json()['success'] is False
+
+
+# =============================================================================
+# TestAsgiIdempotencyAndAdmission
+# =============================================================================
+
+class TestAsgiIdempotencyAndAdmission:
+    def test_retry_reenvia_resposta_original(self, client, tampinha, tmp_path, image_b64):
+        store = IdempotencyStore(str(tmp_path / "idem.db"))
+        headers = {'Idempotency-Key': 'captura-asgi'}
+        payload = {'image': image_b64}
+        with patch('app.idempotency_store', store), patch('app.db_connection', None):
+            first = client.post('/api/save_deposit', json=payload, headers=headers)
+            retry = client.post('/api/save_deposit', json=payload, headers=headers)
+
+        assert retry.json() == first.json()
+        assert retry.headers['Idempotent-Replayed'] == 'true'
+        assert tampinha.call_count == 1
+
+    def test_requisicao_cancelada_libera_a_chave(self, tmp_path):
+        store = IdempotencyStore(str(tmp_path / "idem.db"))
+        scope = {
+            'type': 'http', 'method': 'POST', 'path': '/api/save_deposit', 'query_string': b'',
+            'headers': [(b'idempotency-key', b'captura-cancelada'), (b'content-type', b'application/json')],
+        }
+
+        async def receive():
+            return {'type': 'http.request', 'body': b'{}', 'more_body': False}
+
+        async def cancelled_handler():
+            raise asyncio.CancelledError()
+
+        with patch('app.idempotency_store', store), patch.object(store, 'abort', wraps=store.abort) as mock_abort:
+            with pytest.raises(asyncio.CancelledError):
+                asyncio.run(asgi._idempotent(Request(scope, receive), cancelled_handler))
+
+        mock_abort.assert_called_once_with('/api/save_deposit:captura-cancelada')
+
+    def test_totem_acima_do_limite_recebe_429(self, client, tampinha, image_b64):
+        app_module.admission_controller = AdmissionController(
+            {'save_deposit': RoutePolicy(requests=1, period_seconds=60, burst=1)}
+        )
+        headers = {'X-Kiosk-Id': 'totem-asgi'}
+        with patch('app.db_connection', None):
+            client.post('/api/save_deposit', json={'image': image_b64}, headers=headers)
+            response = client.post('/api/save_deposit', json={'image': image_b64}, headers=headers)
+
+        assert response.status_code == 429
+        assert response.json()['reason'] == 'rate_limited'
+        assert int(response.headers['Retry-After']) >= 1
+
+    def test_servidor_saturado_retorna_429_sem_classificar(self, client, image_b64):
+        saturated = InferenceAdmission(max_in_flight=1, max_queue=0)
+        saturated.acquire()
+        app_module.admission_controller = AdmissionController({}, saturated)
+
+        with patch('app._classify_image') as mock_classify, patch('app.db_connection', None):
+            response = client.post('/api/save_deposit', json={'image': image_b64})
+
+        assert response.status_code == 429
+        assert response.json()['reason'] == 'saturated'
+        mock_classify.assert_not_called()
+
+    def test_admissao_cancelada_na_fila_devolve_a_vaga(self):
+        controller = AdmissionController({}, InferenceAdmission(max_in_flight=1, max_queue=1,
+                                                                queue_timeout_seconds=5))
+        controller.admission.acquire()  # única vaga ocupada: a próxima aquisição espera na fila
+
+        async def cenario():
+            waiting = asyncio.create_task(asgi._acquire_inference_slot(controller, 'classify'))
+            while controller.admission.waiting == 0:
+                await asyncio.sleep(0.01)
+            waiting.cancel()  # cliente desconectou durante a espera
+            with pytest.raises(asyncio.CancelledError):
+                await waiting
+            controller.release()  # a thread da fila obtém a vaga depois do cancelamento
+            for _ in range(500):
+                if controller.admission.waiting == 0 and controller.admission.in_flight == 0:
+                    break
+                await asyncio.sleep(0.01)
+
+        asyncio.run(cenario())
+
+        assert controller.admission.waiting == 0
+        assert controller.admission.in_flight == 0
+
+
+# =============================================================================
+# TestAsgiBackground
+# =============================================================================
+
+class TestAsgiBackground:
+    def test_falha_nos_sensores_cancela_confirmacao(self):
+        cancelled = []
+
+        async def slow_confirm(detection_type, confidence):
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+
+        async def sensors_error():
+            await asyncio.sleep(0)
+            raise RuntimeError('sensores indisponíveis')
+
+        with patch('asgi.confirm_esp32_detection_async', side_effect=slow_confirm), \
+                patch('asgi.get_esp32_sensors_with_mechanical_async', side_effect=sensors_error):
+            async def run():
+                await asgi._validate_esp32_background(0.9)
+                return list(cancelled)  # antes de asyncio.run cancelar tarefas pendentes
+
+            cancelled_on_return = asyncio.run(run())
+
+        assert cancelled_on_return == [True]
+        assert app_module.esp32_status['status'] == 'error'
+        app_module.esp32_status['status'] = 'idle'
+
+
+# =============================================================================
+# TestAsyncEsp32Client
+# =============================================================================
+
+class TestAsyncEsp32Client:
+    def test_sensores_validados(self, reset_esp32_client):
+        def handler(request: httpx.Request) -> httpx.Response:
+            assert request.headers['Authorization'] == 'Bearer token'
+            return httpx.Response(200, json={'presenca': 1, 'peso': 2550, 'temperatura': 22})
+
+        esp32._async_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        sensors = asyncio.run(esp32.get_esp32_sensors_async())
+
+        assert sensors == {'presenca': True, 'peso': 2550, 'temperatura': 22.0}
+
+    def test_timeout_retorna_fallback(self, reset_esp32_client):
+        def handler(request: httpx.Request) -> httpx.Response:
+            raise httpx.ReadTimeout('lento', request=request)
+
+        esp32._async_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        result = asyncio.run(esp32.check_esp32_mechanical_async(True, 2600))
+
+        assert result == esp32._get_fallback_response('/api/check_mechanical')
+
+    def test_login_assincrono_compartilha_cache_de_token(self, reset_esp32_client):
+        esp32.esp32_jwt_token = None
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(200, json={'token': 'novo_token_async', 'expires_in': 3600})
+
+        esp32._async_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        token = asyncio.run(esp32.get_esp32_jwt_token_async())
+
+        assert token == 'novo_token_async'
+        assert esp32.get_esp32_jwt_token() == 'novo_token_async'
+
+
+# =============================================================================
+# TestAsyncDatabaseConnection
+# =============================================================================
+
+class TestAsyncDatabaseConnection:
+    def test_grava_deposito_e_interacao(self, tmp_path):
+        db_path = str(tmp_path / "async.db")
+        sync_db = DatabaseConnection(db_path)
+        sync_db.init_db()
+
+        async def scenario():
+            async with AsyncDatabaseConnection(db_path) as db:
+                return await db.record_deposit_outcome(0.9, True, True, 2500, 0.5)
+
+        deposit_id = asyncio.run(scenario())
+
+        assert deposit_id == 1
+        assert sync_db.get_all_interactions()[0]['deposit_id'] == 1
+        close_all_pools()
+
+    def test_sem_conexao_retorna_none(self):
+        db = AsyncDatabaseConnection('/caminho/inexistente/x.db')
+        assert asyncio.run(db.save_deposit_data(0.9, True, True, 2500, 0.5)) is None
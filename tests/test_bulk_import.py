@@ -0,0 +1,224 @@
+"""
+Testes da importação em lote de CSVs exportados (src/database/bulk_import.py).
+
+Cobre:
+    Leitura em stream das duas seções, ids novos com remapeamento de deposit_id,
+    deduplicação por (timestamp, id) via ledger, retomada após queda pelo checkpoint
+    (por caminho + fingerprint, com arquivos homônimos), seções pelo cabeçalho (exportação
+    sem depósitos), --source com vários arquivos e consistência de rollup/contadores
+"""
+import csv
+import sys
+from unittest.mock import patch
+
+import pytest
+
+from src.database.bulk_import import _BatchImporter, iter_export_sections
+from src.database.db import DatabaseConnection
+from scripts.import_csv import main as import_csv_main
+
+BASE_TS = 1767261600.25  # 2026-01-01, com fração para exercitar o round trip do float
+
+
+def _write_export(path, deposits: int, rejected: int = 0, base_ts: float = BASE_TS) -> None:
+    """CSV no formato de dados_exportados.csv: depósitos (ids 1..N), linha em branco, interações."""
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "timestamp", "ml_confidence", "weight_value", "weight_ok", "plastico_reciclado_g"])
+        for i in range(1, deposits + 1):
+            writer.writerow([i, base_ts + i * 60, 0.9, 2500, 1, 0.5])
+        writer.writerow([])
+        writer.writerow(["id", "deposit_id", "timestamp", "resultado"])
+        for i in range(1, deposits + 1):
+            writer.writerow([i, i, base_ts + i * 60, 'sucesso'])
+        for j in range(rejected):
+            writer.writerow([deposits + j + 1, '', base_ts + j * 60 + 30, 'rejeitado'])
+
+
+def _count(db: DatabaseConnection, table: str) -> int:
+    with db as conn_holder:
+        return conn_holder.conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+
+
+# =============================================================================
+# TestIterExportSections
+# =============================================================================
+
+class TestIterExportSections:
+    def test_separa_secoes_pela_linha_em_branco(self, tmp_path):
+        path = tmp_path / "export.csv"
+        _write_export(path, deposits=2, rejected=1)
+        with open(path, newline='', encoding='utf-8') as f:
+            rows = list(iter_export_sections(f))
+
+        assert [section for section, _, _ in rows] == ['deposits'] * 2 + ['interactions'] * 3
+        assert rows[0][2]['weight_value'] == '2500'
+        assert rows[-1][2]['resultado'] == 'rejeitado'
+
+    def test_cabecalho_sem_colunas_obrigatorias(self):
+        with pytest.raises(ValueError):
+            list(iter_export_sections(["id,ml_confidence\n", "1,0.9\n"]))
+
+    def test_exportacao_sem_depositos_so_tem_interacoes(self):
+        # Formato original de export_csv sem depósitos: linha em branco e direto a seção de interações
+        lines = ["\r\n", "id,deposit_id,timestamp,resultado\r\n",
+                 f"1,,{BASE_TS},rejeitado\r\n", f"2,,{BASE_TS + 60},rejeitado\r\n"]
+
+        rows = list(iter_export_sections(lines))
+
+        assert [section for section, _, _ in rows] == ['interactions', 'interactions']
+        assert rows[0][2]['resultado'] == 'rejeitado'
+
+    def test_secoes_fora_de_ordem(self):
+        lines = ["id,deposit_id,timestamp,resultado\n", f"1,,{BASE_TS},rejeitado\n", "\n",
+                 "id,timestamp\n", f"1,{BASE_TS}\n"]
+        with pytest.raises(ValueError):
+            list(iter_export_sections(lines))
+
+
+# =============================================================================
+# TestImportCsv
+# =============================================================================
+
+class TestImportCsv:
+    def test_importa_em_lotes_com_ids_novos(self, sqlite_database, tmp_path):
+        sqlite_database.record_deposit_outcome(0.8, True, True, 2400, 0.5)  # ids 1 já ocupados no banco central
+        path = tmp_path / "totem3.csv"
+        _write_export(path, deposits=25, rejected=5)
+
+        stats = sqlite_database.import_csv(str(path), batch_rows=10)
+
+        assert (stats.deposits, stats.interactions, stats.duplicates, stats.orphans) == (25, 30, 0, 0)
+        assert stats.batches == 6 and stats.rows_per_second > 0
+        assert _count(sqlite_database, 'deposits') == 26
+        with sqlite_database as conn_holder:
+            # Interação de sucesso aponta para o depósito importado com o mesmo timestamp
+            mismatched = conn_holder.conn.execute(
+                '''SELECT COUNT(*) FROM interactions i JOIN deposits d ON d.id = i.deposit_id
+                   WHERE d.timestamp != i.timestamp''').fetchone()[0]
+        assert mismatched == 0
+        assert sqlite_database.check_daily_rollup() == []
+        assert sqlite_database.reconcile_totals() == {}
+        assert sqlite_database.get_totals()['deposits'] == 26
+
+    def test_reimportacao_descarta_duplicadas_mesmo_com_outra_origem(self, sqlite_database, tmp_path):
+        path = tmp_path / "totem3.csv"
+        _write_export(path, deposits=5, rejected=2)
+        sqlite_database.import_csv(str(path))
+
+        again = sqlite_database.import_csv(str(path), source='outra-origem')
+
+        assert (again.deposits, again.interactions, again.duplicates) == (0, 0, 12)
+        assert _count(sqlite_database, 'interactions') == 7
+
+    def test_exportacao_do_proprio_banco_nao_duplica(self, sqlite_database, tmp_path):
+        for _ in range(3):
+            sqlite_database.record_deposit_outcome(0.9, True, True, 2500, 0.5)
+        path = tmp_path / "proprio.csv"
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(["id", "timestamp", "weight_value"])
+            writer.writerows((d['id'], d['timestamp'], d['weight_value']) for d in sqlite_database.get_all_deposits())
+            writer.writerow([])
+            writer.writerow(["id", "deposit_id", "timestamp", "resultado"])
+            writer.writerows((i['id'], i['deposit_id'], i['timestamp'], i['resultado'])
+                             for i in sqlite_database.get_all_interactions())
+
+        stats = sqlite_database.import_csv(str(path))
+
+        assert (stats.deposits, stats.interactions, stats.duplicates) == (0, 0, 6)
+        assert _count(sqlite_database, 'deposits') == 3
+
+    def test_exportacao_sem_depositos_importa_interacoes(self, sqlite_database, tmp_path):
+        path = tmp_path / "sem_depositos.csv"
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow([])
+            writer.writerow(["id", "deposit_id", "timestamp", "resultado"])
+            writer.writerows([[1, '', BASE_TS, 'rejeitado'], [2, '', BASE_TS + 60, 'rejeitado']])
+
+        stats = sqlite_database.import_csv(str(path))
+
+        assert (stats.deposits, stats.interactions) == (0, 2)
+        assert _count(sqlite_database, 'deposits') == 0
+        assert _count(sqlite_database, 'interactions') == 2
+
+    def test_arquivos_homonimos_de_pastas_diferentes(self, sqlite_database, tmp_path):
+        (tmp_path / "t1").mkdir()
+        (tmp_path / "t2").mkdir()
+        _write_export(tmp_path / "t1" / "dados_exportados.csv", deposits=4)
+        _write_export(tmp_path / "t2" / "dados_exportados.csv", deposits=6, base_ts=BASE_TS + 86400)
+
+        first = sqlite_database.import_csv(str(tmp_path / "t1" / "dados_exportados.csv"))
+        second = sqlite_database.import_csv(str(tmp_path / "t2" / "dados_exportados.csv"))
+
+        assert (first.deposits, second.deposits) == (4, 6)
+        assert second.resumed_rows == 0 and second.orphans == 0
+        assert _count(sqlite_database, 'deposits') == 10
+        with sqlite_database as conn_holder:
+            mismatched = conn_holder.conn.execute(
+                '''SELECT COUNT(*) FROM interactions i JOIN deposits d ON d.id = i.deposit_id
+                   WHERE d.timestamp != i.timestamp''').fetchone()[0]
+        assert mismatched == 0
+
+    def test_arquivo_substituido_no_mesmo_caminho_e_importado(self, sqlite_database, tmp_path):
+        path = tmp_path / "dados_exportados.csv"
+        _write_export(path, deposits=3)
+        sqlite_database.import_csv(str(path))
+        _write_export(path, deposits=5, base_ts=BASE_TS + 86400)
+
+        stats = sqlite_database.import_csv(str(path))
+
+        assert (stats.resumed_rows, stats.deposits, stats.interactions) == (0, 5, 5)
+
+    def test_arquivo_concluido_e_relido_do_inicio(self, sqlite_database, tmp_path):
+        path = tmp_path / "totem3.csv"
+        _write_export(path, deposits=5)
+        sqlite_database.import_csv(str(path), batch_rows=2)
+
+        again = sqlite_database.import_csv(str(path), batch_rows=2)
+
+        assert again.resumed_rows == 0
+        assert (again.deposits, again.interactions, again.duplicates) == (0, 0, 10)
+        with sqlite_database as conn_holder:
+            completed = conn_holder.conn.execute('SELECT completed FROM import_checkpoints').fetchone()[0]
+        assert completed == 1
+
+    def test_retoma_apos_queda_pelo_checkpoint(self, sqlite_database, tmp_path):
+        path = tmp_path / "totem3.csv"
+        _write_export(path, deposits=30)
+        original_flush = _BatchImporter.flush
+        calls = []
+
+        def flush_que_cai(self, table, batch):
+            calls.append(table)
+            if len(calls) == 3:
+                raise RuntimeError("queda simulada")
+            return original_flush(self, table, batch)
+
+        with patch.object(_BatchImporter, 'flush', flush_que_cai), pytest.raises(RuntimeError):
+            sqlite_database.import_csv(str(path), batch_rows=10)
+        assert _count(sqlite_database, 'deposits') == 20
+
+        stats = sqlite_database.import_csv(str(path), batch_rows=10)
+
+        assert stats.resumed_rows == 20
+        assert (stats.deposits, stats.interactions, stats.orphans) == (10, 30, 0)
+        assert _count(sqlite_database, 'deposits') == 30
+        with sqlite_database as conn_holder:
+            linked = conn_holder.conn.execute('SELECT COUNT(deposit_id) FROM interactions').fetchone()[0]
+        assert linked == 30
+
+
+# =============================================================================
+# TestImportCsvScript
+# =============================================================================
+
+class TestImportCsvScript:
+    def test_source_com_varios_arquivos_e_recusado(self, tmp_path):
+        argv = ['import_csv.py', str(tmp_path / "a.csv"), str(tmp_path / "b.csv"),
+                '--source', 'totem-3', '--db', str(tmp_path / "import.db")]
+        with patch.object(sys, 'argv', argv), pytest.raises(SystemExit) as exc_info:
+            import_csv_main()
+        assert exc_info.value.code == 2
+        assert not (tmp_path / "import.db").exists()
@@ -0,0 +1,220 @@
+"""
+Testes dos circuit breakers do cliente ESP32 (src/hardware/circuit_breaker.py).
+
+Cobre:
+    Abertura após N falhas seguidas, fallback imediato com o circuito aberto, sondagem única
+    em half-open, breakers por endpoint no cliente e estado em /api/esp32-health e métricas
+"""
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+
+from app import app
+from src.hardware import esp32
+from src.hardware.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def breaker(clock):
+    return CircuitBreaker('/api/sensors', failure_threshold=3, reset_seconds=30, clock=clock)
+
+
+@pytest.fixture
+def token_em_cache():
+    esp32.esp32_jwt_token = 'valid_token'
+    esp32.esp32_token_expiry = datetime.now().timestamp() + 3600
+    yield
+    esp32.esp32_jwt_token = None
+    esp32.esp32_token_expiry = None
+
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    with app.test_client() as flask_client:
+        yield flask_client
+
+
+def _response(status_code, payload=None):
+    response = MagicMock()
+    response.status_code = status_code
+    response.json.return_value = payload or {}
+    response.text = ''
+    return response
+
+
+# =============================================================================
+# TestCircuitBreaker
+# =============================================================================
+
+class TestCircuitBreaker:
+    """Estados closed → open → half_open → closed."""
+
+    def test_abre_apos_falhas_seguidas(self, breaker):
+        for _ in range(2):
+            breaker.record_failure('timeout')
+        assert breaker.state == CLOSED
+
+        breaker.record_failure('timeout')
+
+        assert breaker.state == OPEN
+        assert breaker.allow() is False
+        assert breaker.snapshot()['short_circuited'] == 1
+        assert breaker.snapshot()['trips'] == 1
+
+    def test_sucesso_zera_falhas_seguidas(self, breaker):
+        breaker.record_failure()
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+
+        assert breaker.state == CLOSED
+        assert breaker.consecutive_failures == 1
+
+    def test_uma_unica_sondagem_apos_o_resfriamento(self, breaker, clock):
+        for _ in range(3):
+            breaker.record_failure()
+        clock.now += 30
+
+        assert breaker.allow() is True
+        assert breaker.state == HALF_OPEN
+        assert breaker.allow() is False
+
+    def test_sondagem_com_sucesso_fecha(self, breaker, clock):
+        for _ in range(3):
+            breaker.record_failure()
+        clock.now += 30
+        breaker.allow()
+
+        breaker.record_success()
+
+        assert breaker.state == CLOSED
+        assert breaker.allow() is True
+
+    def test_sondagem_com_falha_reabre(self, breaker, clock):
+        for _ in range(3):
+            breaker.record_failure()
+        clock.now += 30
+        breaker.allow()
+
+        breaker.record_failure('timeout')
+
+        assert breaker.state == OPEN
+        assert breaker.snapshot()['retry_in_seconds'] == 30
+        assert breaker.snapshot()['trips'] == 2
+
+    def test_sondagem_sem_resultado_libera_outra(self, breaker, clock):
+        for _ in range(3):
+            breaker.record_failure()
+        clock.now += 30
+        assert breaker.allow() is True
+
+        clock.now += 30
+
+        assert breaker.allow() is True
+
+
+# =============================================================================
+# TestEsp32Breakers
+# =============================================================================
+
+class TestEsp32Breakers:
+    """Breakers por endpoint em call_esp32_api e no login."""
+
+    def test_circuito_aberto_devolve_fallback_sem_chamar(self, token_em_cache):
+        with patch('src.hardware.esp32.http_session.get') as mock_get:
+            mock_get.side_effect = requests.exceptions.ConnectTimeout('timeout')
+            for _ in range(3):
+                esp32.call_esp32_api('/api/sensors', 'GET')
+
+            result = esp32.call_esp32_api('/api/sensors', 'GET')
+
+        assert result == esp32._get_fallback_response('/api/sensors')
+        assert mock_get.call_count == 3
+        assert esp32.esp32_breakers.get('/api/sensors').state == OPEN
+
+    def test_endpoints_tem_circuitos_independentes(self, token_em_cache):
+        with patch('src.hardware.esp32.http_session.get') as mock_get, \
+                patch('src.hardware.esp32.http_session.post') as mock_post:
+            mock_get.side_effect = requests.exceptions.ConnectionError('offline')
+            mock_post.return_value = _response(200, {'status': 'OK'})
+            for _ in range(3):
+                esp32.call_esp32_api('/api/sensors', 'GET')
+
+            result = esp32.call_esp32_api('/api/check_mechanical', 'POST', {'presenca': True, 'peso': 2500})
+
+        assert result == {'status': 'OK'}
+        assert esp32.esp32_breakers.get('/api/check_mechanical').state == CLOSED
+
+    def test_status_5xx_conta_como_falha_e_4xx_nao(self, token_em_cache):
+        with patch('src.hardware.esp32.http_session.get') as mock_get:
+            mock_get.return_value = _response(404)
+            for _ in range(3):
+                esp32.call_esp32_api('/api/sensors', 'GET')
+            assert esp32.esp32_breakers.get('/api/sensors').state == CLOSED
+
+            mock_get.return_value = _response(503)
+            for _ in range(3):
+                esp32.call_esp32_api('/api/sensors', 'GET')
+
+        assert esp32.esp32_breakers.get('/api/sensors').state == OPEN
+
+    def test_login_com_circuito_aberto_nao_espera_timeout(self):
+        # Sem backoff de login (token_refresher) para isolar o circuit breaker
+        with patch('src.hardware.esp32.http_session.post') as mock_post, \
+                patch.object(esp32.token_refresher, 'backoff_seconds', 0):
+            mock_post.side_effect = requests.exceptions.ReadTimeout('timeout')
+            for _ in range(3):
+                assert esp32.get_esp32_jwt_token() is None
+
+            assert esp32.get_esp32_jwt_token() is None
+
+        assert mock_post.call_count == 3
+        assert esp32.esp32_breakers.get(esp32.ESP32_LOGIN_ENDPOINT).state == OPEN
+
+
+# =============================================================================
+# TestBreakerNasRotas
+# =============================================================================
+
+class TestBreakerNasRotas:
+    """Estado dos circuitos em /api/esp32-health e /api/admin/metrics."""
+
+    def test_health_informa_circuitos(self, client, token_em_cache):
+        with patch('src.hardware.esp32.http_session.get') as mock_get:
+            mock_get.side_effect = requests.exceptions.ConnectTimeout('timeout')
+            for _ in range(3):
+                esp32.call_esp32_api('/api/sensors', 'GET')
+
+        with patch('app.esp32_http.get') as mock_health:
+            mock_health.return_value = _response(200, {'status': 'ok'})
+            response = client.get('/api/esp32-health')
+
+        breakers = response.get_json()['circuit_breakers']
+        assert breakers['/api/sensors']['state'] == OPEN
+        assert breakers['/api/sensors']['consecutive_failures'] == 3
+
+    def test_metricas_incluem_circuitos(self, client):
+        esp32.esp32_breakers.get('/api/confirm_detection').record_failure('timeout')
+
+        with patch('app.is_admin_authenticated', return_value=True):
+            response = client.get('/api/admin/metrics')
+
+        assert response.status_code == 200
+        metrics = response.get_json()['metrics']
+        assert metrics['esp32_breakers']['/api/confirm_detection']['failures'] == 1
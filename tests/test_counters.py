@@ -0,0 +1,103 @@
+"""
+Testes dos contadores de totais do dashboard (src/database/counters.py).
+
+Cobre:
+    Incremento por trigger na mesma transação do INSERT, backfill da migração em banco
+    legado, reconciliação (banco quente + arquivos frios) e a thread periódica
+"""
+import sqlite3
+import time
+from datetime import date, datetime
+
+from src.database.counters import TotalsReconciler
+from src.database.db import DatabaseConnection
+from src.database.migrations import MIGRATIONS, apply_migrations
+
+SUCESSO = DatabaseConnection.ResultadoInteracao.SUCESSO
+REJEITADO = DatabaseConnection.ResultadoInteracao.REJEITADO
+
+
+def _set_counter(db: DatabaseConnection, name: str, value: float) -> None:
+    with db as conn_holder:
+        conn_holder.conn.execute('UPDATE totals SET value = ? WHERE name = ?', (value, name))
+        conn_holder.conn.commit()
+
+
+# =============================================================================
+# TestTotalsCounters
+# =============================================================================
+
+class TestTotalsCounters:
+    def test_contadores_acompanham_os_inserts(self, sqlite_database):
+        sqlite_database.record_deposit_outcome(0.9, True, True, 2500, 0.5)
+        sqlite_database.record_deposit_outcome(0.8, True, True, None, 0.5)
+        sqlite_database.save_interaction(REJEITADO)
+
+        assert sqlite_database.get_totals() == {'interactions': 3, 'deposits': 2, 'weight_sum': 2500.0}
+        assert sqlite_database.get_total_interacoes() == 3
+        assert sqlite_database.count_deposits() == 2
+        assert sqlite_database.reconcile_totals() == {}
+
+    def test_migracao_faz_backfill_em_banco_existente(self, tmp_path):
+        path = str(tmp_path / "antes_dos_contadores.db")
+        conn = sqlite3.connect(path)
+        conn.execute('CREATE TABLE deposits (id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp REAL NOT NULL, '
+                     'ml_confidence REAL, presence_detected BOOLEAN, weight_value INTEGER, weight_ok BOOLEAN, '
+                     'plastico_reciclado_g REAL, created_at DATETIME DEFAULT CURRENT_TIMESTAMP)')
+        conn.execute('CREATE TABLE interactions (id INTEGER PRIMARY KEY AUTOINCREMENT, deposit_id INTEGER, '
+                     'timestamp REAL NOT NULL, resultado TEXT NOT NULL, created_at DATETIME DEFAULT CURRENT_TIMESTAMP)')
+        apply_migrations(conn, [m for m in MIGRATIONS if m.version < 4])
+        conn.execute('INSERT INTO deposits (timestamp, weight_value) VALUES (?, ?)', (time.time(), 2400))
+        conn.executemany('INSERT INTO interactions (timestamp, resultado) VALUES (?, ?)',
+                         [(time.time(), 'sucesso'), (time.time(), 'rejeitado')])
+        conn.commit()
+
+        apply_migrations(conn)
+        assert dict(conn.execute('SELECT name, value FROM totals')) == {
+            'interactions': 2, 'deposits': 1, 'weight_sum': 2400
+        }
+        conn.close()
+
+
+# =============================================================================
+# TestReconcileTotals
+# =============================================================================
+
+class TestReconcileTotals:
+    def test_reconciliacao_corrige_divergencia(self, sqlite_database):
+        sqlite_database.record_deposit_outcome(0.9, True, True, 2500, 0.5)
+        _set_counter(sqlite_database, 'interactions', 40)
+
+        drift = sqlite_database.reconcile_totals()
+
+        assert drift == {'interactions': {'stored': 40, 'counted': 1}}
+        assert sqlite_database.get_total_interacoes() == 1
+        assert sqlite_database.reconcile_totals() == {}
+
+    def test_reconciliacao_conta_arquivos_frios(self, sqlite_database, tmp_path):
+        with sqlite_database as conn_holder:
+            ts = datetime(2026, 1, 10, 9).timestamp()
+            deposit_id = conn_holder.conn.execute(
+                'INSERT INTO deposits (timestamp, weight_value) VALUES (?, ?)', (ts, 2500)).lastrowid
+            conn_holder.conn.execute('INSERT INTO interactions (deposit_id, timestamp, resultado) VALUES (?, ?, ?)',
+                                     (deposit_id, ts, 'sucesso'))
+            conn_holder.conn.commit()
+        sqlite_database.archive_older_than(30, str(tmp_path / "archive"), today=date(2026, 6, 1))
+
+        assert sqlite_database.get_totals() == {'interactions': 1, 'deposits': 1, 'weight_sum': 2500.0}
+        assert sqlite_database.reconcile_totals() == {}
+
+    def test_thread_reconcilia_ao_iniciar(self, sqlite_database):
+        sqlite_database.save_interaction(SUCESSO)
+        _set_counter(sqlite_database, 'interactions', 0)
+
+        reconciler = TotalsReconciler(sqlite_database, interval_seconds=3600)
+        try:
+            deadline = time.monotonic() + 5
+            while reconciler.stats['runs'] == 0 and time.monotonic() < deadline:
+                time.sleep(0.01)
+        finally:
+            reconciler.close()
+
+        assert reconciler.stats['corrections'] == 1
+        assert sqlite_database.get_total_interacoes() == 1
@@ -5,6 +5,9 @@ Cobre:
     init_db, save_deposit_data, save_interaction,
     get_total_interacoes, get_all_deposits
 """
+import time
+from datetime import datetime
+
 import pytest
 from unittest.mock import patch
 
@@ -118,6 +121,59 @@ class TestSaveInteraction:
             db.save_interaction(DatabaseConnection.ResultadoInteracao.REJEITADO, None)
 
 
+# =============================================================================
+# TestRecordDepositOutcome
+# =============================================================================
+
+class TestRecordDepositOutcome:
+    def test_grava_deposito_e_interacao_vinculados(self, test_db: DatabaseConnection):
+        deposit_id = test_db.record_deposit_outcome(0.9, True, True, 2500, 0.5)
+        assert deposit_id == 1
+        interactions = test_db.get_all_interactions()
+        assert len(interactions) == 1
+        assert interactions[0]['deposit_id'] == deposit_id
+        assert interactions[0]['resultado'] == 'sucesso'
+        assert interactions[0]['timestamp'] == test_db.get_all_deposits()[0]['timestamp']
+
+    def test_falha_na_interacao_desfaz_deposito(self, test_db: DatabaseConnection):
+        with test_db as db:
+            db.conn.execute('DROP TABLE interactions')
+            db.conn.commit()
+        assert test_db.record_deposit_outcome(0.9, True, True, 2500, 0.5) is None
+        assert test_db.get_all_deposits() == []
+
+
+# =============================================================================
+# TestDashboardAggregates
+# =============================================================================
+
+class TestDashboardAggregates:
+    def test_agregados_batem_com_listagem_completa(self, test_db: DatabaseConnection):
+        for peso in (2400, 2500, 2600):
+            test_db.record_deposit_outcome(0.9, True, True, peso, 0.5)
+        deposits = test_db.get_all_deposits()
+
+        assert test_db.count_deposits() == len(deposits) == 3
+        assert test_db.sum_deposit_weight_grams() == 7500.0
+        assert test_db.get_latest_deposits(limit=2) == deposits[:2]
+
+    def test_contagem_diaria_ignora_fora_da_janela(self, test_db: DatabaseConnection):
+        test_db.record_deposit_outcome(0.9, True, True, 2500, 0.5)
+        with test_db as db:
+            db.conn.execute('INSERT INTO deposits (timestamp, weight_value) VALUES (?, ?)',
+                            (time.time() - 30 * 24 * 3600, 2500))
+            db.conn.commit()
+
+        counts = test_db.get_daily_deposit_counts(days=7)
+        assert counts == {datetime.now().date().isoformat(): 1}
+
+    def test_banco_vazio(self, test_db: DatabaseConnection):
+        assert test_db.count_deposits() == 0
+        assert test_db.sum_deposit_weight_grams() == 0.0
+        assert test_db.get_daily_deposit_counts() == {}
+        assert test_db.get_latest_deposits() == []
+
+
 # =============================================================================
 # TestGetTotalInteracoes
 # =============================================================================
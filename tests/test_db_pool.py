@@ -0,0 +1,109 @@
+"""
+Testes do pool SQLite (src/database/pool.py) e do empréstimo de conexões no DatabaseConnection.
+
+Cobre:
+    PRAGMAs (WAL, synchronous=NORMAL, busy_timeout), reutilização e limite do pool,
+    rollback na devolução, conexões por thread e blocos `with` aninhados
+"""
+import threading
+
+import pytest
+
+from src.database.db import DatabaseConnection
+from src.database.pool import PoolConfig, PoolExhausted, SQLitePool, close_all_pools, get_pool
+
+
+@pytest.fixture(autouse=True)
+def _fechar_pools():
+    yield
+    close_all_pools()
+
+
+@pytest.fixture
+def pool(tmp_path) -> SQLitePool:
+    return SQLitePool(str(tmp_path / "pool.db"), PoolConfig(size=2, busy_timeout_ms=1234, lease_timeout_seconds=0.05))
+
+
+# =============================================================================
+# TestSQLitePool
+# =============================================================================
+
+class TestSQLitePool:
+    def test_pragmas_aplicados(self, pool: SQLitePool):
+        with pool.lease() as conn:
+            assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+            assert conn.execute('PRAGMA synchronous').fetchone()[0] == 1  # NORMAL
+            assert conn.execute('PRAGMA busy_timeout').fetchone()[0] == 1234
+
+    def test_conexao_reutilizada_entre_emprestimos(self, pool: SQLitePool):
+        with pool.lease() as first:
+            pass
+        with pool.lease() as second:
+            assert second is first
+        assert pool.snapshot()['created'] == 1
+        assert pool.snapshot()['leases'] == 2
+
+    def test_limite_do_pool_gera_pool_exhausted(self, pool: SQLitePool):
+        a, b = pool.acquire(), pool.acquire()
+        with pytest.raises(PoolExhausted):
+            pool.acquire()
+        assert pool.snapshot()['waits'] == 1
+        pool.release(a)
+        pool.release(b)
+
+    def test_transacao_aberta_desfeita_na_devolucao(self, pool: SQLitePool):
+        with pool.lease() as conn:
+            conn.execute('CREATE TABLE t (v INTEGER)')
+            conn.commit()
+            conn.execute('INSERT INTO t VALUES (1)')
+        with pool.lease() as conn:
+            assert conn.execute('SELECT COUNT(*) FROM t').fetchone()[0] == 0
+
+    def test_get_pool_compartilha_por_arquivo(self, tmp_path):
+        path = str(tmp_path / "shared.db")
+        assert get_pool(path) is get_pool(path)
+
+
+# =============================================================================
+# TestDatabaseConnectionLeases
+# =============================================================================
+
+class TestDatabaseConnectionLeases:
+    def test_with_aninhado_reutiliza_conexao(self, tmp_path):
+        db = DatabaseConnection(str(tmp_path / "nested.db"))
+        with db:
+            outer = db.conn
+            with db:
+                assert db.conn is outer
+            assert db.conn is outer
+        assert db.conn is None
+
+    def test_conexao_isolada_por_thread(self, tmp_path):
+        db = DatabaseConnection(str(tmp_path / "threads.db"))
+        db.init_db()
+        seen = {}
+
+        def background():
+            seen['conn_before'] = db.conn
+            with db:
+                seen['conn'] = db.conn
+                seen['deposit_id'] = db.save_deposit_data(0.9, True, True, 2500, 0.5)
+
+        with db:
+            main_conn = db.conn
+            worker = threading.Thread(target=background)
+            worker.start()
+            worker.join()
+            assert db.conn is main_conn
+
+        assert seen['conn_before'] is None
+        assert seen['conn'] is not main_conn
+        assert seen['deposit_id'] is not None
+
+    def test_operacao_fora_do_with_empresta_e_devolve(self, tmp_path):
+        db = DatabaseConnection(str(tmp_path / "lease.db"), pool_config=PoolConfig(size=1))
+        db.init_db()
+        db.save_interaction(DatabaseConnection.ResultadoInteracao.SUCESSO)
+        assert db.get_total_interacoes() == 1
+        snapshot = get_pool(db.db_path).snapshot()
+        assert snapshot['open'] == 1 and snapshot['idle'] == 1
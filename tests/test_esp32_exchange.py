@@ -0,0 +1,209 @@
+"""
+Testes das chamadas concorrentes e da requisição combinada ao ESP32 (src/hardware/esp32.py).
+
+Cobre:
+    Recursos anunciados no login, sensores + validação mecânica numa requisição, caminho
+    sequencial em firmware antigo, confirmação em paralelo no /api/validate-complete (Flask)
+    e no background do modo ASGI
+"""
+import asyncio
+import base64
+import threading
+import time
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+import cv2
+import httpx
+import numpy as np
+import pytest
+
+import app as app_module
+from app import app
+from src.hardware import esp32
+
+COMBINED_RESPONSE = {
+    'sensors': {'presenca': True, 'peso': 2550, 'temperatura': 23.0},
+    'mechanical': {'status': 'OK', 'message': 'Validação mecânica OK', 'peso': 2550},
+}
+
+
+@pytest.fixture
+def token_em_cache():
+    esp32.esp32_jwt_token = 'valid_token'
+    esp32.esp32_token_expiry = datetime.now().timestamp() + 3600
+    yield
+    esp32.esp32_jwt_token = None
+    esp32.esp32_token_expiry = None
+    esp32._async_client = None
+
+
+@pytest.fixture
+def firmware_combinado(token_em_cache):
+    esp32.esp32_capabilities = frozenset({esp32.ESP32_COMBINED_CAPABILITY})
+
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    with app.test_client() as flask_client:
+        yield flask_client
+
+
+def _response(status_code, payload):
+    response = MagicMock()
+    response.status_code = status_code
+    response.json.return_value = payload
+    response.text = ''
+    return response
+
+
+def _image_payload() -> dict:
+    ok, buff = cv2.imencode('.jpg', np.zeros((16, 16, 3), dtype=np.uint8))
+    assert ok
+    return {'image': f"data:image/jpeg;base64,{base64.b64encode(bytes(buff)).decode('utf-8')}"}
+
+
+@pytest.fixture(autouse=True)
+def esp32_status_idle():
+    app_module.esp32_status['status'] = 'idle'
+    yield
+    app_module.esp32_status['status'] = 'idle'
+
+
+def _wait_background(timeout: float = 5.0) -> dict:
+    """Espera a thread de validação ESP32 terminar (status sai de idle/validating)."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline and app_module.esp32_status['status'] in ('idle', 'validating'):
+        time.sleep(0.01)
+    return app_module.esp32_status
+
+
+# =============================================================================
+# TestNegociacaoDeRecursos
+# =============================================================================
+
+class TestNegociacaoDeRecursos:
+    """Recursos anunciados no login decidem entre requisição combinada e caminho sequencial."""
+
+    def test_login_guarda_recursos_anunciados(self):
+        with patch('src.hardware.esp32.http_session.post') as mock_post:
+            mock_post.return_value = _response(200, {
+                'token': 'abc', 'expires_in': 3600, 'capabilities': ['sensors_mechanical'],
+            })
+            esp32.get_esp32_jwt_token()
+
+        assert esp32.esp32_supports(esp32.ESP32_COMBINED_CAPABILITY)
+
+    def test_firmware_antigo_sem_recursos(self):
+        with patch('src.hardware.esp32.http_session.post') as mock_post:
+            mock_post.return_value = _response(200, {'token': 'abc', 'expires_in': 3600})
+            esp32.get_esp32_jwt_token()
+
+        assert esp32.esp32_capabilities == frozenset()
+
+    def test_combinada_em_uma_requisicao(self, firmware_combinado):
+        with patch('src.hardware.esp32.http_session.get') as mock_get:
+            mock_get.return_value = _response(200, COMBINED_RESPONSE)
+            sensors, mechanical = esp32.get_esp32_sensors_with_mechanical()
+
+        assert sensors == {'presenca': True, 'peso': 2550, 'temperatura': 23.0}
+        assert mechanical['status'] == 'OK'
+        mock_get.assert_called_once()
+        assert mock_get.call_args.args[0].endswith(esp32.ESP32_COMBINED_ENDPOINT)
+
+    def test_sem_recurso_nao_faz_requisicao(self, token_em_cache):
+        with patch('src.hardware.esp32.http_session.get') as mock_get:
+            assert esp32.get_esp32_sensors_with_mechanical() is None
+        mock_get.assert_not_called()
+
+    def test_resposta_incompleta_volta_ao_caminho_sequencial(self, firmware_combinado):
+        with patch('src.hardware.esp32.http_session.get') as mock_get:
+            mock_get.return_value = _response(200, {'sensors': COMBINED_RESPONSE['sensors']})
+            assert esp32.get_esp32_sensors_with_mechanical() is None
+
+
+# =============================================================================
+# TestChamadasConcorrentes
+# =============================================================================
+
+class TestChamadasConcorrentes:
+    """Confirmação de detecção em paralelo com sensores/validação mecânica."""
+
+    def test_start_esp32_call_nao_bloqueia(self):
+        started = time.perf_counter()
+        wait = esp32.start_esp32_call(lambda: time.sleep(0.2) or 'ok')
+
+        assert time.perf_counter() - started < 0.1
+        assert wait() == 'ok'
+
+    def test_start_esp32_call_erro_retorna_none(self):
+        def boom():
+            raise RuntimeError('falhou')
+
+        assert esp32.start_esp32_call(boom)() is None
+
+    def test_validate_complete_confirma_em_paralelo(self, client):
+        confirm_started = threading.Event()
+        overlapped = []
+
+        def sensors():
+            overlapped.append(confirm_started.wait(timeout=2))
+            return {'presenca': True, 'peso': 2600}
+
+        def confirm(detection_type, confidence):
+            confirm_started.set()
+            return {'status': 'confirmed'}
+
+        with patch('app.image_classifier') as mock_clf, patch('app.get_esp32_sensors', side_effect=sensors), \
+                patch('app.check_esp32_mechanical', return_value={'status': 'OK'}) as mock_check, \
+                patch('app.confirm_esp32_detection', side_effect=confirm), patch('app.db_connection', None):
+            mock_clf.classify_image.return_value = (1, 0.95, 120.0, 'SAT_HIGH')
+            response = client.post('/api/validate-complete', json=_image_payload())
+            status = _wait_background()
+
+        assert response.status_code == 200
+        assert overlapped == [True]
+        mock_check.assert_called_once_with(True, 2600)
+        assert status['status'] == 'success'
+
+    def test_validate_complete_usa_requisicao_combinada(self, client):
+        sensors = {'presenca': True, 'peso': 2550, 'temperatura': 23.0}
+        with patch('app.image_classifier') as mock_clf, \
+                patch('app.get_esp32_sensors_with_mechanical', return_value=(sensors, {'status': 'OK'})), \
+                patch('app.get_esp32_sensors') as mock_sensors, patch('app.check_esp32_mechanical') as mock_check, \
+                patch('app.confirm_esp32_detection', return_value={'status': 'confirmed'}), \
+                patch('app.db_connection', None):
+            mock_clf.classify_image.return_value = (1, 0.95, 120.0, 'SAT_HIGH')
+            client.post('/api/validate-complete', json=_image_payload())
+            status = _wait_background()
+
+        mock_sensors.assert_not_called()
+        mock_check.assert_not_called()
+        assert status['status'] == 'success'
+
+
+# =============================================================================
+# TestBackgroundAsgi
+# =============================================================================
+
+class TestBackgroundAsgi:
+    """Background do modo ASGI: combinada + confirmação com asyncio."""
+
+    def test_background_assincrono_usa_combinada_e_confirma(self, firmware_combinado):
+        import asgi
+
+        paths = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            paths.append(request.url.path)
+            if request.url.path == esp32.ESP32_COMBINED_ENDPOINT:
+                return httpx.Response(200, json=COMBINED_RESPONSE)
+            return httpx.Response(200, json={'status': 'confirmed'})
+
+        esp32._async_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        with patch('app.db_connection', None):
+            asyncio.run(asgi._validate_esp32_background(0.9))
+
+        assert sorted(paths) == ['/api/confirm_detection', esp32.ESP32_COMBINED_ENDPOINT]
+        assert app_module.esp32_status['status'] == 'success'
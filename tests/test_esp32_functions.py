@@ -30,14 +30,14 @@ def reset_esp32_globals():
 @pytest.fixture
 def mock_requests_post():
     """Mock para requests.post."""
-    with patch('src.hardware.esp32.requests.post') as mock:
+    with patch('src.hardware.esp32.http_session.post') as mock:
         yield mock
 
 
 @pytest.fixture
 def mock_requests_get():
     """Mock para requests.get."""
-    with patch('src.hardware.esp32.requests.get') as mock:
+    with patch('src.hardware.esp32.http_session.get') as mock:
         yield mock
 
 
@@ -231,8 +231,8 @@ class TestCallEsp32Api:
         # Assert (fallback retorna dict vazio)
         assert result == {}
 
-    def test_call_esp32_api_get_usa_timeout_hardcoded(self, mock_requests_get):
-        """GET na API ESP32 deve usar timeout fixo."""
+    def test_call_esp32_api_get_usa_timeout_conexao_e_leitura(self, mock_requests_get):
+        """GET na API ESP32 deve usar timeout (conexão, leitura) com leitura de 10s."""
         esp32.esp32_jwt_token = 'valid_token'
         esp32.esp32_token_expiry = datetime.now().timestamp() + 3600
 
@@ -244,10 +244,10 @@ class TestCallEsp32Api:
         esp32.call_esp32_api('/api/sensors', method='GET')
 
         call_args = mock_requests_get.call_args
-        assert call_args.kwargs['timeout'] == 10
+        assert call_args.kwargs['timeout'] == (esp32.http_session.connect_timeout, 10)
 
-    def test_call_esp32_api_post_usa_timeout_hardcoded(self, mock_requests_post):
-        """POST na API ESP32 deve usar timeout fixo."""
+    def test_call_esp32_api_post_usa_timeout_conexao_e_leitura(self, mock_requests_post):
+        """POST na API ESP32 deve usar timeout (conexão, leitura) com leitura de 10s."""
         esp32.esp32_jwt_token = 'valid_token'
         esp32.esp32_token_expiry = datetime.now().timestamp() + 3600
 
@@ -259,7 +259,7 @@ class TestCallEsp32Api:
         esp32.call_esp32_api('/api/check_mechanical', method='POST', data={'peso': 2600, 'presenca': True})
 
         call_args = mock_requests_post.call_args
-        assert call_args.kwargs['timeout'] == 10
+        assert call_args.kwargs['timeout'] == (esp32.http_session.connect_timeout, 10)
 
 
 # =============================================================================
@@ -453,7 +453,7 @@ class TestEsp32TimeoutConfig:
     """Testes para garantir timeouts fixos (hardcoded)."""
 
     def test_get_esp32_jwt_token_usa_timeout_30(self, mock_requests_post):
-        """Login JWT deve usar timeout fixo de 30s."""
+        """Login JWT deve usar leitura de 30s (conexão no timeout da sessão)."""
         mock_response = MagicMock()
         mock_response.status_code = 200
         mock_response.json.return_value = {'token': 'abc', 'expires_in': 3600}
@@ -463,4 +463,4 @@ class TestEsp32TimeoutConfig:
 
         assert token == 'abc'
         call_args = mock_requests_post.call_args
-        assert call_args.kwargs['timeout'] == 30
+        assert call_args.kwargs['timeout'] == (esp32.http_session.connect_timeout, 30)
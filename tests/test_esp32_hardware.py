@@ -49,7 +49,7 @@ class TestEsp32TokenCaching:
         import time
         from src.hardware.esp32 import get_esp32_jwt_token
 
-        with patch('src.hardware.esp32.requests.post') as mock_post:
+        with patch('src.hardware.esp32.http_session.post') as mock_post:
             # Simular primeiro login bem-sucedido
             mock_response1 = MagicMock()
             mock_response1.status_code = 200
@@ -91,7 +91,7 @@ class TestEsp32APIErrorRecovery:
         src.hardware.esp32.esp32_jwt_token = 'valid_token'
         src.hardware.esp32.esp32_token_expiry = 9999999999  # Far future
 
-        with patch('src.hardware.esp32.requests.get') as mock_get:
+        with patch('src.hardware.esp32.http_session.get') as mock_get:
             import requests
             mock_get.side_effect = requests.exceptions.ConnectionError("Refused")
             
@@ -106,7 +106,7 @@ class TestEsp32APIErrorRecovery:
         src.hardware.esp32.esp32_jwt_token = 'valid_token'
         src.hardware.esp32.esp32_token_expiry = 9999999999
 
-        with patch('src.hardware.esp32.requests.get') as mock_get:
+        with patch('src.hardware.esp32.http_session.get') as mock_get:
             import requests
             mock_get.side_effect = requests.exceptions.Timeout("timeout")
             
@@ -121,7 +121,7 @@ class TestEsp32APIErrorRecovery:
         src.hardware.esp32.esp32_jwt_token = 'valid_token'
         src.hardware.esp32.esp32_token_expiry = 9999999999
 
-        with patch('src.hardware.esp32.requests.get') as mock_get:
+        with patch('src.hardware.esp32.http_session.get') as mock_get:
             mock_response = MagicMock()
             mock_response.status_code = 200
             mock_response.json.side_effect = ValueError("Invalid JSON")
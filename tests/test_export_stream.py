@@ -0,0 +1,102 @@
+"""
+Testes da exportação em stream (src/modules/export_stream.py e iter_export_rows nos dois backends).
+
+Cobre:
+    Paginação por chave (timestamp, id) com timestamps repetidos, limite inclusivo,
+    fim de página para o cursor seguinte, tokens de cursor e serialização CSV/NDJSON em pedaços
+"""
+import csv
+import io
+import json
+
+from unittest.mock import patch
+
+import pytest
+
+from src.database.db import EXPORT_COLUMNS, DatabaseConnection
+from src.modules.export_stream import csv_chunks, decode_cursor, encode_cursor, ndjson_chunks
+
+
+@pytest.fixture
+def database(repository):
+    # Timestamps repetidos: a ordem precisa desempatar pelo id
+    for i in range(10):
+        with patch('time.time', return_value=1000.0 + i // 3):
+            repository.save_interaction(DatabaseConnection.ResultadoInteracao.SUCESSO)
+    return repository
+
+
+def _ids(rows) -> list[int]:
+    return [row[0] for row in rows]
+
+
+# =============================================================================
+# TestKeysetExport
+# =============================================================================
+
+class TestKeysetExport:
+    def test_lotes_pequenos_preservam_ordem_e_nao_repetem(self, database):
+        rows = list(database.iter_export_rows('interactions', batch_size=3))
+        assert _ids(rows) == list(range(1, 11))
+
+    def test_retoma_apos_cursor_com_timestamp_repetido(self, database):
+        rows = list(database.iter_export_rows('interactions', batch_size=3))
+        position = (rows[4][2], rows[4][0])  # (timestamp, id) da 5ª linha
+
+        resumed = list(database.iter_export_rows('interactions', after=position, batch_size=2))
+        assert _ids(resumed) == list(range(6, 11))
+
+    def test_paginas_por_limite(self, database):
+        pages = []
+        after = None
+        while True:
+            until, has_more = database.find_export_page_end('interactions', after, 4)
+            pages.append(_ids(database.iter_export_rows('interactions', after=after, until=until)))
+            if not has_more:
+                break
+            after = decode_cursor(encode_cursor(until))
+        assert pages == [[1, 2, 3, 4], [5, 6, 7, 8], [9, 10]]
+
+    def test_ultima_pagina_incompleta_vai_ate_o_fim(self, database):
+        assert database.find_export_page_end('interactions', (1002.0, 8), 4) == (None, False)
+
+    def test_fim_de_pagina_exata_sem_proxima(self, database):
+        assert database.find_export_page_end('interactions', None, 10)[1] is False
+        assert database.find_export_page_end('interactions', (9999.0, 0), 5) == (None, False)
+
+    def test_tabela_desconhecida(self, database):
+        with pytest.raises(KeyError):
+            database.find_export_page_end('sqlite_master', None, 1)
+
+
+# =============================================================================
+# TestExportSerialization
+# =============================================================================
+
+class TestExportSerialization:
+    def test_cursor_ida_e_volta(self):
+        assert decode_cursor(encode_cursor((1767225600.123456, 42))) == (1767225600.123456, 42)
+
+    @pytest.mark.parametrize('token', ['%%%', 'bm9wZQ', ''])
+    def test_cursor_invalido(self, token):
+        with pytest.raises(ValueError):
+            decode_cursor(token)
+
+    def test_csv_em_pedacos(self, database):
+        columns = EXPORT_COLUMNS['interactions']
+        chunks = list(csv_chunks(columns, database.iter_export_rows('interactions'), rows_per_chunk=4))
+
+        assert len(chunks) == 3
+        parsed = list(csv.reader(io.StringIO(''.join(chunks))))
+        assert parsed[0] == list(columns)
+        assert [row[0] for row in parsed[1:]] == [str(i) for i in range(1, 11)]
+
+    def test_csv_retomado_sem_cabecalho(self):
+        assert ''.join(csv_chunks(('id',), [(1,)], header=False)).strip() == '1'
+
+    def test_ndjson(self, database):
+        columns = EXPORT_COLUMNS['interactions']
+        body = b''.join(ndjson_chunks(columns, database.iter_export_rows('interactions'), rows_per_chunk=3))
+        records = [json.loads(line) for line in body.splitlines()]
+        assert len(records) == 10
+        assert records[0] == {'id': 1, 'deposit_id': None, 'timestamp': 1000.0, 'resultado': 'sucesso'}
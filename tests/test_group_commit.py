@@ -0,0 +1,96 @@
+"""
+Testes do GroupCommitWriter (src/database/group_commit.py).
+
+Cobre:
+    Futures com ids das linhas, lote por max_rows, isolamento de escrita inválida,
+    flush durável no close() e delegação do DatabaseConnection ao writer
+"""
+import threading
+
+import pytest
+
+from src.database.db import DatabaseConnection
+from src.database.group_commit import GroupCommitWriter
+
+SUCESSO = DatabaseConnection.ResultadoInteracao.SUCESSO
+REJEITADO = DatabaseConnection.ResultadoInteracao.REJEITADO
+
+
+# =============================================================================
+# TestGroupCommitWriter
+# =============================================================================
+
+class TestGroupCommitWriter:
+    def test_futures_recebem_ids_das_linhas(self, sqlite_database):
+        writer = GroupCommitWriter(sqlite_database, interval_ms=5)
+        deposit_id = writer.submit_deposit_outcome(0.9, True, True, 2500, 0.5).result(timeout=2)
+        interaction_id = writer.submit_interaction(REJEITADO).result(timeout=2)
+        writer.close()
+
+        assert deposit_id == 1
+        assert interaction_id == 2
+        assert sqlite_database.get_all_interactions()[-1]['deposit_id'] == deposit_id
+
+    def test_agrupa_escritas_concorrentes_em_lotes(self, sqlite_database):
+        writer = GroupCommitWriter(sqlite_database, interval_ms=50, max_rows=8)
+        futures = []
+        barrier = threading.Barrier(4)
+
+        def kiosk():
+            barrier.wait()
+            futures.extend(writer.submit_interaction(REJEITADO) for _ in range(8))
+
+        threads = [threading.Thread(target=kiosk) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        ids = [f.result(timeout=2) for f in futures]
+        snapshot = writer.snapshot()
+        writer.close()
+
+        assert len(set(ids)) == 32
+        assert snapshot['rows'] == 32
+        assert snapshot['max_batch_rows'] == 8
+        assert snapshot['batches'] < 32
+
+    def test_escrita_invalida_nao_derruba_o_lote(self, sqlite_database):
+        writer = GroupCommitWriter(sqlite_database, interval_ms=50)
+        good = writer.submit_interaction(SUCESSO)
+        bad = writer._submit('interaction', (None, None))  # resultado NOT NULL
+        other = writer.submit_interaction(REJEITADO)
+
+        assert good.result(timeout=2) is not None
+        assert other.result(timeout=2) is not None
+        with pytest.raises(Exception):
+            bad.result(timeout=2)
+        assert writer.snapshot()['failed_rows'] == 1
+        writer.close()
+        assert sqlite_database.get_total_interacoes() == 2
+
+    def test_close_grava_fila_pendente(self, sqlite_database):
+        writer = GroupCommitWriter(sqlite_database, interval_ms=10_000, max_rows=1000)
+        futures = [writer.submit_interaction(SUCESSO) for _ in range(10)]
+        writer.close()
+
+        assert all(f.done() for f in futures)
+        assert sqlite_database.get_total_interacoes() == 10
+        with pytest.raises(RuntimeError):
+            writer.submit_interaction(SUCESSO).result(timeout=1)
+
+
+# =============================================================================
+# TestDatabaseConnectionComWriter
+# =============================================================================
+
+class TestDatabaseConnectionComWriter:
+    def test_metodos_de_escrita_delegam_ao_writer(self, sqlite_database):
+        sqlite_database.writer = GroupCommitWriter(sqlite_database, interval_ms=5)
+        with sqlite_database as db:
+            deposit_id = db.record_deposit_outcome(0.9, True, True, 2500, 0.5)
+            db.save_interaction(REJEITADO)
+        sqlite_database.writer.close()
+
+        assert deposit_id == 1
+        assert sqlite_database.writer.snapshot()['rows'] == 2
+        assert sqlite_database.get_total_interacoes() == 2
@@ -0,0 +1,160 @@
+"""
+Testes da sessão HTTP compartilhada das chamadas ao ESP32 (src/hardware/http_session.py).
+
+Cobre:
+    Reaproveitamento de conexões keep-alive, retry com backoff só em GET, timeouts
+    (conexão, leitura), contadores de métricas e o fluxo login → sensores pela sessão
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+import pytest
+import requests
+
+from src.hardware import esp32
+from src.hardware.http_session import PooledHttpSession
+
+
+class StandInServer:
+    """Servidor local no lugar da API ESP32: respostas por caminho, status forçados e atraso."""
+
+    def __init__(self):
+        self.calls: list[tuple[str, str]] = []
+        self.forced_status: list[int] = []
+        self.delay_seconds = 0.0
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def _reply(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                if length:
+                    self.rfile.read(length)
+                stand_in.calls.append((self.command, self.path))
+                if stand_in.delay_seconds:
+                    time.sleep(stand_in.delay_seconds)
+                status = stand_in.forced_status.pop(0) if stand_in.forced_status else 200
+                if self.path == '/api/auth/login':
+                    payload = {'token': 'token-local', 'expires_in': 3600}
+                else:
+                    payload = {'presenca': True, 'peso': 2500, 'temperatura': 24.0}
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_GET = _reply
+            do_POST = _reply
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def server():
+    stand_in = StandInServer()
+    yield stand_in
+    stand_in.close()
+
+
+@pytest.fixture
+def http():
+    session = PooledHttpSession(pool_size=2, connect_timeout=1.0, read_timeout=2.0, retries=2, backoff_seconds=0)
+    yield session
+    session.close()
+
+
+# =============================================================================
+# TestPooledHttpSession
+# =============================================================================
+
+class TestPooledHttpSession:
+    """Pool keep-alive, retry e timeouts."""
+
+    def test_chamadas_reaproveitam_a_mesma_conexao(self, server, http):
+        for _ in range(5):
+            assert http.get(f'{server.url}/api/sensors').status_code == 200
+
+        snapshot = http.snapshot()
+        assert snapshot['requests'] == 5
+        assert snapshot['connections_opened'] == 1
+        assert snapshot['connections_reused'] == 4
+        assert snapshot['reuse_ratio'] == 0.8
+
+    def test_get_repetido_em_503(self, server, http):
+        server.forced_status = [503, 503]
+
+        response = http.get(f'{server.url}/api/sensors')
+
+        assert response.status_code == 200
+        assert len(server.calls) == 3
+
+    def test_post_nao_e_repetido_em_503(self, server, http):
+        server.forced_status = [503]
+
+        response = http.post(f'{server.url}/api/check_mechanical', json={'peso': 2500})
+
+        assert response.status_code == 503
+        assert len(server.calls) == 1
+
+    def test_timeout_padrao_e_par_conexao_leitura(self, http):
+        assert http.timeout() == (1.0, 2.0)
+        assert http.timeout(30) == (1.0, 30)
+
+    def test_timeout_de_leitura_contado_nas_metricas(self, server):
+        session = PooledHttpSession(read_timeout=0.1, retries=0)
+        server.delay_seconds = 0.5
+        try:
+            with pytest.raises(requests.exceptions.Timeout):
+                session.post(f'{server.url}/api/confirm_detection', json={})
+            assert session.snapshot()['timeouts'] == 1
+        finally:
+            session.close()
+
+    def test_snapshot_antes_da_primeira_chamada(self, http):
+        snapshot = http.snapshot()
+        assert snapshot['requests'] == 0
+        assert snapshot['connections_opened'] == 0
+        assert snapshot['reuse_ratio'] == 0.0
+
+
+# =============================================================================
+# TestEsp32PelaSessao
+# =============================================================================
+
+class TestEsp32PelaSessao:
+    """Login e leitura de sensores do módulo esp32 passando pela sessão compartilhada."""
+
+    @pytest.fixture(autouse=True)
+    def reset_token(self):
+        esp32.esp32_jwt_token = None
+        esp32.esp32_token_expiry = None
+        yield
+        esp32.esp32_jwt_token = None
+        esp32.esp32_token_expiry = None
+
+    def test_login_e_sensores_na_mesma_conexao(self, server, http):
+        with patch.dict('os.environ', {'ESP32_API_URL': server.url}), \
+                patch.object(esp32, 'http_session', http):
+            sensors = esp32.get_esp32_sensors()
+            esp32.check_esp32_mechanical(True, 2500)
+
+        assert sensors == {'presenca': True, 'peso': 2500, 'temperatura': 24.0}
+        assert [path for _, path in server.calls] == ['/api/auth/login', '/api/sensors', '/api/check_mechanical']
+        assert http.snapshot()['connections_opened'] == 1
@@ -0,0 +1,220 @@
+"""
+Testes de idempotência — retries do totem com `Idempotency-Key`.
+
+Cobre:
+    IdempotencyStore (LRU + SQLite, duplicatas concorrentes, TTL, conflito), também sobre o
+    backend SQLAlchemy compartilhado entre instâncias
+    Decorator `idempotent` nas rotas /api/save_deposit e /api/validate_mechanical
+"""
+from __future__ import annotations
+
+import io
+import threading
+from unittest.mock import MagicMock, patch
+
+import cv2
+import numpy as np
+import pytest
+
+from app import app
+from src.database.idempotency import ClaimStatus, IdempotencyStore
+from src.database.repository import open_idempotency_store
+
+
+# =============================================================================
+# FIXTURES
+# =============================================================================
+
+@pytest.fixture(params=['sqlite', 'sqlalchemy'])
+def store(request, tmp_path) -> IdempotencyStore:
+    """Store isolado em banco temporário: arquivo SQLite ou tabela via SQLAlchemy."""
+    url = f"sqlite:///{tmp_path / 'idem.db'}" if request.param == 'sqlite' else \
+        f"sqlite+pysqlite:///{tmp_path / 'idem_sa.db'}"
+    return open_idempotency_store(url, ttl_seconds=60, max_entries=8, wait_timeout_seconds=5)
+
+
+@pytest.fixture
+def client(tmp_path):
+    app.config['TESTING'] = True
+    route_store = IdempotencyStore(str(tmp_path / "idem_routes.db"), wait_timeout_seconds=5)
+    with patch('app.idempotency_store', route_store), app.test_client() as flask_client:
+        yield flask_client
+
+
+# =============================================================================
+# TestIdempotencyStore
+# =============================================================================
+
+class TestIdempotencyStore:
+    def test_primeira_requisicao_e_dona(self, store: IdempotencyStore):
+        claim = store.begin('k1', 'fp')
+        assert claim.status == ClaimStatus.OWNER
+
+    def test_retry_apos_conclusao_recebe_resposta_original(self, store: IdempotencyStore):
+        store.begin('k1', 'fp')
+        store.complete('k1', 'fp', 200, b'{"deposit_id": 7}')
+
+        claim = store.begin('k1', 'fp')
+
+        assert claim.status == ClaimStatus.REPLAY
+        assert claim.response.status_code == 200
+        assert claim.response.body == b'{"deposit_id": 7}'
+
+    def test_chave_reutilizada_com_outro_payload_gera_conflito(self, store: IdempotencyStore):
+        store.begin('k1', 'fp-a')
+        store.complete('k1', 'fp-a', 200, b'{}')
+
+        assert store.begin('k1', 'fp-b').status == ClaimStatus.CONFLICT
+
+    def test_resposta_compartilhada_entre_workers_via_sqlite(self, tmp_path):
+        """Outro worker (outra instância, LRU vazio) deve reenviar a resposta persistida."""
+        db_path = str(tmp_path / "shared.db")
+        worker_a = IdempotencyStore(db_path)
+        worker_b = IdempotencyStore(db_path)
+        worker_a.begin('k1', 'fp')
+        worker_a.complete('k1', 'fp', 201, b'{"ok": true}')
+
+        claim = worker_b.begin('k1', 'fp')
+
+        assert claim.status == ClaimStatus.REPLAY
+        assert claim.response.status_code == 201
+
+    def test_resposta_compartilhada_entre_instancias_via_sqlalchemy(self, tmp_path):
+        """Retry que cai em outra instância (banco compartilhado) reenvia a resposta original."""
+        url = f"sqlite+pysqlite:///{tmp_path / 'shared_sa.db'}"
+        instance_a = open_idempotency_store(url)
+        instance_b = open_idempotency_store(url)
+        instance_a.begin('k1', 'fp')
+        instance_a.complete('k1', 'fp', 201, b'{"deposit_id": 3}')
+
+        claim = instance_b.begin('k1', 'fp')
+
+        assert claim.status == ClaimStatus.REPLAY
+        assert claim.response.body == b'{"deposit_id": 3}'
+
+    def test_app_usa_o_banco_de_database_url(self, tmp_path):
+        import app as app_module
+
+        db_path = tmp_path / 'dados' / 'x.db'
+        db_path.parent.mkdir()
+        with patch('app.DATABASE_URL', f"sqlite:///{db_path}"), patch('app.idempotency_store', None):
+            store = app_module._ensure_idempotency_store()
+
+        assert store.db_path == str(db_path)
+
+    def test_abort_libera_chave_para_novo_processamento(self, store: IdempotencyStore):
+        store.begin('k1', 'fp')
+        store.abort('k1')
+
+        assert store.begin('k1', 'fp').status == ClaimStatus.OWNER
+
+    def test_resposta_expirada_permite_reprocessar(self, tmp_path):
+        expiring = IdempotencyStore(str(tmp_path / "ttl.db"), ttl_seconds=10)
+        with patch('src.database.idempotency.time.time', return_value=1_000.0):
+            expiring.begin('k1', 'fp')
+            expiring.complete('k1', 'fp', 200, b'{}')
+        with patch('src.database.idempotency.time.time', return_value=1_100.0):
+            claim = expiring.begin('k1', 'fp')
+        assert claim.status == ClaimStatus.OWNER
+
+    def test_lru_respeita_limite_de_entradas(self, store: IdempotencyStore):
+        for i in range(20):
+            store.begin(f'k{i}', 'fp')
+            store.complete(f'k{i}', 'fp', 200, b'{}')
+        assert len(store._cache) == store.max_entries
+
+    def test_duplicata_concorrente_espera_resultado_do_dono(self, store: IdempotencyStore):
+        assert store.begin('k1', 'fp').status == ClaimStatus.OWNER
+        results = []
+        waiter = threading.Thread(target=lambda: results.append(store.begin('k1', 'fp')))
+        waiter.start()
+
+        store.complete('k1', 'fp', 200, b'{"id": 1}')
+        waiter.join(timeout=5)
+
+        assert results and results[0].status == ClaimStatus.REPLAY
+        assert results[0].response.body == b'{"id": 1}'
+
+    def test_duplicata_concorrente_sem_conclusao_retorna_em_andamento(self, tmp_path):
+        impatient = IdempotencyStore(str(tmp_path / "wait.db"), wait_timeout_seconds=0.1)
+        impatient.begin('k1', 'fp')
+        assert impatient.begin('k1', 'fp').status == ClaimStatus.IN_PROGRESS
+
+
+# =============================================================================
+# TestIdempotentRoutes
+# =============================================================================
+
+class TestIdempotentRoutes:
+    def test_save_deposit_retry_nao_duplica_deposito(self, client, image_b64):
+        fake_db = MagicMock()
+        fake_db.__enter__.return_value = fake_db
+        fake_db.record_deposit_outcome.return_value = 42
+        headers = {'Idempotency-Key': 'captura-1'}
+        payload = {'image': image_b64}
+
+        with patch('app.image_classifier') as mock_clf, patch('app.db_connection', fake_db):
+            mock_clf.classify_image.return_value = (1, 0.9, 130.0, 'SAT_HIGH')
+            first = client.post('/api/save_deposit', json=payload, headers=headers)
+            retry = client.post('/api/save_deposit', json=payload, headers=headers)
+
+        assert first.status_code == 200
+        assert retry.status_code == 200
+        assert retry.get_json() == first.get_json()
+        assert retry.headers.get('Idempotent-Replayed') == 'true'
+        assert mock_clf.classify_image.call_count == 1
+        assert fake_db.record_deposit_outcome.call_count == 1
+
+    def test_save_deposit_sem_header_processa_sempre(self, client, image_b64):
+        payload = {'image': image_b64}
+        with patch('app.image_classifier') as mock_clf, patch('app.db_connection', None):
+            mock_clf.classify_image.return_value = (1, 0.9, 130.0, 'SAT_HIGH')
+            client.post('/api/save_deposit', json=payload)
+            client.post('/api/save_deposit', json=payload)
+        assert mock_clf.classify_image.call_count == 2
+
+    def test_mesma_chave_com_imagem_diferente_retorna_422(self, client, image_b64):
+        headers = {'Idempotency-Key': 'captura-2'}
+        with patch('app.image_classifier') as mock_clf, patch('app.db_connection', None):
+            mock_clf.classify_image.return_value = (1, 0.9, 130.0, 'SAT_HIGH')
+            client.post('/api/save_deposit', json={'image': image_b64}, headers=headers)
+            response = client.post('/api/save_deposit', json={'image': 'outra'}, headers=headers)
+
+        assert response.status_code == 422
+        data = response.get_json()
+        assert data['status'] == 'erro'
+        assert 'timestamp' in data
+
+    def test_erro_interno_nao_e_armazenado(self, client, image_b64):
+        headers = {'Idempotency-Key': 'captura-3'}
+        payload = {'image': image_b64}
+        with patch('app.image_classifier') as mock_clf, patch('app.db_connection', None):
+            mock_clf.classify_image.side_effect = [RuntimeError('falha'), (1, 0.9, 130.0, 'SAT_HIGH')]
+            first = client.post('/api/save_deposit', json=payload, headers=headers)
+            retry = client.post('/api/save_deposit', json=payload, headers=headers)
+
+        assert first.status_code == 500
+        assert retry.status_code == 200
+        assert 'Idempotent-Replayed' not in retry.headers
+
+    def test_validate_mechanical_retry_multipart_reenvia_resposta(self, client):
+        fake_img = np.zeros((8, 8, 3), dtype=np.uint8)
+        headers = {'Idempotency-Key': 'captura-4'}
+        with patch('app.cv2.imdecode', return_value=fake_img), \
+             patch('app.image_classifier') as mock_clf, \
+             patch('app.db_connection', None):
+            mock_clf.classify_image.return_value = (0, 0.2, 10.0, 'SAT_VERY_LOW')
+            first = client.post('/api/validate_mechanical', data={'image': (io.BytesIO(b'abc'), 'img.jpg')},
+                                content_type='multipart/form-data', headers=headers)
+            retry = client.post('/api/validate_mechanical', data={'image': (io.BytesIO(b'abc'), 'img.jpg')},
+                                content_type='multipart/form-data', headers=headers)
+
+        assert first.status_code == 400
+        assert retry.status_code == 400
+        assert retry.headers.get('Idempotent-Replayed') == 'true'
+        assert mock_clf.classify_image.call_count == 1
+
+    def test_chave_longa_demais_retorna_400(self, client, image_b64):
+        response = client.post('/api/save_deposit', json={'image': image_b64},
+                               headers={'Idempotency-Key': 'x' * 300})
+        assert response.status_code == 400
@@ -0,0 +1,213 @@
+"""
+Testes do pool de processos de inferência com frames em memória compartilhada.
+
+Cobre:
+    InferenceResult, read_cv_metrics, _FrameSlots
+    ProcessPoolInferenceExecutor (paridade com a classificação na thread)
+    _classify_image no app.py (pool habilitado × desabilitado), falha do pool ao subir
+    (encerrado, lembrado e substituído pela thread) e modelo do processo pai só sem pool
+"""
+from __future__ import annotations
+
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import cv2
+import numpy as np
+import pytest
+
+import app as app_module
+from app import app
+from src.modules.image import ImageClassifier
+from src.modules.inference_pool import (
+    InferenceResult,
+    ProcessPoolInferenceExecutor,
+    _FrameSlots,
+    read_cv_metrics,
+)
+
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    with app.test_client() as flask_client:
+        yield flask_client
+
+
+# =============================================================================
+# TestInferenceResult
+# =============================================================================
+
+class TestInferenceResult:
+    def test_as_tuple_mantem_contrato_do_classify_image(self):
+        result = InferenceResult(1, 0.9, 130.0, 'SAT_HIGH', {'hough': 2})
+        assert result.as_tuple() == (1, 0.9, 130.0, 'SAT_HIGH')
+
+    def test_read_cv_metrics_usa_zero_quando_atributo_ausente(self):
+        classifier = SimpleNamespace(_last_hough_count=3, _last_circularity=0.8)
+        metrics = read_cv_metrics(classifier)
+        assert metrics['hough'] == 3
+        assert metrics['circularity'] == 0.8
+        assert metrics['contour_area'] == 0
+
+
+# =============================================================================
+# TestFrameSlots
+# =============================================================================
+
+class TestFrameSlots:
+    def test_slots_sao_reutilizados(self):
+        slots = _FrameSlots(count=1, slot_bytes=1024)
+        try:
+            first, dedicated = slots.acquire(100, timeout=1)
+            slots.release(first, dedicated)
+            second, _ = slots.acquire(100, timeout=1)
+            assert second is first
+            slots.release(second, False)
+        finally:
+            slots.close()
+
+    def test_frame_maior_que_slot_usa_segmento_dedicado(self):
+        slots = _FrameSlots(count=1, slot_bytes=64)
+        try:
+            segment, dedicated = slots.acquire(1000, timeout=1)
+            assert dedicated is True
+            assert segment.size >= 1000
+            slots.release(segment, dedicated)
+        finally:
+            slots.close()
+
+    def test_replace_troca_slot_apos_timeout(self):
+        slots = _FrameSlots(count=1, slot_bytes=64)
+        try:
+            stale, _ = slots.acquire(10, timeout=1)
+            slots.replace(stale)
+            fresh, _ = slots.acquire(10, timeout=1)
+            assert fresh.name != stale.name
+            slots.release(fresh, False)
+        finally:
+            slots.close()
+
+
+# =============================================================================
+# TestProcessPoolInferenceExecutor
+# =============================================================================
+
+class TestProcessPoolInferenceExecutor:
+    def test_workers_invalido_levanta_value_error(self):
+        with pytest.raises(ValueError):
+            ProcessPoolInferenceExecutor(0)
+
+    def test_resultado_igual_a_classificacao_na_thread(self):
+        classifier = ImageClassifier()
+        classifier.load_classifier()
+        if classifier.model is None:
+            pytest.skip("Modelo SVM não disponível")
+        frame = np.full((120, 160, 3), 40, dtype=np.uint8)
+        cv2.circle(frame, (80, 60), 40, (0, 200, 255), -1)
+
+        executor = ProcessPoolInferenceExecutor(1)
+        try:
+            executor.warm_up()
+            pooled = executor.classify(frame)
+        finally:
+            executor.close()
+
+        assert pooled.as_tuple() == classifier.classify_image(frame)
+        assert pooled.cv_metrics == read_cv_metrics(classifier)
+
+    def test_imagem_invalida_retorna_erro_sem_usar_pool(self):
+        executor = ProcessPoolInferenceExecutor.__new__(ProcessPoolInferenceExecutor)
+        assert executor.classify(None).as_tuple() == (None, None, None, "ERRO")
+
+    def test_falha_ao_criar_pool_libera_memoria_compartilhada(self):
+        context = MagicMock()
+        context.Pool.side_effect = OSError('sem processos')
+        with patch('src.modules.inference_pool.multiprocessing.get_context', return_value=context), \
+                patch.object(_FrameSlots, 'close', autospec=True) as mock_close, pytest.raises(OSError):
+            ProcessPoolInferenceExecutor(2, slot_bytes=64)
+        mock_close.assert_called_once()
+
+
+# =============================================================================
+# TestClassifyImageRouting
+# =============================================================================
+
+class TestClassifyImageRouting:
+    def test_sem_pool_classifica_na_thread(self):
+        classifier = MagicMock()
+        classifier.classify_image.return_value = (1, 0.9, 130.0, 'SAT_HIGH')
+        with patch('app.inference_executor', None), patch('app.INFERENCE_PROCESS_WORKERS', 0):
+            result = app_module._classify_image(classifier, np.zeros((4, 4, 3), dtype=np.uint8))
+        assert result.as_tuple() == (1, 0.9, 130.0, 'SAT_HIGH')
+        classifier.classify_image.assert_called_once()
+
+    def test_com_pool_nao_usa_classificador_local(self, client, image_b64):
+        fake_executor = MagicMock()
+        fake_executor.classify.return_value = InferenceResult(1, 0.95, 140.0, 'SAT_HIGH')
+        with patch('app.inference_executor', fake_executor), \
+             patch('app._ensure_image_classifier') as mock_ensure, \
+             patch('app.db_connection', None):
+            response = client.post('/api/save_deposit', json={'image': image_b64})
+
+        assert response.status_code == 200
+        fake_executor.classify.assert_called_once()
+        mock_ensure.assert_not_called()  # modelo só nos workers do pool
+
+    def test_metrics_informa_modo_de_inferencia(self, client):
+        fake_executor = MagicMock(workers=4)
+        with patch('app.inference_executor', fake_executor), \
+             patch('app.is_admin_authenticated', return_value=True):
+            response = client.get('/api/admin/metrics')
+
+        inference = response.get_json()['metrics']['inference']
+        assert inference == {'mode': 'process_pool', 'workers': 4, 'pool_failed': False}
+
+
+# =============================================================================
+# TestEnsureInferenceExecutor
+# =============================================================================
+
+class TestEnsureInferenceExecutor:
+    @pytest.fixture(autouse=True)
+    def pool_habilitado(self):
+        with patch('app.INFERENCE_PROCESS_WORKERS', 2), patch('app.inference_executor', None), \
+                patch('app._inference_executor_failed', False):
+            yield
+
+    def test_warm_up_sem_modelo_encerra_pool_e_classifica_na_thread(self):
+        with patch('app.ProcessPoolInferenceExecutor') as mock_cls:
+            mock_cls.return_value.warm_up.return_value = False
+            assert app_module._ensure_inference_executor() is None
+            assert app_module._ensure_inference_executor() is None
+
+        mock_cls.assert_called_once_with(2)  # falha lembrada: o pool não é recriado a cada requisição
+        mock_cls.return_value.close.assert_called_once()
+        assert app_module._inference_executor_failed is True
+
+    def test_warm_up_com_erro_encerra_pool_parcial(self):
+        with patch('app.ProcessPoolInferenceExecutor') as mock_cls:
+            mock_cls.return_value.warm_up.side_effect = RuntimeError('worker morreu')
+            assert app_module._ensure_inference_executor() is None
+
+        mock_cls.return_value.close.assert_called_once()
+
+    def test_pool_com_falha_usa_modelo_do_processo(self):
+        classifier = MagicMock()
+        classifier.classify_image.return_value = (0, 0.3, 20.0, 'SAT_LOW')
+        with patch('app.ProcessPoolInferenceExecutor', side_effect=OSError('sem processos')), \
+                patch('app._ensure_image_classifier', return_value=classifier) as mock_ensure:
+            local = app_module._local_classifier()
+            result = app_module._classify_image(local, np.zeros((4, 4, 3), dtype=np.uint8))
+
+        mock_ensure.assert_called_once()
+        assert result.as_tuple() == (0, 0.3, 20.0, 'SAT_LOW')
+
+    def test_pool_ativo_nao_carrega_modelo_no_processo(self):
+        with patch('app.ProcessPoolInferenceExecutor') as mock_cls, \
+                patch('app._ensure_image_classifier') as mock_ensure:
+            mock_cls.return_value.warm_up.return_value = True
+            assert app_module._local_classifier() is None
+
+        mock_ensure.assert_not_called()
+        assert app_module.inference_executor is mock_cls.return_value
@@ -0,0 +1,128 @@
+"""
+Testes do provider JSON rápido e do esquema de resposta compacta.
+
+Cobre:
+    json_default, dumps_bytes (orjson e fallback stdlib), compact_payload
+    FastJSONProvider registrado no app Flask (jsonify com NumPy)
+    Negociação `?compact=1` / `Accept` nas rotas do totem
+"""
+from __future__ import annotations
+
+import json
+from datetime import datetime
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from app import app
+from src.database.db import DatabaseConnection
+from src.modules.inference_pool import InferenceResult
+from src.modules.json_provider import (
+    COMPACT_MEDIA_TYPE,
+    FastJSONProvider,
+    compact_payload,
+    dumps_bytes,
+    json_default,
+)
+
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    with app.test_client() as flask_client:
+        yield flask_client
+
+
+# =============================================================================
+# TestSerializacao
+# =============================================================================
+
+class TestSerializacao:
+    def test_json_default_converte_tipos_numpy_datas_e_enum(self):
+        assert json_default(np.float32(0.5)) == 0.5
+        assert json_default(np.int64(3)) == 3
+        assert json_default(np.array([1, 2])) == [1, 2]
+        assert json_default(datetime(2026, 1, 2, 3, 4, 5)) == '2026-01-02T03:04:05'
+        assert json_default(DatabaseConnection.ResultadoInteracao.SUCESSO) == 'sucesso'
+
+    def test_json_default_rejeita_tipo_desconhecido(self):
+        with pytest.raises(TypeError):
+            json_default(object())
+
+    @pytest.mark.parametrize("use_orjson", [True, False])
+    def test_dumps_bytes_com_escalares_numpy(self, use_orjson):
+        payload = {'confidence': np.float64(0.93), 'hough': np.int64(2), 'ok': np.bool_(True)}
+        if use_orjson:
+            pytest.importorskip('orjson')
+            data = dumps_bytes(payload)
+        else:
+            with patch('src.modules.json_provider.orjson', None):
+                data = dumps_bytes(payload)
+        assert json.loads(data) == {'confidence': 0.93, 'hough': 2, 'ok': True}
+
+    def test_app_registra_fast_provider(self):
+        assert isinstance(app.json, FastJSONProvider)
+
+    def test_jsonify_aceita_numpy(self):
+        from flask import jsonify
+        with app.app_context():
+            response = jsonify({'confidence': np.float64(0.5)})
+        assert response.get_json() == {'confidence': 0.5}
+
+
+# =============================================================================
+# TestCompactPayload
+# =============================================================================
+
+class TestCompactPayload:
+    def test_remove_campos_de_exibicao_e_arredonda(self):
+        payload = {
+            'status': 'sucesso',
+            'timestamp': '2026-01-01T00:00:00',
+            'color': 'green',
+            'stages': {'classificacao': {'confidence': np.float64(0.93123456), 'cv_debug': {'hough': 2}}},
+        }
+        assert compact_payload(payload) == {
+            'status': 'sucesso',
+            'stages': {'classificacao': {'confidence': 0.931}},
+        }
+
+    def test_listas_sao_percorridas(self):
+        assert compact_payload([{'icon': 'x', 'v': 1.23456}]) == [{'v': 1.235}]
+
+
+# =============================================================================
+# TestCompactRoutes
+# =============================================================================
+
+class TestCompactRoutes:
+    def test_classify_compacto_por_query(self, client, image_b64):
+        with patch('app._classify_image', return_value=InferenceResult(1, np.float64(0.912345), 140.0, 'SAT_HIGH')):
+            full = client.post('/api/classify', json={'image': image_b64}).get_json()
+            compact = client.post('/api/classify?compact=1', json={'image': image_b64}).get_json()
+
+        assert 'timestamp' in full and 'color' in full
+        assert 'timestamp' not in compact and 'color' not in compact and 'icon' not in compact
+        assert compact['confidence'] == 0.912
+        assert compact['is_tampinha'] is True
+
+    def test_validate_complete_compacto_por_accept_omite_cv_debug(self, client, image_b64):
+        result = InferenceResult(0, 0.2, 10.0, 'SAT_VERY_LOW', {'hough': 0, 'circularity': 0.1})
+        with patch('app._classify_image', return_value=result), patch('app.db_connection', None):
+            response = client.post('/api/validate-complete', json={'image': image_b64},
+                                   headers={'Accept': COMPACT_MEDIA_TYPE})
+
+        data = response.get_json()
+        assert response.status_code == 200
+        assert data['status'] == 'rejeitado'
+        assert 'cv_debug' not in data
+        assert response.headers['Vary'] == 'Accept'
+
+    def test_resposta_padrao_mantem_cv_debug(self, client, image_b64):
+        result = InferenceResult(0, 0.2, 10.0, 'SAT_VERY_LOW', {'hough': 1, 'circularity': 0.123456})
+        with patch('app._classify_image', return_value=result), patch('app.db_connection', None):
+            data = client.post('/api/validate-complete', json={'image': image_b64}).get_json()
+
+        assert data['cv_debug']['hough'] == 1
+        assert data['cv_debug']['circularity'] == 0.123
@@ -0,0 +1,116 @@
+"""
+Testes das migrações de esquema (src/database/migrations.py).
+
+Cobre:
+    schema_version e aplicação única, migração de banco legado com backfill de `day`,
+    rollback de migração com erro e EXPLAIN QUERY PLAN das consultas do dashboard
+"""
+import sqlite3
+from datetime import datetime
+
+import pytest
+
+from src.database.db import SELECT_DEPOSITS_SQL, SELECT_INTERACTIONS_SQL, DatabaseConnection
+from src.database.migrations import MIGRATIONS, Migration, apply_migrations, current_version
+from src.database.pool import close_all_pools
+
+
+@pytest.fixture(autouse=True)
+def _fechar_pools():
+    yield
+    close_all_pools()
+
+
+@pytest.fixture
+def db_path(tmp_path) -> str:
+    path = str(tmp_path / "migrations.db")
+    DatabaseConnection(path).init_db()
+    return path
+
+
+def _query_plan(conn: sqlite3.Connection, sql: str, params=()) -> str:
+    return ' | '.join(row[-1] for row in conn.execute(f'EXPLAIN QUERY PLAN {sql}', params))
+
+
+# =============================================================================
+# TestApplyMigrations
+# =============================================================================
+
+class TestApplyMigrations:
+    def test_init_db_registra_versao_atual(self, db_path):
+        conn = sqlite3.connect(db_path)
+        assert current_version(conn) == MIGRATIONS[-1].version
+        assert conn.execute('SELECT COUNT(*) FROM schema_version').fetchone()[0] == len(MIGRATIONS)
+        conn.close()
+
+    def test_init_db_repetido_nao_reaplica(self, db_path):
+        DatabaseConnection(db_path).init_db()
+        conn = sqlite3.connect(db_path)
+        assert conn.execute('SELECT COUNT(*) FROM schema_version').fetchone()[0] == len(MIGRATIONS)
+        conn.close()
+
+    def test_banco_legado_recebe_day_preenchido(self, tmp_path):
+        path = str(tmp_path / "legado.db")
+        conn = sqlite3.connect(path)
+        conn.execute('CREATE TABLE deposits (id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp REAL NOT NULL, '
+                     'ml_confidence REAL, presence_detected BOOLEAN, weight_value INTEGER, weight_ok BOOLEAN, '
+                     'plastico_reciclado_g REAL, created_at DATETIME DEFAULT CURRENT_TIMESTAMP)')
+        conn.execute('CREATE TABLE interactions (id INTEGER PRIMARY KEY AUTOINCREMENT, deposit_id INTEGER, '
+                     'timestamp REAL NOT NULL, resultado TEXT NOT NULL, created_at DATETIME DEFAULT CURRENT_TIMESTAMP)')
+        ts = datetime(2026, 3, 10, 12, 0).timestamp()
+        conn.execute('INSERT INTO interactions (timestamp, resultado) VALUES (?, ?)', (ts, 'rejeitado'))
+        conn.commit()
+
+        assert apply_migrations(conn) == MIGRATIONS[-1].version
+        assert conn.execute('SELECT day FROM interactions').fetchone()[0] == '2026-03-10'
+        conn.close()
+
+    def test_insert_preenche_day_na_mesma_transacao(self, db_path):
+        DatabaseConnection(db_path).record_deposit_outcome(0.9, True, True, 2500, 0.5)
+        conn = sqlite3.connect(db_path)
+        today = datetime.now().date().isoformat()
+        assert conn.execute('SELECT day FROM deposits').fetchone()[0] == today
+        assert conn.execute('SELECT day FROM interactions').fetchone()[0] == today
+        conn.close()
+
+    def test_migracao_com_erro_e_desfeita(self, db_path):
+        def quebra(conn):
+            conn.execute('CREATE TABLE temporaria (v INTEGER)')
+            raise RuntimeError('falhou')
+
+        conn = sqlite3.connect(db_path)
+        with pytest.raises(RuntimeError):
+            apply_migrations(conn, MIGRATIONS + [Migration(999, 'quebrada', quebra)])
+        assert current_version(conn) == MIGRATIONS[-1].version
+        assert conn.execute("SELECT name FROM sqlite_master WHERE name='temporaria'").fetchone() is None
+        conn.close()
+
+
+# =============================================================================
+# TestQueryPlans
+# =============================================================================
+
+class TestQueryPlans:
+    def test_listagem_de_depositos_usa_indice_de_timestamp(self, db_path):
+        conn = sqlite3.connect(db_path)
+        assert 'idx_deposits_timestamp' in _query_plan(conn, SELECT_DEPOSITS_SQL)
+        conn.close()
+
+    def test_listagem_de_interacoes_usa_indice_de_timestamp(self, db_path):
+        conn = sqlite3.connect(db_path)
+        assert 'idx_interactions_timestamp' in _query_plan(conn, SELECT_INTERACTIONS_SQL)
+        conn.close()
+
+    def test_contagem_por_resultado_e_periodo_usa_indice_composto(self, db_path):
+        conn = sqlite3.connect(db_path)
+        plan = _query_plan(conn, 'SELECT COUNT(*) FROM interactions WHERE resultado = ? AND timestamp >= ?',
+                           ('rejeitado', 0))
+        assert 'idx_interactions_resultado_timestamp' in plan
+        conn.close()
+
+    def test_agrupamento_por_dia_nao_varre_tabela(self, db_path):
+        conn = sqlite3.connect(db_path)
+        plan = _query_plan(conn, 'SELECT day, resultado, COUNT(*) FROM interactions GROUP BY day, resultado')
+        assert 'idx_interactions_day_resultado' in plan
+        assert 'TEMP B-TREE' not in plan
+        conn.close()
@@ -0,0 +1,110 @@
+"""
+Testes dos totais por período do dashboard (src/modules/period_stats.py).
+
+Cobre:
+    Limites de período corrente/anterior, percentuais de variação,
+    cálculo a partir do rollup (SQLite e SQLAlchemy) e cache por limite de período
+"""
+from datetime import date, datetime, time as dt_time, timedelta
+from unittest.mock import patch
+
+import pytest
+
+from src.database.db import DatabaseConnection
+from src.modules.period_stats import PeriodStatsCache, percent_change, period_ranges
+
+SUCESSO = DatabaseConnection.ResultadoInteracao.SUCESSO
+REJEITADO = DatabaseConnection.ResultadoInteracao.REJEITADO
+
+
+@pytest.fixture
+def database(repository):
+    """Repositório nos dois backends (DATABASE_URL parametrizado no conftest)."""
+    return repository
+
+
+def _insert_at(db, day: date, resultado, deposit: bool) -> None:
+    with patch('time.time', return_value=datetime.combine(day, dt_time(12, 0)).timestamp()):
+        if deposit:
+            db.record_deposit_outcome(0.9, True, True, 2500, 0.5, resultado)
+        else:
+            db.save_interaction(resultado)
+
+
+# =============================================================================
+# TestPeriodRanges
+# =============================================================================
+
+class TestPeriodRanges:
+    def test_mes_compara_mesmos_dias_decorridos(self):
+        assert period_ranges('month', date(2026, 3, 10)) == (
+            (date(2026, 3, 1), date(2026, 3, 10)), (date(2026, 2, 1), date(2026, 2, 10))
+        )
+
+    def test_mes_anterior_mais_curto_e_limitado(self):
+        assert period_ranges('month', date(2026, 3, 31))[1] == (date(2026, 2, 1), date(2026, 2, 28))
+
+    def test_semana_comeca_na_segunda(self):
+        # 2026-10-21 é quarta-feira
+        assert period_ranges('week', date(2026, 10, 21)) == (
+            (date(2026, 10, 19), date(2026, 10, 21)), (date(2026, 10, 12), date(2026, 10, 14))
+        )
+
+    def test_ano_e_hoje(self):
+        assert period_ranges('year', date(2026, 2, 1))[1] == (date(2025, 1, 1), date(2025, 2, 1))
+        assert period_ranges('today', date(2026, 1, 1))[1] == (date(2025, 12, 31), date(2025, 12, 31))
+
+    def test_percent_change(self):
+        assert percent_change(15, 10) == 50.0
+        assert percent_change(5, 10) == -50.0
+        assert percent_change(0, 0) == 0.0
+        assert percent_change(3, 0) == 100.0
+
+
+# =============================================================================
+# TestPeriodStatsCache
+# =============================================================================
+
+class TestPeriodStatsCache:
+    def test_campos_do_dashboard_a_partir_do_rollup(self, database):
+        today = date.today()
+        _insert_at(database, today, SUCESSO, deposit=True)
+        _insert_at(database, today, REJEITADO, deposit=False)
+        _insert_at(database, today - timedelta(days=400), SUCESSO, deposit=True)
+
+        fields = PeriodStatsCache().dashboard_fields(database, today=today)
+
+        assert fields['today'] == fields['week'] == fields['month'] == fields['year'] == 2
+        assert fields['changeTotal'] == 100.0
+        assert fields['changeTaxa'] == 50.0
+        assert fields['changeRejeitadas'] == 100.0
+
+    def test_periodo_anterior(self, database):
+        today = date(2026, 3, 10)
+        for _ in range(2):
+            _insert_at(database, date(2026, 2, 5), REJEITADO, deposit=False)
+        _insert_at(database, date(2026, 2, 5), SUCESSO, deposit=True)
+        _insert_at(database, date(2026, 3, 9), REJEITADO, deposit=False)
+
+        fields = PeriodStatsCache().dashboard_fields(database, today=today)
+
+        assert fields['month'] == 1
+        assert fields['changeTotal'] == percent_change(1, 3)
+        assert fields['changeRejeitadas'] == -50.0
+
+    def test_polls_repetidos_so_consultam_o_dia_corrente(self, database):
+        cache = PeriodStatsCache()
+        today = date(2026, 3, 10)
+        cache.dashboard_fields(database, today=today)
+
+        with patch.object(database, 'get_rollup_totals', wraps=database.get_rollup_totals) as spy:
+            cache.dashboard_fields(database, today=today)
+        assert spy.call_count == 1
+        assert spy.call_args.args == ('2026-03-10', '2026-03-10')
+
+    def test_virada_do_dia_gera_novas_chaves(self, database):
+        cache = PeriodStatsCache()
+        cache.dashboard_fields(database, today=date(2026, 3, 10))
+        misses = cache.stats['misses']
+        cache.dashboard_fields(database, today=date(2026, 3, 11))
+        assert cache.stats['misses'] > misses
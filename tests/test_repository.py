@@ -0,0 +1,193 @@
+"""
+Testes do contrato de persistência (src/database/repository.py) nos dois backends.
+
+Cobre:
+    Seleção do backend pela URL, escrita com rollup e contadores na mesma transação,
+    agregados do dashboard/analytics, paginação por chave e as rotas admin/depósito sobre o
+    banco de DATABASE_URL — os mesmos testes rodam no SQLite com pool WAL e no backend
+    SQLAlchemy (SQLite local como banco de teste)
+"""
+import time
+from datetime import date, datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+
+from src.database.db import DatabaseConnection
+from src.database.repository import TotemRepository, open_repository, sqlite_path_from_url
+
+SUCESSO = DatabaseConnection.ResultadoInteracao.SUCESSO
+REJEITADO = DatabaseConnection.ResultadoInteracao.REJEITADO
+
+
+@pytest.fixture
+def repo(repository):
+    """Um parâmetro por backend (DATABASE_URL no conftest)."""
+    return repository
+
+
+def _at(moment: datetime):
+    """Congela time.time() nos dois backends para gravar em um instante conhecido."""
+    return patch('time.time', return_value=moment.timestamp())
+
+
+# =============================================================================
+# TestOpenRepository
+# =============================================================================
+
+class TestOpenRepository:
+    def test_sem_url_ou_sqlite_usa_database_connection(self, tmp_path):
+        assert sqlite_path_from_url(None) == 'totem_data.db'
+        assert sqlite_path_from_url('sqlite:///dados/totem.db') == 'dados/totem.db'
+        assert sqlite_path_from_url('postgresql+psycopg://u:p@host/totem') is None
+        assert isinstance(open_repository(f"sqlite:///{tmp_path / 'x.db'}"), DatabaseConnection)
+
+    def test_outra_url_usa_sqlalchemy(self, tmp_path):
+        pytest.importorskip('sqlalchemy')
+        from src.database.sql_backend import SQLAlchemyRepository
+
+        repository = open_repository(f"sqlite+pysqlite:///{tmp_path / 'y.db'}")
+        try:
+            assert isinstance(repository, SQLAlchemyRepository)
+            assert isinstance(repository, TotemRepository)
+        finally:
+            repository.close()
+
+
+# =============================================================================
+# TestRepositoryContract
+# =============================================================================
+
+class TestRepositoryContract:
+    def test_escritas_atualizam_totais_e_rollup(self, repo):
+        with repo as db:
+            deposit_id = db.record_deposit_outcome(0.9, True, True, 2500, 0.5)
+            db.save_deposit_data(0.7, True, True, None, 0.5)
+            db.save_interaction(REJEITADO)
+
+        assert deposit_id is not None
+        assert repo.get_totals() == {'interactions': 2, 'deposits': 2, 'weight_sum': 2500.0}
+        assert repo.get_total_interacoes() == 2
+        assert repo.count_deposits() == 2
+        assert repo.sum_deposit_weight_grams() == 2500.0
+        assert repo.reconcile_totals() == {}
+
+        today = date.today().isoformat()
+        rollup = {row['resultado']: row for row in repo.get_daily_rollup(today, today)}
+        assert rollup['sucesso']['deposits'] == 2
+        assert rollup['sucesso']['interactions'] == 1
+        assert rollup['sucesso']['confidence_count'] == 2
+        assert rollup['sucesso']['weight_count'] == 1
+        assert rollup['rejeitado']['interactions'] == 1
+        assert repo.get_rollup_totals(today, today) == {'interactions': 2, 'deposits': 2}
+        assert repo.get_daily_deposit_counts(days=7) == {today: 2}
+
+    def test_listagens_em_ordem_decrescente(self, repo):
+        for offset, weight in enumerate((2400, 2500, 2600)):
+            with _at(datetime.now() - timedelta(minutes=10 - offset)):
+                repo.save_deposit_data(0.9, True, True, weight, 0.5)
+
+        assert [d['weight_value'] for d in repo.get_latest_deposits(limit=2)] == [2600, 2500]
+        assert [d['weight_value'] for d in repo.get_all_deposits()] == [2600, 2500, 2400]
+        assert set(repo.get_all_deposits()[0]) == {'id', 'timestamp', 'ml_confidence', 'presence_detected',
+                                                   'weight_value', 'weight_ok', 'plastico_reciclado_g'}
+
+    def test_buckets_por_hora_e_mes(self, repo):
+        with _at(datetime(2026, 2, 3, 14, 10)):
+            repo.record_deposit_outcome(0.9, True, True, 2500, 0.5)
+        with _at(datetime(2026, 2, 3, 14, 50)):
+            repo.save_interaction(REJEITADO)
+        with _at(datetime(2026, 3, 1, 9, 0)):
+            repo.record_deposit_outcome(0.8, True, True, 2700, 0.5)
+
+        start, end = datetime(2026, 2, 1).timestamp(), datetime(2026, 4, 1).timestamp()
+        hourly = repo.get_analytics_buckets('hour', start, end)
+        assert [(b['bucket'], b['resultado'], b['interactions'], b['deposits']) for b in hourly] == [
+            ('2026-02-03T14:00', 'rejeitado', 1, 0),
+            ('2026-02-03T14:00', 'sucesso', 1, 1),
+            ('2026-03-01T09:00', 'sucesso', 1, 1),
+        ]
+        monthly = repo.get_analytics_buckets('month', start, end)
+        assert [(b['bucket'], b['resultado'], b['interactions'], b['weight_sum']) for b in monthly] == [
+            ('2026-02', 'rejeitado', 1, 0),
+            ('2026-02', 'sucesso', 1, 2500),
+            ('2026-03', 'sucesso', 1, 2700),
+        ]
+
+    def test_paginacao_por_chave(self, repo):
+        base = float(int(time.time()) - 100)
+        for offset in range(5):
+            with _at(datetime.fromtimestamp(base + offset)):
+                repo.save_interaction(SUCESSO)
+
+        rows = list(repo.iter_export_rows('interactions', batch_size=2))
+        assert [row[2] for row in rows] == [base + offset for offset in range(5)]
+
+        end, has_more = repo.find_export_page_end('interactions', None, 2)
+        assert has_more is True
+        first_page = list(repo.iter_export_rows('interactions', until=end, batch_size=10))
+        rest = list(repo.iter_export_rows('interactions', after=end, batch_size=10))
+        assert len(first_page) == 2 and len(rest) == 3
+        assert repo.find_export_page_end('interactions', end, 5) == (None, False)
+
+
+# =============================================================================
+# TestRotasNosDoisBackends
+# =============================================================================
+
+class TestRotasNosDoisBackends:
+    """Rotas que leem/gravam pelo repositório do app (`_ensure_db_connection`)."""
+
+    @pytest.fixture
+    def client(self, repository):
+        from app import app
+
+        app.config['TESTING'] = True
+        with app.test_client() as flask_client, patch('app.is_admin_authenticated', return_value=True):
+            yield flask_client
+
+    def test_dashboard_com_dados_reais(self, client, repo):
+        repo.record_deposit_outcome(0.9, True, True, 2500, 0.5)
+        repo.record_deposit_outcome(0.8, True, True, 1500, 0.5)
+        repo.save_interaction(REJEITADO)
+
+        response = client.get('/api/admin/dashboard')
+
+        body = response.get_json()
+        assert response.status_code == 200
+        assert body['stats']['total'] == 3
+        assert body['stats']['aceitas'] == 2
+        assert body['stats']['rejeitadas'] == 1
+        assert body['stats']['today'] == 3
+        assert [deposit['weight_value'] for deposit in body['deposits']] == [1500, 2500]
+        assert body['trend']['values'][-1] == 2
+
+    def test_analytics_report_com_intervalo(self, client, repo):
+        with _at(datetime(2026, 1, 5, 10)):
+            repo.record_deposit_outcome(0.9, True, True, 2000, 0.5)
+        with _at(datetime(2026, 1, 6, 10)):
+            repo.save_interaction(REJEITADO)
+
+        ranged = client.get('/api/admin/analytics-report?from=2026-01-05&to=2026-01-06&granularity=day')
+        full = client.get('/api/admin/analytics-report')
+
+        series = ranged.get_json()['report']['series']
+        assert series['labels'] == ['2026-01-05', '2026-01-06']
+        assert series['interactions'] == [1, 1]
+        assert full.get_json()['report']['kpis']['total_interactions'] == 2
+
+    def test_save_deposit_grava_no_backend(self, client, repo):
+        import base64
+
+        import cv2
+        import numpy as np
+
+        ok, buffer = cv2.imencode('.jpg', np.zeros((16, 16, 3), dtype=np.uint8))
+        assert ok
+        with patch('app._ensure_image_classifier') as mock_ensure:
+            mock_ensure.return_value.classify_image.return_value = (1, 0.93, 140.0, 'SAT_HIGH')
+            response = client.post('/api/save_deposit', json={'image': base64.b64encode(buffer).decode('utf-8')})
+
+        assert response.status_code == 200
+        assert repo.count_deposits() == 1
+        assert repo.get_all_interactions()[0]['resultado'] == 'sucesso'
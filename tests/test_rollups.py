@@ -0,0 +1,91 @@
+"""
+Testes do rollup diário (src/database/rollups.py).
+
+Cobre:
+    Manutenção por triggers (inclusive group commit), rebuild, checker de consistência
+    e relatório analítico lido do rollup × calculado das tabelas brutas
+"""
+from src.database.db import DatabaseConnection
+from src.database.group_commit import GroupCommitWriter
+from src.modules.sprint3_analytics import build_analytics_report, build_analytics_report_from_rollup
+
+SUCESSO = DatabaseConnection.ResultadoInteracao.SUCESSO
+REJEITADO = DatabaseConnection.ResultadoInteracao.REJEITADO
+ERRO_MECANICA = DatabaseConnection.ResultadoInteracao.ERRO_MECANICA
+
+
+def _popular(db: DatabaseConnection) -> None:
+    db.record_deposit_outcome(0.9, True, True, 2500, 0.5)
+    db.record_deposit_outcome(0.8, True, True, 2600, 0.7)
+    db.save_deposit_data(None, True, True, None, 0.1)  # depósito legado sem interação
+    db.save_interaction(REJEITADO)
+    db.save_interaction(REJEITADO)
+    db.save_interaction(ERRO_MECANICA)
+
+
+def _sem_data(report: dict) -> dict:
+    return {key: value for key, value in report.items() if key != 'generated_at'}
+
+
+# =============================================================================
+# TestDailyRollup
+# =============================================================================
+
+class TestDailyRollup:
+    def test_triggers_mantem_rollup_consistente(self, sqlite_database):
+        _popular(sqlite_database)
+        assert sqlite_database.check_daily_rollup() == []
+
+        rows = {row['resultado']: row for row in sqlite_database.get_daily_rollup()}
+        assert rows['sucesso']['interactions'] == 2
+        assert rows['sucesso']['deposits'] == 3
+        assert rows['sucesso']['confidence_count'] == 2
+        assert rows['sucesso']['weight_sum'] == 5100
+        assert rows['rejeitado']['interactions'] == 2
+        assert rows['erro_mecanica']['interactions'] == 1
+
+    def test_group_commit_tambem_atualiza_rollup(self, sqlite_database):
+        writer = GroupCommitWriter(sqlite_database, interval_ms=5)
+        writer.submit_deposit_outcome(0.9, True, True, 2500, 0.5).result(timeout=2)
+        writer.submit_interaction(REJEITADO).result(timeout=2)
+        writer.close()
+        assert sqlite_database.check_daily_rollup() == []
+
+    def test_checker_detecta_divergencia_e_rebuild_corrige(self, sqlite_database):
+        _popular(sqlite_database)
+        with sqlite_database as db:
+            db.conn.execute("UPDATE daily_rollup SET interactions = 99 WHERE resultado = 'rejeitado'")
+            db.conn.commit()
+
+        mismatches = sqlite_database.check_daily_rollup()
+        assert [(m['resultado'], m['metric'], m['rollup'], m['raw']) for m in mismatches] == [
+            ('rejeitado', 'interactions', 99, 2)
+        ]
+        assert sqlite_database.rebuild_daily_rollup() == 3
+        assert sqlite_database.check_daily_rollup() == []
+
+    def test_filtro_por_intervalo_de_dias(self, sqlite_database):
+        _popular(sqlite_database)
+        assert sqlite_database.get_daily_rollup(first_day='2999-01-01') == []
+        assert len(sqlite_database.get_daily_rollup(last_day='2999-01-01')) == 3
+
+
+# =============================================================================
+# TestAnalyticsFromRollup
+# =============================================================================
+
+class TestAnalyticsFromRollup:
+    def test_relatorio_do_rollup_igual_ao_das_tabelas_brutas(self, sqlite_database):
+        _popular(sqlite_database)
+        sqlite_database.save_interaction(SUCESSO, None)
+
+        from_raw = build_analytics_report(sqlite_database.get_all_deposits(), sqlite_database.get_all_interactions())
+        from_rollup = build_analytics_report_from_rollup(sqlite_database.get_daily_rollup())
+        assert _sem_data(from_rollup) == _sem_data(from_raw)
+
+    def test_rollup_vazio(self):
+        report = build_analytics_report_from_rollup([])
+        assert report['kpis']['total_interactions'] == 0
+        assert report['kpis']['acceptance_rate_percent'] == 0.0
+        assert report['interaction_results'] == {}
+        assert report['trend_7d']['values'] == [0] * 7
@@ -235,7 +235,7 @@ class TestEsp32Health:
 
     def test_esp32_online_retorna_200(self, client):
         """ESP32 online → status='online' e HTTP 200."""
-        with patch('app.requests.get') as mock_get:
+        with patch('app.esp32_http.get') as mock_get:
             mock_response = MagicMock()
             mock_response.status_code = 200
             mock_response.json.return_value = {'status': 'ok'}
@@ -250,7 +250,7 @@ class TestEsp32Health:
 
     def test_esp32_offline_retorna_503(self, client):
         """ESP32 offline (timeout/erro) → status='offline' e HTTP 503."""
-        with patch('app.requests.get') as mock_get:
+        with patch('app.esp32_http.get') as mock_get:
             mock_get.side_effect = ConnectionError("Cannot connect")
 
             response = client.get('/api/esp32-health')
@@ -261,7 +261,7 @@ class TestEsp32Health:
 
     def test_esp32_http_error_status(self, client):
         """ESP32 retorna erro HTTP → status='offline'."""
-        with patch('app.requests.get') as mock_get:
+        with patch('app.esp32_http.get') as mock_get:
             mock_response = MagicMock()
             mock_response.status_code = 500
             mock_get.return_value = mock_response
@@ -275,7 +275,7 @@ class TestEsp32Health:
     def test_esp32_timeout_treated_as_offline(self, client):
         """Timeout ao conectar ESP32 → status='offline'."""
         import requests
-        with patch('app.requests.get') as mock_get:
+        with patch('app.esp32_http.get') as mock_get:
             mock_get.side_effect = requests.exceptions.Timeout("timeout")
 
             response = client.get('/api/esp32-health')
@@ -357,8 +357,12 @@ class TestAdminRoutes:
 
         with patch('app._ensure_db_connection') as mock_db_factory:
             fake_db = MagicMock()
-            fake_db.get_all_deposits.return_value = fake_deposits
+            fake_db.count_deposits.return_value = len(fake_deposits)
             fake_db.get_total_interacoes.return_value = 3
+            fake_db.sum_deposit_weight_grams.return_value = 5100.0
+            fake_db.get_daily_deposit_counts.return_value = {}
+            fake_db.get_rollup_totals.return_value = {'interactions': 0, 'deposits': 0}
+            fake_db.get_latest_deposits.return_value = fake_deposits
 
             fake_context = MagicMock()
             fake_context.__enter__.return_value = fake_db
@@ -388,20 +392,19 @@ class TestAdminAnalyticsReport:
 
     def test_analytics_report_com_token_valido_retorna_kpis(self, client):
         """Endpoint analítico deve retornar KPIs, tendência e distribuição."""
-        fake_deposits = [
-            {'timestamp': 1700000000.0, 'ml_confidence': 0.9, 'weight_value': 2500},
-            {'timestamp': 1700003600.0, 'ml_confidence': 0.8, 'weight_value': 2600},
-        ]
-        fake_interactions = [
-            {'id': 1, 'deposit_id': 1, 'timestamp': 1700000000.0, 'resultado': 'sucesso'},
-            {'id': 2, 'deposit_id': None, 'timestamp': 1700000200.0, 'resultado': 'rejeitado'},
-            {'id': 3, 'deposit_id': 2, 'timestamp': 1700003600.0, 'resultado': 'sucesso'},
+        # Rollup diário de 2 depósitos (2500g/2600g) e 3 interações (2 sucesso, 1 rejeitado)
+        fake_rollup = [
+            {'day': '2023-11-14', 'resultado': 'sucesso', 'interactions': 2, 'deposits': 2,
+             'confidence_sum': 1.7, 'confidence_count': 2, 'weight_sum': 5100.0, 'weight_count': 2,
+             'plastico_sum': 1.0},
+            {'day': '2023-11-14', 'resultado': 'rejeitado', 'interactions': 1, 'deposits': 0,
+             'confidence_sum': 0.0, 'confidence_count': 0, 'weight_sum': 0.0, 'weight_count': 0,
+             'plastico_sum': 0.0},
         ]
 
         with patch('app._ensure_db_connection') as mock_db_factory:
             fake_db = MagicMock()
-            fake_db.get_all_deposits.return_value = fake_deposits
-            fake_db.get_all_interactions.return_value = fake_interactions
+            fake_db.get_daily_rollup.return_value = fake_rollup
 
             fake_context = MagicMock()
             fake_context.__enter__.return_value = fake_db
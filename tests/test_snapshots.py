@@ -0,0 +1,138 @@
+"""
+Testes dos snapshots de leitura para analytics (src/database/snapshots.py).
+
+Cobre:
+    Cópia pelo backup online em passos com escritas concorrentes, publicação atômica,
+    retenção dos N mais recentes, leitura somente leitura e idade no relatório analítico
+"""
+import sqlite3
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from app import app
+from src.database.db import DatabaseConnection
+from src.database.snapshots import SnapshotManager
+
+SUCESSO = DatabaseConnection.ResultadoInteracao.SUCESSO
+
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    with app.test_client() as flask_client:
+        yield flask_client
+
+
+# =============================================================================
+# TestSnapshotManager
+# =============================================================================
+
+class TestSnapshotManager:
+    def test_snapshot_copia_dados_e_publica_sem_tmp(self, sqlite_database, tmp_path):
+        for _ in range(3):
+            sqlite_database.save_interaction(SUCESSO)
+        manager = SnapshotManager(sqlite_database.db_path, tmp_path / "snaps", pages_per_step=1)
+
+        info = manager.take_snapshot()
+
+        assert manager.latest() == info
+        assert not list((tmp_path / "snaps").glob("*.tmp"))
+        conn = sqlite3.connect(info.path)
+        try:
+            assert conn.execute('SELECT COUNT(*) FROM interactions').fetchone()[0] == 3
+            assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'delete'
+        finally:
+            conn.close()
+
+    def test_mantem_apenas_os_mais_recentes(self, sqlite_database, tmp_path):
+        manager = SnapshotManager(sqlite_database.db_path, tmp_path / "snaps", keep=2)
+        taken = [manager.take_snapshot() for _ in range(4)]
+
+        remaining = sorted(p.name for p in (tmp_path / "snaps").glob("*.db"))
+        assert remaining == sorted(info.path.rsplit('/', 1)[-1] for info in taken[-2:])
+
+    def test_reaproveita_snapshots_publicados_ao_reiniciar(self, sqlite_database, tmp_path):
+        info = SnapshotManager(sqlite_database.db_path, tmp_path / "snaps").take_snapshot()
+        assert SnapshotManager(sqlite_database.db_path, tmp_path / "snaps").latest().path == info.path
+
+    def test_escritas_concorrentes_nao_bloqueiam_nem_corrompem(self, sqlite_database, tmp_path):
+        # Banco com algumas centenas de páginas para o backup levar vários passos
+        with sqlite_database as conn_holder:
+            conn_holder.conn.executemany('INSERT INTO interactions (timestamp, resultado) VALUES (?, ?)',
+                                         [(time.time(), 'sucesso')] * 20000)
+            conn_holder.conn.commit()
+        stop = threading.Event()
+        writes = []
+
+        def writer():
+            while not stop.is_set():
+                started = time.perf_counter()
+                sqlite_database.save_interaction(SUCESSO)
+                writes.append(time.perf_counter() - started)
+
+        thread = threading.Thread(target=writer)
+        thread.start()
+        try:
+            info = SnapshotManager(sqlite_database.db_path, tmp_path / "snaps", pages_per_step=8,
+                                   step_pause_seconds=0.001).take_snapshot()
+        finally:
+            stop.set()
+            thread.join()
+
+        assert writes and max(writes) < 1.0
+        conn = sqlite3.connect(info.path)
+        try:
+            assert conn.execute('PRAGMA integrity_check').fetchone()[0] == 'ok'
+            assert conn.execute('SELECT COUNT(*) FROM interactions').fetchone()[0] >= 20000
+        finally:
+            conn.close()
+
+    def test_reader_consulta_snapshot_somente_leitura(self, sqlite_database, tmp_path):
+        sqlite_database.save_interaction(SUCESSO)
+        manager = SnapshotManager(sqlite_database.db_path, tmp_path / "snaps")
+        assert manager.reader() is None
+        manager.take_snapshot()
+        sqlite_database.save_interaction(SUCESSO)  # depois do snapshot: não aparece na leitura
+
+        reader, info = manager.reader()
+        with reader as db:
+            assert sum(row['interactions'] for row in db.get_daily_rollup()) == 1
+            with pytest.raises(sqlite3.OperationalError):
+                db.conn.execute('DELETE FROM interactions')
+        assert info.age_seconds < 60
+
+
+# =============================================================================
+# TestAnalyticsSnapshotRoute
+# =============================================================================
+
+class TestAnalyticsSnapshotRoute:
+    def test_relatorio_le_snapshot_e_informa_idade(self, client, sqlite_database, tmp_path):
+        sqlite_database.save_interaction(SUCESSO)
+        manager = SnapshotManager(sqlite_database.db_path, tmp_path / "snaps")
+        manager.take_snapshot()
+        sqlite_database.save_interaction(SUCESSO)
+
+        with patch('app.is_admin_authenticated', return_value=True), \
+             patch('app._ensure_snapshot_manager', return_value=manager):
+            response = client.get('/api/admin/analytics-report')
+
+        report = response.get_json()['report']
+        assert response.status_code == 200
+        assert report['kpis']['total_interactions'] == 1
+        assert report['source']['kind'] == 'snapshot'
+        assert report['source']['age_seconds'] >= 0
+
+    def test_sem_snapshot_le_banco_vivo(self, client, sqlite_database):
+        sqlite_database.save_interaction(SUCESSO)
+        with patch('app.is_admin_authenticated', return_value=True), \
+             patch('app._ensure_snapshot_manager', return_value=None), \
+             patch('app._ensure_db_connection', return_value=sqlite_database):
+            response = client.get('/api/admin/analytics-report')
+
+        report = response.get_json()['report']
+        assert report['source'] == {'kind': 'live'}
+        assert report['kpis']['total_interactions'] == 1
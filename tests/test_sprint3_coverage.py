@@ -6,6 +6,7 @@ Testes focados na cobertura da demanda Sprint 3:
 """
 from __future__ import annotations
 
+from datetime import datetime, timedelta
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -19,6 +20,7 @@ from app import app
 from src.modules.sprint3_analytics import (
     build_analytics_report,
     build_daily_trend,
+    build_daily_trend_from_counts,
     is_admin_authenticated,
 )
 
@@ -59,6 +61,15 @@ class TestSprint3Helpers:
         trend = build_daily_trend([{'timestamp': old_ts}], days=7)
         assert sum(trend['values']) == 0
 
+    def test_build_daily_trend_from_counts_preenche_dias_sem_deposito(self):
+        today = datetime.now().date()
+        counts = {today.isoformat(): 3, (today - timedelta(days=2)).isoformat(): 1}
+        trend = build_daily_trend_from_counts(counts, days=7)
+        assert trend['values'] == [0, 0, 0, 0, 1, 0, 3]
+        assert trend == build_daily_trend(
+            [{'timestamp': time.time()}] * 3 + [{'timestamp': time.time() - 2 * 24 * 3600}], days=7
+        )
+
     def test_build_analytics_report_com_lista_vazia(self):
         report = build_analytics_report([], [])
         assert report['kpis']['total_interactions'] == 0
@@ -94,15 +105,17 @@ class TestSprint3Helpers:
         assert isinstance(report['generated_at'], str)
 
     def test_ensure_db_connection_cria_quando_nao_existe(self):
-        with patch('app.DatabaseConnection') as mock_db_cls:
+        with patch('app.open_repository') as mock_open, \
+             patch('app._ensure_totals_reconciler'):
             fake_db = MagicMock()
-            mock_db_cls.return_value = fake_db
+            mock_open.return_value = fake_db
             app_module.db_connection = None
 
             result = app_module._ensure_db_connection()
 
             assert result is fake_db
             fake_db.init_db.assert_called_once()
+            assert mock_open.call_args.args[0] == app_module.DATABASE_URL
 
     def test_ensure_db_connection_reutiliza_existente(self):
         fake_existing = MagicMock()
@@ -0,0 +1,234 @@
+"""
+Testes da telemetria empurrada pelo ESP32 (src/hardware/telemetry.py e esp32.py).
+
+Cobre:
+    Anel de leituras por dispositivo com idade máxima, agregação da janela fresca (mediana,
+    presença), escolha do dispositivo (ESP32_DEVICE_ID ou único fresco), ingestão autenticada em
+    /api/esp32/telemetry, leitura local fresca no lugar de GET /api/sensors e estado nas métricas
+"""
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from app import app
+from src.hardware import esp32
+from src.hardware.telemetry import TelemetryStore, is_device_authenticated
+
+TOKEN = 'token-telemetria'
+READING = {'presenca': True, 'peso': 2550, 'temperatura': 23.0}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def store(clock):
+    return TelemetryStore(buffer_size=3, max_age_seconds=2, max_devices=2, clock=clock)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setenv('ESP32_TELEMETRY_TOKEN', TOKEN)
+    app.config['TESTING'] = True
+    with app.test_client() as flask_client:
+        yield flask_client
+
+
+def _push(client, payload, token=TOKEN):
+    return client.post('/api/esp32/telemetry', json=payload, headers={'Authorization': f'Bearer {token}'})
+
+
+# =============================================================================
+# TestTelemetryStore
+# =============================================================================
+
+class TestTelemetryStore:
+    """Anel por dispositivo, janela fresca agregada e idade máxima."""
+
+    def test_anel_guarda_so_as_ultimas_leituras(self, store):
+        store.ingest('totem-01', [{'peso': peso} for peso in range(5)])
+
+        device = store.snapshot()['devices']['totem-01']
+        assert device['readings'] == 3
+        assert device['latest'] == {'peso': 4}
+
+    def test_agrega_a_janela_fresca(self, store):
+        store.ingest('totem-01', [
+            {'presenca': False, 'peso': 2500, 'temperatura': 22.0},
+            {'presenca': True, 'peso': 9000, 'temperatura': 40.0},  # pico isolado
+            {'presenca': False, 'peso': 2550, 'temperatura': 23.0},
+        ])
+
+        assert store.reading('totem-01') == {'presenca': True, 'peso': 2550, 'temperatura': 23.0}
+        assert store.stats['local_hits'] == 1
+
+    def test_leituras_velhas_ficam_fora_da_janela(self, store, clock):
+        store.ingest('totem-01', [{'presenca': True, 'peso': 100, 'temperatura': 20.0}])
+        clock.now += 2.5
+        store.ingest('totem-01', [READING])
+
+        assert store.reading('totem-01') == READING
+
+    def test_dispositivo_configurado_escolhe_a_janela(self, store, clock):
+        store.ingest('totem-01', [READING])
+        clock.now += 1
+        store.ingest('totem-02', [{'presenca': False, 'peso': 0, 'temperatura': 30.0}])
+
+        assert store.reading('totem-01') == READING
+        assert store.reading('totem-03') is None
+        assert store.stats['empty_misses'] == 1
+
+    def test_varios_dispositivos_frescos_sem_configuracao(self, store):
+        store.ingest('totem-01', [READING])
+        store.ingest('totem-02', [READING])
+
+        assert store.fresh() is False
+        assert store.reading() is None
+        assert store.stats['ambiguous_misses'] == 1
+
+    def test_dispositivo_unico_dispensa_configuracao(self, store, clock):
+        store.ingest('totem-01', [READING])
+        store.ingest('totem-02', [READING])
+        clock.now += 2.5
+        store.ingest('totem-02', [READING])
+
+        assert store.fresh() is True
+        assert store.reading() == READING
+
+    def test_leitura_velha_nao_e_servida(self, store, clock):
+        store.ingest('totem-01', [{'peso': 1}])
+        clock.now += 2.5
+
+        assert store.reading() is None
+        assert store.fresh() is False
+        assert store.stats['stale_misses'] == 1
+        assert store.snapshot()['devices']['totem-01']['stale'] is True
+
+    def test_limite_de_dispositivos(self, store):
+        store.ingest('a', [{'peso': 1}])
+        store.ingest('b', [{'peso': 1}])
+
+        with pytest.raises(ValueError):
+            store.ingest('c', [{'peso': 1}])
+        assert store.ingest('a', [{'peso': 2}]) == 1
+
+    def test_token_do_dispositivo(self):
+        assert is_device_authenticated('Bearer abc', 'abc')
+        assert not is_device_authenticated('Bearer abd', 'abc')
+        assert not is_device_authenticated('Bearer ', '')
+
+
+# =============================================================================
+# TestIngestao
+# =============================================================================
+
+class TestIngestao:
+    """POST /api/esp32/telemetry: autenticação, validação e lote."""
+
+    def test_sem_token_configurado_recusa(self, client, monkeypatch):
+        monkeypatch.delenv('ESP32_TELEMETRY_TOKEN')
+
+        response = _push(client, {'device_id': 'totem-01', **READING}, token='')
+
+        assert response.status_code == 401
+        assert esp32.telemetry_store.snapshot()['devices'] == {}
+
+    def test_token_errado_recusa(self, client):
+        response = _push(client, {'device_id': 'totem-01', **READING}, token='outro')
+
+        assert response.status_code == 401
+
+    def test_leitura_unica_aceita(self, client):
+        response = _push(client, {'device_id': 'totem-01', **READING})
+
+        assert response.status_code == 200
+        assert response.get_json()['accepted'] == 1
+        assert esp32.telemetry_store.reading() == READING
+
+    def test_lote_invalido_e_rejeitado_inteiro(self, client):
+        response = _push(client, {'device_id': 'relay', 'readings': [READING, {**READING, 'peso': 99999}]})
+
+        assert response.status_code == 400
+        assert 'peso' in response.get_json()['error']
+        assert esp32.telemetry_store.snapshot()['devices'] == {}
+        assert esp32.telemetry_store.stats['rejected'] == 2
+
+    @pytest.mark.parametrize('payload', [
+        {**READING},
+        {'device_id': 'totem-01', 'presenca': 'sim', 'peso': 2550},
+        {'device_id': 'totem-01', 'readings': []},
+    ])
+    def test_payload_invalido_retorna_400(self, client, payload):
+        assert _push(client, payload).status_code == 400
+
+
+# =============================================================================
+# TestLeituraLocal
+# =============================================================================
+
+class TestLeituraLocal:
+    """get_esp32_sensors usa a telemetria fresca em vez de GET /api/sensors."""
+
+    def test_leitura_fresca_dispensa_chamada_remota(self):
+        esp32.ingest_esp32_telemetry({'device_id': 'totem-01', **READING})
+
+        with patch('src.hardware.esp32.call_esp32_api') as mock_call:
+            assert esp32.get_esp32_sensors() == READING
+            assert esp32.get_esp32_sensors_with_mechanical() is None
+        mock_call.assert_not_called()
+
+    def test_leitura_velha_consulta_a_api(self):
+        esp32.ingest_esp32_telemetry({'device_id': 'totem-01', **READING})
+        remote = {'presenca': False, 'peso': 0, 'temperatura': 20.0}
+
+        with patch.object(esp32.telemetry_store, 'max_age_seconds', 0), \
+                patch('src.hardware.esp32.call_esp32_api', return_value=remote) as mock_call:
+            assert esp32.get_esp32_sensors() == remote
+        mock_call.assert_called_once_with('/api/sensors', 'GET')
+
+    def test_dispositivo_configurado_entre_varios(self, monkeypatch):
+        monkeypatch.setenv('ESP32_DEVICE_ID', 'totem-02')
+        esp32.ingest_esp32_telemetry({'device_id': 'totem-01', 'presenca': False, 'peso': 0})
+        esp32.ingest_esp32_telemetry({'device_id': 'totem-02', **READING})
+
+        with patch('src.hardware.esp32.call_esp32_api') as mock_call:
+            assert esp32.get_esp32_sensors() == READING
+        mock_call.assert_not_called()
+
+    def test_varios_dispositivos_sem_configuracao_consulta_a_api(self, monkeypatch):
+        monkeypatch.delenv('ESP32_DEVICE_ID', raising=False)
+        esp32.ingest_esp32_telemetry({'device_id': 'totem-01', 'presenca': False, 'peso': 0})
+        esp32.ingest_esp32_telemetry({'device_id': 'totem-02', **READING})
+        remote = {'presenca': True, 'peso': 2400, 'temperatura': 21.0}
+
+        with patch('src.hardware.esp32.call_esp32_api', return_value=remote) as mock_call:
+            assert esp32.get_esp32_sensors() == remote
+        mock_call.assert_called_once_with('/api/sensors', 'GET')
+
+    def test_versao_assincrona_usa_leitura_local(self):
+        esp32.ingest_esp32_telemetry({'device_id': 'totem-01', **READING})
+
+        with patch('src.hardware.esp32.call_esp32_api_async') as mock_call:
+            assert asyncio.run(esp32.get_esp32_sensors_async()) == READING
+        mock_call.assert_not_called()
+
+    def test_metricas_incluem_telemetria(self, client):
+        _push(client, {'device_id': 'totem-01', **READING})
+
+        with patch('app.is_admin_authenticated', return_value=True), patch('app.db_connection', None):
+            response = client.get('/api/admin/metrics')
+
+        telemetry = response.get_json()['metrics']['esp32_telemetry']
+        assert telemetry['devices']['totem-01']['stale'] is False
+        assert telemetry['ingested'] == 1
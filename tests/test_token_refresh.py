@@ -0,0 +1,208 @@
+"""
+Testes da renovação do token JWT do ESP32 (src/hardware/token_refresh.py e esp32.py).
+
+Cobre:
+    Backoff exponencial após falhas de login, renovação antecipada em background servindo
+    o token ainda válido, login único entre threads e corrotinas e estado nas métricas
+"""
+import asyncio
+import threading
+import time
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+import httpx
+import pytest
+import requests
+
+from app import app
+from src.hardware import esp32
+from src.hardware.token_refresh import TokenRefresher
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(autouse=True)
+def reset_token():
+    esp32.esp32_jwt_token = None
+    esp32.esp32_token_expiry = None
+    yield
+    esp32.esp32_jwt_token = None
+    esp32.esp32_token_expiry = None
+    esp32._async_client = None
+
+
+def _login_response(token, expires_in=3600):
+    response = MagicMock()
+    response.status_code = 200
+    response.json.return_value = {'token': token, 'expires_in': expires_in}
+    response.text = ''
+    return response
+
+
+# =============================================================================
+# TestTokenRefresher
+# =============================================================================
+
+class TestTokenRefresher:
+    """Política: antecipação, vida curta e backoff."""
+
+    def test_backoff_dobra_ate_o_maximo(self):
+        clock = FakeClock()
+        refresher = TokenRefresher(backoff_seconds=5, backoff_max_seconds=15, clock=clock)
+
+        delays = []
+        for _ in range(4):
+            refresher.record_failure('timeout')
+            delays.append(refresher.retry_in_seconds())
+
+        assert delays == [5, 10, 15, 15]
+        assert refresher.in_backoff()
+        clock.now += 15
+        assert not refresher.in_backoff()
+
+    def test_sucesso_encerra_backoff(self):
+        clock = FakeClock()
+        refresher = TokenRefresher(backoff_seconds=5, clock=clock)
+        refresher.record_failure()
+
+        refresher.record_success(expiry=clock.now + 3600)
+
+        assert not refresher.in_backoff()
+        assert refresher.consecutive_failures == 0
+
+    def test_due_dentro_da_margem(self):
+        clock = FakeClock()
+        refresher = TokenRefresher(refresh_margin_seconds=300, clock=clock)
+
+        assert not refresher.due(clock.now + 301)
+        assert refresher.due(clock.now + 299)
+
+    def test_token_de_vida_curta_usa_metade_da_validade(self):
+        clock = FakeClock()
+        refresher = TokenRefresher(refresh_margin_seconds=300, clock=clock)
+        refresher.record_success(expiry=clock.now + 100)
+
+        assert not refresher.due(clock.now + 60)
+        assert refresher.due(clock.now + 40)
+
+    def test_sem_renovacao_antecipada_durante_backoff(self):
+        clock = FakeClock()
+        refresher = TokenRefresher(refresh_margin_seconds=300, clock=clock)
+        refresher.record_failure()
+
+        assert not refresher.due(clock.now + 10)
+
+
+# =============================================================================
+# TestLoginUnico
+# =============================================================================
+
+class TestLoginUnico:
+    """Token expirado com várias threads/corrotinas: um único /api/auth/login."""
+
+    def test_threads_concorrentes_fazem_um_login(self):
+        def slow_login(*args, **kwargs):
+            time.sleep(0.2)
+            return _login_response('token-novo')
+
+        tokens = []
+        with patch('src.hardware.esp32.http_session.post', side_effect=slow_login) as mock_post:
+            threads = [threading.Thread(target=lambda: tokens.append(esp32.get_esp32_jwt_token()))
+                       for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        assert mock_post.call_count == 1
+        assert tokens == ['token-novo'] * 8
+
+    def test_corrotinas_concorrentes_fazem_um_login(self):
+        calls = []
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(request.url.path)
+            await asyncio.sleep(0.1)
+            return httpx.Response(200, json={'token': 'token-async', 'expires_in': 3600})
+
+        async def run():
+            esp32._async_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+            return await asyncio.gather(*(esp32.get_esp32_jwt_token_async() for _ in range(5)))
+
+        tokens = asyncio.run(run())
+
+        assert calls == ['/api/auth/login']
+        assert tokens == ['token-async'] * 5
+
+    def test_falha_de_login_entra_em_backoff(self):
+        with patch('src.hardware.esp32.http_session.post') as mock_post:
+            mock_post.side_effect = requests.exceptions.ConnectionError('offline')
+            assert esp32.get_esp32_jwt_token() is None
+            assert esp32.get_esp32_jwt_token() is None
+
+        assert mock_post.call_count == 1
+        assert esp32.token_refresher.snapshot()['consecutive_failures'] == 1
+
+
+# =============================================================================
+# TestRenovacaoEmBackground
+# =============================================================================
+
+class TestRenovacaoEmBackground:
+    """Token perto de expirar: servido na hora enquanto o login roda em background."""
+
+    def test_token_valido_servido_durante_renovacao(self):
+        esp32.esp32_jwt_token = 'token-antigo'
+        esp32.esp32_token_expiry = datetime.now().timestamp() + 60  # dentro da margem de 300s
+        release = threading.Event()
+
+        def blocked_login(*args, **kwargs):
+            release.wait(timeout=2)
+            return _login_response('token-renovado')
+
+        with patch('src.hardware.esp32.http_session.post', side_effect=blocked_login) as mock_post:
+            started = time.perf_counter()
+            first = esp32.get_esp32_jwt_token()
+            second = esp32.get_esp32_jwt_token()
+            elapsed = time.perf_counter() - started
+
+            release.set()
+            deadline = time.monotonic() + 2
+            while esp32.esp32_jwt_token != 'token-renovado' and time.monotonic() < deadline:
+                time.sleep(0.01)
+
+        assert (first, second) == ('token-antigo', 'token-antigo')
+        assert elapsed < 0.5
+        assert mock_post.call_count == 1
+        assert esp32.esp32_jwt_token == 'token-renovado'
+        assert esp32.token_refresher.stats['background_refreshes'] == 1
+
+    def test_token_longe_de_expirar_nao_renova(self):
+        esp32.esp32_jwt_token = 'token'
+        esp32.esp32_token_expiry = datetime.now().timestamp() + 3600
+
+        with patch('src.hardware.esp32.http_session.post') as mock_post:
+            assert esp32.get_esp32_jwt_token() == 'token'
+
+        mock_post.assert_not_called()
+
+    def test_metricas_incluem_estado_do_token(self):
+        esp32.esp32_jwt_token = 'token'
+        esp32.esp32_token_expiry = datetime.now().timestamp() + 3600
+        app.config['TESTING'] = True
+
+        with app.test_client() as client, patch('app.is_admin_authenticated', return_value=True), \
+                patch('app.db_connection', None):
+            response = client.get('/api/admin/metrics')
+
+        token = response.get_json()['metrics']['esp32_token']
+        assert token['has_token'] is True
+        assert 3500 < token['expires_in_seconds'] <= 3600
+        assert token['refreshing'] is False